@@ -7,7 +7,7 @@ import sys
 import time
 import argparse
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # Add the parent directory to the path so we can import the package
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -78,7 +78,7 @@ def create_search_tool():
         }
     )
 
-def create_team(model_path: str, kernel_type: str, use_bitnet_integration: bool, collaboration_mode: CollaborationMode):
+def create_team(model_path: str, kernel_type: str, use_bitnet_integration: bool, collaboration_mode: CollaborationMode, simulation: Optional[Dict[str, Any]] = None):
     """
     Create a team.
     
@@ -87,6 +87,7 @@ def create_team(model_path: str, kernel_type: str, use_bitnet_integration: bool,
         kernel_type: Kernel type
         use_bitnet_integration: Whether to use BitNet integration
         collaboration_mode: Collaboration mode
+        simulation: Simulated backend settings (optional)
         
     Returns:
         Team
@@ -95,7 +96,8 @@ def create_team(model_path: str, kernel_type: str, use_bitnet_integration: bool,
     model = BitNetModel(
         model_path=model_path,
         kernel_type=kernel_type,
-        use_bitnet_integration=use_bitnet_integration
+        use_bitnet_integration=use_bitnet_integration,
+        simulation=simulation
     )
     
     # Create tools
@@ -224,14 +226,59 @@ def main():
         help="Number of runs per task"
     )
     
+    parser.add_argument(
+        "--simulate",
+        action="store_true",
+        help="Use the simulated backend instead of a model"
+    )
+    
+    parser.add_argument(
+        "--prefill-time",
+        type=float,
+        default=0.0005,
+        help="Simulated seconds per prompt token"
+    )
+    
+    parser.add_argument(
+        "--decode-time",
+        type=float,
+        default=0.02,
+        help="Simulated seconds per generated token"
+    )
+    
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.1,
+        help="Simulated relative jitter of each call's costs"
+    )
+    
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed of the simulated jitter"
+    )
+    
     args = parser.parse_args()
     
+    # Simulated backend settings
+    simulation = None
+    if args.simulate:
+        simulation = {
+            "prefill_time_per_token": args.prefill_time,
+            "decode_time_per_token": args.decode_time,
+            "jitter": args.jitter,
+            "seed": args.seed
+        }
+    
     # Create team
     team = create_team(
         model_path=args.model_path,
         kernel_type=args.kernel_type,
         use_bitnet_integration=args.use_bitnet,
-        collaboration_mode=CollaborationMode[args.collaboration_mode]
+        collaboration_mode=CollaborationMode[args.collaboration_mode],
+        simulation=simulation
     )
     
     # Define tasks
@@ -253,6 +300,7 @@ def main():
     print(f"Model: {args.model_path}")
     print(f"Kernel Type: {args.kernel_type}")
     print(f"Use BitNet Integration: {args.use_bitnet}")
+    print(f"Simulated: {args.simulate}")
     print(f"Collaboration Mode: {args.collaboration_mode}")
     print(f"Number of Runs: {args.num_runs}")
     print()
@@ -7,7 +7,7 @@ import sys
 import time
 import argparse
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # Add the parent directory to the path so we can import the package
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -52,7 +52,7 @@ def create_calculator_tool():
         }
     )
 
-def create_virtual_coworker(model_path: str, kernel_type: str, use_bitnet_integration: bool):
+def create_virtual_coworker(model_path: str, kernel_type: str, use_bitnet_integration: bool, simulation: Optional[Dict[str, Any]] = None):
     """
     Create a virtual co-worker.
     
@@ -60,6 +60,7 @@ def create_virtual_coworker(model_path: str, kernel_type: str, use_bitnet_integr
         model_path: Path to the model
         kernel_type: Kernel type
         use_bitnet_integration: Whether to use BitNet integration
+        simulation: Simulated backend settings (optional)
         
     Returns:
         Virtual co-worker
@@ -68,7 +69,8 @@ def create_virtual_coworker(model_path: str, kernel_type: str, use_bitnet_integr
     model = BitNetModel(
         model_path=model_path,
         kernel_type=kernel_type,
-        use_bitnet_integration=use_bitnet_integration
+        use_bitnet_integration=use_bitnet_integration,
+        simulation=simulation
     )
     
     # Create tools
@@ -164,13 +166,58 @@ def main():
         help="Number of runs per task"
     )
     
+    parser.add_argument(
+        "--simulate",
+        action="store_true",
+        help="Use the simulated backend instead of a model"
+    )
+    
+    parser.add_argument(
+        "--prefill-time",
+        type=float,
+        default=0.0005,
+        help="Simulated seconds per prompt token"
+    )
+    
+    parser.add_argument(
+        "--decode-time",
+        type=float,
+        default=0.02,
+        help="Simulated seconds per generated token"
+    )
+    
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.1,
+        help="Simulated relative jitter of each call's costs"
+    )
+    
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed of the simulated jitter"
+    )
+    
     args = parser.parse_args()
     
+    # Simulated backend settings
+    simulation = None
+    if args.simulate:
+        simulation = {
+            "prefill_time_per_token": args.prefill_time,
+            "decode_time_per_token": args.decode_time,
+            "jitter": args.jitter,
+            "seed": args.seed
+        }
+    
     # Create virtual co-worker
     virtual_coworker = create_virtual_coworker(
         model_path=args.model_path,
         kernel_type=args.kernel_type,
-        use_bitnet_integration=args.use_bitnet
+        use_bitnet_integration=args.use_bitnet,
+        simulation=simulation
     )
     
     # Define tasks
@@ -197,6 +244,7 @@ def main():
     print(f"Model: {args.model_path}")
     print(f"Kernel Type: {args.kernel_type}")
     print(f"Use BitNet Integration: {args.use_bitnet}")
+    print(f"Simulated: {args.simulate}")
     print(f"Number of Runs: {args.num_runs}")
     print()
     
@@ -0,0 +1,150 @@
+"""
+Ternary matmul kernel benchmark for BitNet Virtual Co-worker Builder.
+
+Times TernaryLinear against naive float emulation (unpacking the packed
+weights to float32 and multiplying them with NumPy on every call) for a
+square matrix and several input row counts: one row is a decoding step, and
+more rows are batched decoding and prefill.
+
+Usage:
+    python benchmarks/kernels.py
+    python benchmarks/kernels.py --size 4096 --rows 1 16 128 512 --output kernels.json
+
+The run fails (exit code 1) when the kernel's median is slower than float
+emulation for any row count.
+"""
+
+import os
+import sys
+import argparse
+import logging
+from typing import List
+
+import numpy as np
+
+# Add the parent directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from bitnet_vc_builder.core.benchmark import BenchmarkResult, run_benchmark, print_results, save_results
+from bitnet_vc_builder.models.kernels import TernaryLinear
+from bitnet_vc_builder.models.ternary import pack_ternary, unpack_ternary
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+def bench_rows(size: int, rows: int, kernel_type: str, num_threads: int, seed: int = 0) -> List[BenchmarkResult]:
+    """
+    Time the kernel and float emulation for one input row count.
+
+    Args:
+        size: Number of rows and columns of the weight matrix
+        rows: Number of input rows
+        kernel_type: Kernel type
+        num_threads: Number of kernel threads
+        seed: Random seed
+
+    Returns:
+        Results of the kernel and of float emulation
+    """
+    rng = np.random.default_rng(seed)
+    values = rng.integers(-1, 2, size=(size, size)).astype(np.int8)
+    packed = pack_ternary(values)
+    x = rng.standard_normal((rows, size)).astype(np.float32)
+
+    layer = TernaryLinear(packed, (size, size), 1.0, kernel_type, num_threads)
+
+    def emulate():
+        weights = unpack_ternary(packed, size * size).reshape(size, size).astype(np.float32)
+        return x @ weights.T
+
+    params = {"size": size, "rows": rows, "kernel_type": kernel_type, "num_threads": num_threads}
+    return [
+        run_benchmark(f"ternary_{rows}", lambda: layer(x), units_per_call=rows, unit="rows", params=params, min_time=1.0),
+        run_benchmark(f"float_{rows}", emulate, units_per_call=rows, unit="rows", params=params, min_time=1.0)
+    ]
+
+def parse_args():
+    """
+    Parse command line arguments.
+
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Ternary matmul kernel benchmark for BitNet Virtual Co-worker Builder")
+
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=2048,
+        help="Number of rows and columns of the weight matrix"
+    )
+
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[1, 16, 128],
+        help="Input row counts to time"
+    )
+
+    parser.add_argument(
+        "--kernel-type",
+        type=str,
+        default="i2_s",
+        help="Kernel type"
+    )
+
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=1,
+        help="Number of kernel threads"
+    )
+
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="Write results as JSON to this file"
+    )
+
+    return parser.parse_args()
+
+def main():
+    """
+    Main function.
+    """
+    args = parse_args()
+
+    results = []
+    for rows in args.rows:
+        results.extend(bench_rows(args.size, rows, args.kernel_type, args.threads))
+
+    print()
+    print_results(results)
+
+    if args.output:
+        save_results(args.output, results)
+        logger.info(f"Results written to {args.output}")
+
+    failures = []
+    print()
+    print(f"{'rows':>6} {'ternary ms':>12} {'float ms':>10} {'speedup':>9}")
+    for kernel, emulated in zip(results[::2], results[1::2]):
+        kernel_p50 = kernel.stats()["p50"]
+        emulated_p50 = emulated.stats()["p50"]
+        rows = kernel.params["rows"]
+        print(f"{rows:>6} {kernel_p50 * 1000:>12.2f} {emulated_p50 * 1000:>10.2f} {emulated_p50 / kernel_p50:>8.2f}x")
+        if kernel_p50 >= emulated_p50:
+            failures.append(f"{rows} rows: the kernel takes {kernel_p50 * 1000:.2f} ms, float emulation {emulated_p50 * 1000:.2f} ms")
+
+    if failures:
+        for failure in failures:
+            logger.error(failure)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
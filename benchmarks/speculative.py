@@ -0,0 +1,304 @@
+"""
+Speculative decoding benchmark for BitNet Virtual Co-worker Builder.
+
+Writes a random ternary model and first times one forward pass over 1 to
+num_draft_tokens + 1 tokens, which is what verifying that many drafts costs,
+relative to decoding one token. It then times greedy generation of a ReAct
+prompt with plain decoding and with each drafter, after warming up the gate so
+the timed runs use the decision it settles on. For each drafter it reports the
+measured cost of a speculative pass in decoding steps, the acceptance rate at
+which that cost breaks even, the acceptance rate reached, and the speedup
+SpeculationGate expects from them next to the speedup measured. A random
+model's output is hard to predict, so expect the gate to fall back to plain
+decoding here; pass --model to time a trained model.
+
+Usage:
+    python benchmarks/speculative.py
+    python benchmarks/speculative.py --hidden-size 2048 --draft ngram draft --output speculative.json
+    python benchmarks/speculative.py --model models/bitnet.i2s --draft ngram
+
+The run fails (exit code 1) when a drafter makes generation slower than plain
+decoding by more than the tolerance.
+"""
+
+import os
+import sys
+import shutil
+import argparse
+import logging
+import tempfile
+from typing import Dict, List, Optional
+
+# Add the parent directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from bitnet_vc_builder.core.benchmark import BenchmarkResult, measure, run_benchmark, print_results, save_results
+from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+from bitnet_vc_builder.models.numpy_backend import NumPyTransformer
+from bitnet_vc_builder.models.speculative import expected_tokens_per_pass
+from bitnet_vc_builder.models.ternary import TernaryWeights, write_random_model
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+PROMPT = (
+    "Thought: I need to look up the weather.\n"
+    "Action: search\n"
+    "Action Input: {\"query\": \"weather in Paris\"}\n"
+    "Observation: Sunny, 21 degrees.\n"
+    "Thought: I need to look up the weather.\n"
+    "Action: search\n"
+    "Action Input: {\"query\": \""
+)
+
+def bench_verify(path: str, num_draft_tokens: int, min_time: float) -> List[BenchmarkResult]:
+    """
+    Time one forward pass over 1 to num_draft_tokens + 1 tokens after a short context.
+
+    Args:
+        path: Model file
+        num_draft_tokens: Largest number of drafts verified
+        min_time: Minimum seconds to time each token count
+
+    Returns:
+        One result per token count
+    """
+    weights = TernaryWeights(path)
+    try:
+        model = NumPyTransformer(weights)
+        context = [token % model.vocab_size for token in range(1, 33)]
+        cache = model.new_cache()
+        model.forward(context, cache)
+        start = cache.length
+
+        def verify(count: int) -> None:
+            cache.length = start
+            model.forward(context[-1:] * count, cache, all_logits=count > 1)
+
+        results = []
+        for count in range(1, num_draft_tokens + 2):
+            results.append(run_benchmark(
+                f"verify_{count}", lambda count=count: verify(count), units_per_call=count, unit="tokens",
+                params={"tokens": count}, min_time=min_time
+            ))
+        return results
+    finally:
+        weights.close()
+
+def break_even_acceptance(pass_cost: float, num_draft_tokens: int) -> float:
+    """
+    Find the acceptance rate at which a pass yields as many tokens as it costs.
+
+    Args:
+        pass_cost: Cost of a pass in decoding steps
+        num_draft_tokens: Tokens drafted per pass
+
+    Returns:
+        Acceptance rate between 0 and 1 (1 if no rate breaks even)
+    """
+    low, high = 0.0, 1.0
+    if expected_tokens_per_pass(high, num_draft_tokens) < pass_cost:
+        return 1.0
+    for _ in range(40):
+        middle = (low + high) / 2
+        if expected_tokens_per_pass(middle, num_draft_tokens) < pass_cost:
+            low = middle
+        else:
+            high = middle
+    return high
+
+def bench_generation(path: str, drafts: Dict[str, Optional[str]], options: argparse.Namespace) -> List[BenchmarkResult]:
+    """
+    Time greedy generation with each drafter.
+
+    Calls of the drafters alternate round by round, so drift in the host's
+    speed affects them all alike.
+
+    Args:
+        path: Model file
+        drafts: Drafter of each benchmark name ("ngram", a draft model file, or None for plain decoding)
+        options: Parsed arguments
+
+    Returns:
+        One result per drafter, with the speculative statistics in its params
+    """
+    models = {
+        name: BitNetModel(model_path=path, use_bitnet_integration=False, draft=draft, num_draft_tokens=options.num_draft_tokens)
+        for name, draft in drafts.items()
+    }
+    generators = {
+        name: lambda model=model: model.generate(PROMPT, max_tokens=options.tokens, temperature=0.0)
+        for name, model in models.items()
+    }
+
+    # Let the gates measure the acceptance rate before timing
+    for generate in generators.values():
+        for _ in range(options.warmup):
+            generate()
+
+    samples: Dict[str, List[int]] = {name: [] for name in drafts}
+    for _ in range(options.rounds):
+        for name, generate in generators.items():
+            samples[name].extend(measure(generate, warmup=0, min_iterations=1, max_iterations=1, min_time=0.0))
+
+    return [
+        BenchmarkResult(name, samples[name], units_per_call=options.tokens, unit="tokens", params=models[name].get_speculative_stats())
+        for name in drafts
+    ]
+
+def parse_args():
+    """
+    Parse command line arguments.
+
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Speculative decoding benchmark for BitNet Virtual Co-worker Builder")
+
+    parser.add_argument(
+        "--model",
+        type=str,
+        help="Ternary model file to time instead of a random model"
+    )
+
+    parser.add_argument(
+        "--hidden-size",
+        type=int,
+        default=1024,
+        help="Hidden size of the model"
+    )
+
+    parser.add_argument(
+        "--num-layers",
+        type=int,
+        default=4,
+        help="Number of transformer layers of the model (the draft model has one)"
+    )
+
+    parser.add_argument(
+        "--draft",
+        type=str,
+        nargs="+",
+        choices=["ngram", "draft"],
+        default=["ngram", "draft"],
+        help="Drafters to time: prompt lookup and a one-layer random draft model (only with a random model)"
+    )
+
+    parser.add_argument(
+        "--num-draft-tokens",
+        type=int,
+        default=4,
+        help="Maximum number of tokens drafted per pass"
+    )
+
+    parser.add_argument(
+        "--tokens",
+        type=int,
+        default=32,
+        help="Tokens generated per call"
+    )
+
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=4,
+        help="Untimed generations per drafter before timing"
+    )
+
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=8,
+        help="Timed generations per drafter"
+    )
+
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.5,
+        help="Minimum seconds to time each verification pass size"
+    )
+
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Largest fraction by which a drafter may slow generation down"
+    )
+
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="Write results as JSON to this file"
+    )
+
+    return parser.parse_args()
+
+def main():
+    """
+    Main function.
+    """
+    args = parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = args.model
+        drafts = list(args.draft)
+        if path is None:
+            path = os.path.join(temp_dir, "model.i2s")
+            draft_path = os.path.join(temp_dir, "draft.i2s")
+            write_random_model(path, args.hidden_size, args.num_layers)
+            write_random_model(draft_path, args.hidden_size, 1)
+        elif "draft" in drafts:
+            logger.warning("The random draft model does not share a trained model's vocabulary; skipping it")
+            drafts.remove("draft")
+
+        verified = bench_verify(path, args.num_draft_tokens, args.min_time)
+        generated = bench_generation(path, dict(
+            [("plain", None)] + [("ngram", "ngram") if draft == "ngram" else ("draft_model", draft_path) for draft in drafts]
+        ), args)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    results = verified + generated
+
+    print()
+    print_results(results)
+
+    if args.output:
+        save_results(args.output, results)
+        logger.info(f"Results written to {args.output}")
+
+    single_p50 = verified[0].stats()["p50"]
+    print()
+    print(f"{'tokens':>6} {'pass ms':>10} {'cost':>6}")
+    for result in verified:
+        p50 = result.stats()["p50"]
+        print(f"{result.params['tokens']:>6} {p50 * 1000:>10.2f} {p50 / single_p50:>6.2f}")
+
+    failures = []
+    plain_p50 = generated[0].stats()["p50"]
+    print()
+    print(f"{'drafter':<12} {'pass cost':>10} {'break-even':>11} {'acceptance':>11} {'expected':>9} {'measured':>9}")
+    for result in generated[1:]:
+        params = result.params
+        speedup = plain_p50 / result.stats()["p50"]
+        break_even = break_even_acceptance(params["pass_cost"], args.num_draft_tokens)
+        print(
+            f"{result.name:<12} {params['pass_cost']:>10.2f} {break_even:>11.2f} {params['acceptance_rate']:>11.2f} "
+            f"{params['expected_speedup']:>8.2f}x {speedup:>8.2f}x"
+        )
+        if speedup < 1.0 - args.tolerance:
+            failures.append(f"{result.name} generation is {speedup:.2f}x as fast as plain decoding")
+
+    if failures:
+        for failure in failures:
+            logger.error(failure)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
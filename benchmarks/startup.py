@@ -0,0 +1,230 @@
+"""
+Startup-time benchmark for the BitNet Virtual Co-worker Builder CLI.
+
+The CLI runs from cron jobs and batch scripts, so its startup time is paid on
+every invocation. Each measurement starts a fresh interpreter:
+
+- ``import``: importing the CLI module, as reported by ``python -X importtime``.
+  The slowest imports are listed, and the run fails if a module that is meant
+  to load lazily (NumPy, requests, YAML) is imported at startup.
+- ``list``: ``--list``, which only reads the configuration.
+- ``coworker_task`` and ``team_task``: a single task for a virtual co-worker
+  and for a team, on a simulated model with zero cost, so no model time counts.
+
+The CLI runs are measured against a bare interpreter (``python -c pass``), and
+the budget applies to the time they add to it, which does not depend on how
+slow site-packages makes interpreter startup on the host.
+
+Usage:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --budget-ms 200 --runs 20 --output startup.json
+
+The run fails (exit code 1) when the median time a CLI run adds exceeds the
+budget, or a lazily loaded module is imported at startup.
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import logging
+import tempfile
+import subprocess
+from typing import List, Dict, Any
+
+SRC_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Add the parent directory to the path so we can import the package
+sys.path.insert(0, SRC_PATH)
+
+from bitnet_vc_builder.core.benchmark import BenchmarkResult, measure, parse_importtime, print_results, save_results
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Modules that must not be imported before a model needs them
+LAZY_MODULES = ("numpy", "requests", "yaml")
+
+# CLI configuration with a zero-cost simulated model (JSON is valid YAML)
+CLI_CONFIG = {
+    "model": {
+        "path": "simulated",
+        "simulation": {"prefill_time_per_token": 0.0, "decode_time_per_token": 0.0, "jitter": 0.0}
+    },
+    "agents": [{"name": "Assistant", "tools": ["calculate"]}],
+    "teams": [{"name": "Team", "agents": ["Assistant"]}]
+}
+
+def run_command(command: List[str], env: Dict[str, str], cwd: str) -> str:
+    """
+    Run a command to completion.
+
+    Args:
+        command: Command line
+        env: Environment variables
+        cwd: Working directory
+
+    Returns:
+        The command's stderr
+
+    Raises:
+        RuntimeError: If the command fails
+    """
+    completed = subprocess.run(command, env=env, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} exited with {completed.returncode}:\n{completed.stderr}")
+    return completed.stderr
+
+def bench_import(python: str, env: Dict[str, str], cwd: str, runs: int) -> Dict[str, Any]:
+    """
+    Measure importing the CLI module with -X importtime.
+
+    Args:
+        python: Python executable
+        env: Environment variables
+        cwd: Working directory
+        runs: Number of runs
+
+    Returns:
+        Dictionary with the result (cumulative import time of each run) and
+        the modules imported by the last run
+    """
+    command = [python, "-X", "importtime", "-c", "import bitnet_vc_builder.main"]
+    samples = []
+    modules: Dict[str, Dict[str, int]] = {}
+    for _ in range(runs):
+        modules = parse_importtime(run_command(command, env, cwd))
+        samples.append(modules["bitnet_vc_builder.main"]["cumulative"] * 1000)
+    return {"result": BenchmarkResult("import", samples, unit="starts"), "modules": modules}
+
+def bench_cli(name: str, command: List[str], env: Dict[str, str], cwd: str, runs: int) -> BenchmarkResult:
+    """
+    Measure the wall time of a command.
+
+    Args:
+        name: Benchmark name
+        command: Command line
+        env: Environment variables
+        cwd: Working directory
+        runs: Number of timed runs (after one warmup run)
+
+    Returns:
+        BenchmarkResult instance
+    """
+    samples = measure(lambda: run_command(command, env, cwd), warmup=1, min_iterations=runs, max_iterations=runs, min_time=0.0)
+    return BenchmarkResult(name, samples, unit="starts")
+
+def parse_args():
+    """
+    Parse command line arguments.
+
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Startup-time benchmark for the BitNet Virtual Co-worker Builder CLI")
+
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=10,
+        help="Timed runs per measurement"
+    )
+
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=200.0,
+        help="Largest median time in milliseconds a CLI run may add to a bare interpreter start"
+    )
+
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=15,
+        help="Number of slowest imports to list"
+    )
+
+    parser.add_argument(
+        "--python",
+        type=str,
+        default=sys.executable,
+        help="Python executable to start"
+    )
+
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="Write results as JSON to this file"
+    )
+
+    return parser.parse_args()
+
+def main():
+    """
+    Main function.
+    """
+    args = parse_args()
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        config_path = os.path.join(temp_dir, "config.yaml")
+        with open(config_path, "w") as f:
+            json.dump(CLI_CONFIG, f)
+
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(path for path in (SRC_PATH, env.get("PYTHONPATH")) if path)
+
+        cli = [args.python, "-m", "bitnet_vc_builder.main", "--config", config_path]
+        logger.info(f"Timing {args.runs} runs of each measurement...")
+        interpreter = bench_cli("interpreter", [args.python, "-c", "pass"], env, temp_dir, args.runs)
+        imported = bench_import(args.python, env, temp_dir, args.runs)
+        results = [
+            interpreter,
+            imported["result"],
+            bench_cli("list", cli + ["--list"], env, temp_dir, args.runs),
+            bench_cli("coworker_task", cli + ["--virtual-coworker", "Assistant", "--task", "hello"], env, temp_dir, args.runs),
+            bench_cli("team_task", cli + ["--team", "Team", "--task", "hello"], env, temp_dir, args.runs)
+        ]
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    print()
+    print_results(results)
+
+    modules = imported["modules"]
+    print()
+    print("Slowest imports of bitnet_vc_builder.main (last run):")
+    print(f"  {'self ms':>9} {'cumulative ms':>14}  module")
+    for name, times in sorted(modules.items(), key=lambda item: -item[1]["self"])[:args.top]:
+        print(f"  {times['self'] / 1000:>9.2f} {times['cumulative'] / 1000:>14.2f}  {name}")
+
+    if args.output:
+        save_results(args.output, results)
+        logger.info(f"Results written to {args.output}")
+
+    failures = []
+    eager = [name for name in LAZY_MODULES if name in modules]
+    if eager:
+        failures.append(f"imported at startup: {', '.join(eager)}")
+
+    baseline = interpreter.stats()["p50"]
+    print()
+    print(f"{'CLI run':<16} {'p50 ms':>10} {'added ms':>10} {'budget ms':>10}")
+    for result in results[2:]:
+        added = (result.stats()["p50"] - baseline) * 1000
+        print(f"{result.name:<16} {result.stats()['p50'] * 1000:>10.1f} {added:>10.1f} {args.budget_ms:>10.1f}")
+        if added > args.budget_ms:
+            failures.append(f"{result.name} adds {added:.1f} ms to interpreter startup (budget {args.budget_ms:.1f} ms)")
+
+    if failures:
+        for failure in failures:
+            logger.error(failure)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
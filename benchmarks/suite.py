@@ -0,0 +1,359 @@
+"""
+Benchmark suite for BitNet Virtual Co-worker Builder.
+
+Covers model generation throughput, agent loop overhead, every team
+collaboration mode, memory retrieval, tool dispatch and API server request
+handling. Models are either a small random ternary model (generation) or the
+simulated backend with zero cost (everything else), so the suite needs no
+model files and measures the framework rather than a model.
+
+Usage:
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --baseline benchmarks/baseline.json --threshold 0.2
+    python benchmarks/suite.py --save-baseline benchmarks/baseline.json
+
+With --baseline, the run fails (exit code 1) when a benchmark's median is
+more than the threshold slower than in the baseline.
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import logging
+import tempfile
+from typing import List, Dict, Any, Callable
+
+# Add the parent directory to the path so we can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from bitnet_vc_builder.core.benchmark import BenchmarkResult, run_benchmark, save_results, load_results, compare, print_results, environment
+from bitnet_vc_builder.core.team import BitNetTeam, CollaborationMode
+from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker
+from bitnet_vc_builder.memory.memory import Memory
+from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+from bitnet_vc_builder.models.ternary import write_random_model
+from bitnet_vc_builder.tools.base_tools import Tool
+from bitnet_vc_builder.tools.registry import ToolRegistry
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Simulated backend that costs nothing, so only framework time is measured
+INSTANT = {"prefill_time_per_token": 0.0, "decode_time_per_token": 0.0, "jitter": 0.0}
+
+CALCULATOR_CALL = "Action: calculator\nAction Input: {\"expression\": \"2 + 2\"}"
+
+def calculator_tool() -> Tool:
+    """
+    Create a calculator tool.
+
+    Returns:
+        Calculator tool
+    """
+    return Tool(
+        name="calculator",
+        description="Calculate a mathematical expression",
+        function=lambda expression: str(sum(int(term) for term in expression.split("+"))),
+        args_schema={"expression": {"type": "string", "description": "Mathematical expression to calculate"}}
+    )
+
+def scripted_coworker(name: str, script: List[str]) -> BitNetVirtualCoworker:
+    """
+    Create a virtual co-worker answering from a script at no model cost.
+
+    Args:
+        name: Name of the virtual co-worker
+        script: Model responses, returned in turn
+
+    Returns:
+        Virtual co-worker
+    """
+    model = BitNetModel(model_path="simulated", simulation=dict(INSTANT, script=script))
+    return BitNetVirtualCoworker(model=model, tools=[calculator_tool()], memory=Memory(), name=name)
+
+def bench_generate(options: Dict[str, Any]) -> List[BenchmarkResult]:
+    """
+    Benchmark NumPy backend generation throughput.
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "bench.i2s")
+        hidden_size = options["hidden_size"]
+        write_random_model(path, hidden_size, options["num_layers"])
+        model = BitNetModel(model_path=path, use_bitnet_integration=False)
+        tokens = options["generate_tokens"]
+
+        result = run_benchmark(
+            "generate", lambda: model.generate("The quick brown fox", max_tokens=tokens, temperature=0.0),
+            units_per_call=tokens, unit="tokens",
+            params={"hidden_size": hidden_size, "num_layers": options["num_layers"], "max_tokens": tokens},
+            **options["measure"]
+        )
+        model.unload()
+        return [result]
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+def bench_agent_loop(options: Dict[str, Any]) -> List[BenchmarkResult]:
+    """
+    Benchmark the agent loop with an instant model: one tool call, then an answer.
+    """
+    coworker = scripted_coworker("Bench", [CALCULATOR_CALL, "Final Answer: 4"])
+    return [run_benchmark("agent_loop", lambda: coworker.run("What is 2 + 2?"), params={"steps": 2}, **options["measure"])]
+
+def bench_collaboration_modes(options: Dict[str, Any]) -> List[BenchmarkResult]:
+    """
+    Benchmark every team collaboration mode with instant models.
+    """
+    plan = json.dumps([
+        {"subtask": "Add the numbers", "agent_name": "Worker1", "depends_on": []},
+        {"subtask": "Check the sum", "agent_name": "Worker2", "depends_on": [0]}
+    ])
+    coordinator_scripts = {
+        CollaborationMode.SEQUENTIAL: ["Final Answer: 4"],
+        CollaborationMode.PARALLEL: [f"Final Answer: {plan}"],
+        CollaborationMode.HIERARCHICAL: [f"Final Answer: {plan}", "Final Answer: 4"],
+        CollaborationMode.CONSENSUS: ["Final Answer: 4"]
+    }
+
+    results = []
+    for mode in CollaborationMode:
+        agents = [scripted_coworker("Coordinator", coordinator_scripts[mode])]
+        agents += [scripted_coworker(f"Worker{i}", [CALCULATOR_CALL, "Final Answer: 4"]) for i in (1, 2)]
+        team = BitNetTeam(agents=agents, collaboration_mode=mode)
+        results.append(run_benchmark(f"team_{mode.value}", lambda: team.run("Add 2 and 2"), **options["measure"]))
+    return results
+
+def bench_memory(options: Dict[str, Any]) -> List[BenchmarkResult]:
+    """
+    Benchmark memory retrieval at several store sizes.
+    """
+    results = []
+    for size in options["memory_sizes"]:
+        memory = Memory(max_items=size)
+        for i in range(size):
+            memory.add(f"Task: request {i} about topic {i % 97}\nAnswer: result {i}")
+        results.append(run_benchmark(
+            f"memory_retrieval_{size}", lambda: memory.get_context(query="topic 42", max_items=10),
+            params={"items": size}, **options["measure"]
+        ))
+        results.append(run_benchmark(
+            f"memory_recent_{size}", lambda: memory.get_context(max_items=10),
+            params={"items": size}, **options["measure"]
+        ))
+    return results
+
+def bench_tool_dispatch(options: Dict[str, Any]) -> List[BenchmarkResult]:
+    """
+    Benchmark finding a tool by name and calling it with validated arguments.
+    """
+    registry = ToolRegistry(
+        [calculator_tool()] +
+        [Tool(name=f"tool_{i}", description=f"Tool {i}", function=lambda value: value, args_schema={"value": {"type": "string"}}) for i in range(50)]
+    )
+
+    def dispatch():
+        registry.get("tool_25")({"value": "x"})
+        registry.get("calculator")({"expression": "2 + 2"})
+
+    return [run_benchmark("tool_dispatch", dispatch, units_per_call=2, params={"tools": len(registry)}, **options["measure"])]
+
+def bench_api(options: Dict[str, Any]) -> List[BenchmarkResult]:
+    """
+    Benchmark API server request handling in process: reads, and running a
+    virtual co-worker task through the API until its result can be polled.
+    """
+    from fastapi.testclient import TestClient
+    from bitnet_vc_builder.api import server
+
+    results = []
+    with TestClient(server.app) as client:
+        for path in ("/", "/models", "/metrics"):
+            results.append(run_benchmark(f"api_get_{path.strip('/') or 'root'}", lambda: client.get(path), unit="requests", **options["measure"]))
+
+        client.post("/models", json={
+            "name": "bench", "model_path": "simulated",
+            "simulation": dict(INSTANT, script=[CALCULATOR_CALL, "Final Answer: 4"])
+        }).raise_for_status()
+        client.post("/virtual-coworkers", json={"name": "BenchWorker", "model_name": "bench"}).raise_for_status()
+
+        polls = []
+
+        def run_task():
+            task_id = client.post("/virtual-coworkers/BenchWorker/run", json={"task": "What is 2 + 2?"}).json()["task_id"]
+            count = 0
+            while True:
+                count += 1
+                task = client.get(f"/tasks/{task_id}").json()
+                if task["status"] not in ("pending", "running"):
+                    break
+            if task["status"] != "completed":
+                raise RuntimeError(f"Task {task_id} {task['status']}: {task['result']}")
+            polls.append(count)
+
+        try:
+            results.append(run_benchmark("api_run_task", run_task, unit="tasks", **options["measure"]))
+            results[-1].params["polls"] = sum(polls) / len(polls)
+            results.append(run_benchmark("api_get_tasks", lambda: client.get("/tasks"), unit="requests", params={"tasks": len(polls)}, **options["measure"]))
+        finally:
+            client.delete("/virtual-coworkers/BenchWorker")
+            client.delete("/models/bench")
+    return results
+
+BENCHMARKS: Dict[str, Callable[[Dict[str, Any]], List[BenchmarkResult]]] = {
+    "generate": bench_generate,
+    "agent_loop": bench_agent_loop,
+    "team": bench_collaboration_modes,
+    "memory": bench_memory,
+    "tools": bench_tool_dispatch,
+    "api": bench_api
+}
+
+def parse_args():
+    """
+    Parse command line arguments.
+
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Benchmark suite for BitNet Virtual Co-worker Builder")
+
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=list(BENCHMARKS),
+        help="Benchmark groups to run (default: all)"
+    )
+
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="Fewer iterations and smaller sizes, for smoke tests"
+    )
+
+    parser.add_argument(
+        "--memory-sizes",
+        type=str,
+        default="1000,10000,100000,1000000",
+        help="Comma-separated memory store sizes"
+    )
+
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=1.0,
+        help="Seconds to time each benchmark for"
+    )
+
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="Write results as JSON to this file"
+    )
+
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        help="Compare against results in this file and fail on regressions"
+    )
+
+    parser.add_argument(
+        "--save-baseline",
+        type=str,
+        help="Write results as the new baseline to this file"
+    )
+
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Relative slowdown of the median counted as a regression"
+    )
+
+    parser.add_argument(
+        "--statistic",
+        type=str,
+        choices=["p50", "p90", "p99", "mean"],
+        default="p50",
+        help="Statistic compared against the baseline"
+    )
+
+    return parser.parse_args()
+
+def main():
+    """
+    Main function.
+    """
+    args = parse_args()
+
+    memory_sizes = [int(size) for size in args.memory_sizes.split(",") if size]
+    options = {
+        "measure": {"warmup": 1 if args.quick else 3, "min_iterations": 3 if args.quick else 10, "min_time": 0.1 if args.quick else args.min_time},
+        "memory_sizes": [size for size in memory_sizes if size <= 10000] if args.quick else memory_sizes,
+        "hidden_size": 128 if args.quick else 256,
+        "num_layers": 1 if args.quick else 2,
+        "generate_tokens": 8 if args.quick else 32
+    }
+
+    # Keep benchmark output readable
+    logging.getLogger("bitnet_vc_builder").setLevel(logging.WARNING)
+    logging.getLogger("bitnet_vc_builder.core.benchmark").setLevel(logging.INFO)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    results: List[BenchmarkResult] = []
+    for group in args.only or list(BENCHMARKS):
+        logger.info(f"Running {group} benchmarks...")
+        results.extend(BENCHMARKS[group](options))
+
+    print()
+    print_results(results)
+
+    if args.output:
+        save_results(args.output, results)
+        logger.info(f"Results written to {args.output}")
+    if args.save_baseline:
+        save_results(args.save_baseline, results)
+        logger.info(f"Baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        baseline = load_results(args.baseline)
+        if baseline["environment"].get("host") != environment()["host"]:
+            logger.warning("Baseline was measured on a different host; comparisons may not be meaningful")
+
+        comparisons = compare(
+            {result.name: result.stats() for result in results}, baseline["benchmarks"],
+            threshold=args.threshold, statistic=args.statistic
+        )
+        print()
+        print(f"{'Benchmark':<36} {'Baseline ms':>12} {'Current ms':>12} {'Change':>9}")
+        for comparison in comparisons:
+            if comparison["missing"]:
+                baseline_ms = "-" if comparison["baseline"] is None else f"{comparison['baseline'] * 1000:.3f}"
+                current_ms = "-" if comparison["current"] is None else f"{comparison['current'] * 1000:.3f}"
+                print(f"{comparison['name']:<36} {baseline_ms:>12} {current_ms:>12} {'-':>9}  MISSING FROM {comparison['missing'].upper()}")
+                continue
+            flag = "  REGRESSION" if comparison["regression"] else ""
+            print(
+                f"{comparison['name']:<36} {comparison['baseline'] * 1000:>12.3f} "
+                f"{comparison['current'] * 1000:>12.3f} {comparison['change']:>+9.1%}{flag}"
+            )
+
+        for side in ("current", "baseline"):
+            missing = [comparison["name"] for comparison in comparisons if comparison["missing"] == side]
+            if missing:
+                print(f"\n{len(missing)} benchmark(s) missing from the {side} results, not compared: {', '.join(missing)}")
+
+        regressions = [comparison["name"] for comparison in comparisons if comparison["regression"]]
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -225,6 +225,7 @@ def main():
             print(f"  Tasks Failed: {agent_metrics['tasks_failed']}")
             print(f"  Success Rate: {agent_metrics['success_rate']:.2f}")
             print(f"  Average Time: {agent_metrics['avg_time']:.2f} seconds")
+            print(f"  p95 Time: {agent_metrics['p95_time']:.2f} seconds")
         
         print("\n" + "=" * 50)
 
@@ -81,7 +81,8 @@ class CustomBitNetModel(BitNetModel):
         top_p: Optional[float] = None,
         top_k: Optional[int] = None,
         repetition_penalty: Optional[float] = None,
-        stop_sequences: Optional[List[str]] = None
+        stop_sequences: Optional[List[str]] = None,
+        **kwargs
     ) -> str:
         """
         Generate text from the model.
@@ -94,6 +95,7 @@ class CustomBitNetModel(BitNetModel):
             top_k: Top-k for sampling (overrides instance value)
             repetition_penalty: Repetition penalty (overrides instance value)
             stop_sequences: Sequences that stop generation
+            **kwargs: Other generation options (grammar, cancel token), passed through
             
         Returns:
             Generated text
@@ -132,7 +134,8 @@ class CustomBitNetModel(BitNetModel):
             top_p=top_p,
             top_k=top_k,
             repetition_penalty=repetition_penalty,
-            stop_sequences=stop_sequences
+            stop_sequences=stop_sequences,
+            **kwargs
         )
     
     def get_model_info(self) -> Dict[str, Any]:
@@ -194,6 +194,7 @@ def main():
         print(f"  Tasks Failed: {agent_metrics['tasks_failed']}")
         print(f"  Success Rate: {agent_metrics['success_rate']:.2f}")
         print(f"  Average Time: {agent_metrics['avg_time']:.2f} seconds")
+        print(f"  p95 Time: {agent_metrics['p95_time']:.2f} seconds")
 
 if __name__ == "__main__":
     main()
@@ -32,6 +32,7 @@ DEFAULT_INSTALL_DIR = r"C:\BitNet-VC-Builder"
 DEFAULT_MONITORING_DIR = os.path.join(DEFAULT_INSTALL_DIR, "monitoring")
 DEFAULT_SUMMARY_FILE = os.path.join(DEFAULT_MONITORING_DIR, "summary.json")
 DEFAULT_LOG_DIR = os.path.join(DEFAULT_INSTALL_DIR, "logs")
+DEFAULT_API_URL = "http://localhost:8000"
 
 # Global variables
 monitoring_data = []
@@ -92,6 +93,27 @@ def check_service_status(url):
     except:
         return False
 
+def fetch_api_metrics(api_url):
+    """Scrape the API server's /metrics endpoint into {metric name: total over all labels}."""
+    try:
+        response = requests.get(f"{api_url}/metrics", timeout=5)
+        response.raise_for_status()
+    except Exception as e:
+        logger.error(f"Failed to fetch API metrics: {e}")
+        return None
+    
+    totals = {}
+    for line in response.text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        sample, _, value = line.rpartition(" ")
+        name = sample.split("{", 1)[0]
+        # Bucket series are cumulative and would double count
+        if name.endswith("_bucket"):
+            continue
+        totals[name] = totals.get(name, 0.0) + float(value)
+    return totals
+
 def background_monitoring(install_dir, summary_file, interval=60):
     """Background thread for continuous monitoring."""
     global monitoring_data, system_metrics
@@ -122,6 +144,7 @@ def main():
     parser = argparse.ArgumentParser(description="Web-based monitoring dashboard for BitNet Virtual Co-worker Builder")
     parser.add_argument("--install-dir", default=DEFAULT_INSTALL_DIR, help="Installation directory")
     parser.add_argument("--port", type=int, default=8502, help="Port to run the dashboard on")
+    parser.add_argument("--api-url", default=DEFAULT_API_URL, help="API server URL to read /metrics from")
     args = parser.parse_args()
     
     install_dir = args.install_dir
@@ -217,6 +240,34 @@ def main():
     else:
         st.error("No monitoring data available. Please run the monitoring script first.")
     
+    # Display live metrics from the API server
+    st.header("API Metrics")
+    
+    api_metrics = fetch_api_metrics(args.api_url)
+    
+    if api_metrics:
+        def mean(name):
+            count = api_metrics.get(f"{name}_count", 0)
+            return api_metrics.get(f"{name}_sum", 0) / count if count else 0.0
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Requests", int(api_metrics.get("bitnet_http_requests_total", 0)))
+        with col2:
+            st.metric("Tasks", int(api_metrics.get("bitnet_tasks", 0)))
+        with col3:
+            st.metric("Mean TTFT (s)", f"{mean('bitnet_time_to_first_token_seconds'):.3f}")
+        with col4:
+            st.metric("Mean Tokens/s", f"{mean('bitnet_tokens_per_second'):.1f}")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Tool Calls", int(api_metrics.get("bitnet_tool_duration_seconds_count", 0)))
+        with col2:
+            st.metric("Tool Errors", int(api_metrics.get("bitnet_tool_errors_total", 0)))
+    else:
+        st.info(f"No metrics available from {args.api_url}/metrics.")
+    
     # Display historical data
     st.header("Historical Data")
     
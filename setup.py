@@ -33,6 +33,9 @@ setup(
         "ui": [
             "streamlit>=1.0.0",
         ],
+        "load": [
+            "httpx>=0.23.0",
+        ],
     },
     python_requires=">=3.8",
     classifiers=[
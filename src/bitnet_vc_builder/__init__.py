@@ -2,13 +2,54 @@
 BitNet Virtual Co-worker Builder - A framework for building AI virtual co-workers using BitNet's 1-bit quantized language models.
 """
 
-from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker
-from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
-from bitnet_vc_builder.tools.base_tools import Tool
-from bitnet_vc_builder.memory.memory import Memory
-from bitnet_vc_builder.core.team import BitNetTeam
+import importlib
+from typing import TYPE_CHECKING
 
-# For backward compatibility
-from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker as BitNetAgent
+if TYPE_CHECKING:
+    from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker
+    from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+    from bitnet_vc_builder.tools.base_tools import Tool
+    from bitnet_vc_builder.memory.memory import Memory
+    from bitnet_vc_builder.core.team import BitNetTeam
 
 __version__ = "0.2.0"
+
+# Public names and their modules. They are imported on first access, so that
+# importing a submodule (the CLI, the config loader) does not load the model
+# stack.
+_EXPORTS = {
+    "BitNetVirtualCoworker": "bitnet_vc_builder.core.virtual_coworker",
+    "BitNetModel": "bitnet_vc_builder.models.bitnet_wrapper",
+    "Tool": "bitnet_vc_builder.tools.base_tools",
+    "Memory": "bitnet_vc_builder.memory.memory",
+    "BitNetTeam": "bitnet_vc_builder.core.team",
+    # For backward compatibility
+    "BitNetAgent": "bitnet_vc_builder.core.virtual_coworker"
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    """
+    Import a public name on first access.
+
+    Args:
+        name: Attribute name
+
+    Returns:
+        The exported class
+
+    Raises:
+        AttributeError: If the name is not exported
+    """
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), "BitNetVirtualCoworker" if name == "BitNetAgent" else name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    """
+    List the module's attributes, including exports not yet imported.
+    """
+    return sorted(set(globals()) | set(_EXPORTS))
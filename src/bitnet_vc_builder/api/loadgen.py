@@ -0,0 +1,455 @@
+"""
+HTTP load generator for the BitNet Virtual Co-worker Builder API server.
+
+Creates a model, virtual co-workers and optionally a team on a running
+server, then submits tasks to their ``/run`` endpoints and polls
+``/tasks/{task_id}`` until each finishes. Load is either closed-loop (a fixed
+number of concurrent clients, each submitting its next task when the last
+one finished) or open-loop (tasks arriving at a target rate). The report
+gives submit and end-to-end latency percentiles, error rates and the
+server's task queue depth sampled from ``/metrics`` during the run.
+
+Usage:
+    python -m bitnet_vc_builder.api.loadgen --url http://localhost:8000 --concurrency 16 --duration 60
+    python -m bitnet_vc_builder.api.loadgen --rps 20 --duration 60 --target team --output load.json
+
+Requires httpx (``pip install bitnet_vc_builder[load]``).
+"""
+
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+from typing import Dict, Any, List, Optional
+
+import httpx
+
+from bitnet_vc_builder.core.benchmark import percentile
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+# Simulated model used when no model path is given: a 7B-class CPU model
+DEFAULT_SIMULATION = {"prefill_time_per_token": 0.0005, "decode_time_per_token": 0.02, "jitter": 0.1}
+
+def parse_metrics(text: str) -> Dict[str, float]:
+    """
+    Parse Prometheus text exposition.
+
+    Args:
+        text: Exposition text
+
+    Returns:
+        Dictionary mapping samples, including their labels (such as
+        'bitnet_tasks{status="pending"}'), to values
+    """
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        sample, _, value = line.rpartition(" ")
+        try:
+            samples[sample] = float(value)
+        except ValueError:
+            continue
+    return samples
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """
+    Summarize latencies.
+
+    Args:
+        values: Latencies in seconds
+
+    Returns:
+        Dictionary with mean, p50, p90, p99 and max (zeros when empty)
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return {"mean": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "mean": sum(ordered) / len(ordered),
+        "p50": percentile(ordered, 50),
+        "p90": percentile(ordered, 90),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1]
+    }
+
+class LoadGenerator:
+    """
+    Drives the API server's run endpoints and measures how it copes.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        target: str = "coworker",
+        num_coworkers: int = 2,
+        model_path: Optional[str] = None,
+        simulation: Optional[Dict[str, Any]] = None,
+        concurrency: int = 8,
+        rps: Optional[float] = None,
+        duration: float = 30.0,
+        max_requests: Optional[int] = None,
+        task: str = "Summarize request {n}",
+        poll_interval: float = 0.05,
+        task_timeout: float = 120.0,
+        prefix: str = "loadgen",
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """
+        Initialize load generator.
+
+        Args:
+            base_url: URL of the API server
+            target: What tasks are submitted to ("coworker" or "team")
+            num_coworkers: Number of virtual co-workers to create
+            model_path: Model the virtual co-workers use (optional; by default a
+                simulated model, so the server's own overhead is measured)
+            simulation: Simulated model settings (used without model_path)
+            concurrency: Number of concurrent clients, or with rps the maximum
+                number of tasks in flight
+            rps: Target task arrival rate (optional; closed-loop without it)
+            duration: Seconds to generate load for
+            max_requests: Stop after this many tasks (optional)
+            task: Task text; "{n}" is replaced by the request number so
+                identical concurrent tasks are not coalesced by the server
+            poll_interval: Seconds between task status polls
+            task_timeout: Seconds after which a task counts as timed out
+            prefix: Prefix of the names of created resources
+            transport: httpx transport (optional, for running in process)
+
+        Raises:
+            ValueError: If the target is unknown
+        """
+        if target not in ("coworker", "team"):
+            raise ValueError(f"Unknown target: {target}. Targets: coworker, team")
+
+        self.base_url = base_url.rstrip("/")
+        self.target = target
+        self.num_coworkers = num_coworkers
+        self.model_path = model_path
+        self.simulation = simulation if simulation is not None else DEFAULT_SIMULATION
+        self.concurrency = concurrency
+        self.rps = rps
+        self.duration = duration
+        self.max_requests = max_requests
+        self.task = task
+        self.poll_interval = poll_interval
+        self.task_timeout = task_timeout
+        self.prefix = prefix
+        self.transport = transport
+
+        self.model_name = f"{prefix}-model"
+        self.coworker_names = [f"{prefix}-coworker-{i}" for i in range(num_coworkers)]
+        self.team_name = f"{prefix}-team"
+
+        self._records: List[Dict[str, Any]] = []
+        self._queue_samples: List[Dict[str, float]] = []
+        self._issued = 0
+
+    async def setup(self, client: httpx.AsyncClient) -> None:
+        """
+        Create the model, virtual co-workers and team on the server.
+
+        Args:
+            client: HTTP client
+
+        Raises:
+            httpx.HTTPStatusError: If the server rejects a resource
+        """
+        model = {"name": self.model_name, "use_bitnet_integration": self.model_path is not None}
+        if self.model_path is not None:
+            model["model_path"] = self.model_path
+        else:
+            model["model_path"] = "simulated"
+            model["simulation"] = self.simulation
+        (await client.post("/models", json=model)).raise_for_status()
+
+        for name in self.coworker_names:
+            (await client.post("/virtual-coworkers", json={"name": name, "model_name": self.model_name})).raise_for_status()
+
+        if self.target == "team":
+            (await client.post("/teams", json={"name": self.team_name, "virtual_coworker_names": self.coworker_names})).raise_for_status()
+
+    async def teardown(self, client: httpx.AsyncClient) -> None:
+        """
+        Delete the resources created by setup.
+
+        Args:
+            client: HTTP client
+        """
+        if self.target == "team":
+            await client.delete(f"/teams/{self.team_name}")
+        for name in self.coworker_names:
+            await client.delete(f"/virtual-coworkers/{name}")
+        await client.delete(f"/models/{self.model_name}")
+
+    def _run_path(self, n: int) -> str:
+        """
+        Get the run endpoint for a request.
+
+        Args:
+            n: Request number
+
+        Returns:
+            Path of the run endpoint
+        """
+        if self.target == "team":
+            return f"/teams/{self.team_name}/run"
+        return f"/virtual-coworkers/{self.coworker_names[n % len(self.coworker_names)]}/run"
+
+    async def _submit(self, client: httpx.AsyncClient, n: int, scheduled: float) -> None:
+        """
+        Submit one task and poll it until it finishes.
+
+        Latency is measured from the scheduled start, so time spent waiting
+        for a free slot under open-loop load counts against the server.
+
+        Args:
+            client: HTTP client
+            n: Request number
+            scheduled: perf_counter time the request was due
+        """
+        record = {"n": n, "outcome": "completed"}
+        try:
+            response = await client.post(self._run_path(n), json={"task": self.task.format(n=n), "timeout": self.task_timeout})
+            record["submit_latency"] = time.perf_counter() - scheduled
+            if response.status_code != 200:
+                record["outcome"] = f"http_{response.status_code}"
+                return
+            task_id = response.json()["task_id"]
+
+            deadline = scheduled + self.task_timeout
+            while True:
+                await asyncio.sleep(self.poll_interval)
+                status = (await client.get(f"/tasks/{task_id}")).json().get("status")
+                if status in TERMINAL_STATUSES:
+                    record["outcome"] = status
+                    break
+                if time.perf_counter() > deadline:
+                    record["outcome"] = "timeout"
+                    break
+            record["latency"] = time.perf_counter() - scheduled
+        except httpx.HTTPError as e:
+            record["outcome"] = type(e).__name__
+        finally:
+            self._records.append(record)
+
+    def _more(self, end: float) -> bool:
+        """
+        Check whether another request should be issued.
+
+        Args:
+            end: perf_counter time load generation stops
+
+        Returns:
+            True if another request is due
+        """
+        if self.max_requests is not None and self._issued >= self.max_requests:
+            return False
+        return time.perf_counter() < end
+
+    async def _closed_loop(self, client: httpx.AsyncClient, end: float) -> None:
+        """
+        Run concurrent clients that each submit a task when their last one finished.
+
+        Args:
+            client: HTTP client
+            end: perf_counter time load generation stops
+        """
+        async def worker():
+            while self._more(end):
+                n = self._issued
+                self._issued += 1
+                await self._submit(client, n, time.perf_counter())
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+    async def _open_loop(self, client: httpx.AsyncClient, end: float) -> None:
+        """
+        Submit tasks at the target rate, whether or not earlier ones finished.
+
+        Args:
+            client: HTTP client
+            end: perf_counter time load generation stops
+        """
+        slots = asyncio.Semaphore(self.concurrency)
+        interval = 1.0 / self.rps
+        start = time.perf_counter()
+        pending = []
+
+        async def limited(n, scheduled):
+            async with slots:
+                await self._submit(client, n, scheduled)
+
+        while self._more(end):
+            scheduled = start + self._issued * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            pending.append(asyncio.ensure_future(limited(self._issued, scheduled)))
+            self._issued += 1
+
+        await asyncio.gather(*pending)
+
+    async def _sample_queue(self, client: httpx.AsyncClient, stop: asyncio.Event, interval: float = 0.5) -> None:
+        """
+        Sample the server's task queue from /metrics until stopped.
+
+        Args:
+            client: HTTP client
+            stop: Event set when load generation is over
+            interval: Seconds between samples
+        """
+        while not stop.is_set():
+            try:
+                samples = parse_metrics((await client.get("/metrics")).text)
+                self._queue_samples.append({
+                    "pending": samples.get('bitnet_tasks{status="pending"}', 0.0),
+                    "running": samples.get('bitnet_tasks{status="running"}', 0.0)
+                })
+            except httpx.HTTPError as e:
+                logger.warning(f"Could not read server metrics: {e}")
+            try:
+                await asyncio.wait_for(stop.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Create the resources, generate load, then delete the resources.
+
+        Returns:
+            Report (see report)
+        """
+        self._records = []
+        self._queue_samples = []
+        self._issued = 0
+
+        limits = httpx.Limits(max_connections=self.concurrency + 2)
+        async with httpx.AsyncClient(base_url=self.base_url, transport=self.transport, limits=limits, timeout=self.task_timeout) as client:
+            await self.setup(client)
+            try:
+                stop = asyncio.Event()
+                sampler = asyncio.ensure_future(self._sample_queue(client, stop))
+                start = time.perf_counter()
+                end = start + self.duration
+                if self.rps:
+                    await self._open_loop(client, end)
+                else:
+                    await self._closed_loop(client, end)
+                elapsed = time.perf_counter() - start
+                stop.set()
+                await sampler
+            finally:
+                await self.teardown(client)
+
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        """
+        Summarize the recorded requests.
+
+        Args:
+            elapsed: Seconds load was generated for
+
+        Returns:
+            Dictionary with request counts, outcomes, error rate, throughput,
+            submit and end-to-end latency statistics and queue depth samples
+        """
+        outcomes: Dict[str, int] = {}
+        for record in self._records:
+            outcomes[record["outcome"]] = outcomes.get(record["outcome"], 0) + 1
+        total = len(self._records)
+        completed = outcomes.get("completed", 0)
+
+        pending = [sample["pending"] for sample in self._queue_samples]
+        running = [sample["running"] for sample in self._queue_samples]
+        return {
+            "mode": "open" if self.rps else "closed",
+            "target": self.target,
+            "concurrency": self.concurrency,
+            "target_rps": self.rps,
+            "duration": elapsed,
+            "requests": total,
+            "outcomes": outcomes,
+            "error_rate": (total - completed) / total if total else 0.0,
+            "throughput": completed / elapsed if elapsed > 0 else 0.0,
+            "submit_latency": summarize([record["submit_latency"] for record in self._records if "submit_latency" in record]),
+            "latency": summarize([record["latency"] for record in self._records if record["outcome"] == "completed"]),
+            "queue": {
+                "samples": len(self._queue_samples),
+                "max_pending": max(pending, default=0.0),
+                "mean_pending": sum(pending) / len(pending) if pending else 0.0,
+                "max_running": max(running, default=0.0)
+            }
+        }
+
+def print_report(report: Dict[str, Any], file=sys.stdout) -> None:
+    """
+    Print a load test report.
+
+    Args:
+        report: Report from LoadGenerator.run
+        file: Stream to print to
+    """
+    target = f"{report['target_rps']} tasks/s" if report["mode"] == "open" else f"{report['concurrency']} concurrent clients"
+    print(f"Load: {target} against {report['target']} for {report['duration']:.1f} s", file=file)
+    print(f"Requests: {report['requests']}  Completed/s: {report['throughput']:.2f}  Error rate: {report['error_rate']:.1%}", file=file)
+    print(f"Outcomes: {', '.join(f'{name}={count}' for name, count in sorted(report['outcomes'].items()))}", file=file)
+    for name in ("submit_latency", "latency"):
+        stats = report[name]
+        print(
+            f"{name.replace('_', ' ').capitalize():<15} mean {stats['mean'] * 1000:9.1f} ms  p50 {stats['p50'] * 1000:9.1f} ms  "
+            f"p90 {stats['p90'] * 1000:9.1f} ms  p99 {stats['p99'] * 1000:9.1f} ms  max {stats['max'] * 1000:9.1f} ms",
+            file=file
+        )
+    queue = report["queue"]
+    print(f"Server queue: max pending {queue['max_pending']:.0f}, mean pending {queue['mean_pending']:.1f}, max running {queue['max_running']:.0f}", file=file)
+
+def main():
+    """
+    Run a load test from the command line.
+    """
+    parser = argparse.ArgumentParser(description="Load test the BitNet Virtual Co-worker Builder API server")
+    parser.add_argument("--url", default="http://localhost:8000", help="API server URL")
+    parser.add_argument("--target", choices=["coworker", "team"], default="coworker", help="Submit tasks to virtual co-workers or a team")
+    parser.add_argument("--coworkers", type=int, default=2, help="Number of virtual co-workers to create")
+    parser.add_argument("--model-path", help="Model for the virtual co-workers (default: simulated model)")
+    parser.add_argument("--decode-time", type=float, default=DEFAULT_SIMULATION["decode_time_per_token"], help="Simulated seconds per generated token")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients, or the in-flight limit with --rps")
+    parser.add_argument("--rps", type=float, help="Target task arrival rate (open-loop)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to generate load for")
+    parser.add_argument("--requests", type=int, help="Stop after this many tasks")
+    parser.add_argument("--task", default="Summarize request {n}", help="Task text ({n} is the request number)")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    generator = LoadGenerator(
+        base_url=args.url,
+        target=args.target,
+        num_coworkers=args.coworkers,
+        model_path=args.model_path,
+        simulation=dict(DEFAULT_SIMULATION, decode_time_per_token=args.decode_time),
+        concurrency=args.concurrency,
+        rps=args.rps,
+        duration=args.duration,
+        max_requests=args.requests,
+        task=args.task
+    )
+    report = asyncio.run(generator.run())
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
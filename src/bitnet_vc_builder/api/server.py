@@ -4,17 +4,29 @@ API server for BitNet Virtual Co-worker Builder.
 
 import os
 import json
+import time
 import logging
+import threading
+from contextlib import asynccontextmanager
 from typing import Dict, Any, List, Optional
 
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
 
 from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker
-from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+from bitnet_vc_builder.models.registry import ModelRegistry
 from bitnet_vc_builder.tools.base_tools import Tool
 from bitnet_vc_builder.core.team import BitNetTeam, CollaborationMode
+from bitnet_vc_builder.core.response_cache import ResponseCache
+from bitnet_vc_builder.core.cancellation import CancelToken, CancelledError
+from bitnet_vc_builder.core.chat_template import CHAT_TEMPLATES
+from bitnet_vc_builder.core.metrics import MetricsRegistry, MetricsCollector
+from bitnet_vc_builder.core.timing import CompositeCollector, get_collector, set_collector
+from bitnet_vc_builder.core.tracing import TraceWriter
+from bitnet_vc_builder.core.profiling import PROFILE_MODES, ProfileSession
 from bitnet_vc_builder.config.config_loader import load_config
 
 # Configure logging
@@ -24,11 +36,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Record model and tool metrics, and execution traces when a trace file is
+    configured, unless another timing collector is installed.
+    
+    Args:
+        app: FastAPI application
+    """
+    trace_writer = None
+    if get_collector() is None:
+        collectors = [MetricsCollector(metrics)]
+        if trace_file:
+            trace_writer = TraceWriter(trace_file)
+            collectors.append(trace_writer)
+        set_collector(collectors[0] if len(collectors) == 1 else CompositeCollector(collectors))
+    yield
+    if trace_writer is not None:
+        trace_writer.close()
+
 # Create FastAPI app
 app = FastAPI(
     title="BitNet Virtual Co-worker Builder API",
     description="API for creating and managing BitNet virtual co-workers and teams",
-    version="0.2.0"
+    version="0.2.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -41,10 +74,115 @@ app.add_middleware(
 )
 
 # In-memory storage for models, virtual co-workers, and teams
-models: Dict[str, BitNetModel] = {}
+# Models are loaded on first use; the memory budget is configured at startup
+model_registry = ModelRegistry()
 virtual_coworkers: Dict[str, BitNetVirtualCoworker] = {}
+# Virtual co-worker name -> name of the model it was created with
+coworker_models: Dict[str, str] = {}
 teams: Dict[str, BitNetTeam] = {}
 tasks: Dict[str, Dict[str, Any]] = {}
+# Cancel tokens of tasks that have not finished yet
+task_tokens: Dict[str, CancelToken] = {}
+# Identifiers of the threads running tasks, for profiling single tasks
+task_threads: Dict[str, int] = {}
+
+# Profiling sessions started from /admin/profiles (enabled by server.enable_profiling: true)
+profiling_enabled = False
+profiles: Dict[str, Dict[str, Any]] = {}
+profiles_lock = threading.Lock()
+
+# Answer cache shared by virtual co-workers that opt in (configured at startup)
+response_cache_config: Dict[str, Any] = {}
+response_cache: Optional[ResponseCache] = None
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get the shared response cache, creating it on first use.
+    
+    Returns:
+        ResponseCache instance
+    """
+    global response_cache
+    if response_cache is None:
+        response_cache = ResponseCache(
+            max_entries=response_cache_config.get("max_entries", 1024),
+            ttl=response_cache_config.get("ttl", 3600.0),
+            cache_dir=response_cache_config.get("cache_dir"),
+            allow_nondeterministic=response_cache_config.get("allow_nondeterministic", False)
+        )
+    return response_cache
+
+# Execution trace file (timing.trace_file; configured at startup)
+trace_file: Optional[str] = None
+
+def configure(config: Dict[str, Any]) -> None:
+    """
+    Apply the configuration to the server before it starts.
+
+    Args:
+        config: Configuration dictionary
+    """
+    global profiling_enabled, trace_file
+
+    response_cache_config.update(config.get("response_cache", {}))
+    profiling_enabled = config.get("server", {}).get("enable_profiling", False)
+    trace_file = config.get("timing", {}).get("trace_file")
+
+    memory_budget_mb = config.get("model", {}).get("memory_budget_mb")
+    if memory_budget_mb is not None:
+        model_registry.memory_budget = int(memory_budget_mb * 1024 * 1024)
+
+# Metrics served at /metrics; model, tool and task metrics come from timing spans
+metrics = MetricsRegistry()
+http_requests = metrics.counter(
+    "bitnet_http_requests_total", "HTTP requests handled", ("method", "route", "status")
+)
+http_request_duration = metrics.histogram(
+    "bitnet_http_request_duration_seconds", "Time to handle HTTP requests", ("method", "route")
+)
+metrics.gauge(
+    "bitnet_tasks", "Background tasks by status (pending tasks are queued, running tasks are in flight)", ("status",),
+    lambda: {
+        (status,): sum(1 for task in list(tasks.values()) if task["status"] == status)
+        for status in ("pending", "running", "completed", "cancelled", "failed")
+    }
+)
+metrics.gauge(
+    "bitnet_memory_items", "Items in virtual co-worker memory", ("coworker",),
+    lambda: {(name,): len(coworker.memory) for name, coworker in list(virtual_coworkers.items()) if coworker.memory is not None}
+)
+metrics.gauge(
+    "bitnet_response_cache_entries", "Entries in the shared response cache",
+    function=lambda: len(response_cache) if response_cache is not None else 0
+)
+metrics.gauge(
+    "bitnet_loaded_model_bytes", "Bytes of model weights loaded", function=lambda: model_registry.loaded_bytes()
+)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    Count requests and time them per route.
+    
+    Args:
+        request: Incoming request
+        call_next: Handler for the request
+        
+    Returns:
+        Response
+    """
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template so path parameters do not create new series
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        http_requests.labels(request.method, path, status).inc()
+        http_request_duration.labels(request.method, path).observe(time.perf_counter() - start)
 
 # Pydantic models for API requests and responses
 class ModelConfig(BaseModel):
@@ -59,6 +197,10 @@ class ModelConfig(BaseModel):
     top_k: int = 40
     repetition_penalty: float = 1.1
     use_bitnet_integration: bool = True
+    autotune: bool = False
+    draft: Optional[str] = None
+    num_draft_tokens: int = 4
+    simulation: Optional[Dict[str, Any]] = None
 
 class VirtualCoworkerConfig(BaseModel):
     name: str
@@ -66,6 +208,9 @@ class VirtualCoworkerConfig(BaseModel):
     description: str = "A helpful AI virtual co-worker powered by BitNet."
     system_prompt: Optional[str] = None
     tools: List[str] = []
+    sampling_params: Optional[Dict[str, Any]] = None
+    enable_response_cache: bool = False
+    chat_template: str = "plain"
 
 class TeamConfig(BaseModel):
     name: str
@@ -80,12 +225,97 @@ class TeamConfig(BaseModel):
 class TaskRequest(BaseModel):
     task: str
     coordinator_name: Optional[str] = None
+    timeout: Optional[float] = None
+
+class ProfileRequest(BaseModel):
+    mode: str = "sampling"
+    duration: Optional[float] = None
+    task_id: Optional[str] = None
+    allocations: bool = False
+    interval: float = 0.005
 
 class TaskResponse(BaseModel):
     task_id: str
     status: str = "pending"
     result: Optional[str] = None
 
+def run_cancellable_task(task_id: str, label: str, run: Any) -> None:
+    """
+    Run a background task under its cancel token and record the outcome.
+    
+    Args:
+        task_id: Task ID
+        label: What is being run, for log messages
+        run: Function taking the cancel token and returning the result
+    """
+    token = task_tokens.get(task_id)
+    task_profiles = []
+    
+    try:
+        # The task may have been cancelled, or its deadline passed, before a worker picked it up
+        if token is None:
+            return
+        token.raise_if_cancelled()
+        
+        # cProfile only follows the thread it is started in, so the task starts its own profiles
+        with profiles_lock:
+            tasks[task_id]["status"] = "running"
+            task_threads[task_id] = threading.get_ident()
+            task_profiles = [
+                entry["session"] for entry in profiles.values()
+                if entry["task_id"] == task_id and entry["session"].mode == "cprofile"
+            ]
+            for session in task_profiles:
+                session.start()
+        
+        result = run(token)
+        if tasks[task_id]["status"] == "cancelled":
+            return
+        tasks[task_id]["status"] = "completed"
+        tasks[task_id]["result"] = result
+    except CancelledError as e:
+        logger.info(f"Task {task_id} cancelled: {e}")
+        tasks[task_id]["status"] = "cancelled"
+        tasks[task_id]["result"] = f"Cancelled: {str(e)}"
+    except Exception as e:
+        logger.error(f"Error running {label}: {e}")
+        tasks[task_id]["status"] = "failed"
+        tasks[task_id]["result"] = f"Error: {str(e)}"
+    finally:
+        task_tokens.pop(task_id, None)
+        task_threads.pop(task_id, None)
+        for session in task_profiles:
+            session.stop()
+        stop_task_profiles(task_id)
+
+def stop_task_profiles(task_id: str) -> None:
+    """
+    Stop the sampling profiles of a finished task.
+    
+    Args:
+        task_id: Task ID
+    """
+    for entry in list(profiles.values()):
+        if entry["task_id"] == task_id and entry["session"].mode == "sampling":
+            entry["session"].stop()
+
+def tracing_allocations(entry: Dict[str, Any]) -> bool:
+    """
+    Check whether a profile traces allocations now or will once its task starts.
+    
+    Args:
+        entry: Entry of the profiles dictionary
+        
+    Returns:
+        True if the profile traces allocations and has not finished
+    """
+    session = entry["session"]
+    if session.tracer is None or session.status == "completed":
+        return False
+    if session.status == "pending":
+        return tasks[entry["task_id"]]["status"] == "pending"
+    return True
+
 # API endpoints
 @app.get("/")
 async def root():
@@ -93,45 +323,45 @@ async def root():
 
 @app.get("/models")
 async def get_models():
-    return {"models": list(models.keys())}
+    return {"models": model_registry.names()}
 
 @app.post("/models")
 async def create_model(model_config: ModelConfig):
-    if model_config.name in models:
+    if model_config.name in model_registry:
         raise HTTPException(status_code=400, detail=f"Model {model_config.name} already exists")
     
     try:
-        model = BitNetModel(
-            model_path=model_config.model_path,
-            kernel_type=model_config.kernel_type,
-            bitnet_path=model_config.bitnet_path,
-            num_threads=model_config.num_threads,
-            context_size=model_config.context_size,
-            temperature=model_config.temperature,
-            top_p=model_config.top_p,
-            top_k=model_config.top_k,
-            repetition_penalty=model_config.repetition_penalty,
-            use_bitnet_integration=model_config.use_bitnet_integration
-        )
-        
-        models[model_config.name] = model
+        # Only the configuration is recorded; the model loads on first use
+        config = model_config.dict()
+        del config["name"]
+        model_registry.register(model_config.name, config)
         
         return {"message": f"Model {model_config.name} created successfully"}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error creating model: {e}")
         raise HTTPException(status_code=500, detail=f"Error creating model: {str(e)}")
 
+@app.get("/models/{model_name}")
+async def get_model(model_name: str):
+    config = model_registry.get_config(model_name)
+    if config is None:
+        raise HTTPException(status_code=404, detail=f"Model {model_name} not found")
+    
+    return {"model_info": {**config, "loaded": model_registry.is_loaded(model_name)}}
+
 @app.delete("/models/{model_name}")
 async def delete_model(model_name: str):
-    if model_name not in models:
+    if model_name not in model_registry:
         raise HTTPException(status_code=404, detail=f"Model {model_name} not found")
     
     # Check if any virtual co-workers are using this model
-    for coworker in virtual_coworkers.values():
-        if coworker.model == models[model_name]:
-            raise HTTPException(status_code=400, detail=f"Model {model_name} is in use by virtual co-worker {coworker.name}")
+    for coworker_name, coworker_model in coworker_models.items():
+        if coworker_model == model_name:
+            raise HTTPException(status_code=400, detail=f"Model {model_name} is in use by virtual co-worker {coworker_name}")
     
-    del models[model_name]
+    model_registry.unregister(model_name)
     
     return {"message": f"Model {model_name} deleted successfully"}
 
@@ -144,7 +374,15 @@ async def create_virtual_coworker(coworker_config: VirtualCoworkerConfig):
     if coworker_config.name in virtual_coworkers:
         raise HTTPException(status_code=400, detail=f"Virtual co-worker {coworker_config.name} already exists")
     
-    if coworker_config.model_name not in models:
+    if coworker_config.model_name not in model_registry:
+        raise HTTPException(status_code=404, detail=f"Model {coworker_config.model_name} not found")
+    
+    if coworker_config.chat_template not in CHAT_TEMPLATES:
+        raise HTTPException(status_code=400, detail=f"Unknown chat template: {coworker_config.chat_template}")
+    
+    # Creating the model can autotune its kernels, so keep it off the event loop
+    model = await run_in_threadpool(model_registry.get, coworker_config.model_name, load=False)
+    if model is None:
         raise HTTPException(status_code=404, detail=f"Model {coworker_config.model_name} not found")
     
     try:
@@ -154,14 +392,18 @@ async def create_virtual_coworker(coworker_config: VirtualCoworkerConfig):
         
         # Create virtual co-worker
         coworker = BitNetVirtualCoworker(
-            model=models[coworker_config.model_name],
+            model=model,
             tools=tools,
             name=coworker_config.name,
             description=coworker_config.description,
-            system_prompt=coworker_config.system_prompt
+            system_prompt=coworker_config.system_prompt,
+            sampling_params=coworker_config.sampling_params,
+            response_cache=get_response_cache() if coworker_config.enable_response_cache else None,
+            chat_template=coworker_config.chat_template
         )
         
         virtual_coworkers[coworker_config.name] = coworker
+        coworker_models[coworker_config.name] = coworker_config.model_name
         
         return {"message": f"Virtual co-worker {coworker_config.name} created successfully"}
     except Exception as e:
@@ -179,6 +421,7 @@ async def delete_virtual_coworker(coworker_name: str):
             raise HTTPException(status_code=400, detail=f"Virtual co-worker {coworker_name} is in use by team {team.name}")
     
     del virtual_coworkers[coworker_name]
+    coworker_models.pop(coworker_name, None)
     
     return {"message": f"Virtual co-worker {coworker_name} deleted successfully"}
 
@@ -199,16 +442,15 @@ async def run_virtual_coworker(coworker_name: str, task_request: TaskRequest, ba
         "result": None
     }
     
+    task_tokens[task_id] = CancelToken(timeout=task_request.timeout)
+    
     # Run virtual co-worker in background
     def run_task():
-        try:
-            result = coworker.run(task_request.task)
-            tasks[task_id]["status"] = "completed"
-            tasks[task_id]["result"] = result
-        except Exception as e:
-            logger.error(f"Error running virtual co-worker: {e}")
-            tasks[task_id]["status"] = "failed"
-            tasks[task_id]["result"] = f"Error: {str(e)}"
+        run_cancellable_task(
+            task_id,
+            "virtual co-worker",
+            lambda token: coworker.run(task_request.task, cancel_token=token)
+        )
     
     background_tasks.add_task(run_task)
     
@@ -284,16 +526,15 @@ async def run_team(team_name: str, task_request: TaskRequest, background_tasks:
         "result": None
     }
     
+    task_tokens[task_id] = CancelToken(timeout=task_request.timeout)
+    
     # Run team in background
     def run_task():
-        try:
-            result = team.run(task_request.task, task_request.coordinator_name)
-            tasks[task_id]["status"] = "completed"
-            tasks[task_id]["result"] = result
-        except Exception as e:
-            logger.error(f"Error running team: {e}")
-            tasks[task_id]["status"] = "failed"
-            tasks[task_id]["result"] = f"Error: {str(e)}"
+        run_cancellable_task(
+            task_id,
+            "team",
+            lambda token: team.run(task_request.task, task_request.coordinator_name, cancel_token=token)
+        )
     
     background_tasks.add_task(run_task)
     
@@ -306,10 +547,123 @@ async def get_task(task_id: str):
     
     return tasks[task_id]
 
+@app.delete("/tasks/{task_id}")
+async def cancel_task(task_id: str):
+    if task_id not in tasks:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    
+    token = task_tokens.get(task_id)
+    if token is None:
+        raise HTTPException(status_code=400, detail=f"Task {task_id} has already finished")
+    
+    # Running work stops at its next checkpoint; pending work never starts
+    token.cancel("Cancelled by client")
+    tasks[task_id]["status"] = "cancelled"
+    tasks[task_id]["result"] = "Cancelled: Cancelled by client"
+    
+    return {"message": f"Task {task_id} cancelled successfully"}
+
 @app.get("/tasks")
 async def get_tasks():
     return {"tasks": tasks}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.post("/admin/profiles")
+async def start_profile(profile_request: ProfileRequest):
+    if not profiling_enabled:
+        raise HTTPException(status_code=400, detail="Profiling is disabled (server.enable_profiling)")
+    
+    if profile_request.mode not in PROFILE_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown profile mode: {profile_request.mode}. Modes: {', '.join(PROFILE_MODES)}")
+    
+    task_id = profile_request.task_id
+    if task_id is None and profile_request.duration is None:
+        raise HTTPException(status_code=400, detail="Either duration or task_id is required")
+    
+    if task_id is not None:
+        if task_id not in tasks:
+            raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+        if tasks[task_id]["status"] not in ("pending", "running"):
+            raise HTTPException(status_code=400, detail=f"Task {task_id} has already finished")
+    
+    with profiles_lock:
+        # cProfile follows one thread: it is started by the task itself, before it runs
+        if profile_request.mode == "cprofile" and (task_id is None or tasks[task_id]["status"] != "pending"):
+            raise HTTPException(status_code=400, detail="cprofile mode needs the ID of a task that has not started; use sampling mode otherwise")
+        
+        if profile_request.allocations and any(tracing_allocations(entry) for entry in profiles.values()):
+            raise HTTPException(status_code=400, detail="Allocations are already being traced by another profile")
+        
+        profile_id = f"profile_{len(profiles) + 1}"
+        threads = (lambda: [task_threads[task_id]] if task_id in task_threads else []) if task_id is not None else None
+        session = ProfileSession(
+            mode=profile_request.mode,
+            allocations=profile_request.allocations,
+            interval=profile_request.interval,
+            threads=threads
+        )
+        profiles[profile_id] = {"session": session, "task_id": task_id}
+    
+    if profile_request.mode == "sampling":
+        session.start()
+        if profile_request.duration is not None:
+            timer = threading.Timer(profile_request.duration, session.stop)
+            timer.daemon = True
+            timer.start()
+        # The task may have finished before its profile was registered
+        if task_id is not None and tasks[task_id]["status"] not in ("pending", "running"):
+            session.stop()
+    
+    return {"profile_id": profile_id, "status": session.status}
+
+@app.get("/admin/profiles")
+async def get_profiles():
+    return {
+        "profiles": {
+            profile_id: {"mode": entry["session"].mode, "status": entry["session"].status, "task_id": entry["task_id"]}
+            for profile_id, entry in list(profiles.items())
+        }
+    }
+
+@app.get("/admin/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    if profile_id not in profiles:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    
+    entry = profiles[profile_id]
+    result = entry["session"].result()
+    # Collapsed stacks are served as text by /admin/profiles/{profile_id}/collapsed
+    result.pop("collapsed")
+    result["task_id"] = entry["task_id"]
+    return result
+
+@app.get("/admin/profiles/{profile_id}/collapsed", response_class=PlainTextResponse)
+async def get_profile_collapsed(profile_id: str):
+    if profile_id not in profiles:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    
+    session = profiles[profile_id]["session"]
+    if session.mode != "sampling":
+        raise HTTPException(status_code=400, detail=f"Profile {profile_id} is a cprofile profile; collapsed stacks come from sampling profiles")
+    
+    return PlainTextResponse(session.collapsed())
+
+@app.post("/admin/profiles/{profile_id}/stop")
+async def stop_profile(profile_id: str):
+    if profile_id not in profiles:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    
+    session = profiles[profile_id]["session"]
+    if session.mode == "cprofile":
+        raise HTTPException(status_code=400, detail=f"Profile {profile_id} is a cprofile profile; it stops when its task finishes")
+    
+    session.stop()
+    
+    return {"message": f"Profile {profile_id} stopped", "status": session.status}
+
 # Run the server
 if __name__ == "__main__":
     import uvicorn
@@ -322,4 +676,6 @@ if __name__ == "__main__":
     host = config.get("server", {}).get("host", "0.0.0.0")
     port = config.get("server", {}).get("port", 8000)
     
+    configure(config)
+    
     uvicorn.run(app, host=host, port=port)
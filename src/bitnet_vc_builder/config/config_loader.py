@@ -1,20 +1,102 @@
 """
 Configuration loader for BitNet Virtual Co-worker Builder.
+
+Parsed configurations are cached in marshal format, keyed by the file's path,
+modification time and size, so repeated startups skip importing and running
+the YAML parser. Editing the file invalidates its cache entry.
 """
 
 import os
-import yaml
+import hashlib
 import logging
+import marshal
 from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
-def load_config(config_path: str) -> Dict[str, Any]:
+# Bumped when the cache file layout changes
+CONFIG_CACHE_VERSION = 1
+
+def default_config_cache_dir() -> str:
+    """
+    Get the default configuration cache directory.
+
+    Returns:
+        Path under the user's cache directory
+    """
+    return os.path.join(os.path.expanduser("~"), ".cache", "bitnet_vc_builder", "config")
+
+def config_cache_path(config_path: str, cache_dir: Optional[str] = None) -> str:
+    """
+    Get the cache file for a configuration file.
+
+    Args:
+        config_path: Path to the configuration file
+        cache_dir: Cache directory (optional; the default cache directory otherwise)
+
+    Returns:
+        Path of the cache file
+    """
+    name = hashlib.sha256(os.path.abspath(config_path).encode("utf-8")).hexdigest()[:32]
+    return os.path.join(cache_dir or default_config_cache_dir(), f"{name}.marshal")
+
+def _read_config_cache(cache_path: str, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+    """
+    Read a cached configuration if it matches the configuration file.
+
+    Args:
+        cache_path: Path of the cache file
+        stat: Status of the configuration file
+
+    Returns:
+        Cached configuration, or None if missing, stale or unreadable
+    """
+    try:
+        with open(cache_path, "rb") as f:
+            version, mtime_ns, size, config = marshal.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, EOFError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable configuration cache {cache_path}: {e}")
+        return None
+
+    if version != CONFIG_CACHE_VERSION or mtime_ns != stat.st_mtime_ns or size != stat.st_size:
+        return None
+    return config
+
+def _write_config_cache(cache_path: str, stat: os.stat_result, config: Dict[str, Any]) -> None:
+    """
+    Store a parsed configuration in the cache.
+
+    Args:
+        cache_path: Path of the cache file
+        stat: Status of the configuration file when it was read
+        config: Parsed configuration
+    """
+    try:
+        data = marshal.dumps((CONFIG_CACHE_VERSION, stat.st_mtime_ns, stat.st_size, config))
+    except ValueError as e:
+        # YAML values such as timestamps have no marshal representation
+        logger.debug(f"Not caching configuration: {e}")
+        return
+
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not write configuration cache {cache_path}: {e}")
+
+def load_config(config_path: str, use_cache: bool = True, cache_dir: Optional[str] = None) -> Dict[str, Any]:
     """
     Load configuration from a YAML file.
     
     Args:
         config_path: Path to the configuration file
+        use_cache: Whether to read and write the parsed configuration cache
+        cache_dir: Cache directory (optional; the default cache directory otherwise)
         
     Returns:
         Configuration dictionary
@@ -27,10 +109,24 @@ def load_config(config_path: str) -> Dict[str, Any]:
             logger.warning(f"Configuration file {config_path} not found. Using default configuration.")
             return {}
         
+        # Use the cached parse if the file has not changed since
+        stat = os.stat(config_path)
+        cache_path = config_cache_path(config_path, cache_dir) if use_cache else None
+        if cache_path is not None:
+            config = _read_config_cache(cache_path, stat)
+            if config is not None:
+                logger.info(f"Configuration loaded successfully (cached)")
+                return config
+        
         # Load YAML file
+        import yaml
+        
         with open(config_path, "r") as f:
             config = yaml.safe_load(f)
         
+        if cache_path is not None:
+            _write_config_cache(cache_path, stat, config or {})
+        
         logger.info(f"Configuration loaded successfully")
         
         return config or {}
@@ -52,6 +148,8 @@ def save_config(config: Dict[str, Any], config_path: str) -> bool:
     logger.info(f"Saving configuration to {config_path}")
     
     try:
+        import yaml
+        
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(config_path), exist_ok=True)
         
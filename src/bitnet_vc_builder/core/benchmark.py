@@ -0,0 +1,299 @@
+"""
+Benchmark harness for BitNet Virtual Co-worker Builder.
+
+``measure`` times a function after warming it up, using the nanosecond
+performance counter, until it has enough samples. ``BenchmarkResult``
+reports percentiles rather than only a mean, and results are saved as JSON
+so a later run can be compared against them with ``compare``: a benchmark
+whose median slowed down by more than the threshold is a regression.
+
+The benchmark cases themselves live in ``benchmarks/suite.py``; CLI startup
+time is measured by ``benchmarks/startup.py``.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import platform
+from typing import Dict, Any, List, Optional, Callable
+
+from bitnet_vc_builder.models.autotune import host_fingerprint
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 99)
+
+def measure(
+    function: Callable[[], Any],
+    warmup: int = 3,
+    min_iterations: int = 5,
+    max_iterations: int = 10000,
+    min_time: float = 0.5
+) -> List[int]:
+    """
+    Time repeated calls of a function.
+
+    Args:
+        function: Function to time, called without arguments
+        warmup: Untimed calls made first, to fill caches and lazy state
+        min_iterations: Minimum number of timed calls
+        max_iterations: Maximum number of timed calls
+        min_time: Seconds to keep timing once min_iterations calls are done
+
+    Returns:
+        Duration of each timed call in nanoseconds
+    """
+    for _ in range(warmup):
+        function()
+
+    samples = []
+    deadline = time.perf_counter_ns() + int(min_time * 1e9)
+    while len(samples) < max_iterations:
+        start = time.perf_counter_ns()
+        function()
+        end = time.perf_counter_ns()
+        samples.append(end - start)
+        if len(samples) >= min_iterations and end >= deadline:
+            break
+    return samples
+
+def percentile(sorted_samples: List[int], p: float) -> float:
+    """
+    Get a percentile by linear interpolation.
+
+    Args:
+        sorted_samples: Samples in increasing order
+        p: Percentile between 0 and 100
+
+    Returns:
+        Percentile value
+    """
+    if not sorted_samples:
+        return 0.0
+    position = (len(sorted_samples) - 1) * p / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+    return sorted_samples[lower] + (sorted_samples[upper] - sorted_samples[lower]) * (position - lower)
+
+class BenchmarkResult:
+    """
+    Timings of one benchmark.
+    """
+
+    def __init__(self, name: str, samples: List[int], units_per_call: float = 1.0, unit: str = "calls", params: Optional[Dict[str, Any]] = None):
+        """
+        Initialize result.
+
+        Args:
+            name: Benchmark name
+            samples: Duration of each call in nanoseconds
+            units_per_call: Work done per call, for throughput (such as tokens generated)
+            unit: Name of the work unit
+            params: Settings the benchmark ran with (optional)
+        """
+        self.name = name
+        self.samples = samples
+        self.units_per_call = units_per_call
+        self.unit = unit
+        self.params = params or {}
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Summarize the timings.
+
+        Returns:
+            Dictionary with the number of calls, min, mean, percentiles and max
+            in seconds, and throughput in units per second
+        """
+        ordered = sorted(self.samples)
+        mean = sum(ordered) / len(ordered) if ordered else 0.0
+        stats = {
+            "iterations": len(ordered),
+            "min": ordered[0] / 1e9 if ordered else 0.0,
+            "mean": mean / 1e9
+        }
+        for p in PERCENTILES:
+            stats[f"p{p}"] = percentile(ordered, p) / 1e9
+        stats["max"] = ordered[-1] / 1e9 if ordered else 0.0
+        stats["throughput"] = self.units_per_call / (mean / 1e9) if mean else 0.0
+        stats["unit"] = self.unit
+        if self.params:
+            stats["params"] = self.params
+        return stats
+
+def run_benchmark(
+    name: str,
+    function: Callable[[], Any],
+    units_per_call: float = 1.0,
+    unit: str = "calls",
+    params: Optional[Dict[str, Any]] = None,
+    **measure_options: Any
+) -> BenchmarkResult:
+    """
+    Measure a function and log a one-line summary.
+
+    Args:
+        name: Benchmark name
+        function: Function to time
+        units_per_call: Work done per call, for throughput
+        unit: Name of the work unit
+        params: Settings the benchmark ran with (optional)
+        measure_options: Options passed to measure
+
+    Returns:
+        BenchmarkResult instance
+    """
+    result = BenchmarkResult(name, measure(function, **measure_options), units_per_call, unit, params)
+    stats = result.stats()
+    logger.info(f"{name}: p50 {stats['p50'] * 1000:.3f} ms, p99 {stats['p99'] * 1000:.3f} ms, {stats['throughput']:.1f} {unit}/s over {stats['iterations']} calls")
+    return result
+
+def environment() -> Dict[str, Any]:
+    """
+    Describe the machine results were measured on.
+
+    Returns:
+        Dictionary with the host fingerprint, Python version, platform and time
+    """
+    return {
+        "host": host_fingerprint(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count() or 1,
+        "timestamp": time.time()
+    }
+
+def save_results(path: str, results: List[BenchmarkResult]) -> None:
+    """
+    Write results as JSON.
+
+    Args:
+        path: Output file
+        results: Benchmark results
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    data = {
+        "environment": environment(),
+        "benchmarks": {result.name: result.stats() for result in results}
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+def load_results(path: str) -> Dict[str, Any]:
+    """
+    Read results written by save_results.
+
+    Args:
+        path: Results file
+
+    Returns:
+        Dictionary with "environment" and "benchmarks"
+
+    Raises:
+        ValueError: If the file is not a results file
+    """
+    with open(path, "r") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or "benchmarks" not in data:
+        raise ValueError(f"{path} is not a benchmark results file")
+    return data
+
+def compare(
+    current: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float = 0.2,
+    statistic: str = "p50",
+    min_difference: float = 1e-5
+) -> List[Dict[str, Any]]:
+    """
+    Compare benchmark statistics against a baseline.
+
+    Args:
+        current: Benchmark name to statistics of this run
+        baseline: Benchmark name to statistics of the baseline
+        threshold: Relative slowdown counted as a regression (0.2 for 20%)
+        statistic: Statistic to compare ("p50", "p90", "p99", "mean", ...)
+        min_difference: Slowdowns smaller than this many seconds are ignored,
+            so timer noise on very fast benchmarks does not fail the run
+
+    Returns:
+        One entry per benchmark, with name, baseline, current, change
+        (relative), regression (bool) and missing. Benchmarks present on both
+        sides come first, slowest change first; then those missing from one
+        side, whose missing is "current" or "baseline", change is None and
+        statistic on the missing side is None
+    """
+    comparisons = []
+    for name, stats in current.items():
+        if name not in baseline:
+            continue
+        before = baseline[name][statistic]
+        after = stats[statistic]
+        change = (after - before) / before if before else 0.0
+        comparisons.append({
+            "name": name,
+            "baseline": before,
+            "current": after,
+            "change": change,
+            "regression": change > threshold and after - before > min_difference,
+            "missing": None
+        })
+    comparisons.sort(key=lambda comparison: -comparison["change"])
+
+    for missing, present, stats_by_name in (("current", "baseline", baseline), ("baseline", "current", current)):
+        for name, stats in stats_by_name.items():
+            if name in current and name in baseline:
+                continue
+            comparisons.append({
+                "name": name,
+                missing: None,
+                present: stats[statistic],
+                "change": None,
+                "regression": False,
+                "missing": missing
+            })
+    return comparisons
+
+def parse_importtime(output: str) -> Dict[str, Dict[str, int]]:
+    """
+    Parse the report written to stderr by ``python -X importtime``.
+
+    Args:
+        output: Report text
+
+    Returns:
+        Module name to its own ("self") and cumulative ("cumulative") import
+        time in microseconds, for every module imported
+    """
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # The header line names the columns
+            continue
+        modules[fields[2].strip()] = {"self": int(fields[0]), "cumulative": int(fields[1])}
+    return modules
+
+def print_results(results: List[BenchmarkResult], file=sys.stdout) -> None:
+    """
+    Print a results table.
+
+    Args:
+        results: Benchmark results
+        file: Stream to print to
+    """
+    print(f"{'Benchmark':<36} {'Calls':>7} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'Throughput':>20}", file=file)
+    for result in results:
+        stats = result.stats()
+        throughput = f"{stats['throughput']:.1f} {result.unit}/s"
+        print(
+            f"{result.name:<36} {stats['iterations']:>7} {stats['p50'] * 1000:>10.3f} "
+            f"{stats['p90'] * 1000:>10.3f} {stats['p99'] * 1000:>10.3f} {throughput:>20}",
+            file=file
+        )
@@ -0,0 +1,200 @@
+"""
+Deadlines and cooperative cancellation for BitNet Virtual Co-worker Builder.
+"""
+
+import time
+import logging
+import threading
+from typing import List, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+class CancelledError(Exception):
+    """
+    Raised when work is abandoned because its cancel token was cancelled.
+    """
+
+class DeadlineExceededError(CancelledError):
+    """
+    Raised when work is abandoned because its deadline passed.
+    """
+
+class CancelToken:
+    """
+    Cancellation signal with an optional deadline.
+
+    A token is passed down from the API through teams and virtual co-workers to
+    model generation and tool calls. Long-running loops check it between units
+    of work (iterations, agents, decoded tokens) and stop early by raising
+    CancelledError. Cancelling a token also cancels every child token derived
+    from it.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, deadline: Optional[float] = None, parent: Optional["CancelToken"] = None):
+        """
+        Initialize cancel token.
+
+        Args:
+            timeout: Seconds from now until the token expires (optional)
+            deadline: Absolute expiry time from time.monotonic() (optional)
+            parent: Token whose cancellation also cancels this one (optional)
+        """
+        if timeout is not None:
+            timeout_deadline = time.monotonic() + timeout
+            deadline = timeout_deadline if deadline is None else min(deadline, timeout_deadline)
+        if parent is not None and parent.deadline is not None:
+            deadline = parent.deadline if deadline is None else min(deadline, parent.deadline)
+
+        self.deadline = deadline
+        self.parent = parent
+        self.reason: Optional[str] = None
+
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+        if parent is not None:
+            parent.add_callback(self._cancel_from_parent)
+
+    def cancel(self, reason: str = "Cancelled") -> None:
+        """
+        Cancel the token and run its callbacks.
+
+        Args:
+            reason: Why the work was cancelled
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks = self._callbacks
+            self._callbacks = []
+
+        logger.debug(f"Cancel token cancelled: {reason}")
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error in cancel callback: {e}")
+
+    def _cancel_from_parent(self) -> None:
+        """
+        Propagate the parent's cancellation.
+        """
+        self.cancel(self.parent.reason or "Cancelled")
+
+    @property
+    def cancelled(self) -> bool:
+        """
+        Whether the token was cancelled or its deadline has passed.
+        """
+        if self._event.is_set():
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return True
+        return self.parent is not None and self.parent.cancelled
+
+    @property
+    def expired(self) -> bool:
+        """
+        Whether the deadline has passed.
+        """
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def remaining(self) -> Optional[float]:
+        """
+        Get the time left until the deadline.
+
+        Returns:
+            Seconds left (never negative), or None if there is no deadline
+        """
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Raise if the token was cancelled or its deadline has passed.
+        """
+        if self._event.is_set():
+            raise CancelledError(self.reason or "Cancelled")
+        if self.expired:
+            raise DeadlineExceededError("Deadline exceeded")
+        if self.parent is not None:
+            self.parent.raise_if_cancelled()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the token is cancelled, its deadline passes or the timeout elapses.
+
+        Args:
+            timeout: Maximum seconds to wait (optional)
+
+        Returns:
+            True if the token is cancelled, False if the timeout elapsed first
+        """
+        remaining = self.remaining()
+        if remaining is not None:
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        self._event.wait(timeout)
+        return self.cancelled
+
+    def child(self, timeout: Optional[float] = None) -> "CancelToken":
+        """
+        Derive a token that is cancelled with this one and may expire sooner.
+
+        Args:
+            timeout: Seconds from now until the child expires (optional)
+
+        Returns:
+            Child token
+        """
+        return CancelToken(timeout=timeout, parent=self)
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """
+        Register a function to call when the token is cancelled.
+
+        Callbacks run on explicit cancellation (including a parent's), not when
+        a deadline passes; deadlines are noticed by polling.
+
+        Args:
+            callback: Function to call
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        """
+        Unregister a cancellation callback.
+
+        Args:
+            callback: Function to remove
+        """
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def __repr__(self) -> str:
+        """
+        Get representation of the token.
+
+        Returns:
+            Representation
+        """
+        return f"CancelToken(cancelled={self.cancelled}, remaining={self.remaining()})"
+
+def check_cancelled(cancel_token: Optional[CancelToken]) -> None:
+    """
+    Raise if an optional cancel token was cancelled.
+
+    Args:
+        cancel_token: Token to check (None never cancels)
+    """
+    if cancel_token is not None:
+        cancel_token.raise_if_cancelled()
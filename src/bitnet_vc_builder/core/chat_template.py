@@ -0,0 +1,303 @@
+"""
+Chat templates and incremental transcripts for BitNet Virtual Co-worker Builder.
+
+A chat template turns conversation turns into the prompt format a model was
+trained on. A transcript keeps the rendered turns of one conversation so each
+turn is formatted (and, when asked for, tokenized) exactly once as the
+conversation grows, instead of re-rendering the whole history on every step.
+"""
+
+import hashlib
+import logging
+from typing import Dict, List, Optional, Callable, Union
+
+logger = logging.getLogger(__name__)
+
+class ChatTemplate:
+    """
+    Prompt format for conversation turns.
+
+    The default formatting is the plain ``Role: content`` layout; subclasses
+    change the role markers and the end of turn marker.
+    """
+
+    name = "plain"
+
+    # Text before the first turn
+    prefix = ""
+
+    # Marker the model emits at the end of its turn (stops generation)
+    end_of_turn: Optional[str] = None
+
+    ROLE_NAMES = {"system": "System", "user": "User", "assistant": "Assistant"}
+
+    def format_message(self, role: str, content: str) -> str:
+        """
+        Render one turn.
+
+        Args:
+            role: Message role ("system", "user" or "assistant")
+            content: Message content
+
+        Returns:
+            Rendered turn
+
+        Raises:
+            ValueError: If the role is unknown
+        """
+        if role not in self.ROLE_NAMES:
+            raise ValueError(f"Unknown message role: {role}")
+        return f"{self.ROLE_NAMES[role]}: {content}\n\n"
+
+    def generation_prompt(self) -> str:
+        """
+        Get the text that opens the assistant's next turn.
+
+        Returns:
+            Generation prompt
+        """
+        return "Assistant: "
+
+    def render(self, conversation: List[Dict[str, str]]) -> str:
+        """
+        Render a whole conversation followed by the generation prompt.
+
+        Args:
+            conversation: Messages with "role" and "content"
+
+        Returns:
+            Prompt text
+        """
+        turns = [self.format_message(message["role"], message["content"]) for message in conversation]
+        return self.prefix + "".join(turns) + self.generation_prompt()
+
+class Llama3ChatTemplate(ChatTemplate):
+    """
+    Llama 3 header format, used by BitNet b1.58 2B4T.
+    """
+
+    name = "llama3"
+    prefix = "<|begin_of_text|>"
+    end_of_turn = "<|eot_id|>"
+
+    def format_message(self, role: str, content: str) -> str:
+        """
+        Render one turn.
+
+        Args:
+            role: Message role ("system", "user" or "assistant")
+            content: Message content
+
+        Returns:
+            Rendered turn
+
+        Raises:
+            ValueError: If the role is unknown
+        """
+        if role not in self.ROLE_NAMES:
+            raise ValueError(f"Unknown message role: {role}")
+        return f"<|start_header_id|>{role}<|end_header_id|>\n\n{content}<|eot_id|>"
+
+    def generation_prompt(self) -> str:
+        """
+        Get the text that opens the assistant's next turn.
+
+        Returns:
+            Generation prompt
+        """
+        return "<|start_header_id|>assistant<|end_header_id|>\n\n"
+
+class ChatMLTemplate(ChatTemplate):
+    """
+    ChatML format (``<|im_start|>role ... <|im_end|>``).
+    """
+
+    name = "chatml"
+    end_of_turn = "<|im_end|>"
+
+    def format_message(self, role: str, content: str) -> str:
+        """
+        Render one turn.
+
+        Args:
+            role: Message role ("system", "user" or "assistant")
+            content: Message content
+
+        Returns:
+            Rendered turn
+
+        Raises:
+            ValueError: If the role is unknown
+        """
+        if role not in self.ROLE_NAMES:
+            raise ValueError(f"Unknown message role: {role}")
+        return f"<|im_start|>{role}\n{content}<|im_end|>\n"
+
+    def generation_prompt(self) -> str:
+        """
+        Get the text that opens the assistant's next turn.
+
+        Returns:
+            Generation prompt
+        """
+        return "<|im_start|>assistant\n"
+
+CHAT_TEMPLATES: Dict[str, ChatTemplate] = {
+    template.name: template for template in (ChatTemplate(), Llama3ChatTemplate(), ChatMLTemplate())
+}
+
+def register_chat_template(template: ChatTemplate) -> None:
+    """
+    Make a chat template available by name.
+
+    Args:
+        template: Chat template (replaces any template with the same name)
+    """
+    CHAT_TEMPLATES[template.name] = template
+
+def get_chat_template(template: Union[str, ChatTemplate, None]) -> ChatTemplate:
+    """
+    Resolve a chat template.
+
+    Args:
+        template: Template name, template instance, or None for the plain template
+
+    Returns:
+        ChatTemplate instance
+
+    Raises:
+        ValueError: If no template has the given name
+    """
+    if isinstance(template, ChatTemplate):
+        return template
+    name = template or "plain"
+    if name not in CHAT_TEMPLATES:
+        raise ValueError(f"Unknown chat template: {name}. Available templates: {', '.join(CHAT_TEMPLATES)}")
+    return CHAT_TEMPLATES[name]
+
+class Transcript:
+    """
+    Conversation rendered incrementally with a chat template.
+
+    Appending a turn renders only that turn. Token IDs are produced on demand
+    and likewise only for turns not tokenized before. Each segment also
+    extends a chain of prefix keys, so two transcripts that share their first
+    n segments share their first n keys; this is what a prompt prefix cache
+    would be keyed on.
+    """
+
+    def __init__(
+        self,
+        template: Union[str, ChatTemplate, None] = None,
+        tokenize: Optional[Callable[[str], List[int]]] = None
+    ):
+        """
+        Initialize transcript.
+
+        Args:
+            template: Chat template or its name (plain template by default)
+            tokenize: Function turning text into token IDs (optional)
+        """
+        self.template = get_chat_template(template)
+        self.tokenize = tokenize
+        self.messages: List[Dict[str, str]] = []
+        self.segments: List[str] = []
+        self.prefix_keys: List[str] = []
+
+        self._text: Optional[str] = ""
+        self._token_ids: List[int] = []
+        self._tokenized = 0
+
+        if self.template.prefix:
+            self._add_segment(self.template.prefix)
+
+    @classmethod
+    def from_messages(
+        cls,
+        messages: List[Dict[str, str]],
+        template: Union[str, ChatTemplate, None] = None,
+        tokenize: Optional[Callable[[str], List[int]]] = None
+    ) -> "Transcript":
+        """
+        Create a transcript from existing messages.
+
+        Args:
+            messages: Messages with "role" and "content"
+            template: Chat template or its name (plain template by default)
+            tokenize: Function turning text into token IDs (optional)
+
+        Returns:
+            Transcript instance
+        """
+        transcript = cls(template, tokenize)
+        for message in messages:
+            transcript.append(message["role"], message["content"])
+        return transcript
+
+    def _add_segment(self, segment: str) -> None:
+        """
+        Add rendered text.
+
+        Args:
+            segment: Rendered text
+        """
+        previous = self.prefix_keys[-1] if self.prefix_keys else ""
+        self.prefix_keys.append(hashlib.sha256((previous + segment).encode("utf-8")).hexdigest())
+        self.segments.append(segment)
+        self._text = None
+
+    def append(self, role: str, content: str) -> None:
+        """
+        Append a turn.
+
+        Args:
+            role: Message role ("system", "user" or "assistant")
+            content: Message content
+
+        Raises:
+            ValueError: If the role is unknown
+        """
+        self._add_segment(self.template.format_message(role, content))
+        self.messages.append({"role": role, "content": content})
+
+    @property
+    def text(self) -> str:
+        """
+        Rendered turns so far.
+        """
+        if self._text is None:
+            self._text = "".join(self.segments)
+        return self._text
+
+    def prompt(self) -> str:
+        """
+        Get the prompt asking the model for the assistant's next turn.
+
+        Returns:
+            Rendered turns followed by the template's generation prompt
+        """
+        return self.text + self.template.generation_prompt()
+
+    @property
+    def token_ids(self) -> List[int]:
+        """
+        Token IDs of the rendered turns, tokenizing only new segments.
+
+        Raises:
+            ValueError: If the transcript has no tokenize function
+        """
+        if self.tokenize is None:
+            raise ValueError("Transcript has no tokenize function")
+        while self._tokenized < len(self.segments):
+            self._token_ids.extend(self.tokenize(self.segments[self._tokenized]))
+            self._tokenized += 1
+        return self._token_ids
+
+    def __len__(self) -> int:
+        """
+        Get the number of turns.
+
+        Returns:
+            Number of turns
+        """
+        return len(self.messages)
@@ -0,0 +1,744 @@
+"""
+Metrics for BitNet Virtual Co-worker Builder.
+
+Counters, gauges and histograms rendered in the Prometheus text exposition
+format, as served by the API server's ``/metrics`` endpoint.
+
+Counters and histograms are sharded per thread: each thread updates its own
+cells without taking a lock, and a scrape sums the cells of every thread.
+Recording therefore never makes request threads wait on each other; only
+the first update from a new thread registers its cells under a lock. When a
+thread exits, its cells are folded into a base total, so servers that start
+a thread per request do not accumulate cells.
+
+Model and tool metrics are derived from timing spans (see
+``bitnet_vc_builder.core.timing``) by ``MetricsCollector``, so the hot path
+has no extra instrumentation of its own.
+
+``QuantileSketch`` summarizes a stream of values in bounded memory and
+answers quantile queries (p50, p95, p99) within a relative error.
+"""
+
+import os
+import math
+import weakref
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Callable, Sequence, Tuple, Union
+
+from bitnet_vc_builder.core.timing import Span, TimingCollector
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+TOKENS_PER_SECOND_BUCKETS = (1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0, 200.0, 500.0, 1000.0)
+
+class _CellHolder:
+    """
+    Holds a thread's cell in thread-local storage; freed when the thread exits.
+    """
+
+    __slots__ = ("cell", "__weakref__")
+
+    def __init__(self, cell: List[float]):
+        """
+        Initialize holder.
+
+        Args:
+            cell: The thread's values
+        """
+        self.cell = cell
+
+class _Shards:
+    """
+    Per-thread arrays of numbers, summed on read.
+    """
+
+    def __init__(self, size: int):
+        """
+        Initialize shards.
+
+        Args:
+            size: Number of values per thread
+        """
+        self.size = size
+        self._local = threading.local()
+        # Cells of live threads by id (finalizers keep the cells alive)
+        self._cells: Dict[int, List[float]] = {}
+        # Values of threads that have exited
+        self._base = [0.0] * size
+        self._lock = threading.Lock()
+
+    def cell(self) -> List[float]:
+        """
+        Get the calling thread's values.
+
+        Only the owning thread writes its cell, so updates need no lock.
+
+        Returns:
+            List of values
+        """
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            holder = _CellHolder([0.0] * self.size)
+            with self._lock:
+                self._cells[id(holder.cell)] = holder.cell
+            # The thread-local holder is freed when the thread exits
+            weakref.finalize(holder, _Shards._retire, weakref.ref(self), holder.cell)
+            self._local.holder = holder
+        return holder.cell
+
+    @staticmethod
+    def _retire(reference: "weakref.ref[_Shards]", cell: List[float]) -> None:
+        """
+        Fold the cell of an exited thread into the base totals.
+
+        Args:
+            reference: Weak reference to the shards
+            cell: The exited thread's values
+        """
+        shards = reference()
+        if shards is None:
+            return
+        with shards._lock:
+            for i, value in enumerate(cell):
+                shards._base[i] += value
+            del shards._cells[id(cell)]
+
+    def totals(self) -> List[float]:
+        """
+        Sum the values of every thread.
+
+        Returns:
+            List of totals
+        """
+        with self._lock:
+            cells = list(self._cells.values())
+            base = list(self._base)
+        return [base[i] + sum(cell[i] for cell in cells) for i in range(self.size)]
+
+def _format_value(value: float) -> str:
+    """
+    Format a sample value.
+
+    Args:
+        value: Value
+
+    Returns:
+        Value in exposition format
+    """
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """
+    Format a label set.
+
+    Args:
+        names: Label names
+        values: Label values
+
+    Returns:
+        Label set in exposition format (empty without labels)
+    """
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+class _CounterChild:
+    """
+    Counter for one label set.
+    """
+
+    def __init__(self):
+        """
+        Initialize counter.
+        """
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        """
+        Increase the counter.
+
+        Args:
+            amount: Amount to add (must not be negative)
+        """
+        self._shards.cell()[0] += amount
+
+    @property
+    def value(self) -> float:
+        """
+        Current total.
+        """
+        return self._shards.totals()[0]
+
+class _GaugeChild:
+    """
+    Gauge for one label set.
+    """
+
+    def __init__(self):
+        """
+        Initialize gauge.
+        """
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        """
+        Set the gauge.
+
+        Args:
+            value: New value
+        """
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        """
+        Increase the gauge.
+
+        Args:
+            amount: Amount to add
+        """
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """
+        Decrease the gauge.
+
+        Args:
+            amount: Amount to subtract
+        """
+        self.inc(-amount)
+
+class _HistogramChild:
+    """
+    Histogram for one label set.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        """
+        Initialize histogram.
+
+        Args:
+            buckets: Upper bounds of the buckets, in increasing order
+        """
+        self.buckets = tuple(buckets)
+        # One count per bucket, then the +Inf count, the sum and the total count
+        self._shards = _Shards(len(self.buckets) + 3)
+
+    def observe(self, value: float) -> None:
+        """
+        Record a value.
+
+        Args:
+            value: Observed value
+        """
+        cell = self._shards.cell()
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        cell[index] += 1
+        cell[-2] += value
+        cell[-1] += 1
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """
+        Get cumulative bucket counts, the sum and the count.
+
+        Returns:
+            Tuple of cumulative counts (including +Inf), sum and count
+        """
+        totals = self._shards.totals()
+        cumulative = []
+        running = 0.0
+        for count in totals[:len(self.buckets) + 1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-2], totals[-1]
+
+class Metric:
+    """
+    Named metric with optional labels.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        Initialize metric.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Label names
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self) -> Any:
+        """
+        Create the child for a new label set.
+        """
+        raise NotImplementedError
+
+    def labels(self, *values: Any, **labels: Any) -> Any:
+        """
+        Get the metric for a label set.
+
+        Args:
+            values: Label values in the order of the label names
+            labels: Label values by name
+
+        Returns:
+            Child metric for the label set
+
+        Raises:
+            ValueError: If the label values do not match the label names
+        """
+        if labels:
+            values = tuple(labels.get(name) for name in self.labelnames)
+        key = tuple(str(value) for value in values)
+        if len(key) != len(self.labelnames) or (labels and None in values):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}")
+
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self) -> Any:
+        """
+        Get the child of an unlabeled metric.
+        """
+        return self.labels()
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], float]]:
+        """
+        Get the samples to expose.
+
+        Returns:
+            List of (suffix, label values, value)
+        """
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """
+        Render the metric in exposition format.
+
+        Returns:
+            Lines of text
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for suffix, names, values, value in self._labeled_samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}")
+        return lines
+
+    def _labeled_samples(self):
+        """
+        Get samples with their label names.
+        """
+        for suffix, values, value in self.samples():
+            yield suffix, self.labelnames, values, value
+
+class Counter(Metric):
+    """
+    Monotonically increasing count.
+    """
+
+    type = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        """
+        Create the child for a new label set.
+        """
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """
+        Increase an unlabeled counter.
+
+        Args:
+            amount: Amount to add
+        """
+        self._default().inc(amount)
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], float]]:
+        """
+        Get the samples to expose.
+        """
+        return [("", key, child.value) for key, child in list(self._children.items())]
+
+class Gauge(Metric):
+    """
+    Value that goes up and down, optionally computed at scrape time.
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        function: Optional[Callable[[], Union[float, Dict[Tuple[str, ...], float]]]] = None
+    ):
+        """
+        Initialize gauge.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Label names
+            function: Called at scrape time; returns the value, or a dictionary
+                mapping label values to values for labeled gauges (optional)
+        """
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def _new_child(self) -> _GaugeChild:
+        """
+        Create the child for a new label set.
+        """
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        """
+        Set an unlabeled gauge.
+
+        Args:
+            value: New value
+        """
+        self._default().set(value)
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], float]]:
+        """
+        Get the samples to expose.
+        """
+        if self.function is None:
+            return [("", key, child.value) for key, child in list(self._children.items())]
+
+        try:
+            result = self.function()
+        except Exception as e:
+            logger.warning(f"Could not compute metric {self.name}: {e}")
+            return []
+        if isinstance(result, dict):
+            return [("", tuple(str(value) for value in key), value) for key, value in result.items()]
+        return [("", (), result)]
+
+class Histogram(Metric):
+    """
+    Distribution of observed values in cumulative buckets.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        """
+        Initialize histogram.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Label names
+            buckets: Upper bounds of the buckets, in increasing order
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self) -> _HistogramChild:
+        """
+        Create the child for a new label set.
+        """
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """
+        Record a value in an unlabeled histogram.
+
+        Args:
+            value: Observed value
+        """
+        self._default().observe(value)
+
+    def _labeled_samples(self):
+        """
+        Get bucket, sum and count samples with their label names.
+        """
+        bucket_names = self.labelnames + ("le",)
+        for key, child in list(self._children.items()):
+            cumulative, total, count = child.snapshot()
+            for bound, value in zip(self.buckets + (math.inf,), cumulative):
+                yield "_bucket", bucket_names, key + (_format_value(bound),), value
+            yield "_sum", self.labelnames, key, total
+            yield "_count", self.labelnames, key, count
+
+class QuantileSketch:
+    """
+    Streaming quantile estimate with bounded relative error.
+
+    Positive values fall into logarithmically spaced bins, so every value in
+    a bin is within ``relative_accuracy`` of the bin's representative value.
+    Sketches with the same accuracy merge exactly by adding bin counts, which
+    lets each thread fill its own sketch and a reader combine them.
+    """
+
+    # Values at or below this count as zero
+    MIN_VALUE = 1e-9
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        """
+        Initialize sketch.
+
+        Args:
+            relative_accuracy: Maximum relative error of quantile estimates
+
+        Raises:
+            ValueError: If the accuracy is not between 0 and 1
+        """
+        if not 0.0 < relative_accuracy < 1.0:
+            raise ValueError(f"Relative accuracy must be between 0 and 1, got {relative_accuracy}")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1.0 + relative_accuracy) / (1.0 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        """
+        Record a value.
+
+        Args:
+            value: Value (negative values count as zero)
+        """
+        if value > self.MIN_VALUE:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[index] = self.bins.get(index, 0) + 1
+        else:
+            self.zero_count += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """
+        Add the values of another sketch.
+
+        Args:
+            other: Sketch with the same relative accuracy
+
+        Raises:
+            ValueError: If the accuracies differ
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        # Copy first: the other sketch may belong to a thread that is still adding
+        for index, count in other.bins.copy().items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile.
+
+        Args:
+            q: Quantile between 0 and 1 (0.99 for p99)
+
+        Returns:
+            Estimated value, or None if the sketch is empty
+        """
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return max(self.min, 0.0)
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                estimate = 2.0 * self._gamma ** index / (self._gamma + 1.0)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        """
+        Mean of the recorded values (0.0 when empty).
+        """
+        return self.sum / self.count if self.count else 0.0
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered together.
+    """
+
+    def __init__(self):
+        """
+        Initialize registry.
+        """
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Add a metric, or return the registered metric with the same name.
+
+        Args:
+            metric: Metric to add
+
+        Returns:
+            Registered metric
+        """
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """
+        Get or create a counter.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Label names
+
+        Returns:
+            Counter instance
+        """
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), function: Optional[Callable] = None) -> Gauge:
+        """
+        Get or create a gauge.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Label names
+            function: Called at scrape time to compute the value (optional)
+
+        Returns:
+            Gauge instance
+        """
+        return self.register(Gauge(name, documentation, labelnames, function))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        """
+        Get or create a histogram.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Label names
+            buckets: Upper bounds of the buckets
+
+        Returns:
+            Histogram instance
+        """
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[Metric]:
+        """
+        Get a metric by name.
+
+        Args:
+            name: Metric name
+
+        Returns:
+            Metric, or None if there is none
+        """
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """
+        Render every metric in exposition format.
+
+        Returns:
+            Exposition text
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+class MetricsCollector(TimingCollector):
+    """
+    Turns timing spans into model, tool and task metrics.
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        """
+        Initialize collector.
+
+        Args:
+            registry: Registry to create the metrics in
+        """
+        self.generate_duration = registry.histogram(
+            "bitnet_generate_duration_seconds", "Duration of model generate calls", ("model",)
+        )
+        self.ttft = registry.histogram(
+            "bitnet_time_to_first_token_seconds", "Time from a generate call to its first token", ("model",)
+        )
+        self.tokens_per_second = registry.histogram(
+            "bitnet_tokens_per_second", "Decode throughput of generate calls", ("model",), TOKENS_PER_SECOND_BUCKETS
+        )
+        self.generated_tokens = registry.counter(
+            "bitnet_generated_tokens_total", "Tokens generated", ("model",)
+        )
+        self.tool_duration = registry.histogram(
+            "bitnet_tool_duration_seconds", "Duration of tool calls", ("tool",)
+        )
+        self.tool_errors = registry.counter(
+            "bitnet_tool_errors_total", "Tool calls that raised an error", ("tool",)
+        )
+        self.run_duration = registry.histogram(
+            "bitnet_coworker_run_duration_seconds", "Duration of virtual co-worker runs", ("coworker",)
+        )
+
+    def record(self, span: Span) -> None:
+        """
+        Record a finished span.
+
+        Args:
+            span: Finished span
+        """
+        attributes = span.attributes
+        if span.name == "generate":
+            model = os.path.basename(str(attributes.get("model", "")))
+            self.generate_duration.labels(model).observe(span.duration)
+            if "ttft" in attributes:
+                self.ttft.labels(model).observe(attributes["ttft"])
+                self.tokens_per_second.labels(model).observe(attributes["tokens_per_second"])
+                self.generated_tokens.labels(model).inc(attributes["tokens"])
+        elif span.name == "tool":
+            tool = attributes.get("tool", "")
+            self.tool_duration.labels(tool).observe(span.duration)
+            if "error" in attributes:
+                self.tool_errors.labels(tool).inc()
+        elif span.name == "run":
+            self.run_duration.labels(attributes.get("coworker", "")).observe(span.duration)
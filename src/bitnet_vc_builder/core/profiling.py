@@ -0,0 +1,362 @@
+"""
+Profiling for BitNet Virtual Co-worker Builder.
+
+A ``ProfileSession`` runs one profiler, optionally with allocation tracing,
+between ``start`` and ``stop``:
+
+- ``sampling`` reads the stacks of running threads at a fixed interval. It
+  works on a live process from any thread and costs little, and its output is
+  collapsed stacks ("outer;inner;leaf count" lines) that flamegraph.pl,
+  speedscope and similar tools read directly.
+- ``cprofile`` counts every function call with cProfile. It is exact but
+  slower, and it only follows the thread that started it, so it suits a
+  single run rather than a whole server.
+
+Allocation tracing compares tracemalloc snapshots taken at start and stop and
+reports the source lines that allocated the most memory in between.
+"""
+
+import io
+import os
+import sys
+import time
+import cProfile
+import logging
+import threading
+import tracemalloc
+from collections import Counter
+from typing import Dict, Any, List, Optional, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("sampling", "cprofile")
+
+def collapse_stack(frame: Any) -> str:
+    """
+    Describe a stack as one collapsed-stack line.
+
+    Args:
+        frame: Innermost frame
+
+    Returns:
+        Frames from outermost to innermost as "file:function", separated by ";"
+    """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+class SamplingProfiler:
+    """
+    Profiler that samples thread stacks from a background thread.
+    """
+
+    def __init__(self, interval: float = 0.005, threads: Optional[Callable[[], Iterable[int]]] = None):
+        """
+        Initialize sampling profiler.
+
+        Args:
+            interval: Seconds between samples
+            threads: Function returning the identifiers of the threads to
+                sample (optional; all threads by default)
+        """
+        self.interval = interval
+        self.threads = threads
+        self.samples: Counter = Counter()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """
+        Start sampling.
+        """
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop sampling and wait for the sampling thread.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        """
+        Take samples until stopped.
+        """
+        own = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            wanted = set(self.threads()) if self.threads is not None else None
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (wanted is not None and ident not in wanted):
+                    continue
+                self.samples[collapse_stack(frame)] += 1
+
+    def collapsed(self) -> str:
+        """
+        Get the samples as collapsed stacks.
+
+        Returns:
+            One "stack count" line per distinct stack, most frequent first
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+class AllocationTracer:
+    """
+    Reports memory allocated between two tracemalloc snapshots.
+    """
+
+    def __init__(self, frames: int = 1, top: int = 25):
+        """
+        Initialize allocation tracer.
+
+        Args:
+            frames: Stack frames stored per allocation (when this tracer starts tracemalloc)
+            top: Number of source lines to report
+        """
+        self.frames = frames
+        self.top = top
+        self._started_tracing = False
+        self._before: Optional[tracemalloc.Snapshot] = None
+
+    def start(self) -> None:
+        """
+        Take the starting snapshot, starting tracemalloc if needed.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self._before = self._snapshot()
+
+    def stop(self) -> Dict[str, Any]:
+        """
+        Take the final snapshot and compare it with the starting one.
+
+        Returns:
+            Dictionary with the current and peak traced bytes and the top
+            source lines by growth (location, size, size_diff, count, count_diff)
+        """
+        after = self._snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+        top = []
+        for stat in after.compare_to(self._before, "lineno")[:self.top]:
+            frame = stat.traceback[0]
+            top.append({
+                "location": f"{frame.filename}:{frame.lineno}",
+                "size": stat.size,
+                "size_diff": stat.size_diff,
+                "count": stat.count,
+                "count_diff": stat.count_diff
+            })
+        return {"traced_bytes": current, "peak_bytes": peak, "top": top}
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        """
+        Take a snapshot without tracemalloc's and this module's own allocations.
+
+        Returns:
+            Filtered snapshot
+        """
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>")
+        ))
+
+def format_allocations(report: Dict[str, Any]) -> str:
+    """
+    Format an allocation report as text.
+
+    Args:
+        report: Report from AllocationTracer.stop
+
+    Returns:
+        Table of the top source lines by growth
+    """
+    lines = [
+        f"Traced: {report['traced_bytes'] / 1024:.1f} KiB (peak {report['peak_bytes'] / 1024:.1f} KiB)",
+        f"{'Growth KiB':>12} {'Blocks':>8} {'Total KiB':>12}  Location"
+    ]
+    for entry in report["top"]:
+        lines.append(
+            f"{entry['size_diff'] / 1024:>12.1f} {entry['count_diff']:>8} {entry['size'] / 1024:>12.1f}  {entry['location']}"
+        )
+    return "\n".join(lines) + "\n"
+
+class ProfileSession:
+    """
+    One profiling run: a profiler and optional allocation tracing.
+    """
+
+    def __init__(
+        self,
+        mode: str = "sampling",
+        allocations: bool = False,
+        interval: float = 0.005,
+        threads: Optional[Callable[[], Iterable[int]]] = None,
+        top: int = 25
+    ):
+        """
+        Initialize profile session.
+
+        Args:
+            mode: Profiler to run ("sampling" or "cprofile")
+            allocations: Whether to trace allocations as well
+            interval: Seconds between samples (sampling mode)
+            threads: Function returning the threads to sample (sampling mode;
+                optional, all threads by default)
+            top: Number of functions and source lines to report
+
+        Raises:
+            ValueError: If the mode is unknown
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}. Modes: {', '.join(PROFILE_MODES)}")
+
+        self.mode = mode
+        self.top = top
+        self.sampler = SamplingProfiler(interval, threads) if mode == "sampling" else None
+        self.profile = cProfile.Profile() if mode == "cprofile" else None
+        self.tracer = AllocationTracer(top=top) if allocations else None
+        self.started: Optional[float] = None
+        self._start_time = 0.0
+        self.duration: Optional[float] = None
+        self.allocations: Optional[Dict[str, Any]] = None
+        self._stop_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """
+        Whether the session has started and not stopped.
+        """
+        return self.started is not None and self.duration is None
+
+    @property
+    def status(self) -> str:
+        """
+        Session status: "pending", "running" or "completed".
+        """
+        if self.started is None:
+            return "pending"
+        return "running" if self.duration is None else "completed"
+
+    def start(self) -> None:
+        """
+        Start profiling. In cprofile mode, only the calling thread is profiled.
+        """
+        if self.tracer is not None:
+            self.tracer.start()
+        self.started = time.time()
+        self._start_time = time.perf_counter()
+        if self.sampler is not None:
+            self.sampler.start()
+        else:
+            self.profile.enable()
+
+    def stop(self) -> None:
+        """
+        Stop profiling. In cprofile mode, call from the thread that started it.
+        Stopping a session that is not running does nothing.
+        """
+        with self._stop_lock:
+            if not self.running:
+                return
+            if self.sampler is not None:
+                self.sampler.stop()
+            else:
+                self.profile.disable()
+            self.duration = time.perf_counter() - self._start_time
+            if self.tracer is not None:
+                self.allocations = self.tracer.stop()
+
+    def collapsed(self) -> str:
+        """
+        Get collapsed stacks (sampling mode).
+
+        Returns:
+            Collapsed stacks, empty in cprofile mode
+        """
+        return self.sampler.collapsed() if self.sampler is not None else ""
+
+    def stats(self, sort: str = "cumulative") -> str:
+        """
+        Get the function statistics report (cprofile mode).
+
+        Reading the statistics disables the profiler, so the report is only
+        available once the session has stopped.
+
+        Args:
+            sort: pstats sort key
+
+        Returns:
+            The top functions, empty in sampling mode and while running
+        """
+        if self.profile is None or self.running:
+            return ""
+        # pstats is only needed for reports, and slows down CLI startup
+        import pstats
+
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats(sort).print_stats(self.top)
+        return stream.getvalue()
+
+    def result(self) -> Dict[str, Any]:
+        """
+        Summarize the session.
+
+        Returns:
+            Dictionary with mode, status, start time, duration, samples,
+            collapsed stacks (sampling), stats (cprofile) and allocations
+        """
+        return {
+            "mode": self.mode,
+            "status": self.status,
+            "started": self.started,
+            "duration": self.duration,
+            "samples": sum(self.sampler.samples.values()) if self.sampler is not None else None,
+            "collapsed": self.collapsed(),
+            "stats": self.stats(),
+            "allocations": self.allocations
+        }
+
+    def save(self, directory: str, name: str = "profile") -> List[str]:
+        """
+        Write the results to files.
+
+        Sampling sessions write NAME.collapsed, stopped cprofile sessions write
+        NAME.pstats (readable with pstats, snakeviz or flameprof) and NAME.txt,
+        and allocation tracing writes NAME.allocations.txt.
+
+        Args:
+            directory: Output directory (created if missing)
+            name: File name prefix
+
+        Returns:
+            Paths of the written files
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        if self.sampler is not None:
+            paths.append(os.path.join(directory, f"{name}.collapsed"))
+            with open(paths[-1], "w") as f:
+                f.write(self.collapsed())
+        elif not self.running:
+            paths.append(os.path.join(directory, f"{name}.pstats"))
+            self.profile.dump_stats(paths[-1])
+            paths.append(os.path.join(directory, f"{name}.txt"))
+            with open(paths[-1], "w") as f:
+                f.write(self.stats())
+        if self.allocations is not None:
+            paths.append(os.path.join(directory, f"{name}.allocations.txt"))
+            with open(paths[-1], "w") as f:
+                f.write(format_allocations(self.allocations))
+        return paths
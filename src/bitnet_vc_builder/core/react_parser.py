@@ -0,0 +1,544 @@
+"""
+Incremental parser for ReAct-style virtual co-worker output.
+"""
+
+import json
+import logging
+from enum import Enum
+from typing import Callable, List, Dict, Any, Hashable, Optional, Sequence
+
+from bitnet_vc_builder.models.grammar import Grammar
+
+logger = logging.getLogger(__name__)
+
+ACTION_MARKER = "Action:"
+ACTION_INPUT_MARKER = "Action Input:"
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+class ReActEventType(Enum):
+    """
+    Types of events emitted by the ReAct parser.
+    """
+    ACTION = "action"              # A tool name was read
+    ACTION_INPUT = "action_input"  # A complete tool input object was read
+    FINAL_ANSWER = "final_answer"  # The final answer was read (emitted at end of stream)
+
+class ReActEvent:
+    """
+    Structured event emitted by the ReAct parser.
+    """
+
+    def __init__(self, event_type: ReActEventType, value: Any):
+        """
+        Initialize event.
+
+        Args:
+            event_type: Type of the event
+            value: Tool name, tool input dictionary or final answer text
+        """
+        self.type = event_type
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Compare two events.
+
+        Args:
+            other: Other event
+
+        Returns:
+            True if both events have the same type and value
+        """
+        return isinstance(other, ReActEvent) and self.type == other.type and self.value == other.value
+
+    def __repr__(self) -> str:
+        """
+        Get representation of the event.
+
+        Returns:
+            Representation
+        """
+        return f"ReActEvent({self.type.name}, {self.value!r})"
+
+class _State(Enum):
+    """
+    Parser states.
+    """
+    TEXT = "text"                  # Free text, looking for markers
+    ACTION_INPUT = "action_input"  # After "Action Input:", waiting for "{"
+    JSON = "json"                  # Inside the tool input object
+    FINAL_ANSWER = "final_answer"  # After "Final Answer:"
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+class ReActParser:
+    """
+    Single-pass, incremental parser for ReAct output.
+
+    Text can be fed in arbitrary chunks as tokens are decoded. The parser reads
+    each character once and emits events as soon as they are complete, so a
+    caller can stop decoding once the tool call is complete instead of waiting
+    for the model to finish and then rescanning the whole response.
+    """
+
+    def __init__(self):
+        """
+        Initialize parser.
+        """
+        self.tool_name = ""
+        self.tool_input: Optional[Dict[str, Any]] = None
+        self.tool_input_text: Optional[str] = None
+        self.final_answer: Optional[str] = None
+
+        self._state = _State.TEXT
+        self._line = ""
+        self._scanned = 0
+        self._json: List[str] = []
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._answer: List[str] = []
+        self._closed = False
+
+    @property
+    def is_complete(self) -> bool:
+        """
+        Whether a full tool call has been read.
+
+        Anything the model generates after a complete tool call is ignored by
+        virtual co-workers, so decoding can stop once this is True.
+        """
+        return bool(self.tool_name) and self.tool_input is not None
+
+    @property
+    def in_tool_input(self) -> bool:
+        """
+        Whether the parser is between "Action Input:" and the end of the input object.
+        """
+        return self._state in (_State.ACTION_INPUT, _State.JSON)
+
+    @property
+    def has_final_answer(self) -> bool:
+        """
+        Whether a final answer marker has been read.
+        """
+        return self._state == _State.FINAL_ANSWER or self.final_answer is not None
+
+    def feed(self, chunk: str) -> List[ReActEvent]:
+        """
+        Feed a chunk of generated text.
+
+        Args:
+            chunk: Newly generated text
+
+        Returns:
+            Events completed by this chunk
+        """
+        if self._closed:
+            raise RuntimeError("Cannot feed a closed parser")
+
+        events: List[ReActEvent] = []
+        self._process(chunk, events)
+        return events
+
+    def close(self) -> List[ReActEvent]:
+        """
+        Signal the end of the stream.
+
+        Returns:
+            Remaining events, including the final answer if one was read
+        """
+        if self._closed:
+            return []
+
+        events: List[ReActEvent] = []
+
+        if self._state == _State.TEXT and self._line:
+            rest = self._check_inline_markers()
+            if rest is None:
+                self._end_line(events)
+            else:
+                self._process(rest, events)
+
+        if self._state == _State.JSON:
+            self._emit_input(self._repair_json(), events)
+        elif self._state == _State.ACTION_INPUT:
+            self._emit_input(None, events)
+
+        if self._state == _State.FINAL_ANSWER:
+            answer = "".join(self._answer)
+            # Only the text up to a repeated marker belongs to the answer
+            self.final_answer = answer.split(FINAL_ANSWER_MARKER)[0].strip()
+            events.append(ReActEvent(ReActEventType.FINAL_ANSWER, self.final_answer))
+
+        self._closed = True
+        return events
+
+    def _process(self, chunk: str, events: List[ReActEvent]) -> None:
+        """
+        Run the state machine over a chunk of text.
+
+        Args:
+            chunk: Text to process
+            events: List to append events to
+        """
+        i = 0
+        n = len(chunk)
+
+        while i < n:
+            if self._state == _State.FINAL_ANSWER:
+                self._answer.append(chunk[i:])
+                return
+
+            if self._state == _State.ACTION_INPUT:
+                i = self._skip_to_object(chunk, i)
+                continue
+
+            if self._state == _State.JSON:
+                i = self._consume_json(chunk, i, events)
+                continue
+
+            # Free text: work line by line, but look for markers that switch
+            # state in the middle of a line as soon as they are complete
+            newline = chunk.find("\n", i)
+            end = n if newline == -1 else newline
+            self._line += chunk[i:end]
+
+            rest = self._check_inline_markers()
+            if rest is not None:
+                # Continue with the text after the marker in the new state
+                chunk = rest + chunk[end:]
+                i = 0
+                n = len(chunk)
+                continue
+
+            if newline == -1:
+                return
+
+            self._end_line(events)
+            i = newline + 1
+
+    def _check_inline_markers(self) -> Optional[str]:
+        """
+        Switch state if the current line contains an input or answer marker.
+
+        Returns:
+            The text of the line after the marker, or None if the state did not change
+        """
+        # Only rescan the tail a marker could still be straddling
+        input_idx = -1
+        if self.tool_input is None:
+            input_idx = self._line.find(ACTION_INPUT_MARKER, max(0, self._scanned - len(ACTION_INPUT_MARKER) + 1))
+        answer_idx = self._line.find(FINAL_ANSWER_MARKER, max(0, self._scanned - len(FINAL_ANSWER_MARKER) + 1))
+        self._scanned = len(self._line)
+
+        if input_idx != -1 and (answer_idx == -1 or input_idx < answer_idx):
+            rest = self._line[input_idx + len(ACTION_INPUT_MARKER):]
+            self._line = ""
+            self._scanned = 0
+            self._state = _State.ACTION_INPUT
+            return rest
+
+        if answer_idx != -1:
+            rest = self._line[answer_idx + len(FINAL_ANSWER_MARKER):]
+            self._line = ""
+            self._scanned = 0
+            self._state = _State.FINAL_ANSWER
+            return rest
+
+        return None
+
+    def _end_line(self, events: List[ReActEvent]) -> None:
+        """
+        Handle a complete line of free text.
+
+        Args:
+            events: List to append events to
+        """
+        line = self._line
+        self._line = ""
+        self._scanned = 0
+
+        if not self.tool_name and line.startswith(ACTION_MARKER):
+            self.tool_name = line[len(ACTION_MARKER):].strip()
+            if self.tool_name:
+                events.append(ReActEvent(ReActEventType.ACTION, self.tool_name))
+
+    def _skip_to_object(self, chunk: str, i: int) -> int:
+        """
+        Skip whitespace between "Action Input:" and the opening brace.
+
+        Args:
+            chunk: Current chunk
+            i: Position in the chunk
+
+        Returns:
+            New position in the chunk
+        """
+        n = len(chunk)
+        while i < n and chunk[i].isspace():
+            i += 1
+
+        if i < n:
+            if chunk[i] == "{":
+                self._state = _State.JSON
+            else:
+                # Not a JSON object: treat as an empty input and go back to free text
+                self.tool_input = {}
+                self._state = _State.TEXT
+        return i
+
+    def _consume_json(self, chunk: str, i: int, events: List[ReActEvent]) -> int:
+        """
+        Consume characters of the tool input object.
+
+        Args:
+            chunk: Current chunk
+            i: Position in the chunk
+            events: List to append events to
+
+        Returns:
+            New position in the chunk
+        """
+        start = i
+        n = len(chunk)
+
+        while i < n:
+            c = chunk[i]
+            i += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c in _CLOSERS:
+                self._stack.append(_CLOSERS[c])
+            elif c == "}" or c == "]":
+                if self._stack and self._stack[-1] == c:
+                    self._stack.pop()
+                if not self._stack:
+                    self._json.append(chunk[start:i])
+                    self._emit_input("".join(self._json), events)
+                    return i
+
+        self._json.append(chunk[start:i])
+        return i
+
+    def _emit_input(self, text: Optional[str], events: List[ReActEvent]) -> None:
+        """
+        Decode the tool input and emit it.
+
+        Args:
+            text: JSON text of the tool input
+            events: List to append events to
+        """
+        tool_input: Dict[str, Any] = {}
+        if text:
+            try:
+                value = json.loads(text)
+                if isinstance(value, dict):
+                    tool_input = value
+            except json.JSONDecodeError as e:
+                logger.debug(f"Could not decode tool input {text!r}: {e}")
+
+        self.tool_input = tool_input
+        self.tool_input_text = text
+        self._json = []
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._state = _State.TEXT
+        events.append(ReActEvent(ReActEventType.ACTION_INPUT, tool_input))
+
+    def _repair_json(self) -> str:
+        """
+        Close a tool input object that was cut off mid-stream.
+
+        Returns:
+            JSON text with open strings, arrays and objects closed
+        """
+        text = "".join(self._json)
+
+        if self._in_string:
+            if self._escape:
+                text = text[:-1]
+            text += '"'
+
+        text = text.rstrip()
+        if text.endswith(","):
+            text = text[:-1]
+        elif text.endswith(":"):
+            text += " null"
+
+        return text + "".join(reversed(self._stack))
+
+def parse_react(text: str) -> ReActParser:
+    """
+    Parse a complete ReAct response.
+
+    Args:
+        text: Response text
+
+    Returns:
+        Closed parser holding the tool name, tool input and final answer
+    """
+    parser = ReActParser()
+    parser.feed(text)
+    parser.close()
+    return parser
+
+class ReActGrammar(Grammar):
+    """
+    Grammar for ReAct output.
+
+    Free text is unconstrained. The tool input after "Action Input:" is held to
+    the named tool's grammar, and the text after "Final Answer:" to the answer
+    grammar when one is given.
+    """
+
+    def __init__(
+        self,
+        input_grammar: Callable[[str], Optional[Grammar]],
+        answer_grammar: Optional[Grammar] = None,
+        tools_key: Optional[Hashable] = None
+    ):
+        """
+        Initialize ReAct grammar.
+
+        Args:
+            input_grammar: Function returning the input grammar of a tool by
+                name (None for tools without one)
+            answer_grammar: Grammar the final answer must match (optional)
+            tools_key: Identity of the tools' input grammars, such as their
+                descriptions (optional; without it the grammar is only equal
+                to itself)
+        """
+        self.input_grammar = input_grammar
+        self.answer_grammar = answer_grammar
+        self.tools_key = tools_key
+
+    @property
+    def key(self) -> Hashable:
+        """
+        Identity of the grammar, from its tools and answer grammar.
+        """
+        if self.tools_key is None:
+            return id(self)
+        return ("react", self.tools_key, self.answer_grammar.key if self.answer_grammar is not None else None)
+
+    def constraint(self) -> "ReActConstraint":
+        """
+        Create a constraint that tracks the state of one generation.
+
+        Returns:
+            ReActConstraint instance
+        """
+        return ReActConstraint(self)
+
+    def check(self, text: str) -> str:
+        """
+        Check text generated without the constraint.
+
+        ReAct responses are free text around their structured parts; virtual
+        co-workers check the tool input and final answer once they parse the
+        response, so the text is passed through as is.
+
+        Args:
+            text: Generated text
+
+        Returns:
+            The text, unchanged
+        """
+        return text
+
+class ReActConstraint:
+    """
+    Tracks the ReAct structure of a single generation.
+
+    Generated text is fed to a ReActParser as it is decoded. While the parser
+    is inside a tool input or a final answer with a grammar, masks come from
+    that grammar's constraint; elsewhere every token is allowed. Decoding
+    stops as soon as the parser has a complete tool call, since virtual
+    co-workers ignore anything generated after it.
+    """
+
+    def __init__(self, grammar: ReActGrammar):
+        """
+        Initialize constraint.
+
+        Args:
+            grammar: ReAct grammar to enforce
+        """
+        self.grammar = grammar
+        self.parser = ReActParser()
+        self._inner = None
+        self._input_started = False
+        self._answer_started = False
+        self._answer_done = False
+
+    def mask(self, vocab: Sequence[str]) -> Optional[List[bool]]:
+        """
+        Compute which tokens may be generated next.
+
+        Args:
+            vocab: Token strings indexed by token ID
+
+        Returns:
+            List of booleans, True where the token is allowed, or None if
+            every token is allowed
+        """
+        if self._inner is None:
+            return None
+        return self._inner.mask(vocab)
+
+    def advance(self, text: str) -> None:
+        """
+        Consume generated text.
+
+        Args:
+            text: Generated text
+        """
+        for char in text:
+            if self._inner is not None:
+                if not self._inner.allows(char):
+                    # Only the part of a token after a marker can get here, as
+                    # masks do not apply to the token that completes the marker;
+                    # the parsed value is checked once the response is done
+                    self._inner = None
+                else:
+                    self._inner.advance(char)
+                    if self._inner.done:
+                        self._inner = None
+                        self._answer_done = self._answer_started
+
+            self.parser.feed(char)
+            self._start_inner()
+
+    def _start_inner(self) -> None:
+        """
+        Start the structured part the parser has just entered, if any.
+        """
+        if self._inner is not None:
+            return
+
+        if self.parser.in_tool_input and not self._input_started:
+            self._input_started = True
+            input_grammar = self.grammar.input_grammar(self.parser.tool_name)
+            if input_grammar is not None:
+                self._inner = input_grammar.constraint()
+        elif self.parser.has_final_answer and not self._answer_started:
+            self._answer_started = True
+            if self.grammar.answer_grammar is not None:
+                self._inner = self.grammar.answer_grammar.constraint()
+
+    @property
+    def done(self) -> bool:
+        """
+        Whether a tool call or the final answer is complete, so nothing after it would be used.
+        """
+        return self.parser.is_complete or self._answer_done
@@ -0,0 +1,416 @@
+"""
+Record and replay of model and tool calls for BitNet Virtual Co-worker Builder.
+
+While a ``Recorder`` is installed, every team task, every ``generate`` call
+(prompt, response, duration and token counts) and every tool call (input,
+output or error, and duration) is appended to a file, one JSON line each:
+
+    set_recorder(Recorder("recording.jsonl"))
+    team.run("Research and summarize the report")
+    get_recorder().close()
+    set_recorder(None)
+
+While a ``Recording`` is installed as the replay, models answer from it
+instead of running, and tools return their recorded results:
+
+    set_replay(Recording("recording.jsonl", latency="zero"))
+    team.run("Research and summarize the report")
+
+Responses are looked up by the hash of the prompt, so a replayed run gets the
+answers the recorded run got. A prompt recorded several times is answered
+with its responses in recorded order. With ``latency="recorded"`` each call
+takes as long as it did when recorded; with ``latency="zero"`` it returns at
+once, so only framework time remains. Timings of a replayed run then reflect
+the framework: prompt assembly, parsing, memory, scheduling and concurrency.
+
+When a new framework version changes a prompt, its hash no longer matches.
+Unless the recording is strict, the model is then answered with its next
+recorded response in order, which keeps a run on its recorded path as long as
+the sequence of calls is the same.
+"""
+
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from bitnet_vc_builder.core.cancellation import CancelToken
+from bitnet_vc_builder.core.timing import span
+from bitnet_vc_builder.models.simulated import SimulatedBackend, sleep_until
+
+logger = logging.getLogger(__name__)
+
+REPLAY_LATENCIES = ("recorded", "zero")
+
+def prompt_key(prompt: str) -> str:
+    """
+    Hash a prompt for lookup in a recording.
+
+    Args:
+        prompt: Prompt text
+
+    Returns:
+        Hex digest
+    """
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:32]
+
+def tool_key(tool_name: str, args: Dict[str, Any]) -> str:
+    """
+    Hash a tool call for lookup in a recording.
+
+    Args:
+        tool_name: Tool name
+        args: Tool arguments
+
+    Returns:
+        Hex digest
+    """
+    canonical = json.dumps([tool_name, args], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+class Recorder:
+    """
+    Appends team tasks, generate calls and tool calls to a recording file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize recorder.
+
+        Args:
+            path: Recording file (appended to)
+        """
+        self.path = path
+        self.entries_written = 0
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        """
+        Append one entry.
+
+        Args:
+            entry: Entry to write
+        """
+        line = json.dumps(entry, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line)
+            self._file.flush()
+            self.entries_written += 1
+
+    def record_task(self, team_name: str, task: str) -> None:
+        """
+        Record a team task.
+
+        Args:
+            team_name: Team name
+            task: Task description
+        """
+        self._write({"type": "task", "team": team_name, "task": task, "time": time.time()})
+
+    def record_generate(
+        self,
+        model: str,
+        prompt: str,
+        max_tokens: int,
+        response: str,
+        duration: float,
+        tokens: Optional[int] = None,
+        ttft: Optional[float] = None
+    ) -> None:
+        """
+        Record a generate call.
+
+        Args:
+            model: Model path
+            prompt: Input prompt
+            max_tokens: Maximum number of tokens requested
+            response: Generated text
+            duration: Seconds the call took
+            tokens: Number of tokens generated (optional)
+            ttft: Seconds to the first token (optional)
+        """
+        entry = {
+            "type": "generate",
+            "model": model,
+            "key": prompt_key(prompt),
+            "prompt": prompt,
+            "max_tokens": max_tokens,
+            "response": response,
+            "duration": round(duration, 6)
+        }
+        if tokens is not None:
+            entry["tokens"] = tokens
+        if ttft is not None:
+            entry["ttft"] = round(ttft, 6)
+        self._write(entry)
+
+    def record_tool(
+        self,
+        tool_name: str,
+        args: Dict[str, Any],
+        output: Any,
+        duration: float,
+        error: Optional[str] = None
+    ) -> None:
+        """
+        Record a tool call.
+
+        Args:
+            tool_name: Tool name
+            args: Tool arguments
+            output: Tool result (None if the call failed)
+            duration: Seconds the call took
+            error: Error message if the call raised (optional)
+        """
+        entry = {
+            "type": "tool",
+            "tool": tool_name,
+            "key": tool_key(tool_name, args),
+            "input": args,
+            "output": output,
+            "duration": round(duration, 6)
+        }
+        if error is not None:
+            entry["error"] = error
+        self._write(entry)
+
+    def close(self) -> None:
+        """
+        Close the recording file.
+        """
+        with self._lock:
+            self._file.close()
+
+class Recording:
+    """
+    Serves recorded model responses and tool results.
+    """
+
+    def __init__(self, path: str, latency: str = "recorded", strict: bool = False):
+        """
+        Load a recording.
+
+        Args:
+            path: Recording file written by Recorder
+            latency: "recorded" to take as long as the recorded calls, or
+                "zero" to answer at once
+            strict: Whether a prompt or tool call missing from the recording
+                is an error (otherwise models get their next recorded response
+                and tools run for real)
+
+        Raises:
+            ValueError: If the latency is unknown or a line is not a recording entry
+        """
+        if latency not in REPLAY_LATENCIES:
+            raise ValueError(f"Unknown replay latency: {latency}. Latencies: {', '.join(REPLAY_LATENCIES)}")
+
+        self.path = path
+        self.latency = latency
+        self.strict = strict
+        self.tasks: List[Dict[str, Any]] = []
+        # Prompt or tool call hash -> recorded entries, served in order
+        self._generations: Dict[str, List[Dict[str, Any]]] = {}
+        self._tools: Dict[str, List[Dict[str, Any]]] = {}
+        # Model -> its entries in recorded order, for prompts that changed
+        self._by_model: Dict[str, List[Dict[str, Any]]] = {}
+        self._served: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        with open(path, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    kind = entry["type"]
+                    if kind == "task":
+                        self.tasks.append(entry)
+                    elif kind == "generate":
+                        self._generations.setdefault(entry["key"], []).append(entry)
+                        self._by_model.setdefault(entry["model"], []).append(entry)
+                    elif kind == "tool":
+                        self._tools.setdefault(entry["key"], []).append(entry)
+                except (ValueError, KeyError, TypeError) as e:
+                    raise ValueError(f"{path}:{number} is not a recording entry: {e}")
+
+        logger.info(
+            f"Loaded recording {path}: {len(self.tasks)} tasks, "
+            f"{sum(len(entries) for entries in self._generations.values())} generate calls, "
+            f"{sum(len(entries) for entries in self._tools.values())} tool calls"
+        )
+
+    def _next(self, kind: str, key: str, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Take the next of a list of recorded entries; the last one repeats.
+
+        Args:
+            kind: Kind of list ("prompt", "model" or "tool")
+            key: Key of the list
+            entries: Recorded entries
+
+        Returns:
+            Entry to serve
+        """
+        with self._lock:
+            served = self._served.get((kind, key), 0)
+            self._served[(kind, key)] = served + 1
+        return entries[min(served, len(entries) - 1)]
+
+    def _count(self, hit: bool) -> None:
+        """
+        Count a call for the statistics.
+
+        Args:
+            hit: Whether the call matched its recording exactly
+        """
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def generate(self, model: str, prompt: str, max_tokens: int, cancel_token: Optional[CancelToken] = None) -> str:
+        """
+        Answer a generate call from the recording.
+
+        Args:
+            model: Model path
+            prompt: Input prompt
+            max_tokens: Maximum number of tokens to generate
+            cancel_token: Token for abandoning generation (optional)
+
+        Returns:
+            Recorded response
+
+        Raises:
+            ValueError: If nothing was recorded for the prompt and the
+                recording is strict, or nothing at all for the model
+            CancelledError: If the token is cancelled or its deadline passes
+        """
+        key = prompt_key(prompt)
+        # Every call advances the model's position, so a changed prompt gets
+        # the response recorded at the same point of the run
+        in_order = self._next("model", model, self._by_model[model]) if model in self._by_model else None
+
+        if key in self._generations:
+            entry = self._next("prompt", key, self._generations[key])
+            self._count(hit=True)
+        elif self.strict or in_order is None:
+            raise ValueError(f"No recorded response for prompt {key} of model {model}")
+        else:
+            entry = in_order
+            self._count(hit=False)
+            logger.warning(f"Prompt {key} of model {model} was not recorded; replaying the model's next response")
+
+        tokens = entry.get("tokens", SimulatedBackend.count_tokens(entry["response"]))
+        start = time.perf_counter()
+        with span("prefill", tokens=SimulatedBackend.count_tokens(prompt)):
+            if self.latency == "recorded":
+                sleep_until(start + entry.get("ttft", 0.0), cancel_token)
+        with span("decode", tokens=tokens):
+            if self.latency == "recorded":
+                sleep_until(start + entry["duration"], cancel_token)
+        return entry["response"]
+
+    def tool(self, tool_name: str, args: Dict[str, Any], cancel_token: Optional[CancelToken] = None) -> Tuple[bool, Any]:
+        """
+        Answer a tool call from the recording.
+
+        Args:
+            tool_name: Tool name
+            args: Tool arguments
+            cancel_token: Token for abandoning the call (optional)
+
+        Returns:
+            Tuple of whether the call was recorded and its result
+
+        Raises:
+            ValueError: If the call was not recorded and the recording is strict
+            RuntimeError: If the recorded call raised (with its message)
+            CancelledError: If the token is cancelled or its deadline passes
+        """
+        key = tool_key(tool_name, args)
+        if key not in self._tools:
+            if self.strict:
+                raise ValueError(f"No recorded result for tool {tool_name} with input {args}")
+            self._count(hit=False)
+            logger.warning(f"Tool call {tool_name}({args}) was not recorded; calling the tool")
+            return False, None
+
+        entry = self._next("tool", key, self._tools[key])
+        self._count(hit=True)
+        if self.latency == "recorded":
+            sleep_until(time.perf_counter() + entry["duration"], cancel_token)
+        if "error" in entry:
+            raise RuntimeError(entry["error"])
+        return True, entry["output"]
+
+    def team_tasks(self, team_name: Optional[str] = None) -> List[str]:
+        """
+        Get the recorded team tasks.
+
+        Args:
+            team_name: Only tasks of this team (optional)
+
+        Returns:
+            Task descriptions in recorded order
+        """
+        return [entry["task"] for entry in self.tasks if team_name is None or entry["team"] == team_name]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get replay statistics.
+
+        Returns:
+            Dictionary with the number of calls answered by hash (hits) and
+            answered in order or passed through (misses)
+        """
+        return {"path": self.path, "latency": self.latency, "hits": self.hits, "misses": self.misses}
+
+_recorder: Optional[Recorder] = None
+_replay: Optional[Recording] = None
+
+def set_recorder(recorder: Optional[Recorder]) -> None:
+    """
+    Install the recorder that receives model and tool calls.
+
+    Args:
+        recorder: Recorder, or None to stop recording
+    """
+    global _recorder
+    _recorder = recorder
+
+def get_recorder() -> Optional[Recorder]:
+    """
+    Get the installed recorder.
+
+    Returns:
+        Recorder, or None if calls are not being recorded
+    """
+    return _recorder
+
+def set_replay(recording: Optional[Recording]) -> None:
+    """
+    Install the recording that answers model and tool calls.
+
+    Args:
+        recording: Recording, or None to run models and tools for real
+    """
+    global _replay
+    _replay = recording
+
+def get_replay() -> Optional[Recording]:
+    """
+    Get the installed replay.
+
+    Returns:
+        Recording, or None if calls run for real
+    """
+    return _replay
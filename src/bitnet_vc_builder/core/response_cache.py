@@ -0,0 +1,283 @@
+"""
+Response cache for BitNet Virtual Co-worker Builder.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Build a stable cache key from JSON-serializable parts.
+
+    Args:
+        parts: Values the cached response depends on
+
+    Returns:
+        Hex digest identifying the parts
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """
+    Two-tier cache for virtual co-worker answers.
+
+    Entries live in a thread-safe in-memory LRU with a time-to-live and, when a
+    cache directory is given, in one JSON file per entry so they survive
+    restarts and can be shared between worker processes. Disk hits are promoted
+    back into memory.
+
+    Answers sampled with a non-zero temperature are not reproducible, so they
+    are only cached when ``allow_nondeterministic`` is set.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = 3600.0,
+        cache_dir: Optional[str] = None,
+        allow_nondeterministic: bool = False
+    ):
+        """
+        Initialize response cache.
+
+        Args:
+            max_entries: Maximum number of entries kept in memory
+            ttl: Seconds an entry stays valid (None for no expiry)
+            cache_dir: Directory for the persistent tier (optional)
+            allow_nondeterministic: Whether to cache answers sampled with temperature > 0
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.allow_nondeterministic = allow_nondeterministic
+
+        self._entries: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def accepts(self, sampling_params: Dict[str, Any]) -> bool:
+        """
+        Check whether answers generated with the given sampling parameters may be cached.
+
+        Args:
+            sampling_params: Sampling parameters passed to the model
+
+        Returns:
+            True if the answers may be cached, False otherwise
+        """
+        return self.allow_nondeterministic or not sampling_params.get("temperature")
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached answer.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached answer, or None on a miss
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or now < expires_at:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+
+        entry = self._read_disk(key, now)
+
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._insert(key, entry)
+
+        return entry[0]
+
+    def put(self, key: str, value: str) -> None:
+        """
+        Store an answer.
+
+        Args:
+            key: Cache key
+            value: Answer to store
+        """
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            self._insert(key, (value, expires_at))
+
+        self._write_disk(key, value, expires_at)
+
+    def invalidate(self, key: str) -> None:
+        """
+        Remove an entry from both tiers.
+
+        Args:
+            key: Cache key
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+        path = self._path(key)
+        if path and os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not remove cache file {path}: {e}")
+
+    def clear(self) -> None:
+        """
+        Remove all entries from both tiers.
+        """
+        with self._lock:
+            self._entries.clear()
+
+        if not self.cache_dir:
+            return
+
+        for root, _, files in os.walk(self.cache_dir):
+            for filename in files:
+                if filename.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(root, filename))
+                    except OSError as e:
+                        logger.warning(f"Could not remove cache file {filename}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with cache statistics
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "cache_dir": self.cache_dir,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0
+            }
+
+    def _insert(self, key: str, entry: Tuple[str, Optional[float]]) -> None:
+        """
+        Insert an entry into the in-memory tier. The caller must hold the lock.
+
+        Args:
+            key: Cache key
+            entry: Tuple of (answer, expiry time or None)
+        """
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> Optional[str]:
+        """
+        Get the file holding an entry in the persistent tier.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            File path, or None if there is no persistent tier
+        """
+        if not self.cache_dir:
+            return None
+        # Fan out into subdirectories so no single directory grows too large
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[str, Optional[float]]]:
+        """
+        Read an entry from the persistent tier.
+
+        Args:
+            key: Cache key
+            now: Current time
+
+        Returns:
+            Tuple of (answer, expiry time or None), or None if missing or expired
+        """
+        path = self._path(key)
+        if not path or not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read cache file {path}: {e}")
+            return None
+
+        expires_at = data.get("expires_at")
+        if expires_at is not None and now >= expires_at:
+            self.invalidate(key)
+            return None
+
+        return data["value"], expires_at
+
+    def _write_disk(self, key: str, value: str, expires_at: Optional[float]) -> None:
+        """
+        Write an entry to the persistent tier.
+
+        Args:
+            key: Cache key
+            value: Answer to store
+            expires_at: Expiry time or None
+        """
+        path = self._path(key)
+        if not path:
+            return
+
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # Write to a temporary file and rename so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"value": value, "expires_at": expires_at}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write cache file {path}: {e}")
+
+    def __len__(self) -> int:
+        """
+        Get number of entries in the in-memory tier.
+
+        Returns:
+            Number of entries
+        """
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        """
+        Get representation of the cache.
+
+        Returns:
+            Representation
+        """
+        return f"ResponseCache(entries={len(self._entries)}, max_entries={self.max_entries}, ttl={self.ttl}, cache_dir={self.cache_dir!r})"
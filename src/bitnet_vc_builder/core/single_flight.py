@@ -0,0 +1,221 @@
+"""
+Request coalescing for BitNet Virtual Co-worker Builder.
+"""
+
+import logging
+import threading
+from typing import Dict, Any, Callable, Hashable, Optional
+
+from bitnet_vc_builder.core.cancellation import CancelToken, CancelledError
+
+logger = logging.getLogger(__name__)
+
+# Seconds between deadline checks while waiting for a shared call
+_POLL_INTERVAL = 0.05
+
+class _Call:
+    """
+    An execution in flight and the callers waiting for it.
+    """
+
+    def __init__(self, token: Optional[CancelToken]):
+        """
+        Initialize call.
+
+        Args:
+            token: Token passed to the shared execution (None if it cannot be cancelled)
+        """
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.token = token
+        # Callers still interested in the result
+        self.participants = 0
+        # Whether some caller has no deadline
+        self.unbounded = False
+        # Whether every caller gave up, so the execution is being cancelled
+        self.abandoned = False
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single execution.
+
+    The first caller for a key runs the function; callers that arrive with the
+    same key while it is running wait for it and receive the same result, or
+    the same exception. Once the call finishes the key is released, so later
+    calls run again (this is deduplication of concurrent work, not caching).
+
+    When callers pass cancel tokens, the function receives a shared token
+    instead. A caller that is cancelled stops waiting straight away, but the
+    shared execution is only cancelled once every caller has given up, and its
+    deadline is the latest of the callers' deadlines. A waiting caller whose
+    own token is still live does not inherit a cancellation of the shared
+    execution; it runs the function again instead.
+    """
+
+    def __init__(self):
+        """
+        Initialize single-flight group.
+        """
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._executions = 0
+        self._coalesced = 0
+
+    def do(
+        self,
+        key: Hashable,
+        function: Callable[..., Any],
+        *args: Any,
+        cancel_token: Optional[CancelToken] = None,
+        **kwargs: Any
+    ) -> Any:
+        """
+        Run a function, or wait for an identical call that is already running.
+
+        Args:
+            key: Identity of the call
+            function: Function to run
+            args: Positional arguments for the function
+            cancel_token: Caller's cancel token; when given, the function is
+                called with a shared ``cancel_token`` keyword argument
+            kwargs: Keyword arguments for the function
+
+        Returns:
+            Result of the function
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                # A call whose callers all gave up is winding down; start afresh
+                if call is not None and (call.abandoned or (call.token is not None and call.token.cancelled)):
+                    call = None
+
+                if call is not None:
+                    self._coalesced += 1
+                    leader = False
+                else:
+                    call = _Call(CancelToken() if cancel_token is not None else None)
+                    self._calls[key] = call
+                    self._executions += 1
+                    leader = True
+
+                leave = self._join(call, cancel_token)
+
+            try:
+                if not leader:
+                    logger.debug(f"Joining in-flight call {key!r}")
+                    try:
+                        return self._wait(call, cancel_token, leave)
+                    except CancelledError:
+                        if cancel_token is not None and cancel_token.cancelled:
+                            raise
+                    # The shared execution was cancelled under a caller that is still waiting
+                    logger.debug(f"In-flight call {key!r} was cancelled; running it again")
+                    continue
+
+                try:
+                    if call.token is not None:
+                        kwargs["cancel_token"] = call.token
+                    call.result = function(*args, **kwargs)
+                except BaseException as e:
+                    call.error = e
+                    raise
+                finally:
+                    with self._lock:
+                        if self._calls.get(key) is call:
+                            del self._calls[key]
+                    call.done.set()
+
+                return call.result
+            finally:
+                if cancel_token is not None:
+                    cancel_token.remove_callback(leave)
+
+    def _join(self, call: _Call, cancel_token: Optional[CancelToken]) -> Callable[[], None]:
+        """
+        Register a caller with a call. The caller must hold the lock.
+
+        Args:
+            call: Call to join
+            cancel_token: Caller's cancel token
+
+        Returns:
+            Function that withdraws the caller (safe to call more than once)
+        """
+        call.participants += 1
+
+        if call.token is not None:
+            # The shared execution may run as long as any caller is willing to wait
+            deadline = cancel_token.deadline if cancel_token is not None else None
+            if deadline is None:
+                call.unbounded = True
+                call.token.deadline = None
+            elif not call.unbounded:
+                call.token.deadline = deadline if call.participants == 1 else max(call.token.deadline, deadline)
+
+        left = []
+
+        def leave() -> None:
+            with self._lock:
+                if left:
+                    return
+                left.append(True)
+                call.participants -= 1
+                abandoned = call.participants == 0 and not call.done.is_set() and call.token is not None
+                # Callers arriving from now on start a new execution
+                call.abandoned = call.abandoned or abandoned
+            if abandoned:
+                call.token.cancel(cancel_token.reason or "All callers cancelled")
+
+        if cancel_token is not None:
+            cancel_token.add_callback(leave)
+        return leave
+
+    def _wait(self, call: _Call, cancel_token: Optional[CancelToken], leave: Callable[[], None]) -> Any:
+        """
+        Wait for a shared call to finish.
+
+        Args:
+            call: Call to wait for
+            cancel_token: Caller's cancel token
+            leave: Function that withdraws the caller
+
+        Returns:
+            Result of the call
+        """
+        if cancel_token is None:
+            call.done.wait()
+        else:
+            while not call.done.wait(_POLL_INTERVAL):
+                if cancel_token.cancelled:
+                    leave()
+                    cancel_token.raise_if_cancelled()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self) -> int:
+        """
+        Get number of calls currently running.
+
+        Returns:
+            Number of distinct keys in flight
+        """
+        with self._lock:
+            return len(self._calls)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get coalescing statistics.
+
+        Returns:
+            Dictionary with the number of executions, coalesced calls and calls in flight
+        """
+        with self._lock:
+            return {
+                "executions": self._executions,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._calls)
+            }
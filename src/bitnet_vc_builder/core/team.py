@@ -5,16 +5,55 @@ Multi-virtual co-worker collaboration system for BitNet Virtual Co-worker Builde
 import os
 import json
 import time
+import weakref
 import logging
 import threading
+import contextvars
 from typing import List, Dict, Any, Optional, Union, Callable, Set
 from enum import Enum
 from collections import deque
 
 from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker
+from bitnet_vc_builder.core.cancellation import CancelToken, CancelledError, check_cancelled
+from bitnet_vc_builder.core.metrics import QuantileSketch
+from bitnet_vc_builder.core.timing import Span, span
+from bitnet_vc_builder.core.recording import get_recorder
 
 logger = logging.getLogger(__name__)
 
+def plan_schema_for(agent_names: List[str], with_dependencies: bool = False) -> Dict[str, Any]:
+    """
+    Build the JSON schema for a coordinator's plan.
+    
+    Args:
+        agent_names: Names of the virtual co-workers subtasks can be assigned to
+        with_dependencies: Whether steps carry a "depends_on" list of step indices
+        
+    Returns:
+        JSON schema for the plan
+    """
+    properties = {
+        "subtask": {"type": "string"},
+        "agent_name": {"type": "string"}
+    }
+    if agent_names:
+        properties["agent_name"]["enum"] = list(agent_names)
+    required = ["subtask", "agent_name"]
+    
+    if with_dependencies:
+        properties["depends_on"] = {"type": "array", "items": {"type": "integer"}}
+        required.append("depends_on")
+    
+    return {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": properties,
+            "required": required,
+            "additionalProperties": False
+        }
+    }
+
 class CollaborationMode(Enum):
     """
     Collaboration modes for BitNet teams.
@@ -68,6 +107,242 @@ class Task:
         self.completed_at = None
         self.error = None
 
+def count_usage(agent_span: Span) -> Dict[str, int]:
+    """
+    Count the tokens generated and tools called under a span.
+
+    Args:
+        agent_span: Finished span of a virtual co-worker run
+
+    Returns:
+        Dictionary with "tokens" and "tool_calls" (zero while timing is disabled)
+    """
+    usage = {"tokens": 0, "tool_calls": 0}
+    pending = list(agent_span.children)
+    while pending:
+        child = pending.pop()
+        if child.name == "generate":
+            usage["tokens"] += child.attributes.get("tokens", 0)
+        elif child.name == "tool":
+            usage["tool_calls"] += 1
+        pending.extend(child.children)
+    return usage
+
+class _BufferHolder:
+    """
+    Holds a thread's records in thread-local storage; freed when the thread exits.
+    """
+
+    __slots__ = ("buffer", "__weakref__")
+
+    def __init__(self, buffer: Dict[str, Dict[str, Any]]):
+        """
+        Initialize holder.
+
+        Args:
+            buffer: The thread's records by virtual co-worker name
+        """
+        self.buffer = buffer
+
+class PerformanceTracker:
+    """
+    Per virtual co-worker run counts, latency quantiles and usage.
+
+    Every thread records into its own buffer without locking; reading merges
+    the buffers of all threads. When a thread exits, its buffer is merged into
+    a base buffer. Latencies go into quantile sketches, so tail latencies (p95,
+    p99) are reported alongside the mean.
+    """
+
+    QUANTILES = {"p50": 0.5, "p95": 0.95, "p99": 0.99}
+
+    def __init__(self, agent_names: Optional[List[str]] = None, relative_accuracy: float = 0.01):
+        """
+        Initialize tracker.
+
+        Args:
+            agent_names: Names of the virtual co-workers to track
+            relative_accuracy: Relative error of latency quantiles
+        """
+        self.relative_accuracy = relative_accuracy
+        self._agents: Set[str] = set(agent_names or [])
+        self._local = threading.local()
+        # Records of exited threads, then the buffers of live threads by id
+        self._base: Dict[str, Dict[str, Any]] = {}
+        self._buffers: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def add_agent(self, agent_name: str) -> None:
+        """
+        Start tracking a virtual co-worker, resetting any earlier records.
+
+        Args:
+            agent_name: Name of the virtual co-worker
+        """
+        with self._lock:
+            self._agents.add(agent_name)
+            for buffer in [self._base, *self._buffers.values()]:
+                buffer.pop(agent_name, None)
+
+    def remove_agent(self, agent_name: str) -> None:
+        """
+        Stop tracking a virtual co-worker.
+
+        Args:
+            agent_name: Name of the virtual co-worker
+        """
+        with self._lock:
+            self._agents.discard(agent_name)
+            for buffer in [self._base, *self._buffers.values()]:
+                buffer.pop(agent_name, None)
+
+    def _entry(self, agent_name: str) -> Dict[str, Any]:
+        """
+        Get the calling thread's record for a virtual co-worker.
+
+        Args:
+            agent_name: Name of the virtual co-worker
+
+        Returns:
+            Record owned by the calling thread
+        """
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            holder = _BufferHolder({})
+            with self._lock:
+                self._buffers[id(holder.buffer)] = holder.buffer
+            # The thread-local holder is freed when the thread exits
+            weakref.finalize(holder, PerformanceTracker._retire, weakref.ref(self), holder.buffer)
+            self._local.holder = holder
+        entry = holder.buffer.get(agent_name)
+        if entry is None:
+            entry = holder.buffer[agent_name] = self._new_entry()
+        return entry
+
+    def _new_entry(self) -> Dict[str, Any]:
+        """
+        Create an empty record.
+
+        Returns:
+            Record with zero counts and an empty latency sketch
+        """
+        return {
+            "tasks_completed": 0,
+            "tasks_failed": 0,
+            "time": QuantileSketch(self.relative_accuracy),
+            "tokens": 0,
+            "tool_calls": 0
+        }
+
+    @staticmethod
+    def _retire(reference: "weakref.ref[PerformanceTracker]", buffer: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Merge the buffer of an exited thread into the base buffer.
+
+        Args:
+            reference: Weak reference to the tracker
+            buffer: The exited thread's records
+        """
+        tracker = reference()
+        if tracker is None:
+            return
+        with tracker._lock:
+            del tracker._buffers[id(buffer)]
+            for agent_name, entry in buffer.items():
+                base = tracker._base.get(agent_name)
+                if base is None:
+                    base = tracker._base[agent_name] = tracker._new_entry()
+                for key in ("tasks_completed", "tasks_failed", "tokens", "tool_calls"):
+                    base[key] += entry[key]
+                base["time"].merge(entry["time"])
+
+    def record_completed(self, agent_name: str, execution_time: float, tokens: int = 0, tool_calls: int = 0) -> None:
+        """
+        Record a finished run.
+
+        Args:
+            agent_name: Name of the virtual co-worker
+            execution_time: Seconds the run took
+            tokens: Tokens generated during the run
+            tool_calls: Tools called during the run
+        """
+        entry = self._entry(agent_name)
+        entry["tasks_completed"] += 1
+        entry["time"].add(execution_time)
+        entry["tokens"] += tokens
+        entry["tool_calls"] += tool_calls
+
+    def record_failed(self, agent_name: str) -> None:
+        """
+        Record a failed run.
+
+        Args:
+            agent_name: Name of the virtual co-worker
+        """
+        self._entry(agent_name)["tasks_failed"] += 1
+
+    def _merge(self, agent_name: str) -> Dict[str, Any]:
+        """
+        Combine every thread's record for a virtual co-worker.
+
+        Must be called with the lock held.
+
+        Args:
+            agent_name: Name of the virtual co-worker
+
+        Returns:
+            Performance metrics
+        """
+        completed = failed = tokens = tool_calls = 0
+        sketch = QuantileSketch(self.relative_accuracy)
+        for buffer in [self._base, *self._buffers.values()]:
+            entry = buffer.get(agent_name)
+            if entry is None:
+                continue
+            completed += entry["tasks_completed"]
+            failed += entry["tasks_failed"]
+            tokens += entry["tokens"]
+            tool_calls += entry["tool_calls"]
+            sketch.merge(entry["time"])
+
+        metrics = {
+            "tasks_completed": completed,
+            "tasks_failed": failed,
+            "success_rate": completed / (completed + failed) if completed + failed else 0.0,
+            "avg_time": sketch.mean,
+            "max_time": sketch.max if sketch.count else 0.0,
+            "tokens": tokens,
+            "tool_calls": tool_calls
+        }
+        for name, q in self.QUANTILES.items():
+            metrics[f"{name}_time"] = sketch.quantile(q) or 0.0
+        return metrics
+
+    def get(self, agent_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the performance metrics of a virtual co-worker.
+
+        Args:
+            agent_name: Name of the virtual co-worker
+
+        Returns:
+            Performance metrics, or None if the virtual co-worker is not tracked
+        """
+        with self._lock:
+            if agent_name not in self._agents:
+                return None
+            return self._merge(agent_name)
+
+    def get_all(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the performance metrics of every tracked virtual co-worker.
+
+        Returns:
+            Dictionary mapping virtual co-worker names to performance metrics
+        """
+        with self._lock:
+            return {agent_name: self._merge(agent_name) for agent_name in self._agents}
+
 class BitNetTeam:
     """
     Manage multiple BitNet virtual co-workers working together.
@@ -121,18 +396,10 @@ class BitNetTeam:
         self.next_task_id = 1
         
         # Performance tracking
-        self.agent_performance = {
-            agent.name: {
-                "tasks_completed": 0,
-                "tasks_failed": 0,
-                "avg_time": 0.0
-            }
-            for agent in self.agents
-        }
+        self.performance = PerformanceTracker([agent.name for agent in self.agents])
         
         # Locks for thread safety
         self._task_lock = threading.Lock()
-        self._performance_lock = threading.Lock()
     
     def add_agent(self, agent: BitNetVirtualCoworker) -> None:
         """
@@ -149,12 +416,7 @@ class BitNetTeam:
         
         # Initialize performance tracking for the new virtual co-worker
         if self.enable_performance_tracking:
-            with self._performance_lock:
-                self.agent_performance[agent.name] = {
-                    "tasks_completed": 0,
-                    "tasks_failed": 0,
-                    "avg_time": 0.0
-                }
+            self.performance.add_agent(agent.name)
     
     def remove_agent(self, agent_name: str) -> bool:
         """
@@ -176,9 +438,7 @@ class BitNetTeam:
         
         # Remove performance tracking for the virtual co-worker
         if self.enable_performance_tracking:
-            with self._performance_lock:
-                if agent_name in self.agent_performance:
-                    del self.agent_performance[agent_name]
+            self.performance.remove_agent(agent_name)
         
         return True
     
@@ -255,16 +515,20 @@ class BitNetTeam:
         """
         return self.tasks.get(task_id)
     
-    def run(self, task: str, coordinator_agent_name: Optional[str] = None) -> str:
+    def run(self, task: str, coordinator_agent_name: Optional[str] = None, cancel_token: Optional[CancelToken] = None) -> str:
         """
         Run team on a task.
 
         Args:
             task: Task description
             coordinator_agent_name: Name of the virtual co-worker to coordinate the task
+            cancel_token: Token for abandoning the run (optional)
 
         Returns:
             Team's response
+
+        Raises:
+            CancelledError: If the token is cancelled or its deadline passes
         """
         logger.info(f"Running team {self.name} on task: {task}")
 
@@ -278,19 +542,32 @@ class BitNetTeam:
             # Otherwise, use the first virtual co-worker as coordinator
             coordinator = self.agents[0]
 
-        # Different collaboration modes
-        if self.collaboration_mode == CollaborationMode.SEQUENTIAL:
-            return self._run_sequential(task, coordinator)
-        elif self.collaboration_mode == CollaborationMode.PARALLEL:
-            return self._run_parallel(task, coordinator)
-        elif self.collaboration_mode == CollaborationMode.HIERARCHICAL:
-            return self._run_hierarchical(task, coordinator)
-        elif self.collaboration_mode == CollaborationMode.CONSENSUS:
-            return self._run_consensus(task, coordinator)
-        else:
-            return self._run_sequential(task, coordinator)
+        check_cancelled(cancel_token)
+
+        recorder = get_recorder()
+        if recorder is not None:
+            recorder.record_task(self.name, task)
+
+        with span("team", team=self.name, mode=self.collaboration_mode.name, agents=len(self.agents)):
+            # Different collaboration modes
+            if self.collaboration_mode == CollaborationMode.SEQUENTIAL:
+                return self._run_sequential(task, coordinator, cancel_token)
+            elif self.collaboration_mode == CollaborationMode.PARALLEL:
+                return self._run_parallel(task, coordinator, cancel_token)
+            elif self.collaboration_mode == CollaborationMode.HIERARCHICAL:
+                return self._run_hierarchical(task, coordinator, cancel_token)
+            elif self.collaboration_mode == CollaborationMode.CONSENSUS:
+                return self._run_consensus(task, coordinator, cancel_token)
+            else:
+                return self._run_sequential(task, coordinator, cancel_token)
     
-    def run_async(self, task: str, coordinator_agent_name: Optional[str] = None, callback: Optional[Callable[[str], None]] = None) -> str:
+    def run_async(
+        self,
+        task: str,
+        coordinator_agent_name: Optional[str] = None,
+        callback: Optional[Callable[[str], None]] = None,
+        cancel_token: Optional[CancelToken] = None
+    ) -> str:
         """
         Run team on a task asynchronously.
 
@@ -298,6 +575,7 @@ class BitNetTeam:
             task: Task description
             coordinator_agent_name: Name of the virtual co-worker to coordinate the task
             callback: Callback function to call with the result
+            cancel_token: Token for abandoning the run (optional)
 
         Returns:
             Task ID
@@ -313,12 +591,17 @@ class BitNetTeam:
 
         # Start a thread to run the task
         def run_task_thread():
-            result = self.run(task, coordinator_agent_name)
+            status = TaskStatus.COMPLETED
+            try:
+                result = self.run(task, coordinator_agent_name, cancel_token)
+            except CancelledError as e:
+                status = TaskStatus.FAILED
+                result = f"Cancelled: {str(e)}"
             
             # Update task
             with self._task_lock:
                 task_obj = self.tasks[task_id]
-                task_obj.status = TaskStatus.COMPLETED
+                task_obj.status = status
                 task_obj.result = result
                 task_obj.completed_at = time.time()
                 self.completed_tasks.add(task_id)
@@ -333,13 +616,52 @@ class BitNetTeam:
         
         return task_id
     
-    def _run_sequential(self, task: str, coordinator: BitNetVirtualCoworker) -> str:
+    def _run_agent(
+        self,
+        agent: BitNetVirtualCoworker,
+        task: str,
+        cancel_token: Optional[CancelToken] = None,
+        step: Optional[int] = None
+    ) -> str:
+        """
+        Run a virtual co-worker and record its performance.
+        
+        Args:
+            agent: Virtual co-worker to run
+            task: Task description
+            cancel_token: Token for abandoning the run (optional)
+            step: Index of the plan step being run (optional, for tracing)
+            
+        Returns:
+            Virtual co-worker's response
+            
+        Raises:
+            CancelledError: If the token is cancelled (not recorded as a failure)
+            Exception: Whatever the run raises (recorded as a failure)
+        """
+        start_time = time.perf_counter()
+        try:
+            with span("agent", agent=agent.name, **({"step": step} if step is not None else {})) as agent_span:
+                result = agent.run(task, cancel_token=cancel_token)
+        except CancelledError:
+            raise
+        except Exception:
+            if self.enable_performance_tracking:
+                self.performance.record_failed(agent.name)
+            raise
+        
+        if self.enable_performance_tracking:
+            self.performance.record_completed(agent.name, time.perf_counter() - start_time, **count_usage(agent_span))
+        return result
+    
+    def _run_sequential(self, task: str, coordinator: BitNetVirtualCoworker, cancel_token: Optional[CancelToken] = None) -> str:
         """
         Run virtual co-workers sequentially on a task.
         
         Args:
             task: Task description
             coordinator: Coordinator virtual co-worker
+            cancel_token: Token for abandoning the run (optional)
             
         Returns:
             Team's response
@@ -347,13 +669,7 @@ class BitNetTeam:
         logger.info(f"Running team {self.name} in sequential mode")
         
         # Start with the coordinator's response
-        current_result = coordinator.run(task)
-        
-        # Track performance if enabled
-        if self.enable_performance_tracking:
-            with self._performance_lock:
-                perf = self.agent_performance[coordinator.name]
-                perf["tasks_completed"] += 1
+        current_result = self._run_agent(coordinator, task, cancel_token)
         
         # Pass the result to each virtual co-worker in sequence
         for agent in self.agents:
@@ -365,36 +681,23 @@ class BitNetTeam:
             agent_task = f"Task: {task}\n\nPrevious work: {current_result}\n\nContinue the work."
             
             # Run the virtual co-worker
-            start_time = time.time()
             try:
-                agent_result = agent.run(agent_task)
-                current_result = agent_result
-                
-                # Track performance if enabled
-                if self.enable_performance_tracking:
-                    with self._performance_lock:
-                        perf = self.agent_performance[agent.name]
-                        perf["tasks_completed"] += 1
-                        execution_time = time.time() - start_time
-                        perf["avg_time"] = ((perf["avg_time"] * (perf["tasks_completed"] - 1)) + execution_time) / perf["tasks_completed"]
+                current_result = self._run_agent(agent, agent_task, cancel_token)
+            except CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error running virtual co-worker {agent.name}: {e}")
-                
-                # Track performance if enabled
-                if self.enable_performance_tracking:
-                    with self._performance_lock:
-                        perf = self.agent_performance[agent.name]
-                        perf["tasks_failed"] += 1
         
         return current_result
     
-    def _run_parallel(self, task: str, coordinator: BitNetVirtualCoworker) -> str:
+    def _run_parallel(self, task: str, coordinator: BitNetVirtualCoworker, cancel_token: Optional[CancelToken] = None) -> str:
         """
         Run virtual co-workers in parallel on a task.
         
         Args:
             task: Task description
             coordinator: Coordinator virtual co-worker
+            cancel_token: Token for abandoning the run (optional)
             
         Returns:
             Team's response
@@ -430,7 +733,13 @@ class BitNetTeam:
         If a subtask doesn't depend on any other subtasks, use an empty list.
         """
         
-        plan_result = coordinator.run(plan_prompt)
+        # Only a backend that decodes under the schema can be held to it; the
+        # JSON extraction below handles the other backends' answers
+        plan_schema = None
+        if coordinator.supports_grammar:
+            plan_schema = plan_schema_for([agent.name for agent in self.agents], with_dependencies=True)
+        with span("plan", agent=coordinator.name):
+            plan_result = coordinator.run(plan_prompt, output_schema=plan_schema, cancel_token=cancel_token)
         
         # Extract the plan from the result
         try:
@@ -483,51 +792,41 @@ class BitNetTeam:
             """
             
             # Run the virtual co-worker
-            start_time = time.time()
             try:
-                agent_result = agent.run(agent_task)
+                agent_result = self._run_agent(agent, agent_task, cancel_token, step=step_idx)
                 
                 with results_lock:
                     results[step_idx] = agent_result
-                
-                # Update performance metrics if enabled
-                if self.enable_performance_tracking:
-                    end_time = time.time()
-                    execution_time = end_time - start_time
-
-                    # Update virtual co-worker performance
-                    with results_lock:
-                        perf = self.agent_performance[agent_name]
-                        perf["tasks_completed"] += 1
-                        perf["avg_time"] = ((perf["avg_time"] * (perf["tasks_completed"] - 1)) + execution_time) / perf["tasks_completed"]
-
+            except CancelledError as e:
+                # The waiting loop below raises once it sees the cancellation
+                with results_lock:
+                    results[step_idx] = f"Cancelled: {str(e)}"
             except Exception as e:
                 logger.error(f"Error running virtual co-worker {agent_name}: {e}")
                 with results_lock:
                     results[step_idx] = f"Error: {str(e)}"
-                
-                # Update performance metrics if enabled
-                if self.enable_performance_tracking:
-                    with results_lock:
-                        perf = self.agent_performance[agent_name]
-                        perf["tasks_failed"] += 1
         
-        # Create threads for steps with no dependencies
+        # Create threads for steps with no dependencies; each runs in a copy of
+        # this context, so its spans nest under the team's span
         for i, step in enumerate(plan):
             if not step["depends_on"]:
-                threads[i] = threading.Thread(target=execute_step, args=(i, step))
+                threads[i] = threading.Thread(target=contextvars.copy_context().run, args=(execute_step, i, step))
                 threads[i].start()
         
         # Wait for all threads to complete
         while len(results) < len(plan):
+            check_cancelled(cancel_token)
+            
             # Check if we can start any new threads
             for i, step in enumerate(plan):
                 if i not in threads and all(dep_idx in results for dep_idx in step["depends_on"]):
-                    threads[i] = threading.Thread(target=execute_step, args=(i, step))
+                    threads[i] = threading.Thread(target=contextvars.copy_context().run, args=(execute_step, i, step))
                     threads[i].start()
             
             time.sleep(0.1)
         
+        check_cancelled(cancel_token)
+        
         # Compile the final result
         final_result = "Task Execution Results:\n\n"
         for i, step in enumerate(plan):
@@ -535,13 +834,14 @@ class BitNetTeam:
         
         return final_result
     
-    def _run_hierarchical(self, task: str, coordinator: BitNetVirtualCoworker) -> str:
+    def _run_hierarchical(self, task: str, coordinator: BitNetVirtualCoworker, cancel_token: Optional[CancelToken] = None) -> str:
         """
         Run virtual co-workers in a hierarchical structure on a task.
         
         Args:
             task: Task description
             coordinator: Coordinator virtual co-worker
+            cancel_token: Token for abandoning the run (optional)
             
         Returns:
             Team's response
@@ -572,7 +872,12 @@ class BitNetTeam:
         ]
         """
         
-        plan_result = coordinator.run(plan_prompt)
+        # Only a backend that decodes under the schema can be held to it
+        plan_schema = None
+        if coordinator.supports_grammar:
+            plan_schema = plan_schema_for([agent.name for agent in self.agents if agent != coordinator], with_dependencies=False)
+        with span("plan", agent=coordinator.name):
+            plan_result = coordinator.run(plan_prompt, output_schema=plan_schema, cancel_token=cancel_token)
         
         # Extract the plan from the result
         try:
@@ -605,29 +910,13 @@ class BitNetTeam:
             agent = self._agent_map[agent_name]
             
             # Run the virtual co-worker
-            start_time = time.time()
             try:
-                agent_result = agent.run(subtask)
-                subtask_results.append(agent_result)
-                
-                # Update performance metrics if enabled
-                if self.enable_performance_tracking:
-                    end_time = time.time()
-                    execution_time = end_time - start_time
-                    
-                    with self._performance_lock:
-                        perf = self.agent_performance[agent_name]
-                        perf["tasks_completed"] += 1
-                        perf["avg_time"] = ((perf["avg_time"] * (perf["tasks_completed"] - 1)) + execution_time) / perf["tasks_completed"]
+                subtask_results.append(self._run_agent(agent, subtask, cancel_token, step=len(subtask_results)))
+            except CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error running virtual co-worker {agent_name}: {e}")
                 subtask_results.append(f"Error: {str(e)}")
-                
-                # Update performance metrics if enabled
-                if self.enable_performance_tracking:
-                    with self._performance_lock:
-                        perf = self.agent_performance[agent_name]
-                        perf["tasks_failed"] += 1
         
         # Coordinator synthesizes the final result
         synthesis_prompt = f"""
@@ -644,23 +933,18 @@ class BitNetTeam:
         Please synthesize these results into a final response that addresses the original task.
         """
         
-        final_result = coordinator.run(synthesis_prompt)
-        
-        # Update performance metrics for coordinator if enabled
-        if self.enable_performance_tracking:
-            with self._performance_lock:
-                perf = self.agent_performance[coordinator.name]
-                perf["tasks_completed"] += 1
+        final_result = self._run_agent(coordinator, synthesis_prompt, cancel_token)
         
         return final_result
     
-    def _run_consensus(self, task: str, coordinator: BitNetVirtualCoworker) -> str:
+    def _run_consensus(self, task: str, coordinator: BitNetVirtualCoworker, cancel_token: Optional[CancelToken] = None) -> str:
         """
         Run virtual co-workers to reach a consensus on a task.
         
         Args:
             task: Task description
             coordinator: Coordinator virtual co-worker
+            cancel_token: Token for abandoning the run (optional)
             
         Returns:
             Team's response
@@ -672,29 +956,13 @@ class BitNetTeam:
         
         for agent in self.agents:
             # Run the virtual co-worker
-            start_time = time.time()
             try:
-                agent_result = agent.run(task)
-                agent_results[agent.name] = agent_result
-                
-                # Update performance metrics if enabled
-                if self.enable_performance_tracking:
-                    end_time = time.time()
-                    execution_time = end_time - start_time
-                    
-                    with self._performance_lock:
-                        perf = self.agent_performance[agent.name]
-                        perf["tasks_completed"] += 1
-                        perf["avg_time"] = ((perf["avg_time"] * (perf["tasks_completed"] - 1)) + execution_time) / perf["tasks_completed"]
+                agent_results[agent.name] = self._run_agent(agent, task, cancel_token)
+            except CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error running virtual co-worker {agent.name}: {e}")
                 agent_results[agent.name] = f"Error: {str(e)}"
-                
-                # Update performance metrics if enabled
-                if self.enable_performance_tracking:
-                    with self._performance_lock:
-                        perf = self.agent_performance[agent.name]
-                        perf["tasks_failed"] += 1
         
         # Coordinator synthesizes the consensus
         consensus_prompt = f"""
@@ -708,7 +976,7 @@ class BitNetTeam:
         Highlight areas of agreement and address any disagreements.
         """
         
-        consensus_result = coordinator.run(consensus_prompt)
+        consensus_result = coordinator.run(consensus_prompt, cancel_token=cancel_token)
         
         return consensus_result
     
@@ -717,13 +985,15 @@ class BitNetTeam:
         Get performance metrics for all virtual co-workers.
         
         Returns:
-            Dictionary of virtual co-worker performance metrics
+            Dictionary mapping virtual co-worker names to their run counts
+            ("tasks_completed", "tasks_failed", "success_rate"), run time statistics in seconds
+            ("avg_time", "p50_time", "p95_time", "p99_time", "max_time") and
+            usage ("tokens", "tool_calls"; counted while timing is enabled)
         """
         if not self.enable_performance_tracking:
             return {}
         
-        with self._performance_lock:
-            return self.agent_performance.copy()
+        return self.performance.get_all()
     
     def get_agent_performance(self, agent_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -738,5 +1008,4 @@ class BitNetTeam:
         if not self.enable_performance_tracking:
             return None
         
-        with self._performance_lock:
-            return self.agent_performance.get(agent_name)
+        return self.performance.get(agent_name)
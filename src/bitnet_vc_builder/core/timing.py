@@ -0,0 +1,339 @@
+"""
+Per-phase timing for BitNet Virtual Co-worker Builder.
+
+Code marks the phases of a task with ``span``:
+
+    with span("tool", tool=tool_name):
+        result = tool(tool_input)
+
+Spans nest through a context variable, so a ``prefill`` span opened inside
+``BitNetModel.generate`` becomes a child of its ``generate`` span, which in
+turn is a child of the co-worker's ``think`` span. Finished spans are handed
+to the installed collector.
+
+With no collector installed (the default) ``span`` returns a shared no-op
+object, so instrumented code pays one global lookup per phase.
+
+Phases recorded by the package:
+
+- ``team``: one team task, with ``team`` and ``mode``
+- ``plan``: the coordinator planning a PARALLEL or HIERARCHICAL task
+- ``agent``: one co-worker run within a team task
+- ``run``: one co-worker task
+- ``memory``: reading and writing co-worker memory
+- ``iteration``: one pass of the co-worker's reasoning loop
+- ``think``: one reasoning step, containing ``prompt`` (prompt assembly) and ``generate``
+- ``generate``: one model call, with ``tokens``, ``ttft`` (seconds to the
+  first token) and ``tokens_per_second``; the NumPy backend adds
+  ``tokenize``, ``prefill`` and ``decode`` children
+- ``parse``: parsing the model's response
+- ``tool``: one tool call
+"""
+
+import time
+import logging
+import threading
+import contextvars
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class Span:
+    """
+    Timed phase of work.
+    """
+
+    __slots__ = ("name", "attributes", "parent", "children", "start", "end", "thread", "_token")
+
+    # Real spans are recorded; the no-op span returned when disabled is not
+    enabled = True
+
+    def __init__(self, name: str, attributes: Dict[str, Any], parent: Optional["Span"] = None):
+        """
+        Initialize span.
+
+        Args:
+            name: Phase name
+            attributes: Details of the phase, such as a tool name or token count
+            parent: Enclosing span (optional)
+        """
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.children: List["Span"] = []
+        self.start = 0.0
+        self.end: Optional[float] = None
+        self.thread = 0
+        self._token = None
+
+    @property
+    def duration(self) -> float:
+        """
+        Seconds the span took (or has taken so far).
+        """
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def set(self, **attributes: Any) -> None:
+        """
+        Add details to the span.
+
+        Args:
+            attributes: Details to add
+        """
+        self.attributes.update(attributes)
+
+    def child(self, name: str) -> Optional["Span"]:
+        """
+        Get the first finished child with a name.
+
+        Args:
+            name: Phase name
+
+        Returns:
+            Child span, or None if there is none
+        """
+        for child in self.children:
+            if child.name == name and child.end is not None:
+                return child
+        return None
+
+    def __enter__(self) -> "Span":
+        """
+        Start the span.
+
+        Returns:
+            The span
+        """
+        self._token = _current_span.set(self)
+        self.thread = threading.get_ident()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """
+        Finish the span and hand it to the collector.
+        """
+        self.end = time.perf_counter()
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        if self.parent is not None:
+            self.parent.children.append(self)
+
+        collector = _collector
+        if collector is not None:
+            try:
+                collector.record(self)
+            except Exception as e:
+                logger.warning(f"Timing collector failed: {e}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the span and its children to a dictionary.
+
+        Returns:
+            Dictionary with name, duration, attributes and children
+        """
+        return {
+            "name": self.name,
+            "duration": self.duration,
+            "attributes": dict(self.attributes),
+            "children": [child.to_dict() for child in self.children]
+        }
+
+class _NullSpan:
+    """
+    Span that records nothing, used while timing is disabled.
+    """
+
+    enabled = False
+    attributes: Dict[str, Any] = {}
+    children: List[Span] = []
+    duration = 0.0
+
+    def set(self, **attributes: Any) -> None:
+        """
+        Ignore details.
+        """
+
+    def child(self, name: str) -> None:
+        """
+        Get no child.
+        """
+        return None
+
+    def __enter__(self) -> "_NullSpan":
+        """
+        Do nothing.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """
+        Do nothing.
+        """
+
+NULL_SPAN = _NullSpan()
+
+class TimingCollector:
+    """
+    Receiver of finished spans.
+    """
+
+    def record(self, span: Span) -> None:
+        """
+        Record a finished span.
+
+        Called for every span, children before their parents.
+
+        Args:
+            span: Finished span
+        """
+        raise NotImplementedError
+
+class CompositeCollector(TimingCollector):
+    """
+    Hands each span to several collectors.
+    """
+
+    def __init__(self, collectors: List[TimingCollector]):
+        """
+        Initialize collector.
+
+        Args:
+            collectors: Collectors to hand spans to, in order
+        """
+        self.collectors = list(collectors)
+
+    def record(self, span: Span) -> None:
+        """
+        Record a finished span with every collector.
+
+        A failing collector does not keep the span from the others.
+
+        Args:
+            span: Finished span
+        """
+        for collector in self.collectors:
+            try:
+                collector.record(span)
+            except Exception as e:
+                logger.warning(f"Timing collector failed: {e}")
+
+class InMemoryCollector(TimingCollector):
+    """
+    Aggregates span durations and numeric attributes per phase.
+    """
+
+    def __init__(self, keep_roots: int = 100):
+        """
+        Initialize collector.
+
+        Args:
+            keep_roots: Number of most recent top-level spans to keep for inspection
+        """
+        self.keep_roots = keep_roots
+        self.roots: List[Span] = []
+        self._phases: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, span: Span) -> None:
+        """
+        Record a finished span.
+
+        Args:
+            span: Finished span
+        """
+        duration = span.duration
+        with self._lock:
+            phase = self._phases.get(span.name)
+            if phase is None:
+                phase = self._phases[span.name] = {"count": 0, "total": 0.0, "max": 0.0, "attributes": {}}
+            phase["count"] += 1
+            phase["total"] += duration
+            phase["max"] = max(phase["max"], duration)
+            for key, value in span.attributes.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    phase["attributes"][key] = phase["attributes"].get(key, 0.0) + value
+
+            if span.parent is None:
+                self.roots.append(span)
+                del self.roots[:-self.keep_roots]
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-phase statistics.
+
+        Returns:
+            Dictionary mapping phase names to count, total, mean and max seconds,
+            plus the mean of each numeric attribute (such as ``ttft`` or
+            ``tokens_per_second``)
+        """
+        with self._lock:
+            stats = {}
+            for name, phase in self._phases.items():
+                count = phase["count"]
+                stats[name] = {
+                    "count": count,
+                    "total": phase["total"],
+                    "mean": phase["total"] / count,
+                    "max": phase["max"],
+                    **{f"mean_{key}": total / count for key, total in phase["attributes"].items()}
+                }
+            return stats
+
+    def reset(self) -> None:
+        """
+        Forget everything recorded so far.
+        """
+        with self._lock:
+            self._phases.clear()
+            self.roots.clear()
+
+_current_span: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("bitnet_vc_builder_span", default=None)
+_collector: Optional[TimingCollector] = None
+
+def set_collector(collector: Optional[TimingCollector]) -> None:
+    """
+    Install the collector that receives finished spans.
+
+    Args:
+        collector: Collector, or None to disable timing
+    """
+    global _collector
+    _collector = collector
+
+def get_collector() -> Optional[TimingCollector]:
+    """
+    Get the installed collector.
+
+    Returns:
+        Collector, or None if timing is disabled
+    """
+    return _collector
+
+def span(name: str, **attributes: Any):
+    """
+    Time a phase of work.
+
+    Args:
+        name: Phase name
+        attributes: Details of the phase
+
+    Returns:
+        Context manager yielding the span (a no-op span while timing is disabled)
+    """
+    if _collector is None:
+        return NULL_SPAN
+    return Span(name, attributes, _current_span.get())
+
+def current_span():
+    """
+    Get the innermost open span.
+
+    Returns:
+        Span, or the no-op span if there is none or timing is disabled
+    """
+    if _collector is None:
+        return NULL_SPAN
+    return _current_span.get() or NULL_SPAN
@@ -0,0 +1,414 @@
+"""
+Execution traces for BitNet Virtual Co-worker Builder.
+
+``TraceWriter`` is a timing collector that writes every finished team or
+co-worker run to a file as its whole span tree: the team span with its mode,
+the coordinator's plan, each agent run, each reasoning iteration, and the
+generate and tool calls inside them, with timings, token counts and the
+thread each span ran on.
+
+The file holds one JSON object per line and per span:
+
+    {"trace":"5f0c1e2a9b7d4e61","span":0,"name":"team","start":0.0,"duration":2.41,"thread":0,"attrs":{"mode":"PARALLEL"},"time":1760000000.0}
+    {"trace":"5f0c1e2a9b7d4e61","span":1,"parent":0,"name":"plan","start":0.0001,"duration":0.62,"thread":0,"attrs":{"agent":"planner"}}
+
+``start`` is seconds since the trace began, ``thread`` numbers the threads of
+a trace in order of appearance, and the root span carries the wall clock
+``time`` the trace began.
+
+``summarize`` reads a trace back and finds its critical path (the chain of
+spans that determined how long it took) and, for teams, how many agents were
+actually running at once. The same analysis is available from the command
+line:
+
+    python -m bitnet_vc_builder.core.tracing traces.jsonl
+    python -m bitnet_vc_builder.core.tracing traces.jsonl --trace 5f0c1e2a9b7d4e61 --tree --depth 4
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import logging
+import argparse
+import threading
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+from bitnet_vc_builder.core.timing import Span, TimingCollector
+
+logger = logging.getLogger(__name__)
+
+# Root spans written by default: team tasks and co-worker tasks
+TRACE_ROOTS = ("team", "run")
+
+# Attributes that name what a span worked on, in order of preference
+LABEL_ATTRIBUTES = ("team", "agent", "coworker", "tool", "step", "operation")
+
+def encode_trace(root: Span, trace_id: Optional[str] = None) -> str:
+    """
+    Encode a finished span tree as trace lines.
+
+    Args:
+        root: Finished top-level span
+        trace_id: Trace ID (optional; random by default)
+
+    Returns:
+        One JSON line per span, parents before their children
+    """
+    trace_id = trace_id or uuid.uuid4().hex[:16]
+    wall_start = time.time() - (time.perf_counter() - root.start)
+    threads: Dict[int, int] = {}
+    lines: List[str] = []
+
+    def visit(span: Span, parent_id: Optional[int]) -> None:
+        record: Dict[str, Any] = {"trace": trace_id, "span": len(lines)}
+        if parent_id is not None:
+            record["parent"] = parent_id
+        record["name"] = span.name
+        record["start"] = round(span.start - root.start, 6)
+        record["duration"] = round(span.duration, 6)
+        record["thread"] = threads.setdefault(span.thread, len(threads))
+        if span.attributes:
+            record["attrs"] = span.attributes
+        if parent_id is None:
+            record["time"] = round(wall_start, 6)
+
+        span_id = record["span"]
+        lines.append(json.dumps(record, separators=(",", ":"), default=str))
+        for child in sorted(list(span.children), key=lambda child: child.start):
+            visit(child, span_id)
+
+    visit(root, None)
+    return "".join(line + "\n" for line in lines)
+
+class TraceWriter(TimingCollector):
+    """
+    Writes finished team and co-worker runs to a trace file.
+    """
+
+    def __init__(self, path: str, root_names: Optional[Iterable[str]] = TRACE_ROOTS):
+        """
+        Initialize trace writer.
+
+        Args:
+            path: Trace file (appended to; its directory is created if missing)
+            root_names: Names of the top-level spans to write, or None for all
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.root_names = set(root_names) if root_names is not None else None
+        self.traces_written = 0
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def record(self, span: Span) -> None:
+        """
+        Write a span tree once its top-level span finishes.
+
+        Args:
+            span: Finished span
+        """
+        if span.parent is not None:
+            return
+        if self.root_names is not None and span.name not in self.root_names:
+            return
+
+        lines = encode_trace(span)
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(lines)
+            self._file.flush()
+            self.traces_written += 1
+
+    def close(self) -> None:
+        """
+        Close the trace file.
+        """
+        with self._lock:
+            self._file.close()
+
+def read_traces(path: str) -> List[Dict[str, Any]]:
+    """
+    Read a trace file.
+
+    Args:
+        path: Trace file written by TraceWriter
+
+    Returns:
+        Traces in file order, each a dictionary with "id", "time" and "root";
+        spans are dictionaries with name, start, end, duration, thread,
+        attributes and children
+
+    Raises:
+        ValueError: If a line is not a trace record
+    """
+    traces: Dict[str, Dict[str, Any]] = {}
+    spans: Dict[Tuple[str, int], Dict[str, Any]] = {}
+
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                trace_id = record["trace"]
+                node = {
+                    "name": record["name"],
+                    "start": record["start"],
+                    "duration": record["duration"],
+                    "end": record["start"] + record["duration"],
+                    "thread": record.get("thread", 0),
+                    "attributes": record.get("attrs", {}),
+                    "children": []
+                }
+                spans[(trace_id, record["span"])] = node
+                if "parent" in record:
+                    spans[(trace_id, record["parent"])]["children"].append(node)
+                else:
+                    traces[trace_id] = {"id": trace_id, "time": record.get("time"), "root": node}
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}:{number} is not a trace record: {e}")
+
+    return list(traces.values())
+
+def label(node: Dict[str, Any]) -> str:
+    """
+    Describe a span by its name and what it worked on.
+
+    Args:
+        node: Span from read_traces
+
+    Returns:
+        Label such as "agent researcher" or "tool calculator"
+    """
+    for key in LABEL_ATTRIBUTES:
+        if key in node["attributes"]:
+            return f"{node['name']} {node['attributes'][key]}"
+    return node["name"]
+
+def walk(node: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+    """
+    Iterate over a span and all its descendants.
+
+    Args:
+        node: Span from read_traces
+
+    Returns:
+        Iterator over the spans, parents before children
+    """
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        yield current
+        pending.extend(reversed(current["children"]))
+
+def critical_path(node: Dict[str, Any], depth: int = 0) -> List[Dict[str, Any]]:
+    """
+    Find the chain of spans that determined a span's duration.
+
+    Starting from the end of the span, the child that finished last is on the
+    path; before it, the child that finished last before that child started,
+    and so on. The same applies within each child. Time on the path not
+    covered by a child (``self``) is spent in the span itself: preparing
+    prompts, waiting or scheduling.
+
+    Args:
+        node: Span from read_traces
+        depth: Depth of the span, for the entries
+
+    Returns:
+        Entries with depth, label, start, duration and self time, the span
+        first and then the path through its children in time order
+    """
+    chosen = []
+    cursor = node["end"]
+    for child in sorted(node["children"], key=lambda child: child["end"], reverse=True):
+        if child["end"] <= cursor + 1e-6:
+            chosen.append(child)
+            cursor = child["start"]
+    chosen.reverse()
+
+    entry = {
+        "depth": depth,
+        "label": label(node),
+        "start": node["start"],
+        "duration": node["duration"],
+        "self": max(node["duration"] - sum(child["duration"] for child in chosen), 0.0)
+    }
+    path = [entry]
+    for child in chosen:
+        path.extend(critical_path(child, depth + 1))
+    return path
+
+def concurrency(intervals: List[Tuple[float, float]]) -> Dict[str, float]:
+    """
+    Measure how much a set of intervals overlapped.
+
+    Args:
+        intervals: (start, end) pairs
+
+    Returns:
+        Dictionary with busy (sum of lengths), wall (length of their union),
+        mean (busy / wall, the average number running while any ran) and max
+        (the most running at once)
+    """
+    events = sorted([(start, 1) for start, _ in intervals] + [(end, -1) for _, end in intervals])
+    running = peak = 0
+    wall = 0.0
+    previous = None
+    for moment, change in events:
+        if running > 0 and previous is not None:
+            wall += moment - previous
+        running += change
+        peak = max(peak, running)
+        previous = moment
+
+    busy = sum(end - start for start, end in intervals)
+    return {"busy": busy, "wall": wall, "mean": busy / wall if wall > 0 else 0.0, "max": peak}
+
+def summarize(trace: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Summarize a trace.
+
+    Args:
+        trace: Trace from read_traces
+
+    Returns:
+        Dictionary with id, label, mode (for teams), duration, tokens,
+        tool_calls, iterations, threads, per-phase count and total seconds,
+        critical_path (see critical_path) and, when agents ran, agent
+        concurrency (see concurrency)
+    """
+    root = trace["root"]
+    phases: Dict[str, Dict[str, Any]] = {}
+    tokens = 0
+    threads = set()
+    agents = []
+
+    for node in walk(root):
+        phase = phases.setdefault(node["name"], {"count": 0, "total": 0.0})
+        phase["count"] += 1
+        phase["total"] += node["duration"]
+        threads.add(node["thread"])
+        if node["name"] == "generate":
+            tokens += node["attributes"].get("tokens", 0)
+        elif node["name"] == "agent":
+            agents.append((node["start"], node["end"]))
+
+    summary = {
+        "id": trace["id"],
+        "label": label(root),
+        "mode": root["attributes"].get("mode"),
+        "duration": root["duration"],
+        "tokens": tokens,
+        "tool_calls": phases.get("tool", {}).get("count", 0),
+        "iterations": phases.get("iteration", {}).get("count", 0),
+        "threads": len(threads),
+        "phases": phases,
+        "critical_path": critical_path(root)
+    }
+    if agents:
+        summary["agents"] = concurrency(agents)
+    return summary
+
+def print_summary(summary: Dict[str, Any], depth: int = 2, file=sys.stdout) -> None:
+    """
+    Print a trace summary.
+
+    Args:
+        summary: Summary from summarize
+        depth: Deepest level of the critical path to print
+        file: Stream to print to
+    """
+    mode = f" ({summary['mode']})" if summary["mode"] else ""
+    print(f"Trace {summary['id']}: {summary['label']}{mode} {summary['duration'] * 1000:.1f} ms", file=file)
+    print(
+        f"  {summary['tokens']} tokens, {summary['tool_calls']} tool calls, "
+        f"{summary['iterations']} iterations on {summary['threads']} threads",
+        file=file
+    )
+
+    agents = summary.get("agents")
+    if agents:
+        print(
+            f"  agents: {agents['busy'] * 1000:.1f} ms of work in {agents['wall'] * 1000:.1f} ms, "
+            f"mean concurrency {agents['mean']:.2f}, max {agents['max']}",
+            file=file
+        )
+
+    print("  phases:", ", ".join(
+        f"{name} {phase['count']}x {phase['total'] * 1000:.1f} ms"
+        for name, phase in sorted(summary["phases"].items(), key=lambda item: -item[1]["total"])
+    ), file=file)
+
+    print("  critical path:", file=file)
+    for entry in summary["critical_path"]:
+        if entry["depth"] > depth:
+            continue
+        print(
+            f"    {'  ' * entry['depth']}{entry['label']:<{36 - 2 * entry['depth']}} "
+            f"+{entry['start'] * 1000:9.1f} ms {entry['duration'] * 1000:9.1f} ms (self {entry['self'] * 1000:.1f} ms)",
+            file=file
+        )
+
+def print_tree(node: Dict[str, Any], depth: int = 3, level: int = 0, file=sys.stdout) -> None:
+    """
+    Print a span tree.
+
+    Args:
+        node: Span from read_traces
+        depth: Deepest level to print
+        level: Level of this span
+        file: Stream to print to
+    """
+    if level > depth:
+        return
+    print(
+        f"  {'  ' * level}{label(node):<{40 - 2 * level}} +{node['start'] * 1000:9.1f} ms "
+        f"{node['duration'] * 1000:9.1f} ms  thread {node['thread']}",
+        file=file
+    )
+    for child in node["children"]:
+        print_tree(child, depth, level + 1, file)
+
+def main():
+    """
+    Summarize a trace file from the command line.
+    """
+    parser = argparse.ArgumentParser(description="Summarize BitNet Virtual Co-worker Builder execution traces")
+    parser.add_argument("path", help="Trace file")
+    parser.add_argument("--trace", help="Only this trace ID")
+    parser.add_argument("--last", type=int, default=10, help="Number of most recent traces to summarize")
+    parser.add_argument("--depth", type=int, default=2, help="Deepest span level to print")
+    parser.add_argument("--tree", action="store_true", help="Print the span trees as well")
+    parser.add_argument("--json", action="store_true", help="Print the summaries as JSON")
+    args = parser.parse_args()
+
+    traces = read_traces(args.path)
+    if args.trace:
+        traces = [trace for trace in traces if trace["id"] == args.trace]
+        if not traces:
+            print(f"Trace {args.trace} not found in {args.path}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        traces = traces[-args.last:]
+
+    summaries = [summarize(trace) for trace in traces]
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+        return
+
+    for trace, summary in zip(traces, summaries):
+        print_summary(summary, args.depth)
+        if args.tree:
+            print("  spans:")
+            print_tree(trace["root"], args.depth)
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,14 @@ from typing import List, Dict, Any, Optional, Union, Callable
 from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
 from bitnet_vc_builder.memory.memory import Memory
 from bitnet_vc_builder.tools.base_tools import Tool
+from bitnet_vc_builder.tools.registry import ToolRegistry
+from bitnet_vc_builder.core.react_parser import ReActGrammar, parse_react
+from bitnet_vc_builder.models.grammar import Grammar, get_grammar
+from bitnet_vc_builder.core.response_cache import ResponseCache, make_cache_key
+from bitnet_vc_builder.core.single_flight import SingleFlight
+from bitnet_vc_builder.core.cancellation import CancelToken, CancelledError, check_cancelled
+from bitnet_vc_builder.core.chat_template import ChatTemplate, Transcript, get_chat_template
+from bitnet_vc_builder.core.timing import span, current_span
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +29,15 @@ class BitNetVirtualCoworker:
     tools, and memory systems.
     """
     
+    # Sampling parameters passed to the model on every step
+    DEFAULT_SAMPLING_PARAMS = {
+        "max_tokens": 1024,
+        "temperature": 0.7,
+        "top_p": 0.9,
+        "top_k": 40,
+        "repetition_penalty": 1.1
+    }
+    
     def __init__(
         self, 
         model: BitNetModel, 
@@ -29,6 +46,9 @@ class BitNetVirtualCoworker:
         name: str = "BitNetVirtualCoworker",
         description: str = "A general-purpose AI assistant powered by BitNet.",
         system_prompt: Optional[str] = None,
+        sampling_params: Optional[Dict[str, Any]] = None,
+        response_cache: Optional[ResponseCache] = None,
+        chat_template: Union[str, ChatTemplate, None] = None,
     ):
         """
         Initialize BitNet virtual co-worker.
@@ -40,18 +60,62 @@ class BitNetVirtualCoworker:
             name: Name of the virtual co-worker
             description: Description of the virtual co-worker
             system_prompt: System prompt for the virtual co-worker
+            sampling_params: Overrides for DEFAULT_SAMPLING_PARAMS
+            response_cache: Cache for answers to repeated tasks (optional); an answer
+                is reused for the same task and memory contents, and a hit adds
+                the exchange to memory just as a run does
+            chat_template: Prompt format for the model, as a ChatTemplate or the name of
+                a registered one ("plain", "llama3", "chatml"; plain by default)
         """
         self.model = model
-        self.tools = tools or []
-        self.memory = memory or Memory()
+        self.tools = ToolRegistry(tools)
+        self.memory = memory if memory is not None else Memory()
         self.name = name
         self.description = description
-        self.system_prompt = system_prompt or self._default_system_prompt()
+        self.sampling_params = {**self.DEFAULT_SAMPLING_PARAMS, **(sampling_params or {})}
+        self.response_cache = response_cache
+        self.chat_template = get_chat_template(chat_template)
+        
+        # Identical run calls that overlap share one execution
+        self._inflight = SingleFlight()
+        
+        # The default system prompt is built on first use and rebuilt when tools
+        # change; a custom system prompt is left untouched
+        self._custom_system_prompt = bool(system_prompt)
+        self._system_prompt = system_prompt or None
         
         # Validate model
         if not isinstance(model, BitNetModel):
             raise TypeError("Model must be an instance of BitNetModel")
     
+    @property
+    def system_prompt(self) -> str:
+        """
+        System prompt for the virtual co-worker.
+        """
+        if self._system_prompt is None:
+            self._system_prompt = self._default_system_prompt()
+        return self._system_prompt
+    
+    @system_prompt.setter
+    def system_prompt(self, value: str) -> None:
+        """
+        Set a custom system prompt.
+        
+        Args:
+            value: System prompt
+        """
+        self._custom_system_prompt = True
+        self._system_prompt = value
+    
+    @property
+    def supports_grammar(self) -> bool:
+        """
+        Whether the model holds output schemas while decoding, rather than
+        rejecting answers that miss them after generation.
+        """
+        return self.model.supports_grammar
+    
     def _default_system_prompt(self) -> str:
         """
         Get default system prompt.
@@ -59,13 +123,8 @@ class BitNetVirtualCoworker:
         Returns:
             Default system prompt
         """
-        tools_description = ""
-        if self.tools:
-            tools_description = "You have access to the following tools:\n\n"
-            for tool in self.tools:
-                tools_description += f"- {tool.name}: {tool.description}\n"
-                if tool.args_schema:
-                    tools_description += f"  Arguments: {json.dumps(tool.args_schema, indent=2)}\n"
+        # Tool descriptions are cached by the registry, so this is cheap to rebuild
+        tools_description = self.tools.describe()
         
         return f"""You are {self.name}, {self.description}
 
@@ -84,115 +143,241 @@ Final Answer: your final answer here
 Begin!
 """
     
-    def run(self, task: str) -> str:
+    def run(
+        self,
+        task: str,
+        output_schema: Optional[Dict[str, Any]] = None,
+        cancel_token: Optional[CancelToken] = None
+    ) -> str:
         """
         Run virtual co-worker on a task.
         
+        Concurrent calls with the same task and memory share one execution.
+        
         Args:
             task: Task description
+            output_schema: JSON schema the final answer must match (optional)
+            cancel_token: Token for abandoning the run (optional)
+            
+        Returns:
+            Virtual co-worker's response
+            
+        Raises:
+            CancelledError: If the token is cancelled or its deadline passes
+        """
+        with span("run", coworker=self.name):
+            key = make_cache_key(task, output_schema, self.memory.fingerprint())
+            return self._inflight.do(key, self._run, task, output_schema, cancel_token=cancel_token)
+    
+    def _run(
+        self,
+        task: str,
+        output_schema: Optional[Dict[str, Any]] = None,
+        cancel_token: Optional[CancelToken] = None
+    ) -> str:
+        """
+        Run virtual co-worker on a task without coalescing.
+        
+        Args:
+            task: Task description
+            output_schema: JSON schema the final answer must match (optional)
+            cancel_token: Token for abandoning the run (optional)
             
         Returns:
             Virtual co-worker's response
         """
         logger.info(f"Running virtual co-worker {self.name} on task: {task}")
         
-        # Initialize conversation
-        conversation = [
-            {"role": "system", "content": self.system_prompt},
-            {"role": "user", "content": task}
-        ]
+        # Serve exact repeats from the cache when the answer is reproducible
+        cache_key = None
+        if self.response_cache is not None and self.response_cache.accepts(self.sampling_params):
+            cache_key = self._cache_key(task, output_schema)
+            cached_answer = self.response_cache.get(cache_key)
+            if cached_answer is not None:
+                logger.info(f"Virtual co-worker {self.name} answered from cache")
+                current_span().set(cached=True)
+                # Remember the exchange as a run would, so memory does not depend on hits
+                with span("memory", operation="add"):
+                    self.memory.add(f"Task: {task}\nAnswer: {cached_answer}")
+                return cached_answer
+        
+        # Initialize conversation; turns are rendered once as they are appended
+        conversation = Transcript(self.chat_template, self.model.tokenize)
+        conversation.append("system", self.system_prompt)
         
         # Add memory context if available
-        memory_context = self.memory.get_context()
+        with span("memory", operation="get_context"):
+            memory_context = self.memory.get_context()
         if memory_context:
-            conversation.insert(1, {"role": "system", "content": f"Context from memory:\n\n{memory_context}"})
+            conversation.append("system", f"Context from memory:\n\n{memory_context}")
+        
+        conversation.append("user", task)
+        
+        answer_grammar = None
+        if output_schema is not None:
+            conversation.append("system", f"The final answer must be JSON matching this schema: {json.dumps(output_schema, separators=(',', ':'))}")
+            answer_grammar = get_grammar(output_schema)
+        
+        # Backends that sample tokens in process hold tool inputs and the final answer to their schemas;
+        # the tool descriptions identify the input grammars, so identical runs share generations
+        grammar = ReActGrammar(self.tools.input_grammar, answer_grammar, tools_key=self.tools.describe())
         
         # Maximum number of iterations to prevent infinite loops
         max_iterations = 10
         
-        for _ in range(max_iterations):
-            # Generate response
-            response = self.think(conversation)
-            
-            # Check if the response contains a tool call
-            tool_name = self._extract_tool_name(response)
-            
-            if tool_name:
-                # Extract tool input
-                tool_input = self._extract_tool_input(response)
+        for iteration in range(max_iterations):
+            with span("iteration", step=iteration):
+                check_cancelled(cancel_token)
                 
-                # Find the tool
-                tool = self._find_tool(tool_name)
+                # Generate response
+                response = self.think(conversation, cancel_token, grammar=grammar)
                 
-                if tool:
-                    try:
-                        # Call the tool
-                        tool_result = tool(tool_input)
-                        
-                        # Add tool call and result to conversation
-                        conversation.append({"role": "assistant", "content": response})
-                        conversation.append({"role": "system", "content": f"Tool result: {tool_result}"})
-                    except Exception as e:
-                        # Add error to conversation
-                        conversation.append({"role": "assistant", "content": response})
-                        conversation.append({"role": "system", "content": f"Error: {str(e)}"})
-                else:
-                    # Tool not found
-                    conversation.append({"role": "assistant", "content": response})
-                    conversation.append({"role": "system", "content": f"Error: Tool '{tool_name}' not found. Available tools: {', '.join(tool.name for tool in self.tools)}"})
-            
-            # Check if the response contains a final answer
-            elif "Final Answer:" in response:
-                # Extract final answer
-                final_answer = self._extract_final_answer(response)
+                # Parse the response once for the tool call and final answer
+                with span("parse"):
+                    parsed = parse_react(response)
                 
-                # Add final answer to memory
-                self.memory.add(f"Task: {task}\nAnswer: {final_answer}")
+                # Check if the response contains a tool call
+                tool_name = parsed.tool_name
                 
-                return final_answer
-            
-            # If no tool call or final answer, treat as intermediate thinking
-            else:
-                conversation.append({"role": "assistant", "content": response})
-                conversation.append({"role": "system", "content": "Please use the specified format for tool usage or provide a final answer."})
+                if tool_name:
+                    # Extract tool input
+                    tool_input = parsed.tool_input or {}
+                    
+                    # Reject tool inputs that do not match the tool's arguments schema
+                    input_grammar = self.tools.input_grammar(tool_name)
+                    if input_grammar is not None and parsed.tool_input_text is not None and not input_grammar.matches(parsed.tool_input_text):
+                        conversation.append("assistant", response)
+                        conversation.append("system", f"Error: Invalid input for tool '{tool_name}': {parsed.tool_input_text}")
+                        continue
+                    
+                    # Find the tool
+                    tool = self._find_tool(tool_name)
+                    
+                    if tool:
+                        try:
+                            # Call the tool
+                            with span("tool", tool=tool_name):
+                                tool_result = tool(tool_input, cancel_token=cancel_token) if cancel_token is not None else tool(tool_input)
+                            
+                            # Add tool call and result to conversation
+                            conversation.append("assistant", response)
+                            conversation.append("system", f"Tool result: {tool_result}")
+                        except CancelledError:
+                            raise
+                        except Exception as e:
+                            # Add error to conversation
+                            conversation.append("assistant", response)
+                            conversation.append("system", f"Error: {str(e)}")
+                    else:
+                        # Tool not found
+                        conversation.append("assistant", response)
+                        conversation.append("system", f"Error: Tool '{tool_name}' not found. Available tools: {', '.join(self.tools.names())}")
+                
+                # Check if the response contains a final answer
+                elif parsed.has_final_answer:
+                    # Extract final answer
+                    final_answer = parsed.final_answer
+                    
+                    # Ask again for structured answers that do not match the requested schema
+                    if answer_grammar is not None and not answer_grammar.matches(final_answer):
+                        conversation.append("assistant", response)
+                        conversation.append("system", "Error: The final answer must be JSON matching the schema.")
+                        continue
+                    
+                    # Add final answer to memory
+                    with span("memory", operation="add"):
+                        self.memory.add(f"Task: {task}\nAnswer: {final_answer}")
+                    
+                    if cache_key is not None:
+                        self.response_cache.put(cache_key, final_answer)
+                    
+                    return final_answer
+                
+                # If no tool call or final answer, treat as intermediate thinking
+                else:
+                    conversation.append("assistant", response)
+                    conversation.append("system", "Please use the specified format for tool usage or provide a final answer.")
         
         # If we reach here, we've hit the maximum number of iterations
         return "I apologize, but I was unable to complete the task within the allowed number of iterations."
     
-    def think(self, conversation: List[Dict[str, str]]) -> str:
+    def think(
+        self,
+        conversation: Union[Transcript, List[Dict[str, str]]],
+        cancel_token: Optional[CancelToken] = None,
+        grammar: Optional[Grammar] = None
+    ) -> str:
         """
         Virtual co-worker thinking process.
         
         Args:
-            conversation: Conversation history
+            conversation: Conversation history, as a transcript or a list of messages
+            cancel_token: Token for abandoning generation (optional)
+            grammar: Grammar the response must follow (optional)
             
         Returns:
             Virtual co-worker's response
         """
-        # Convert conversation to model input format
-        model_input = ""
-        for message in conversation:
-            if message["role"] == "system":
-                model_input += f"System: {message['content']}\n\n"
-            elif message["role"] == "user":
-                model_input += f"User: {message['content']}\n\n"
-            elif message["role"] == "assistant":
-                model_input += f"Assistant: {message['content']}\n\n"
+        with span("think", coworker=self.name):
+            return self._think(conversation, cancel_token, grammar)
+    
+    def _think(
+        self,
+        conversation: Union[Transcript, List[Dict[str, str]]],
+        cancel_token: Optional[CancelToken] = None,
+        grammar: Optional[Grammar] = None
+    ) -> str:
+        """
+        Generate the next response without timing.
         
-        model_input += "Assistant: "
+        Args:
+            conversation: Conversation history, as a transcript or a list of messages
+            cancel_token: Token for abandoning generation (optional)
+            grammar: Grammar the response must follow (optional)
+            
+        Returns:
+            Virtual co-worker's response
+        """
+        with span("prompt"):
+            if not isinstance(conversation, Transcript):
+                conversation = Transcript.from_messages(conversation, self.chat_template)
+            
+            # Only the generation prompt is added to the already rendered turns
+            model_input = conversation.prompt()
         
         # Generate response
+        generate_kwargs = dict(self.sampling_params)
+        if cancel_token is not None:
+            generate_kwargs["cancel_token"] = cancel_token
+        if grammar is not None:
+            generate_kwargs["grammar"] = grammar
+        
+        # Stop at the template's end of turn marker
+        end_of_turn = conversation.template.end_of_turn
+        if end_of_turn:
+            generate_kwargs["stop_sequences"] = list(generate_kwargs.get("stop_sequences") or []) + [end_of_turn]
+        
         response = self.model.generate(
             prompt=model_input,
-            max_tokens=1024,
-            temperature=0.7,
-            top_p=0.9,
-            top_k=40,
-            repetition_penalty=1.1
+            **generate_kwargs
         )
         
         return response
     
+    def _cache_key(self, task: str, output_schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Build the response cache key for a task.
+        
+        Args:
+            task: Task description
+            output_schema: JSON schema for the final answer
+            
+        Returns:
+            Cache key covering the co-worker configuration, task, memory and sampling parameters
+        """
+        config = [self.name, self.description, self.system_prompt, self.tools.describe(), self.chat_template.name, self.model.get_model_info()]
+        return make_cache_key(config, task, self.memory.fingerprint(), self.sampling_params, output_schema)
+    
     def _extract_tool_name(self, response: str) -> str:
         """
         Extract tool name from response.
@@ -203,11 +388,7 @@ Begin!
         Returns:
             Tool name
         """
-        lines = response.split('\n')
-        for line in lines:
-            if line.startswith("Action:"):
-                return line.replace("Action:", "").strip()
-        return ""
+        return parse_react(response).tool_name
     
     def _extract_tool_input(self, response: str) -> Dict[str, Any]:
         """
@@ -219,26 +400,7 @@ Begin!
         Returns:
             Tool input
         """
-        # Find the action input section
-        action_input_start = response.find("Action Input:")
-        if action_input_start == -1:
-            return {}
-        
-        action_input_text = response[action_input_start:].replace("Action Input:", "").strip()
-        
-        # Extract JSON
-        try:
-            # Find the start and end of the JSON object
-            json_start = action_input_text.find("{")
-            json_end = action_input_text.rfind("}") + 1
-            
-            if json_start == -1 or json_end == 0:
-                return {}
-            
-            json_text = action_input_text[json_start:json_end]
-            return json.loads(json_text)
-        except json.JSONDecodeError:
-            return {}
+        return parse_react(response).tool_input or {}
     
     def _extract_final_answer(self, response: str) -> str:
         """
@@ -250,13 +412,10 @@ Begin!
         Returns:
             Final answer
         """
-        if "Final Answer:" not in response:
+        parsed = parse_react(response)
+        if not parsed.has_final_answer:
             return response
-            
-        final_answer_parts = response.split("Final Answer:")
-        if len(final_answer_parts) > 1:
-            return final_answer_parts[1].strip()
-        return ""
+        return parsed.final_answer
     
     def _find_tool(self, tool_name: str) -> Optional[Tool]:
         """
@@ -268,10 +427,7 @@ Begin!
         Returns:
             Tool instance or None if not found
         """
-        for tool in self.tools:
-            if tool.name.lower() == tool_name.lower():
-                return tool
-        return None
+        return self.tools.get(tool_name)
     
     def add_tool(self, tool: Tool) -> None:
         """
@@ -280,7 +436,8 @@ Begin!
         Args:
             tool: Tool instance
         """
-        self.tools.append(tool)
+        self.tools.add(tool)
+        self._update_system_prompt()
     
     def remove_tool(self, tool_name: str) -> bool:
         """
@@ -292,11 +449,11 @@ Begin!
         Returns:
             True if the tool was removed, False otherwise
         """
-        for i, tool in enumerate(self.tools):
-            if tool.name.lower() == tool_name.lower():
-                self.tools.pop(i)
-                return True
-        return False
+        if self.tools.remove(tool_name) is None:
+            return False
+        
+        self._update_system_prompt()
+        return True
     
     def get_tools(self) -> List[Tool]:
         """
@@ -305,7 +462,14 @@ Begin!
         Returns:
             List of tools
         """
-        return self.tools
+        return list(self.tools)
+    
+    def _update_system_prompt(self) -> None:
+        """
+        Mark the default system prompt for rebuilding after the tool set changed.
+        """
+        if not self._custom_system_prompt:
+            self._system_prompt = None
     
     def clear_memory(self) -> None:
         """
@@ -6,13 +6,19 @@ import os
 import sys
 import argparse
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, TYPE_CHECKING
 
-from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker
-from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
-from bitnet_vc_builder.core.team import BitNetTeam, CollaborationMode
-from bitnet_vc_builder.tools.common_tools import get_available_tools
 from bitnet_vc_builder.config.config_loader import load_config
+from bitnet_vc_builder.core.timing import CompositeCollector, InMemoryCollector, set_collector
+from bitnet_vc_builder.core.recording import REPLAY_LATENCIES, Recorder, Recording, set_recorder, set_replay
+from bitnet_vc_builder.core.profiling import PROFILE_MODES, ProfileSession
+
+# The model, virtual co-worker, team and tool modules are imported where they
+# are used, so that --list, --help and the server start without loading them
+if TYPE_CHECKING:
+    from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker
+    from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+    from bitnet_vc_builder.core.team import BitNetTeam
 
 # Configure logging
 logging.basicConfig(
@@ -50,6 +56,12 @@ def parse_args():
         help="BitNet kernel type"
     )
     
+    parser.add_argument(
+        "--autotune",
+        action="store_true",
+        help="Benchmark kernel types and thread counts on this host and use the fastest (results are cached)"
+    )
+    
     parser.add_argument(
         "--bitnet-path",
         type=str,
@@ -80,6 +92,66 @@ def parse_args():
         help="List available virtual co-workers and teams"
     )
     
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print time spent in each phase (prompt, prefill, decode, tools, ...) after the run"
+    )
+    
+    parser.add_argument(
+        "--trace",
+        type=str,
+        metavar="FILE",
+        help="Append the run's span tree to a trace file (summarize with python -m bitnet_vc_builder.core.tracing FILE)"
+    )
+    
+    parser.add_argument(
+        "--record",
+        type=str,
+        metavar="FILE",
+        help="Append the run's tasks, model calls and tool calls to a recording file"
+    )
+    
+    parser.add_argument(
+        "--replay",
+        type=str,
+        metavar="FILE",
+        help="Answer model and tool calls from a recording instead of running them; "
+             "with --team and no --task, the team's recorded tasks are run"
+    )
+    
+    parser.add_argument(
+        "--replay-latency",
+        choices=REPLAY_LATENCIES,
+        default="recorded",
+        help="Whether replayed calls take as long as they did when recorded, or no time"
+    )
+    
+    parser.add_argument(
+        "--replay-strict",
+        action="store_true",
+        help="Fail on model or tool calls missing from the recording"
+    )
+    
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        help="Profile the run: sample stacks (written as collapsed stacks for flame graphs) or count calls with cProfile"
+    )
+    
+    parser.add_argument(
+        "--profile-allocations",
+        action="store_true",
+        help="Also trace memory allocations during the run and report the top allocating lines"
+    )
+    
+    parser.add_argument(
+        "--profile-output",
+        type=str,
+        default="profiles",
+        help="Directory to write profiling results to"
+    )
+    
     parser.add_argument(
         "--server",
         action="store_true",
@@ -92,9 +164,16 @@ def parse_args():
         help="Run web UI"
     )
     
+    parser.add_argument(
+        "--convert-checkpoint",
+        nargs=2,
+        metavar=("SRC", "DST"),
+        help="Convert a .safetensors or .npz float checkpoint to a packed ternary weight file"
+    )
+    
     return parser.parse_args()
 
-def load_model(config: Dict[str, Any], args) -> BitNetModel:
+def load_model(config: Dict[str, Any], args) -> "BitNetModel":
     """
     Load BitNet model.
     
@@ -105,6 +184,8 @@ def load_model(config: Dict[str, Any], args) -> BitNetModel:
     Returns:
         BitNetModel instance
     """
+    from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+    
     # Get model path
     model_path = args.model or config.get("model", {}).get("path")
     
@@ -125,6 +206,11 @@ def load_model(config: Dict[str, Any], args) -> BitNetModel:
     top_p = config.get("model", {}).get("top_p", 0.9)
     top_k = config.get("model", {}).get("top_k", 40)
     repetition_penalty = config.get("model", {}).get("repetition_penalty", 1.1)
+    autotune = args.autotune or config.get("model", {}).get("autotune", False)
+    autotune_cache = config.get("model", {}).get("autotune_cache")
+    draft = config.get("model", {}).get("draft")
+    num_draft_tokens = config.get("model", {}).get("num_draft_tokens", 4)
+    simulation = config.get("model", {}).get("simulation")
     
     # Create model
     logger.info(f"Loading BitNet model from {model_path} with kernel type {kernel_type}")
@@ -138,12 +224,43 @@ def load_model(config: Dict[str, Any], args) -> BitNetModel:
         temperature=temperature,
         top_p=top_p,
         top_k=top_k,
-        repetition_penalty=repetition_penalty
+        repetition_penalty=repetition_penalty,
+        autotune=autotune,
+        autotune_cache=autotune_cache,
+        draft=draft,
+        num_draft_tokens=num_draft_tokens,
+        simulation=simulation
     )
     
     return model
 
-def create_agent(config: Dict[str, Any], model: BitNetModel) -> BitNetVirtualCoworker:
+def get_configured(config: Dict[str, Any], list_key: str, section_key: str) -> List[Dict[str, Any]]:
+    """
+    Get virtual co-worker or team configurations.
+    
+    Entries come from the list under list_key and from the templates mapping
+    under section_key, as in config/config.yaml; a template without a name is
+    named after its key.
+    
+    Args:
+        config: Configuration
+        list_key: Key of the list of configurations ("agents" or "teams")
+        section_key: Key of the section with templates ("virtual_coworkers" or "teams")
+        
+    Returns:
+        List of configurations
+    """
+    entries = []
+    
+    for key in dict.fromkeys((list_key, section_key)):
+        value = config.get(key) or []
+        if isinstance(value, dict):
+            value = [dict({"name": name}, **template) for name, template in (value.get("templates") or {}).items()]
+        entries.extend(value)
+    
+    return entries
+
+def create_agent(config: Dict[str, Any], model: "BitNetModel") -> "BitNetVirtualCoworker":
     """
     Create a BitNet virtual co-worker from configuration.
     
@@ -154,6 +271,9 @@ def create_agent(config: Dict[str, Any], model: BitNetModel) -> BitNetVirtualCow
     Returns:
         BitNetVirtualCoworker instance
     """
+    from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker
+    from bitnet_vc_builder.tools.common_tools import get_available_tools
+    
     logger.info(f"Creating BitNet virtual co-worker with config: {config}")
     
     # Get tools
@@ -170,12 +290,13 @@ def create_agent(config: Dict[str, Any], model: BitNetModel) -> BitNetVirtualCow
         tools=tools,
         name=config.get("name", "BitNetVirtualCoworker"),
         description=config.get("description", "A helpful AI virtual co-worker"),
-        system_prompt=config.get("system_prompt")
+        system_prompt=config.get("system_prompt"),
+        chat_template=config.get("chat_template")
     )
     
     return agent
 
-def create_team(config: Dict[str, Any], agents: Dict[str, BitNetVirtualCoworker]) -> BitNetTeam:
+def create_team(config: Dict[str, Any], agents: Dict[str, "BitNetVirtualCoworker"]) -> "BitNetTeam":
     """
     Create a BitNet team from configuration.
     
@@ -186,12 +307,14 @@ def create_team(config: Dict[str, Any], agents: Dict[str, BitNetVirtualCoworker]
     Returns:
         BitNetTeam instance
     """
+    from bitnet_vc_builder.core.team import BitNetTeam, CollaborationMode
+    
     logger.info(f"Creating BitNet team with config: {config}")
     
     # Get virtual co-workers
     team_agents = []
     
-    for agent_name in config.get("agents", []):
+    for agent_name in config.get("agents", config.get("virtual_coworkers", [])):
         if agent_name in agents:
             team_agents.append(agents[agent_name])
     
@@ -213,7 +336,7 @@ def create_team(config: Dict[str, Any], agents: Dict[str, BitNetVirtualCoworker]
     
     return team
 
-def run_agent(agent: BitNetVirtualCoworker, task: str) -> str:
+def run_agent(agent: "BitNetVirtualCoworker", task: str) -> str:
     """
     Run a virtual co-worker on a task.
     
@@ -230,7 +353,7 @@ def run_agent(agent: BitNetVirtualCoworker, task: str) -> str:
     
     return result
 
-def run_team(team: BitNetTeam, task: str, coordinator_agent_name: Optional[str] = None) -> str:
+def run_team(team: "BitNetTeam", task: str, coordinator_agent_name: Optional[str] = None) -> str:
     """
     Run a team on a task.
     
@@ -248,6 +371,37 @@ def run_team(team: BitNetTeam, task: str, coordinator_agent_name: Optional[str]
     
     return result
 
+def start_profile(args) -> Optional[ProfileSession]:
+    """
+    Start profiling if requested on the command line.
+    
+    Args:
+        args: Parsed arguments
+        
+    Returns:
+        Running ProfileSession, or None if profiling was not requested
+    """
+    if not args.profile and not args.profile_allocations:
+        return None
+    
+    session = ProfileSession(mode=args.profile or "sampling", allocations=args.profile_allocations)
+    session.start()
+    return session
+
+def finish_profile(session: ProfileSession, args) -> None:
+    """
+    Stop profiling and write the results.
+    
+    Args:
+        session: Running ProfileSession
+        args: Parsed arguments
+    """
+    session.stop()
+    paths = session.save(args.profile_output)
+    print(f"\nProfile ({session.duration:.2f} s) written to:")
+    for path in paths:
+        print(f"  {path}")
+
 def run_server(config: Dict[str, Any]):
     """
     Run API server.
@@ -258,9 +412,11 @@ def run_server(config: Dict[str, Any]):
     logger.info("Starting API server")
     
     # Import server module
-    from bitnet_vc_builder.api.server import app
+    from bitnet_vc_builder.api.server import app, configure
     import uvicorn
     
+    configure(config)
+    
     # Get server configuration
     host = config.get("server", {}).get("host", "0.0.0.0")
     port = config.get("server", {}).get("port", 8000)
@@ -268,6 +424,23 @@ def run_server(config: Dict[str, Any]):
     # Run server
     uvicorn.run(app, host=host, port=port)
 
+def print_timings(collector: InMemoryCollector) -> None:
+    """
+    Print per-phase timing statistics.
+    
+    Args:
+        collector: Collector that recorded the run
+    """
+    print("\nTimings:")
+    print(f"  {'phase':<10} {'count':>6} {'total s':>9} {'mean s':>9} {'max s':>9}")
+    for name, stats in sorted(collector.get_stats().items(), key=lambda item: -item[1]["total"]):
+        print(f"  {name:<10} {stats['count']:>6} {stats['total']:>9.3f} {stats['mean']:>9.3f} {stats['max']:>9.3f}")
+    
+    generate = collector.get_stats().get("generate")
+    if generate:
+        print(f"  time to first token {generate.get('mean_ttft', 0.0):.3f} s, "
+              f"{generate.get('mean_tokens_per_second', 0.0):.1f} tokens/s")
+
 def run_ui(config: Dict[str, Any]):
     """
     Run web UI.
@@ -290,6 +463,16 @@ def main():
     # Parse command line arguments
     args = parse_args()
     
+    # Check if we should convert a checkpoint
+    if args.convert_checkpoint:
+        from bitnet_vc_builder.models.ternary import convert_checkpoint
+        
+        src, dst = args.convert_checkpoint
+        stats = convert_checkpoint(src, dst)
+        print(f"Converted {stats['ternary_tensors']} of {stats['tensors']} tensors to ternary: "
+              f"{stats['source_bytes']} -> {stats['output_bytes']} bytes")
+        return
+    
     # Load configuration
     config = load_config(args.config)
     
@@ -303,36 +486,61 @@ def main():
         run_ui(config)
         return
     
+    # Check if we should list virtual co-workers and teams
+    if args.list:
+        # Names come from the configuration, so the model is not loaded
+        print("Available virtual co-workers:")
+        for agent_name in dict.fromkeys(agent_config.get("name", "BitNetVirtualCoworker") for agent_config in get_configured(config, "agents", "virtual_coworkers")):
+            print(f"  - {agent_name}")
+        
+        print("\nAvailable teams:")
+        for team_name in dict.fromkeys(team_config.get("name", "BitNetTeam") for team_config in get_configured(config, "teams", "teams")):
+            print(f"  - {team_name}")
+        
+        return
+    
+    # Record per-phase timings and execution traces when requested
+    collector = None
+    collectors = []
+    if args.timings or config.get("timing", {}).get("enabled", False):
+        collector = InMemoryCollector()
+        collectors.append(collector)
+    
+    trace_file = args.trace or config.get("timing", {}).get("trace_file")
+    if trace_file:
+        from bitnet_vc_builder.core.tracing import TraceWriter
+        
+        collectors.append(TraceWriter(trace_file))
+    
+    if collectors:
+        set_collector(collectors[0] if len(collectors) == 1 else CompositeCollector(collectors))
+    
+    # Record model and tool calls, or answer them from a recording
+    if args.record:
+        set_recorder(Recorder(args.record))
+    
+    replay = None
+    if args.replay:
+        replay = Recording(args.replay, latency=args.replay_latency, strict=args.replay_strict)
+        set_replay(replay)
+    
     # Load model
     model = load_model(config, args)
     
     # Load virtual co-workers
     agents = {}
     
-    for agent_config in config.get("agents", []):
+    for agent_config in get_configured(config, "agents", "virtual_coworkers"):
         agent = create_agent(agent_config, model)
         agents[agent.name] = agent
     
     # Load teams
     teams = {}
     
-    for team_config in config.get("teams", []):
+    for team_config in get_configured(config, "teams", "teams"):
         team = create_team(team_config, agents)
         teams[team.name] = team
     
-    # Check if we should list virtual co-workers and teams
-    if args.list:
-        # Print available virtual co-workers and teams
-        print("Available virtual co-workers:")
-        for agent_name in agents:
-            print(f"  - {agent_name}")
-        
-        print("\nAvailable teams:")
-        for team_name in teams:
-            print(f"  - {team_name}")
-        
-        return
-    
     # Check if we should run a virtual co-worker
     if args.virtual_coworker:
         if args.virtual_coworker not in agents:
@@ -345,11 +553,17 @@ def main():
         
         # Run virtual co-worker
         agent = agents[args.virtual_coworker]
+        profile = start_profile(args)
         result = run_agent(agent, args.task)
+        if profile is not None:
+            finish_profile(profile, args)
         
         print(f"\nVirtual Co-worker Response:")
         print(result)
         
+        if collector is not None:
+            print_timings(collector)
+        
         return
     
     # Check if we should run a team
@@ -358,16 +572,29 @@ def main():
             logger.error(f"Team {args.team} not found")
             sys.exit(1)
         
-        if not args.task:
+        # Without a task, a replay runs the tasks recorded for the team
+        team_tasks = [args.task] if args.task else (replay.team_tasks(args.team) if replay is not None else [])
+        if not team_tasks:
             logger.error("Task not specified")
             sys.exit(1)
         
         # Run team
         team = teams[args.team]
-        result = run_team(team, args.task)
+        profile = start_profile(args)
+        for task in team_tasks:
+            result = run_team(team, task)
+            
+            print(f"\nTeam Response:")
+            print(result)
+        if profile is not None:
+            finish_profile(profile, args)
         
-        print(f"\nTeam Response:")
-        print(result)
+        if collector is not None:
+            print_timings(collector)
+        
+        if replay is not None:
+            stats = replay.get_stats()
+            print(f"\nReplay: {stats['hits']} calls matched the recording, {stats['misses']} did not")
         
         return
     
@@ -3,8 +3,10 @@ Memory system for BitNet Virtual Co-worker Builder.
 """
 
 import time
+import json
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +36,10 @@ class Memory:
         self.max_context_length = max_context_length
         self.recency_bias = recency_bias
         self.items = []
+        
+        # Incremented on every change so derived values can be cached
+        self.version = 0
+        self._fingerprint: Optional[Tuple[int, str]] = None
     
     def add(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
         """
@@ -56,6 +62,8 @@ class Memory:
         # Trim if necessary
         if len(self.items) > self.max_items:
             self.items = self.items[-self.max_items:]
+        
+        self.version += 1
     
     def get_context(self, query: Optional[str] = None, max_items: Optional[int] = None) -> str:
         """
@@ -158,6 +166,27 @@ class Memory:
         Clear memory.
         """
         self.items = []
+        self.version += 1
+    
+    def fingerprint(self) -> str:
+        """
+        Get a digest of the memory contents.
+        
+        Unlike the version counter, the digest is the same in every process
+        holding the same items, so it can key persistent caches. It covers the
+        items' content and metadata in order, not when they were added.
+        
+        Returns:
+            Hex digest of the stored items
+        """
+        if self._fingerprint is None or self._fingerprint[0] != self.version:
+            payload = json.dumps(
+                [(item["content"], item["metadata"]) for item in self.items],
+                sort_keys=True,
+                default=str
+            )
+            self._fingerprint = (self.version, hashlib.sha256(payload.encode("utf-8")).hexdigest())
+        return self._fingerprint[1]
     
     def search(self, query: str, max_items: Optional[int] = None) -> List[Dict[str, Any]]:
         """
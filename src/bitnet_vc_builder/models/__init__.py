@@ -0,0 +1,3 @@
+"""
+Model integration for BitNet Virtual Co-worker Builder.
+"""
@@ -0,0 +1,220 @@
+"""
+Kernel autotuning for BitNet Virtual Co-worker Builder.
+
+The fastest kernel type and thread count depend on the CPU: cache sizes, core
+counts and memory bandwidth all shift the balance between tile sizes and
+threading. The autotuner times every combination on the current host for
+typical shapes (a single decoded token and a batch of prompt tokens) and keeps
+the result in a cache file keyed by host, so later startups reuse it.
+"""
+
+import os
+import json
+import time
+import logging
+import platform
+import threading
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bitnet_vc_builder.models.kernels import TernaryLinear, KERNEL_TILE_ROWS
+
+logger = logging.getLogger(__name__)
+
+# (input rows, in_features, out_features): one decoded token and a prompt batch
+DEFAULT_SHAPES: Tuple[Tuple[int, int, int], ...] = ((1, 2048, 2048), (8, 2048, 2048))
+
+def default_cache_path() -> str:
+    """
+    Get the default autotune cache file.
+
+    Returns:
+        Path under the user's cache directory
+    """
+    return os.path.join(os.path.expanduser("~"), ".cache", "bitnet_vc_builder", "autotune.json")
+
+def default_thread_counts() -> List[int]:
+    """
+    Get the thread counts worth trying on this host.
+
+    Returns:
+        Powers of two up to the CPU count, plus the CPU count itself
+    """
+    cpu_count = os.cpu_count() or 1
+    counts = []
+    count = 1
+    while count < cpu_count:
+        counts.append(count)
+        count *= 2
+    counts.append(cpu_count)
+    return counts
+
+def host_fingerprint() -> str:
+    """
+    Identify the host for cached results.
+
+    Returns:
+        String naming the CPU, core count and NumPy version
+    """
+    return "|".join([
+        platform.machine(),
+        platform.processor() or "unknown",
+        str(os.cpu_count() or 1),
+        f"numpy-{np.__version__}"
+    ])
+
+class Autotuner:
+    """
+    Picks the fastest kernel type and thread count for this host.
+    """
+
+    def __init__(
+        self,
+        cache_path: Optional[str] = None,
+        kernel_types: Sequence[str] = tuple(KERNEL_TILE_ROWS),
+        thread_counts: Optional[Sequence[int]] = None,
+        shapes: Sequence[Tuple[int, int, int]] = DEFAULT_SHAPES,
+        repeats: int = 3
+    ):
+        """
+        Initialize autotuner.
+
+        Args:
+            cache_path: File holding tuned results (defaults to default_cache_path())
+            kernel_types: Kernel types to try
+            thread_counts: Thread counts to try (defaults to default_thread_counts())
+            shapes: (input rows, in_features, out_features) of the products to time
+            repeats: Timed runs per candidate and shape; the fastest run counts
+        """
+        self.cache_path = cache_path or default_cache_path()
+        self.kernel_types = list(kernel_types)
+        self.thread_counts = list(thread_counts or default_thread_counts())
+        self.shapes = [tuple(shape) for shape in shapes]
+        self.repeats = repeats
+
+        self._lock = threading.Lock()
+
+    def _cache_key(self) -> str:
+        """
+        Get the cache entry for this host and these shapes.
+
+        Returns:
+            Cache key
+        """
+        shapes = ",".join("x".join(str(dim) for dim in shape) for shape in self.shapes)
+        return f"{host_fingerprint()}|{shapes}"
+
+    def _read_cache(self) -> Dict[str, Any]:
+        """
+        Read the cache file.
+
+        Returns:
+            Cached results by key (empty if the file is missing or unreadable)
+        """
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable autotune cache {self.cache_path}: {e}")
+            return {}
+
+    def _write_cache(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Store a result in the cache file.
+
+        Args:
+            key: Cache key
+            result: Tuned result
+        """
+        cache = self._read_cache()
+        cache[key] = result
+
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+            temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(cache, f, indent=2, sort_keys=True)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write autotune cache {self.cache_path}: {e}")
+
+    def cached(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached result for this host.
+
+        Returns:
+            Cached result, or None if this host has not been tuned
+        """
+        result = self._read_cache().get(self._cache_key())
+        if result is None or result.get("kernel_type") not in KERNEL_TILE_ROWS:
+            return None
+        return result
+
+    def benchmark(self, kernel_type: str, num_threads: int) -> float:
+        """
+        Time one kernel type and thread count.
+
+        Args:
+            kernel_type: Kernel type
+            num_threads: Number of threads
+
+        Returns:
+            Seconds for one product of every shape (fastest of the repeats)
+        """
+        rng = np.random.default_rng(0)
+        total = 0.0
+
+        for rows, in_features, out_features in self.shapes:
+            values = rng.integers(-1, 2, size=(out_features, in_features), dtype=np.int8)
+            layer = TernaryLinear.from_values(values, kernel_type=kernel_type, num_threads=num_threads)
+            x = rng.standard_normal((rows, in_features)).astype(np.float32)
+
+            # Warm up thread pools and caches before timing
+            layer(x)
+            best = float("inf")
+            for _ in range(self.repeats):
+                start = time.perf_counter()
+                layer(x)
+                best = min(best, time.perf_counter() - start)
+            total += best
+
+        return total
+
+    def tune(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Find the fastest kernel type and thread count.
+
+        Args:
+            force: Re-run the benchmarks even if a cached result exists
+
+        Returns:
+            Dictionary with the chosen kernel_type and num_threads, and the
+            timing of every candidate
+        """
+        with self._lock:
+            if not force:
+                result = self.cached()
+                if result is not None:
+                    logger.info(f"Using cached autotune result: {result['kernel_type']} with {result['num_threads']} threads")
+                    return result
+
+            timings = {}
+            for kernel_type in self.kernel_types:
+                for num_threads in self.thread_counts:
+                    timings[f"{kernel_type}/{num_threads}"] = self.benchmark(kernel_type, num_threads)
+
+            best = min(timings, key=timings.get)
+            kernel_type, num_threads = best.split("/")
+            result = {
+                "kernel_type": kernel_type,
+                "num_threads": int(num_threads),
+                "timings": timings,
+                "tuned_at": time.time()
+            }
+
+            logger.info(f"Autotuned kernels: {kernel_type} with {num_threads} threads ({timings[best] * 1000:.2f} ms)")
+            self._write_cache(self._cache_key(), result)
+            return result
@@ -0,0 +1,888 @@
+"""
+BitNet model wrapper for BitNet Virtual Co-worker Builder.
+"""
+
+import os
+import re
+import sys
+import ast
+import json
+import operator
+import time
+import logging
+import threading
+import subprocess
+from typing import List, Dict, Any, Optional, Callable, TYPE_CHECKING
+
+from bitnet_vc_builder.models.grammar import Grammar, get_grammar
+from bitnet_vc_builder.models.tokenizer import BPETokenizer, find_tokenizer
+from bitnet_vc_builder.models.simulated import SimulatedBackend
+from bitnet_vc_builder.core.single_flight import SingleFlight
+from bitnet_vc_builder.core.cancellation import CancelToken, check_cancelled
+from bitnet_vc_builder.core.timing import Span, span
+from bitnet_vc_builder.core.recording import get_recorder, get_replay
+
+# The NumPy backend, its weight files, the autotuner and speculative decoding
+# need NumPy, which is slow to import; they are imported when first used, so
+# mock, simulated and BitNet subprocess models start without it
+if TYPE_CHECKING:
+    from bitnet_vc_builder.models.ternary import TernaryWeights
+    from bitnet_vc_builder.models.numpy_backend import NumPyTransformer
+    from bitnet_vc_builder.models.speculative import Drafter, SpeculationGate
+
+logger = logging.getLogger(__name__)
+
+class BitNetModel:
+    """
+    Wrapper around BitNet's 1-bit quantized language models.
+
+    This class provides a unified interface for generating text with BitNet models.
+    Ternary weight files (``.i2s``) run on the built-in NumPy backend. For other
+    models, when BitNet integration is enabled and a BitNet installation is available,
+    inference is delegated to BitNet's ``run_inference.py``. Otherwise a lightweight
+    mock implementation is used, which is useful for development and testing.
+    Given simulation settings, the mock responses take as long as a real model's
+    would (see ``SimulatedBackend``), which is useful for benchmarking.
+    """
+
+    SUPPORTED_KERNELS = ("i2_s", "i2_m", "i2_l")
+
+    def __init__(
+        self,
+        model_path: str,
+        kernel_type: str = "i2_s",
+        bitnet_path: Optional[str] = None,
+        num_threads: int = 4,
+        context_size: int = 2048,
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        top_k: int = 40,
+        repetition_penalty: float = 1.1,
+        use_bitnet_integration: bool = True,
+        autotune: bool = False,
+        autotune_cache: Optional[str] = None,
+        draft: Optional[str] = None,
+        num_draft_tokens: int = 4,
+        simulation: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Initialize BitNet model.
+
+        Args:
+            model_path: Path to the model
+            kernel_type: Kernel type (i2_s, i2_m, i2_l)
+            bitnet_path: Path to BitNet installation (optional)
+            num_threads: Number of threads to use
+            context_size: Context size
+            temperature: Temperature for sampling
+            top_p: Top-p for sampling
+            top_k: Top-k for sampling
+            repetition_penalty: Repetition penalty
+            use_bitnet_integration: Whether to use BitNet integration
+            autotune: Whether to pick the fastest kernel type and thread count for
+                this host, overriding kernel_type and num_threads
+            autotune_cache: File holding autotune results (optional)
+            draft: Speculative decoding drafter: "ngram" for prompt lookup or the
+                path to a smaller ternary weight file with the same vocabulary
+                (optional, only used by the NumPy backend)
+            num_draft_tokens: Maximum number of tokens drafted per verification pass
+            simulation: Settings of a simulated backend used instead of a model,
+                such as {"decode_time_per_token": 0.02, "seed": 1} (optional, see
+                SimulatedBackend for the settings)
+        """
+        if kernel_type not in self.SUPPORTED_KERNELS:
+            raise ValueError(f"Unsupported kernel type: {kernel_type}. Supported kernel types: {', '.join(self.SUPPORTED_KERNELS)}")
+
+        if autotune:
+            from bitnet_vc_builder.models.autotune import Autotuner
+
+            # Benchmarks run once per host; later startups read the cache
+            tuned = Autotuner(cache_path=autotune_cache).tune()
+            kernel_type = tuned["kernel_type"]
+            num_threads = tuned["num_threads"]
+
+        self.model_path = model_path
+        self.kernel_type = kernel_type
+        self.bitnet_path = bitnet_path or os.environ.get("BITNET_PATH")
+        self.num_threads = num_threads
+        self.context_size = context_size
+        self.temperature = temperature
+        self.top_p = top_p
+        self.top_k = top_k
+        self.repetition_penalty = repetition_penalty
+        self.use_bitnet_integration = use_bitnet_integration
+        self.draft = draft
+        self.num_draft_tokens = num_draft_tokens
+        self.simulation = simulation
+
+        # Identical generate calls that overlap share one inference run
+        self._inflight = SingleFlight()
+
+        # Residency bookkeeping; resources are loaded on first use
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self._active = 0
+        self.last_used = 0.0
+        self.on_load: Optional[Callable[["BitNetModel"], None]] = None
+
+        # Memory-mapped packed weights, when the model path is a ternary weight file
+        self.weights: Optional["TernaryWeights"] = None
+        self._backend: Optional["NumPyTransformer"] = None
+        self._draft_weights: Optional["TernaryWeights"] = None
+        self._drafter: Optional["Drafter"] = None
+        self._gate: Optional["SpeculationGate"] = None
+
+        # BPE tokenizer from the model directory, read on first use
+        self._tokenizer: Optional[BPETokenizer] = None
+        self._tokenizer_checked = False
+        self._tokenizer_lock = threading.Lock()
+
+        # Simulated backend, replacing the model entirely
+        self._simulator = SimulatedBackend(**simulation) if simulation is not None else None
+
+        # Check BitNet integration
+        self._bitnet_available = False
+        if self.use_bitnet_integration and self._simulator is None:
+            self._bitnet_available = self._check_bitnet_installation()
+            if not self._bitnet_available:
+                logger.warning("BitNet installation not found. Falling back to mock implementation.")
+
+    def _check_bitnet_installation(self) -> bool:
+        """
+        Check whether a usable BitNet installation is available.
+
+        Returns:
+            True if BitNet is available, False otherwise
+        """
+        if not self.bitnet_path:
+            return False
+
+        return os.path.exists(os.path.join(self.bitnet_path, "run_inference.py"))
+
+    def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 512,
+        temperature: Optional[float] = None,
+        top_p: Optional[float] = None,
+        top_k: Optional[int] = None,
+        repetition_penalty: Optional[float] = None,
+        stop_sequences: Optional[List[str]] = None,
+        json_schema: Optional[Dict[str, Any]] = None,
+        grammar: Optional[Grammar] = None,
+        cancel_token: Optional[CancelToken] = None
+    ) -> str:
+        """
+        Generate text from the model.
+
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum number of tokens to generate
+            temperature: Temperature for sampling (overrides instance value)
+            top_p: Top-p for sampling (overrides instance value)
+            top_k: Top-k for sampling (overrides instance value)
+            repetition_penalty: Repetition penalty (overrides instance value)
+            stop_sequences: Sequences that stop generation
+            json_schema: JSON schema the output must match
+            grammar: Precompiled grammar the output must match (takes precedence over json_schema)
+            cancel_token: Token for abandoning generation (optional)
+
+        Returns:
+            Generated text
+
+        Raises:
+            CancelledError: If the token is cancelled or its deadline passes
+            ValueError: If a backend that cannot be constrained returns text
+                that does not match the grammar
+        """
+        check_cancelled(cancel_token)
+
+        if grammar is None and json_schema is not None:
+            grammar = get_grammar(json_schema)
+
+        temperature = self.temperature if temperature is None else temperature
+        top_p = self.top_p if top_p is None else top_p
+        top_k = self.top_k if top_k is None else top_k
+        repetition_penalty = self.repetition_penalty if repetition_penalty is None else repetition_penalty
+
+        key = (
+            prompt, max_tokens, temperature, top_p, top_k, repetition_penalty,
+            tuple(stop_sequences or ()), grammar.key if grammar is not None else None
+        )
+
+        # Count the call as active first so the model cannot be unloaded under it
+        with self._load_lock:
+            self._active += 1
+        try:
+            with span("generate", model=self.model_path, max_tokens=max_tokens) as generate_span:
+                # A replayed run never needs the model's resources
+                if get_replay() is None:
+                    self.load()
+                start = time.perf_counter()
+                text = self._inflight.do(
+                    key, self._generate, prompt, max_tokens, temperature, top_p, top_k,
+                    repetition_penalty, stop_sequences, grammar, cancel_token=cancel_token
+                )
+                if generate_span.enabled:
+                    self._record_generation(generate_span, text)
+                recorder = get_recorder()
+                if recorder is not None:
+                    recorder.record_generate(
+                        self.model_path, prompt, max_tokens, text, time.perf_counter() - start,
+                        generate_span.attributes.get("tokens"), generate_span.attributes.get("ttft")
+                    )
+                return text
+        finally:
+            with self._load_lock:
+                self._active -= 1
+                self.last_used = time.monotonic()
+
+    def _record_generation(self, generate_span: Span, text: str) -> None:
+        """
+        Add throughput details to a finished generation's span.
+
+        The NumPy backend reports prefill and decode phases. The other backends
+        return whole strings, so their first token arrives with the last one.
+
+        Args:
+            generate_span: Span of the generate call
+            text: Generated text
+        """
+        prefill = generate_span.child("prefill")
+        decode = generate_span.child("decode")
+
+        if decode is not None:
+            tokens = decode.attributes.get("tokens", 0)
+            decode_time = decode.duration
+        else:
+            tokens = len(self.tokenize(text))
+            decode_time = generate_span.duration
+
+        ttft = prefill.end - generate_span.start if prefill is not None else generate_span.duration
+        generate_span.set(
+            backend="replay" if get_replay() is not None else self.backend,
+            tokens=tokens,
+            ttft=ttft,
+            tokens_per_second=tokens / decode_time if decode_time > 0 else 0.0
+        )
+
+    @property
+    def is_loaded(self) -> bool:
+        """
+        Whether the model's resources are resident.
+        """
+        return self._loaded
+
+    @property
+    def in_use(self) -> bool:
+        """
+        Whether a generation is running on the model.
+        """
+        return self._active > 0
+
+    def load(self) -> None:
+        """
+        Make the model's resources resident.
+
+        Called automatically by generate, so a model that was unloaded to save
+        memory is transparently reloaded on its next use.
+        """
+        if self._loaded:
+            return
+
+        with self._load_lock:
+            if self._loaded:
+                return
+            self._load_resources()
+            self._loaded = True
+            self.last_used = time.monotonic()
+
+        logger.info(f"Loaded model {self.model_path} ({self.memory_footprint()} bytes)")
+
+        if self.on_load is not None:
+            self.on_load(self)
+
+    def unload(self) -> bool:
+        """
+        Release the model's resources.
+
+        Returns:
+            True if the model was unloaded, False if it was not loaded or is in use
+        """
+        with self._load_lock:
+            if not self._loaded or self._active > 0:
+                return False
+            self._release_resources()
+            self._loaded = False
+
+        logger.info(f"Unloaded model {self.model_path}")
+        return True
+
+    def _load_resources(self) -> None:
+        """
+        Load the resources needed for inference.
+
+        Ternary weight files are memory-mapped, which only reads their header,
+        and run on the NumPy backend. Other model files are read by BitNet's
+        own inference process, so there is nothing to keep resident here;
+        neither is there for a simulated backend.
+        """
+        if self._simulator is not None:
+            return
+
+        from bitnet_vc_builder.models.ternary import TernaryWeights, TERNARY_EXTENSION
+        from bitnet_vc_builder.models.numpy_backend import NumPyTransformer
+
+        if self.model_path.endswith(TERNARY_EXTENSION) and os.path.isfile(self.model_path):
+            self.weights = TernaryWeights(self.model_path)
+            if "config" in self.weights.metadata:
+                self._backend = NumPyTransformer(self.weights, self.kernel_type, self.context_size, self.num_threads, self.tokenizer)
+                self._drafter = self._create_drafter()
+                if self._drafter is not None:
+                    from bitnet_vc_builder.models.speculative import SpeculationGate
+
+                    self._gate = SpeculationGate.measure(self._backend, self._drafter, self.num_draft_tokens)
+            else:
+                logger.warning(f"{self.model_path} has no model configuration; falling back to mock implementation")
+
+    def _release_resources(self) -> None:
+        """
+        Release the resources loaded by _load_resources.
+        """
+        self._backend = None
+        self._drafter = None
+        self._gate = None
+        if self._draft_weights is not None:
+            self._draft_weights.close()
+            self._draft_weights = None
+        if self.weights is not None:
+            self.weights.close()
+            self.weights = None
+
+    def _create_drafter(self) -> Optional["Drafter"]:
+        """
+        Create the speculative decoding drafter for the NumPy backend.
+
+        Returns:
+            Drafter, or None if speculative decoding is disabled
+
+        Raises:
+            ValueError: If the draft model does not share the model's vocabulary
+        """
+        if not self.draft:
+            return None
+
+        from bitnet_vc_builder.models.ternary import TernaryWeights
+        from bitnet_vc_builder.models.numpy_backend import NumPyTransformer
+        from bitnet_vc_builder.models.speculative import PromptLookupDrafter, DraftModelDrafter
+
+        if self.draft == "ngram":
+            return PromptLookupDrafter()
+
+        self._draft_weights = TernaryWeights(self.draft)
+        draft = NumPyTransformer(self._draft_weights, self.kernel_type, self.context_size, self.num_threads, self.tokenizer)
+        if draft.vocab_size != self._backend.vocab_size:
+            self._draft_weights.close()
+            self._draft_weights = None
+            raise ValueError(f"Draft model vocabulary size {draft.vocab_size} does not match {self._backend.vocab_size}")
+        return DraftModelDrafter(draft)
+
+    @property
+    def tokenizer(self) -> Optional[BPETokenizer]:
+        """
+        BPE tokenizer read from the model directory (None if the model has none).
+        """
+        if not self._tokenizer_checked:
+            with self._tokenizer_lock:
+                if not self._tokenizer_checked:
+                    path = find_tokenizer(self.model_path)
+                    if path is not None:
+                        try:
+                            self._tokenizer = BPETokenizer.from_file(path)
+                        except (OSError, ValueError, KeyError) as e:
+                            logger.warning(f"Could not load tokenizer {path}: {e}")
+                    self._tokenizer_checked = True
+        return self._tokenizer
+
+    @property
+    def backend(self) -> str:
+        """
+        Name of the inference backend ("simulated", "numpy", "bitnet" or "mock").
+
+        Ternary weight files report "numpy" once the model is loaded.
+        """
+        if self._simulator is not None:
+            return "simulated"
+        if self._backend is not None:
+            return "numpy"
+        if self._bitnet_available:
+            return "bitnet"
+        return "mock"
+
+    @property
+    def supports_grammar(self) -> bool:
+        """
+        Whether generation is held to a grammar while decoding.
+
+        Only the NumPy backend samples under grammar masks. The other backends
+        return whole strings that are checked afterwards, so output missing the
+        grammar fails generation instead. Loads the model to find out.
+        """
+        if self._simulator is not None or get_replay() is not None:
+            return False
+        self.load()
+        return self._backend is not None
+
+    def memory_footprint(self) -> int:
+        """
+        Estimate the memory the model occupies while loaded.
+
+        Returns:
+            Size in bytes (the size of the model file or directory, 0 if it does not exist)
+        """
+        if os.path.isfile(self.model_path):
+            return os.path.getsize(self.model_path)
+
+        total = 0
+        if os.path.isdir(self.model_path):
+            for root, _, files in os.walk(self.model_path):
+                for filename in files:
+                    total += os.path.getsize(os.path.join(root, filename))
+        return total
+
+    def _generate(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        top_p: float,
+        top_k: int,
+        repetition_penalty: float,
+        stop_sequences: Optional[List[str]],
+        grammar: Optional[Grammar],
+        cancel_token: Optional[CancelToken] = None
+    ) -> str:
+        """
+        Run one generation with resolved sampling parameters.
+
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum number of tokens to generate
+            temperature: Temperature for sampling
+            top_p: Top-p for sampling
+            top_k: Top-k for sampling
+            repetition_penalty: Repetition penalty
+            stop_sequences: Sequences that stop generation
+            grammar: Grammar the output must match
+            cancel_token: Token for abandoning generation
+
+        Returns:
+            Generated text
+
+        Raises:
+            ValueError: If a backend that cannot be constrained returns text
+                that does not match the grammar
+        """
+        # Whether the backend sampled under the grammar's token masks
+        constrained = False
+
+        replay = get_replay()
+        if replay is not None:
+            text = replay.generate(self.model_path, prompt, max_tokens, cancel_token)
+        elif self._simulator is not None:
+            text = self._simulator.generate(prompt, max_tokens, self._mock_generate, cancel_token)
+        elif self._drafter is not None and self._gate.allows(self._drafter):
+            from bitnet_vc_builder.models.speculative import speculative_generate
+
+            text = speculative_generate(
+                self._backend, self._drafter, prompt, max_tokens, temperature, top_k, top_p, repetition_penalty,
+                stop_sequences=stop_sequences, cancel_token=cancel_token, num_draft_tokens=self.num_draft_tokens,
+                grammar=grammar
+            )
+            constrained = True
+        elif self._backend is not None:
+            text = self._backend.generate(
+                prompt, max_tokens, temperature, top_k, top_p, repetition_penalty,
+                stop_sequences=stop_sequences, cancel_token=cancel_token, grammar=grammar
+            )
+            constrained = True
+        elif self._bitnet_available:
+            text = self._bitnet_generate(prompt, max_tokens, temperature, top_p, top_k, repetition_penalty, cancel_token)
+        else:
+            text = self._mock_generate(prompt, max_tokens)
+            check_cancelled(cancel_token)
+
+        text = self._apply_stop_sequences(text, stop_sequences)
+
+        if grammar is not None and not constrained:
+            # The other backends return whole strings rather than sampling tokens
+            # here, so their output can only be checked, never constrained
+            text = grammar.check(text)
+
+        return text
+
+    def _bitnet_generate(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        top_p: float,
+        top_k: int,
+        repetition_penalty: float,
+        cancel_token: Optional[CancelToken] = None
+    ) -> str:
+        """
+        Generate text using the BitNet installation.
+
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum number of tokens to generate
+            temperature: Temperature for sampling
+            top_p: Top-p for sampling
+            top_k: Top-k for sampling
+            repetition_penalty: Repetition penalty
+            cancel_token: Token for abandoning generation (the inference process is killed)
+
+        Returns:
+            Generated text
+        """
+        command = [
+            sys.executable,
+            os.path.join(self.bitnet_path, "run_inference.py"),
+            "-m", self.model_path,
+            "-p", prompt,
+            "-n", str(max_tokens),
+            "-t", str(self.num_threads),
+            "-c", str(self.context_size),
+            "-temp", str(temperature)
+        ]
+
+        process = subprocess.Popen(
+            command,
+            cwd=self.bitnet_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+
+        try:
+            if cancel_token is None:
+                output, stderr = process.communicate()
+            else:
+                # Poll so an abandoned request stops using CPU straight away
+                while True:
+                    try:
+                        output, stderr = process.communicate(timeout=0.1)
+                        break
+                    except subprocess.TimeoutExpired:
+                        if cancel_token.cancelled:
+                            process.kill()
+                            process.communicate()
+                            cancel_token.raise_if_cancelled()
+        except BaseException:
+            if process.poll() is None:
+                process.kill()
+                process.communicate()
+            raise
+
+        if process.returncode != 0:
+            logger.error(f"Error running BitNet inference: {stderr}")
+            raise RuntimeError(f"BitNet inference failed: {stderr}")
+
+        # run_inference.py echoes the prompt before the completion
+        if output.startswith(prompt):
+            output = output[len(prompt):]
+
+        return output.strip()
+
+    def _mock_generate(self, prompt: str, max_tokens: int) -> str:
+        """
+        Generate a mock response for development and testing.
+
+        The response follows the latest request: it answers with a tool's
+        result once there is one, writes a plan or synthesis when a team asks
+        for one, calls the calculator or search tool when the request calls
+        for it and the tool is available, and otherwise answers from memory.
+
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum number of tokens to generate
+
+        Returns:
+            Mock response in the ReAct format understood by virtual co-workers
+        """
+        # Only look at the most recent user turn so tool descriptions in the
+        # system prompt do not trigger tool calls
+        user_turns = re.split(r"(?:^|\n)User: ", prompt)
+        latest = user_turns[-1]
+        request = re.split(r"\n\n(?:Assistant|System): ", latest)[0].strip()
+        lowered = request.lower()
+
+        # Tools listed in a virtual co-worker's system prompt; any tool for a bare prompt
+        available = None
+        if "To use a tool, use the following format:" in prompt:
+            tools_section = prompt.split("To use a tool, use the following format:")[0]
+            available = set(re.findall(r"^- ([\w-]+): ", tools_section, re.MULTILINE))
+
+        def can_call(tool_name: str) -> bool:
+            return available is None or tool_name in available
+
+        expression = re.search(r"\d+(?:\.\d+)?(?:\s*[-+*/]\s*\(?\s*\d+(?:\.\d+)?\s*\)?)+", request)
+
+        # A tool already answered the latest request
+        tool_results = latest.split("Tool result: ")
+        if len(tool_results) > 1:
+            tool_result = tool_results[-1].split("\n\n")[0].strip()
+            response = f"Final Answer: {tool_result}"
+        elif "plan" in lowered and "Available virtual co-workers:" in request:
+            response = f"Final Answer: {self._mock_plan(request)}"
+        elif "synthesize" in lowered and "Here are the results from each virtual co-worker:" in request:
+            results = request.split("Here are the results from each virtual co-worker:")[1].split("Please synthesize")[0]
+            response = f"Final Answer: {' '.join(results.split())}"
+        elif "calculat" in lowered and expression and can_call("calculator"):
+            response = f"I need to calculate this.\nAction: calculator\nAction Input: {{\"expression\": \"{expression.group(0)}\"}}"
+        elif "search" in lowered and can_call("search"):
+            response = f"I need to search for information.\nAction: search\nAction Input: {{\"query\": \"{self._escape(request)}\"}}"
+        elif "analyze" in lowered and can_call("analyze"):
+            data = request.split("\n\n")[0].strip()
+            response = f"I need to analyze this data.\nAction: analyze\nAction Input: {{\"data\": \"{self._escape(data)}\"}}"
+        elif "calculat" in lowered and expression and self._evaluate(expression.group(0)) is not None:
+            response = f"Final Answer: {expression.group(0)} = {self._evaluate(expression.group(0))}"
+        elif "summarize" in lowered:
+            response = "Final Answer: Here is a summary of the information provided."
+        else:
+            remembered = self._recall(prompt, lowered)
+            if remembered:
+                response = f"Final Answer: {remembered}"
+            else:
+                response = f"Final Answer: This is a mock response to: {request.split(chr(10))[0].strip()}"
+
+        # Respect max_tokens using whitespace tokens
+        words = response.split(" ")
+        if len(words) > max_tokens:
+            response = " ".join(words[:max_tokens])
+
+        return response
+
+    @staticmethod
+    def _mock_plan(request: str) -> str:
+        """
+        Write a team plan for the mock: one subtask per part of the task joined
+        by "and", assigned to the listed virtual co-workers in turn.
+
+        Args:
+            request: Planning request
+
+        Returns:
+            Plan as a JSON array
+        """
+        lines = [line.strip() for line in request.splitlines()]
+        task = next((line[len("Task:"):].strip() for line in lines if line.startswith("Task:")), lines[0])
+        names_index = lines.index("Available virtual co-workers:") + 1
+        names = [name.strip() for name in lines[names_index].split(",") if name.strip()] if names_index < len(lines) else []
+        if not names:
+            return "[]"
+
+        plan = []
+        for i, subtask in enumerate(part.strip() for part in re.split(r"\s+and\s+", task) if part.strip()):
+            step: Dict[str, Any] = {"subtask": subtask, "agent_name": names[i % len(names)]}
+            if '"depends_on"' in request:
+                step["depends_on"] = []
+            plan.append(step)
+        return json.dumps(plan)
+
+    @staticmethod
+    def _evaluate(expression: str) -> Optional[float]:
+        """
+        Evaluate an arithmetic expression for the mock.
+
+        Args:
+            expression: Numbers joined by +, -, * and / (with parentheses)
+
+        Returns:
+            Value of the expression (an int when whole), or None if it cannot be evaluated
+        """
+        operators = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+
+        def evaluate(node: ast.AST) -> float:
+            if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+                return node.value
+            if isinstance(node, ast.BinOp) and type(node.op) in operators:
+                return operators[type(node.op)](evaluate(node.left), evaluate(node.right))
+            raise ValueError(f"Unsupported expression: {expression}")
+
+        try:
+            value = evaluate(ast.parse(expression, mode="eval").body)
+        except (SyntaxError, ValueError, ZeroDivisionError):
+            return None
+        return int(value) if float(value).is_integer() else value
+
+    @staticmethod
+    def _recall(prompt: str, request: str) -> Optional[str]:
+        """
+        Find the memory item in a prompt that shares the most words with a request.
+
+        Args:
+            prompt: Input prompt, with its memory context if any
+            request: Latest request, in lowercase
+
+        Returns:
+            Memory item, or None if no item shares a word of four or more letters
+        """
+        if "Context from memory:" not in prompt:
+            return None
+
+        context = re.split(r"\n\n(?:User|Assistant|System): ", prompt.split("Context from memory:", 1)[1])[0]
+        words = set(re.findall(r"[a-z]{4,}", request))
+        best, best_overlap = None, 0
+        for item in re.split(r"\n\n(?=\[)", context.strip()):
+            content = re.sub(r"^\[[^\]]*\]\s*", "", item).strip()
+            overlap = len(words & set(re.findall(r"[a-z]{4,}", content.lower())))
+            if overlap > best_overlap:
+                best, best_overlap = content, overlap
+        return best
+
+    @staticmethod
+    def _escape(text: str) -> str:
+        """
+        Escape text for embedding in a JSON string literal.
+
+        Args:
+            text: Text to escape
+
+        Returns:
+            Escaped text
+        """
+        return text.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", " ")
+
+    @staticmethod
+    def _apply_stop_sequences(text: str, stop_sequences: Optional[List[str]]) -> str:
+        """
+        Truncate text at the first stop sequence.
+
+        Args:
+            text: Generated text
+            stop_sequences: Sequences that stop generation
+
+        Returns:
+            Truncated text
+        """
+        if not stop_sequences:
+            return text
+
+        cut = len(text)
+        for stop in stop_sequences:
+            if not stop:
+                continue
+            idx = text.find(stop)
+            if idx != -1 and idx < cut:
+                cut = idx
+
+        return text[:cut]
+
+    def tokenize(self, text: str) -> List[int]:
+        """
+        Tokenize text.
+
+        Args:
+            text: Text to tokenize
+
+        Returns:
+            List of token IDs
+        """
+        if self.tokenizer is not None:
+            return self.tokenizer.encode(text)
+
+        # Simple whitespace tokenization for models without a tokenizer
+        return [hash(word) % 32000 for word in text.split()]
+
+    def tokenize_batch(self, texts: List[str]) -> List[List[int]]:
+        """
+        Tokenize several texts.
+
+        Args:
+            texts: Texts to tokenize
+
+        Returns:
+            List of token IDs for each text
+        """
+        if self.tokenizer is not None:
+            return self.tokenizer.encode_batch(texts)
+        return [self.tokenize(text) for text in texts]
+
+    def get_token_count(self, text: str) -> int:
+        """
+        Count the tokens of a text.
+
+        Repeated texts such as system prompts are answered from the
+        tokenizer's cache.
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Number of tokens
+        """
+        return len(self.tokenize(text))
+
+    def detokenize(self, tokens: List[int]) -> str:
+        """
+        Detokenize token IDs.
+
+        Args:
+            tokens: List of token IDs
+
+        Returns:
+            Detokenized text
+        """
+        if self.tokenizer is not None:
+            return self.tokenizer.decode(tokens)
+        return " ".join(f"<token_{token}>" for token in tokens)
+
+    def get_model_info(self) -> Dict[str, Any]:
+        """
+        Get model information.
+
+        Returns:
+            Dictionary with model information
+        """
+        return {
+            "model_path": self.model_path,
+            "kernel_type": self.kernel_type,
+            "bitnet_path": self.bitnet_path,
+            "num_threads": self.num_threads,
+            "context_size": self.context_size,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "top_k": self.top_k,
+            "repetition_penalty": self.repetition_penalty,
+            "use_bitnet_integration": self.use_bitnet_integration,
+            "backend": self.backend,
+            "is_mock": self.backend in ("mock", "simulated"),
+            "draft": self.draft,
+            "simulation": self.simulation
+        }
+
+    def get_speculative_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Get speculative decoding statistics.
+
+        Returns:
+            Dictionary with proposed and accepted draft token counts, the
+            measured cost of a pass and the expected speedup, or None if
+            speculative decoding is not active
+        """
+        if self._drafter is None:
+            return None
+        stats = self._drafter.get_stats()
+        stats.update(self._gate.get_stats(self._drafter))
+        return stats
+
+    def __str__(self) -> str:
+        """
+        Get string representation of the model.
+
+        Returns:
+            String representation
+        """
+        return f"BitNetModel(model_path='{self.model_path}', kernel_type='{self.kernel_type}', use_bitnet_integration={self.use_bitnet_integration})"
@@ -0,0 +1,819 @@
+"""
+Grammar-constrained decoding for BitNet Virtual Co-worker Builder.
+
+A JSON schema is compiled into an incremental recognizer that can tell, for any
+prefix of generated text, which continuations keep the output valid. Backends
+that sample tokens in process (the NumPy backend and speculative decoding) use
+it to mask tokens that would break the structure, so the output matches by
+construction. Backends that only return finished text cannot be steered; their
+output is checked and rejected if it does not match, never rewritten.
+"""
+
+import re
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Hashable, Optional, Tuple, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Recognizer state: an immutable stack of frames, so states can be shared,
+# compared and used as cache keys
+State = Tuple[Tuple[Any, ...], ...]
+
+_WHITESPACE = " \t\n\r"
+_NUMBER = re.compile(r"-?(0|[1-9][0-9]*)(\.[0-9]+)?([eE][+-]?[0-9]+)?\Z")
+_INTEGER = re.compile(r"-?(0|[1-9][0-9]*)\Z")
+_LITERALS = {"t": "true", "f": "false", "n": "null"}
+_HEX = "0123456789abcdefABCDEF"
+_ALL_TYPES = frozenset(["object", "array", "string", "number", "integer", "boolean", "null"])
+
+class _Node:
+    """
+    Compiled schema node.
+    """
+
+    def __init__(self):
+        self.types = _ALL_TYPES
+        self.properties: "OrderedDict[str, int]" = OrderedDict()
+        self.required: Tuple[str, ...] = ()
+        self.additional: Optional[int] = None  # Node for extra keys, or None if not allowed
+        self.items: Optional[int] = None
+        self.enum: Optional[Tuple[str, ...]] = None
+
+class Grammar:
+    """
+    Output format a model enforces while generating.
+
+    Backends that sample tokens call constraint() once per generation and
+    mask every step with it. Backends that return whole strings pass their
+    output to check() instead.
+    """
+
+    @property
+    def key(self) -> Hashable:
+        """
+        Identity of the grammar: grammars with equal keys accept the same text.
+
+        Identical generations under grammars with equal keys are coalesced.
+        By default only the grammar itself has its key.
+        """
+        return id(self)
+
+    def constraint(self) -> "GrammarConstraint":
+        """
+        Create a constraint that tracks the state of one generation.
+
+        Returns:
+            Constraint with mask(vocab) (a list of booleans, or None when every
+            token is allowed), advance(text) and done
+        """
+        raise NotImplementedError
+
+    def check(self, text: str) -> str:
+        """
+        Check text generated without the constraint.
+
+        Args:
+            text: Generated text
+
+        Returns:
+            The text, unchanged
+
+        Raises:
+            ValueError: If the text does not match
+        """
+        raise NotImplementedError
+
+class JSONSchemaGrammar(Grammar):
+    """
+    Incremental recognizer for JSON documents matching a schema.
+
+    Supports the subset of JSON Schema used for tool inputs and plans: ``type``
+    (including lists of types), ``properties``, ``required``,
+    ``additionalProperties``, ``items`` and string ``enum``. A schema of None
+    accepts any JSON value.
+    """
+
+    def __init__(self, schema: Optional[Dict[str, Any]] = None, cache_size: int = 4096):
+        """
+        Initialize grammar.
+
+        Args:
+            schema: JSON schema (None accepts any JSON value)
+            cache_size: Maximum number of token masks to cache
+        """
+        self.schema = schema
+        self._key = ("json", json.dumps(schema, sort_keys=True))
+        # Node 0 accepts any value; objects under it accept any key
+        any_node = _Node()
+        any_node.additional = 0
+        self._nodes: List[_Node] = [any_node]
+        self._any = 0
+        self._root = self._compile(schema or {})
+        self._cache_size = cache_size
+        self._mask_cache: "OrderedDict[Tuple[State, int], List[bool]]" = OrderedDict()
+
+    def _compile(self, schema: Dict[str, Any]) -> int:
+        """
+        Compile a schema into nodes.
+
+        Args:
+            schema: JSON schema
+
+        Returns:
+            Index of the root node
+        """
+        node = _Node()
+        index = len(self._nodes)
+        self._nodes.append(node)
+
+        schema_type = schema.get("type")
+        if isinstance(schema_type, str):
+            node.types = frozenset([schema_type])
+        elif isinstance(schema_type, list):
+            node.types = frozenset(schema_type)
+
+        if "enum" in schema:
+            node.enum = tuple(json.dumps(value)[1:-1] for value in schema["enum"] if isinstance(value, str))
+            node.types = frozenset(["string"])
+
+        for name, subschema in schema.get("properties", {}).items():
+            node.properties[name] = self._compile(subschema if isinstance(subschema, dict) else {})
+        node.required = tuple(name for name in schema.get("required", []) if name in node.properties)
+
+        additional = schema.get("additionalProperties", True)
+        if additional is True:
+            node.additional = self._any
+        elif isinstance(additional, dict):
+            node.additional = self._compile(additional)
+
+        if "items" in schema and isinstance(schema["items"], dict):
+            node.items = self._compile(schema["items"])
+
+        return index
+
+    @property
+    def key(self) -> Hashable:
+        """
+        Identity of the grammar, from its schema.
+        """
+        return self._key
+
+    @property
+    def initial_state(self) -> State:
+        """
+        State before any text has been generated.
+        """
+        return (("value", self._root),)
+
+    def advance(self, state: Optional[State], text: str) -> Optional[State]:
+        """
+        Advance the recognizer over text.
+
+        Args:
+            state: Current state
+            text: Text to consume
+
+        Returns:
+            New state, or None if the text is not a valid continuation
+        """
+        for char in text:
+            if state is None:
+                return None
+            state = self._step(state, char)
+        return state
+
+    def is_accepting(self, state: Optional[State]) -> bool:
+        """
+        Whether the text consumed so far is a complete document.
+
+        Args:
+            state: Current state
+
+        Returns:
+            True if the document is complete
+        """
+        if state is None:
+            return False
+        if not state:
+            return True
+        return len(state) == 1 and state[0][0] == "num" and self._number_complete(state[0])
+
+    def allowed_tokens(self, state: State, vocab: Sequence[str]) -> List[bool]:
+        """
+        Compute which tokens may be generated next.
+
+        Masks are cached per state, so repeated structures such as the keys of
+        each plan step are only computed once.
+
+        Args:
+            state: Current state
+            vocab: Token strings indexed by token ID
+
+        Returns:
+            List of booleans, True where the token is allowed
+        """
+        key = (self._mask_key(state), id(vocab))
+        mask = self._mask_cache.get(key)
+        if mask is not None:
+            self._mask_cache.move_to_end(key)
+            return mask
+
+        accepting = self.is_accepting(state)
+        mask = [
+            (self.advance(state, token) is not None) if token else accepting
+            for token in vocab
+        ]
+
+        self._mask_cache[key] = mask
+        if len(self._mask_cache) > self._cache_size:
+            self._mask_cache.popitem(last=False)
+        return mask
+
+    def _mask_key(self, state: State) -> State:
+        """
+        Reduce a state to what decides which tokens are allowed.
+
+        Inside a free-form string value (no enum, no pending escape) every
+        continuation is judged the same way whatever the string holds so far,
+        so those states share one cached mask instead of one per prefix.
+
+        Args:
+            state: Recognizer state
+
+        Returns:
+            State to cache the mask under
+        """
+        if state:
+            frame = state[-1]
+            if frame[0] == "str" and frame[4] is None and frame[3] == 0 and frame[2] and self._nodes[frame[1]].enum is None:
+                return state[:-1] + (("str", frame[1], "", 0, None),)
+        return state
+
+    def constraint(self) -> "GrammarConstraint":
+        """
+        Create a constraint that tracks the state of one generation.
+
+        Returns:
+            GrammarConstraint instance
+        """
+        return GrammarConstraint(self)
+
+    def matches(self, text: str) -> bool:
+        """
+        Whether text is a complete document matching the schema.
+
+        Args:
+            text: Text to check (surrounding whitespace is allowed)
+
+        Returns:
+            True if the text matches
+        """
+        return self.is_accepting(self.advance(self.initial_state, text))
+
+    def check(self, text: str) -> str:
+        """
+        Check text generated without the constraint.
+
+        Args:
+            text: Generated text
+
+        Returns:
+            The text, unchanged
+
+        Raises:
+            ValueError: If the text is not a document matching the schema
+        """
+        if not self.matches(text):
+            raise ValueError(f"Output does not match the JSON schema: {text!r}")
+        return text
+
+    def complete(self, state: State) -> str:
+        """
+        Compute the shortest closing text that makes the document valid.
+
+        Args:
+            state: Current state
+
+        Returns:
+            Closing text
+        """
+        out: List[str] = []
+
+        while not self.is_accepting(state):
+            closing = self._closing_text(state)
+            next_state = self.advance(state, closing)
+            if next_state is None:
+                raise RuntimeError(f"Grammar could not complete state {state!r}")
+            out.append(closing)
+            state = next_state
+
+        return "".join(out)
+
+    # Recognizer
+
+    def _step(self, state: State, char: str) -> Optional[State]:
+        """
+        Consume one character.
+
+        Args:
+            state: Current state
+            char: Character to consume
+
+        Returns:
+            New state, or None if the character is not allowed
+        """
+        if not state:
+            # Document complete: only trailing whitespace is allowed
+            return state if char in _WHITESPACE else None
+
+        frame = state[-1]
+        rest = state[:-1]
+        kind = frame[0]
+
+        if kind == "value":
+            if char in _WHITESPACE:
+                return state
+            return self._start_value(rest, frame[1], char)
+
+        if kind == "str":
+            return self._step_string(rest, frame, char)
+
+        if kind == "num":
+            _, node_index, buf = frame
+            candidate = buf + char
+            if self._number_prefix(node_index, candidate):
+                return rest + (("num", node_index, candidate),)
+            if not self._number_complete(frame):
+                return None
+            # The number ended: the character belongs to the enclosing frame
+            return self._step(rest, char)
+
+        if kind == "lit":
+            remaining = frame[1]
+            if char != remaining[0]:
+                return None
+            return rest if len(remaining) == 1 else rest + (("lit", remaining[1:]),)
+
+        if kind == "obj":
+            return self._step_object(rest, frame, char)
+
+        if kind == "arr":
+            return self._step_array(rest, frame, char)
+
+        return None
+
+    def _start_value(self, rest: State, node_index: int, char: str) -> Optional[State]:
+        """
+        Start a value of the given schema node.
+
+        Args:
+            rest: Enclosing frames
+            node_index: Schema node of the value
+            char: First character of the value
+
+        Returns:
+            New state, or None if the value cannot start with this character
+        """
+        node = self._nodes[node_index]
+        types = node.types
+
+        if char == '"' and "string" in types:
+            return rest + (("str", node_index, "", 0, None),)
+        if char == "{" and "object" in types:
+            return rest + (("obj", node_index, "key_or_end", frozenset(), None),)
+        if char == "[" and "array" in types:
+            return rest + (("arr", node_index, "value_or_end"),)
+        if (char == "-" or char.isdigit()) and ("number" in types or "integer" in types):
+            if self._number_prefix(node_index, char):
+                return rest + (("num", node_index, char),)
+            return None
+        if char in _LITERALS:
+            literal = _LITERALS[char]
+            if (literal == "null" and "null" in types) or (literal != "null" and "boolean" in types):
+                return rest + (("lit", literal[1:]),)
+        return None
+
+    def _step_string(self, rest: State, frame: Tuple[Any, ...], char: str) -> Optional[State]:
+        """
+        Consume one character of a string.
+
+        Args:
+            rest: Enclosing frames
+            frame: String frame (kind, node, text so far, escape state, key owner)
+            char: Character to consume
+
+        Returns:
+            New state, or None if the character is not allowed
+        """
+        _, _, buf, escape, owner = frame
+
+        if escape == 1:
+            if char == "u":
+                return self._extend_string(rest, frame, buf + char, 2)
+            if char not in '"\\/bfnrt':
+                return None
+            return self._extend_string(rest, frame, buf + char)
+        if escape >= 2:
+            if char not in _HEX:
+                return None
+            if escape == 5:
+                return self._extend_string(rest, frame, buf + char)
+            return self._extend_string(rest, frame, buf + char, escape + 1)
+
+        if char == "\\":
+            return self._extend_string(rest, frame, buf + char, 1)
+        if char == '"':
+            allowed = self._allowed_strings(rest, frame)
+            if allowed is not None and buf not in allowed:
+                return None
+            if owner is None:
+                return rest
+            # Key finished: the object now waits for a colon
+            obj = rest[-1]
+            return rest[:-1] + (("obj", obj[1], "colon", obj[3], buf),)
+        if ord(char) < 0x20:
+            return None
+        return self._extend_string(rest, frame, buf + char)
+
+    def _extend_string(self, rest: State, frame: Tuple[Any, ...], buf: str, escape: int = 0) -> Optional[State]:
+        """
+        Extend a string if it is still a prefix of an allowed value.
+
+        Args:
+            rest: Enclosing frames
+            frame: String frame
+            buf: Extended string text
+            escape: Escape state after the extension
+
+        Returns:
+            New state, or None if no allowed value starts with the text
+        """
+        allowed = self._allowed_strings(rest, frame)
+        if allowed is not None and not any(value.startswith(buf) for value in allowed):
+            return None
+        return rest + (("str", frame[1], buf, escape, frame[4]),)
+
+    def _allowed_strings(self, rest: State, frame: Tuple[Any, ...]) -> Optional[Tuple[str, ...]]:
+        """
+        Get the closed set of values a string may take.
+
+        Args:
+            rest: Enclosing frames
+            frame: String frame
+
+        Returns:
+            Allowed values, or None if any string is allowed
+        """
+        if frame[4] is None:
+            return self._nodes[frame[1]].enum
+
+        # Object key: unseen declared properties, unless extra keys are allowed
+        obj = rest[-1]
+        node = self._nodes[obj[1]]
+        if node.additional is not None:
+            return None
+        return tuple(name for name in node.properties if name not in obj[3])
+
+    def _step_object(self, rest: State, frame: Tuple[Any, ...], char: str) -> Optional[State]:
+        """
+        Consume one structural character of an object.
+
+        Args:
+            rest: Enclosing frames
+            frame: Object frame (kind, node, phase, seen keys, current key)
+            char: Character to consume
+
+        Returns:
+            New state, or None if the character is not allowed
+        """
+        if char in _WHITESPACE:
+            return rest + (frame,)
+
+        _, node_index, phase, seen, key = frame
+        node = self._nodes[node_index]
+
+        if phase in ("key_or_end", "key") and char == '"':
+            if not self._has_free_key(node, seen):
+                return None
+            return rest + (frame, ("str", node_index, "", 0, "key"))
+
+        if phase in ("key_or_end", "comma_or_end") and char == "}":
+            if any(name not in seen for name in node.required):
+                return None
+            return rest
+
+        if phase == "comma_or_end" and char == ",":
+            if not self._has_free_key(node, seen):
+                return None
+            return rest + (("obj", node_index, "key", seen, None),)
+
+        if phase == "colon" and char == ":":
+            value_node = node.properties.get(key, node.additional)
+            return rest + (("obj", node_index, "comma_or_end", seen | frozenset([key]), None), ("value", value_node))
+
+        return None
+
+    @staticmethod
+    def _has_free_key(node: _Node, seen: frozenset) -> bool:
+        """
+        Whether another key may be added to an object.
+
+        Args:
+            node: Object schema node
+            seen: Keys already present
+
+        Returns:
+            True if another key is allowed
+        """
+        return node.additional is not None or any(name not in seen for name in node.properties)
+
+    def _step_array(self, rest: State, frame: Tuple[Any, ...], char: str) -> Optional[State]:
+        """
+        Consume one structural character of an array.
+
+        Args:
+            rest: Enclosing frames
+            frame: Array frame (kind, node, phase)
+            char: Character to consume
+
+        Returns:
+            New state, or None if the character is not allowed
+        """
+        if char in _WHITESPACE:
+            return rest + (frame,)
+
+        _, node_index, phase = frame
+        node = self._nodes[node_index]
+        item_node = node.items if node.items is not None else self._any
+
+        if char == "]":
+            return rest
+        if char == "," and phase == "comma_or_end":
+            return rest + (("arr", node_index, "comma_or_end"), ("value", item_node))
+        if phase == "value_or_end":
+            return self._start_value(rest + (("arr", node_index, "comma_or_end"),), item_node, char)
+
+        return None
+
+    def _number_prefix(self, node_index: int, text: str) -> bool:
+        """
+        Whether text can still grow into a valid number for the node.
+
+        Args:
+            node_index: Schema node
+            text: Number text so far
+
+        Returns:
+            True if the text is a valid number prefix
+        """
+        node = self._nodes[node_index]
+        pattern = _INTEGER if "number" not in node.types else _NUMBER
+        return bool(pattern.match(text) or pattern.match(text + "0"))
+
+    def _number_complete(self, frame: Tuple[Any, ...]) -> bool:
+        """
+        Whether a number frame holds a complete number.
+
+        Args:
+            frame: Number frame
+
+        Returns:
+            True if the number is complete
+        """
+        node = self._nodes[frame[1]]
+        pattern = _INTEGER if "number" not in node.types else _NUMBER
+        return bool(pattern.match(frame[2]))
+
+    # Completion
+
+    def _closing_text(self, state: State) -> str:
+        """
+        Compute text that closes the innermost open frame.
+
+        Args:
+            state: Current state
+
+        Returns:
+            Closing text
+        """
+        frame = state[-1]
+        kind = frame[0]
+
+        if kind == "value":
+            return self._default_value(frame[1])
+
+        if kind == "lit":
+            return frame[1]
+
+        if kind == "num":
+            if self._number_complete(frame):
+                return self._closing_text(state[:-1])
+            return "0"
+
+        if kind == "str":
+            _, _, buf, escape, _ = frame
+            if escape == 1:
+                return "n"
+            if escape >= 2:
+                return "0" * (6 - escape)
+            allowed = self._allowed_strings(state[:-1], frame)
+            if allowed:
+                for value in allowed:
+                    if value.startswith(buf):
+                        return value[len(buf):] + '"'
+            return '"'
+
+        if kind == "obj":
+            _, node_index, phase, seen, key = frame
+            node = self._nodes[node_index]
+            if phase == "colon":
+                return ":" + self._default_value(node.properties.get(key, node.additional))
+            missing = [name for name in node.required if name not in seen]
+            if phase == "key":
+                unseen = missing or [name for name in node.properties if name not in seen]
+                if not unseen:
+                    return '"":' + self._default_value(node.additional)
+                return f"{json.dumps(unseen[0])}:{self._default_value(node.properties[unseen[0]])}"
+            if missing:
+                prefix = "," if phase == "comma_or_end" else ""
+                return f"{prefix}{json.dumps(missing[0])}:{self._default_value(node.properties[missing[0]])}"
+            return "}"
+
+        if kind == "arr":
+            return "]"
+
+        raise RuntimeError(f"Unknown frame {frame!r}")
+
+    def _default_value(self, node_index: int) -> str:
+        """
+        Build the shortest valid value for a schema node.
+
+        Args:
+            node_index: Schema node
+
+        Returns:
+            JSON text
+        """
+        node = self._nodes[node_index]
+        types = node.types
+
+        if node.enum:
+            return f'"{node.enum[0]}"'
+        if "null" in types:
+            return "null"
+        if "string" in types:
+            return '""'
+        if "integer" in types or "number" in types:
+            return "0"
+        if "boolean" in types:
+            return "false"
+        if "array" in types:
+            return "[]"
+        if "object" in types:
+            fields = ",".join(f"{json.dumps(name)}:{self._default_value(node.properties[name])}" for name in node.required)
+            return "{" + fields + "}"
+        return "null"
+
+class GrammarConstraint:
+    """
+    Tracks the grammar state of a single generation.
+
+    A sampler calls mask() before picking each token and advance() with the
+    text of the chosen token, and stops once done is True.
+    """
+
+    def __init__(self, grammar: JSONSchemaGrammar):
+        """
+        Initialize constraint.
+
+        Args:
+            grammar: Grammar to enforce
+        """
+        self.grammar = grammar
+        self.state: State = grammar.initial_state
+
+    def allows(self, text: str) -> bool:
+        """
+        Whether text is a valid continuation.
+
+        Args:
+            text: Candidate text
+
+        Returns:
+            True if the text is allowed
+        """
+        return self.grammar.advance(self.state, text) is not None
+
+    def advance(self, text: str) -> None:
+        """
+        Consume generated text.
+
+        Args:
+            text: Generated text
+
+        Raises:
+            ValueError: If the text is not a valid continuation
+        """
+        state = self.grammar.advance(self.state, text)
+        if state is None:
+            raise ValueError(f"Text {text!r} violates the grammar")
+        self.state = state
+
+    def mask(self, vocab: Sequence[str]) -> List[bool]:
+        """
+        Compute which tokens may be generated next.
+
+        Args:
+            vocab: Token strings indexed by token ID
+
+        Returns:
+            List of booleans, True where the token is allowed
+        """
+        return self.grammar.allowed_tokens(self.state, vocab)
+
+    @property
+    def is_complete(self) -> bool:
+        """
+        Whether a complete document has been generated.
+        """
+        return self.grammar.is_accepting(self.state)
+
+    @property
+    def done(self) -> bool:
+        """
+        Whether the document is closed, so only whitespace could follow.
+        """
+        return not self.state
+
+    def complete(self) -> str:
+        """
+        Compute the shortest text that completes the document.
+
+        Returns:
+            Closing text
+        """
+        return self.grammar.complete(self.state)
+
+def tool_input_schema(args_schema: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Convert a Tool args_schema into a JSON schema for its input object.
+
+    Args:
+        args_schema: Tool argument schema
+
+    Returns:
+        JSON schema
+    """
+    properties = {}
+    required = []
+
+    for name, arg_schema in args_schema.items():
+        properties[name] = {key: value for key, value in arg_schema.items() if key in ("enum", "items", "properties")}
+        # Leave unknown type names unconstrained rather than unsatisfiable
+        if arg_schema.get("type") in _ALL_TYPES:
+            properties[name]["type"] = arg_schema["type"]
+        if arg_schema.get("required", False):
+            required.append(name)
+
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": required,
+        "additionalProperties": False
+    }
+
+_grammar_cache: "OrderedDict[str, JSONSchemaGrammar]" = OrderedDict()
+_grammar_cache_lock = threading.Lock()
+
+def get_grammar(schema: Optional[Dict[str, Any]], max_cached: int = 128) -> JSONSchemaGrammar:
+    """
+    Get a compiled grammar for a schema, reusing earlier compilations.
+
+    Reusing grammars also reuses their cached token masks.
+
+    Args:
+        schema: JSON schema (None accepts any JSON value)
+        max_cached: Maximum number of grammars to keep
+
+    Returns:
+        JSONSchemaGrammar instance
+    """
+    key = json.dumps(schema, sort_keys=True)
+
+    with _grammar_cache_lock:
+        grammar = _grammar_cache.get(key)
+        if grammar is not None:
+            _grammar_cache.move_to_end(key)
+            return grammar
+
+    grammar = JSONSchemaGrammar(schema)
+
+    with _grammar_cache_lock:
+        _grammar_cache[key] = grammar
+        while len(_grammar_cache) > max_cached:
+            _grammar_cache.popitem(last=False)
+
+    return grammar
@@ -0,0 +1,378 @@
+"""
+NumPy ternary matmul kernels for BitNet Virtual Co-worker Builder.
+
+These kernels multiply int8-quantized activations by packed ternary weights
+without unpacking the weights and without multiplications. Each packed byte
+holds four weights, so for every group of four activations a 256-entry
+lookup table holds the sum of the activations with each possible combination
+of signs. The tables are built from the activations by negation and addition
+alone, and a matrix product then reduces to gathering one table entry per
+packed byte and adding them up.
+
+Weights stay in the ``i2_s`` layout of ternary weight files (byte i of a
+128-weight block holds weights i, i+32, i+64 and i+96); the activations are
+permuted to match instead, so rows of a memory-mapped file are used in place.
+
+Tables only pay off for a few input rows at a time: their size grows with
+the number of rows while the weights are read once either way. Products with
+more rows (prefill, batched decoding) unpack each tile of weights to signs
+once and multiply it with a BLAS matrix product instead. Products of int8
+activations and signs are exact integers, and float32 holds their sums
+exactly below 2**24, so both paths give the same result. Which one is faster
+for a single row (a decoding step) depends on the matrix size and the CPU's
+caches, so it is timed once per shape.
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple
+
+import numpy as np
+
+from bitnet_vc_builder.models.ternary import BLOCK_SIZE, pack_ternary, unpack_ternary
+
+logger = logging.getLogger(__name__)
+
+# Sign of each of the four weights in a packed byte (code 3 never occurs)
+SIGN_LUT = np.array(
+    [[((byte >> shift) & 3) - 1 if (byte >> shift) & 3 != 3 else 0 for shift in (6, 4, 2, 0)] for byte in range(256)],
+    dtype=np.int8
+)
+
+# The four signs of each byte as one 32-bit word, so unpacking gathers one item per byte
+_SIGN_WORDS = np.ascontiguousarray(SIGN_LUT).view(np.uint32).ravel()
+
+# 2-bit code of each of the four weights in a packed byte
+_CODE_LUT = np.array([[(byte >> shift) & 3 for shift in (6, 4, 2, 0)] for byte in range(256)], dtype=np.intp)
+
+# Output rows processed per step; larger tiles do fewer, bigger gathers
+KERNEL_TILE_ROWS: Dict[str, int] = {
+    "i2_s": 32,
+    "i2_m": 128,
+    "i2_l": 512
+}
+
+# Input rows from which products unpack weight tiles instead of building tables
+UNPACK_MIN_ROWS = 2
+
+# Output rows unpacked per step by the unpacking path
+UNPACK_TILE_ROWS = 256
+
+# Whether single-row products are faster unpacked, by (out_features, padded in_features, tile rows, threads)
+_single_row_unpack: Dict[Tuple[int, int, int, int], bool] = {}
+
+_executors: Dict[int, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+def get_executor(num_threads: int) -> ThreadPoolExecutor:
+    """
+    Get the thread pool shared by kernels running with a thread count.
+
+    Args:
+        num_threads: Number of threads
+
+    Returns:
+        Shared ThreadPoolExecutor
+    """
+    executor = _executors.get(num_threads)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(num_threads)
+            if executor is None:
+                executor = ThreadPoolExecutor(max_workers=num_threads, thread_name_prefix="ternary-kernel")
+                _executors[num_threads] = executor
+    return executor
+
+def quantize_activations(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize activations to int8 with a per-row absmax scale.
+
+    Args:
+        x: Activations of shape (rows, features)
+
+    Returns:
+        Tuple of the int8 activations and the per-row scales, where
+        ``x ≈ quantized / scales[:, None]``
+    """
+    x = np.asarray(x, dtype=np.float32)
+    scales = 127.0 / np.maximum(np.abs(x).max(axis=-1), 1e-5)
+    quantized = np.clip(np.rint(x * scales[:, None]), -128, 127).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+def build_tables(groups: np.ndarray) -> np.ndarray:
+    """
+    Build the lookup tables for groups of four activations.
+
+    Entry ``byte`` of a group's table is the sum of the four activations
+    multiplied by the signs of the weights packed in ``byte``. Each table is
+    the sum of four per-activation tables holding -x, 0 and +x, so building it
+    needs only negation and addition.
+
+    Args:
+        groups: int8 activations of shape (rows, groups, 4), in packed byte order
+
+    Returns:
+        int16 tables of shape (rows, groups, 256)
+    """
+    x = groups.astype(np.int16)
+    # Per activation, the contribution of codes 0 (-1), 1 (0), 2 (+1) and 3 (unused)
+    choices = np.stack([-x, np.zeros_like(x), x, np.zeros_like(x)], axis=-1)
+
+    tables = choices[:, :, 0, _CODE_LUT[:, 0]]
+    for k in range(1, 4):
+        tables = tables + choices[:, :, k, _CODE_LUT[:, k]]
+    return tables
+
+class TernaryLinear:
+    """
+    Linear layer with packed ternary weights.
+
+    Computes ``x @ W.T`` where W is a ternary matrix times a scale. Inputs are
+    quantized to int8 per row, multiplied with the table lookup kernel in
+    tiles of output rows and rescaled to float32. Any number of input rows is
+    processed at once, so prompts are multiplied as matrices rather than one
+    token at a time. With more than one thread the tiles are spread over a
+    shared thread pool; NumPy releases the GIL while gathering and summing.
+    """
+
+    def __init__(
+        self,
+        packed: np.ndarray,
+        shape: Tuple[int, int],
+        scale: float,
+        kernel_type: str = "i2_s",
+        num_threads: int = 1
+    ):
+        """
+        Initialize ternary linear layer.
+
+        Args:
+            packed: i2_s packed weights of the whole matrix
+            shape: Matrix shape (out_features, in_features)
+            scale: Weight scale
+            kernel_type: Kernel type, selecting the tile size
+            num_threads: Number of threads for each product
+        """
+        if kernel_type not in KERNEL_TILE_ROWS:
+            raise ValueError(f"Unsupported kernel type: {kernel_type}. Supported kernel types: {', '.join(KERNEL_TILE_ROWS)}")
+
+        self.out_features, self.in_features = shape
+        self.scale = float(scale)
+        self.kernel_type = kernel_type
+        self.tile_rows = KERNEL_TILE_ROWS[kernel_type]
+        self.num_threads = max(1, num_threads)
+
+        if self.in_features % BLOCK_SIZE == 0:
+            # Blocks never straddle rows, so rows are slices of the packed data
+            self._padded_features = self.in_features
+            self.rows = np.asarray(packed, dtype=np.uint8)[:self.out_features * self.in_features // 4]
+        else:
+            # Repack with each row padded to whole blocks
+            self._padded_features = -(-self.in_features // BLOCK_SIZE) * BLOCK_SIZE
+            values = unpack_ternary(packed, self.out_features * self.in_features).reshape(shape)
+            padded = np.zeros((self.out_features, self._padded_features), dtype=np.int8)
+            padded[:, :self.in_features] = values
+            self.rows = pack_ternary(padded)
+
+        self.rows = self.rows.reshape(self.out_features, self._padded_features // 4)
+
+        # Offset of each group's table in the flattened tables of one input row
+        self._table_offsets = np.arange(self.rows.shape[1], dtype=np.intp) * 256
+
+        # Integer sums up to 127 * in_features are exact in float32 below 2**24
+        self._blas_dtype = np.float32 if 128 * self._padded_features < 2 ** 24 else np.float64
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, scale: float = 1.0, kernel_type: str = "i2_s", num_threads: int = 1) -> "TernaryLinear":
+        """
+        Create a layer from a matrix of ternary values.
+
+        Args:
+            values: Ternary values (-1, 0 or 1) of shape (out_features, in_features)
+            scale: Weight scale
+            kernel_type: Kernel type
+            num_threads: Number of threads for each product
+
+        Returns:
+            Ternary linear layer
+        """
+        values = np.asarray(values, dtype=np.int8)
+        return cls(pack_ternary(values), values.shape, scale, kernel_type, num_threads)
+
+    def _group_activations(self, quantized: np.ndarray) -> np.ndarray:
+        """
+        Arrange activations in the order of the weights in packed bytes.
+
+        Args:
+            quantized: int8 activations of shape (rows, in_features)
+
+        Returns:
+            Activations of shape (rows, groups, 4)
+        """
+        rows = quantized.shape[0]
+        if self._padded_features != self.in_features:
+            padded = np.zeros((rows, self._padded_features), dtype=np.int8)
+            padded[:, :self.in_features] = quantized
+            quantized = padded
+
+        # (rows, blocks, 4, 32) -> (rows, blocks, 32, 4): byte i of a block pairs with i, i+32, i+64, i+96
+        blocks = quantized.reshape(rows, -1, 4, BLOCK_SIZE // 4)
+        return blocks.transpose(0, 1, 3, 2).reshape(rows, -1, 4)
+
+    def matmul_int(self, quantized: np.ndarray) -> np.ndarray:
+        """
+        Multiply int8 activations by the ternary weights.
+
+        From UNPACK_MIN_ROWS input rows on, each weight tile is unpacked once
+        and multiplied with BLAS. A single row uses whichever of that and the
+        lookup tables was faster when first timed for this shape.
+
+        Args:
+            quantized: int8 activations of shape (rows, in_features)
+
+        Returns:
+            int32 products of shape (rows, out_features)
+        """
+        groups = self._group_activations(quantized)
+        return self._matmul(groups, groups.shape[0] >= UNPACK_MIN_ROWS or self._unpacks_single_rows(groups))
+
+    def _unpacks_single_rows(self, groups: np.ndarray) -> bool:
+        """
+        Decide whether single-row products of this shape are faster unpacked.
+
+        The first call for a shape times both paths on its activations.
+
+        Args:
+            groups: Grouped activations of one input row
+
+        Returns:
+            True to unpack, False to use the lookup tables
+        """
+        key = (self.out_features, self._padded_features, self.tile_rows, self.num_threads)
+        unpack = _single_row_unpack.get(key)
+        if unpack is None:
+            timings = {}
+            for candidate in (False, True):
+                times = []
+                for _ in range(3):
+                    start = time.perf_counter()
+                    self._matmul(groups, candidate)
+                    times.append(time.perf_counter() - start)
+                timings[candidate] = min(times)
+            unpack = timings[True] < timings[False]
+            _single_row_unpack[key] = unpack
+            logger.debug(f"Single-row products of {self!r} use {'unpacked weights' if unpack else 'lookup tables'}")
+        return unpack
+
+    def _matmul(self, groups: np.ndarray, unpack: bool) -> np.ndarray:
+        """
+        Multiply grouped activations by the ternary weights.
+
+        Args:
+            groups: Grouped activations of shape (rows, groups, 4)
+            unpack: Unpack weight tiles and use BLAS instead of the lookup tables
+
+        Returns:
+            int32 products of shape (rows, out_features)
+        """
+        output = np.empty((groups.shape[0], self.out_features), dtype=np.int32)
+
+        if unpack:
+            activations = groups.reshape(groups.shape[0], -1).astype(self._blas_dtype)
+            tile_rows = max(self.tile_rows, UNPACK_TILE_ROWS)
+            # BLAS is about twice as fast with the smaller operand on the right
+            transposed = np.ascontiguousarray(activations.T) if groups.shape[0] < tile_rows else None
+
+            def run_tile(start: int) -> None:
+                end = min(start + tile_rows, self.out_features)
+                # Signs in packed byte order, matching the grouped activations
+                signs = np.take(_SIGN_WORDS, self.rows[start:end]).view(np.int8).astype(self._blas_dtype)
+                if transposed is not None:
+                    output[:, start:end] = (signs @ transposed).T
+                else:
+                    output[:, start:end] = activations @ signs.T
+        else:
+            tables = build_tables(groups)
+            tables = tables.reshape(tables.shape[0], -1)
+            tile_rows = self.tile_rows
+
+            def run_tile(start: int) -> None:
+                end = min(start + tile_rows, self.out_features)
+                indices = self.rows[start:end] + self._table_offsets
+                output[:, start:end] = tables[:, indices].sum(axis=-1, dtype=np.int32)
+
+        starts = range(0, self.out_features, tile_rows)
+        if self.num_threads > 1 and len(starts) > 1:
+            # Tiles write disjoint columns of the output
+            list(get_executor(self.num_threads).map(run_tile, starts))
+        else:
+            for start in starts:
+                run_tile(start)
+
+        return output
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        """
+        Apply the layer.
+
+        Args:
+            x: Inputs of shape (..., in_features)
+
+        Returns:
+            float32 outputs of shape (..., out_features)
+        """
+        x = np.asarray(x, dtype=np.float32)
+        leading = x.shape[:-1]
+        quantized, scales = quantize_activations(x.reshape(-1, self.in_features))
+
+        output = self.matmul_int(quantized).astype(np.float32)
+        output *= (self.scale / scales)[:, None]
+        return output.reshape(*leading, self.out_features)
+
+    def __repr__(self) -> str:
+        """
+        Get representation of the layer.
+
+        Returns:
+            Representation
+        """
+        return (f"TernaryLinear(in_features={self.in_features}, out_features={self.out_features}, "
+                f"kernel_type={self.kernel_type!r}, num_threads={self.num_threads})")
+
+class FloatLinear:
+    """
+    Linear layer with floating point weights, for tensors kept in float.
+    """
+
+    def __init__(self, weight: np.ndarray):
+        """
+        Initialize float linear layer.
+
+        Args:
+            weight: Weights of shape (out_features, in_features)
+        """
+        self.weight = weight
+        self.out_features, self.in_features = weight.shape
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        """
+        Apply the layer.
+
+        Args:
+            x: Inputs of shape (..., in_features)
+
+        Returns:
+            float32 outputs of shape (..., out_features)
+        """
+        return np.asarray(x, dtype=np.float32) @ self.weight.T.astype(np.float32, copy=False)
+
+    def __repr__(self) -> str:
+        """
+        Get representation of the layer.
+
+        Returns:
+            Representation
+        """
+        return f"FloatLinear(in_features={self.in_features}, out_features={self.out_features})"
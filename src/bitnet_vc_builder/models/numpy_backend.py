@@ -0,0 +1,550 @@
+"""
+NumPy inference backend for BitNet Virtual Co-worker Builder.
+
+Runs a BitNet decoder directly from a memory-mapped ternary weight file, using
+the table lookup kernels for every ternary matrix. It needs nothing beyond
+NumPy, so it works wherever the package installs, including CI machines
+without BitNet's native toolchain.
+
+The model configuration is read from the ``config`` entry of the file's
+metadata, using the Hugging Face names (``hidden_size``,
+``num_hidden_layers``, ``num_attention_heads``, ``num_key_value_heads``,
+``vocab_size``, ``rms_norm_eps``, ``rope_theta``, ``hidden_act``). Tensors use
+the Hugging Face Llama names; the BitNet sub-norms
+(``self_attn.attn_sub_norm`` and ``mlp.ffn_sub_norm``) are applied when
+present. Text is tokenized with the model's BPE tokenizer when one is given,
+and as UTF-8 bytes otherwise.
+"""
+
+import logging
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple, Union
+
+import numpy as np
+
+from bitnet_vc_builder.core.cancellation import CancelToken, check_cancelled
+from bitnet_vc_builder.core.timing import span
+from bitnet_vc_builder.models.kernels import TernaryLinear, FloatLinear
+from bitnet_vc_builder.models.sampling import Sampler
+from bitnet_vc_builder.models.ternary import TernaryWeights
+from bitnet_vc_builder.models.tokenizer import BPETokenizer
+
+if TYPE_CHECKING:
+    from bitnet_vc_builder.models.grammar import Grammar
+
+logger = logging.getLogger(__name__)
+
+Linear = Union[TernaryLinear, FloatLinear]
+
+def rms_norm(x: np.ndarray, weight: np.ndarray, eps: float) -> np.ndarray:
+    """
+    Apply RMS normalization.
+
+    Args:
+        x: Inputs of shape (..., features)
+        weight: Per-feature gain
+        eps: Epsilon added to the mean square
+
+    Returns:
+        Normalized inputs
+    """
+    variance = np.mean(x * x, axis=-1, keepdims=True)
+    return x / np.sqrt(variance + eps) * weight
+
+def _activation(name: str, x: np.ndarray) -> np.ndarray:
+    """
+    Apply the gate activation of the feed-forward block.
+
+    Args:
+        name: Activation name ("silu" or "relu2")
+        x: Gate values
+
+    Returns:
+        Activated values
+    """
+    if name == "relu2":
+        return np.square(np.maximum(x, 0))
+    return x / (1.0 + np.exp(-x))
+
+class KVCache:
+    """
+    Preallocated key and value cache for one sequence.
+    """
+
+    def __init__(self, num_layers: int, max_length: int, num_kv_heads: int, head_dim: int):
+        """
+        Initialize KV cache.
+
+        Args:
+            num_layers: Number of decoder layers
+            max_length: Maximum number of cached positions
+            num_kv_heads: Number of key/value heads
+            head_dim: Dimension of each head
+        """
+        self.keys = np.zeros((num_layers, max_length, num_kv_heads, head_dim), dtype=np.float32)
+        self.values = np.zeros_like(self.keys)
+        self.max_length = max_length
+        self.length = 0
+
+class _Layer:
+    """
+    Weights of one decoder layer.
+    """
+
+    def __init__(self, weights: TernaryWeights, prefix: str, kernel_type: str, num_threads: int):
+        """
+        Initialize decoder layer.
+
+        Args:
+            weights: Ternary weight file
+            prefix: Tensor name prefix of the layer
+            kernel_type: Kernel type for ternary matrices
+            num_threads: Number of threads for ternary matrix products
+        """
+        def linear(name: str) -> Linear:
+            return _linear(weights, prefix + name, kernel_type, num_threads)
+
+        def norm(name: str) -> Optional[np.ndarray]:
+            key = prefix + name
+            return weights.tensor(key).astype(np.float32) if key in weights else None
+
+        self.input_norm = norm("input_layernorm.weight")
+        self.q_proj = linear("self_attn.q_proj.weight")
+        self.k_proj = linear("self_attn.k_proj.weight")
+        self.v_proj = linear("self_attn.v_proj.weight")
+        self.o_proj = linear("self_attn.o_proj.weight")
+        self.attn_sub_norm = norm("self_attn.attn_sub_norm.weight")
+        self.post_attention_norm = norm("post_attention_layernorm.weight")
+        self.gate_proj = linear("mlp.gate_proj.weight")
+        self.up_proj = linear("mlp.up_proj.weight")
+        self.down_proj = linear("mlp.down_proj.weight")
+        self.ffn_sub_norm = norm("mlp.ffn_sub_norm.weight")
+
+def _linear(weights: TernaryWeights, name: str, kernel_type: str, num_threads: int = 1) -> Linear:
+    """
+    Create the linear layer for a weight tensor.
+
+    Args:
+        weights: Ternary weight file
+        name: Tensor name
+        kernel_type: Kernel type for ternary matrices
+        num_threads: Number of threads for ternary matrix products
+
+    Returns:
+        Ternary layer for i2_s tensors, float layer otherwise
+    """
+    info = weights.info(name)
+    if info["dtype"] == "i2_s":
+        return TernaryLinear(weights.raw(name), tuple(info["shape"]), info["scale"], kernel_type, num_threads)
+    return FloatLinear(weights.tensor(name))
+
+class NumPyTransformer:
+    """
+    BitNet decoder running on NumPy.
+    """
+
+    def __init__(
+        self,
+        weights: TernaryWeights,
+        kernel_type: str = "i2_s",
+        context_size: int = 2048,
+        num_threads: int = 1,
+        tokenizer: Optional[BPETokenizer] = None
+    ):
+        """
+        Initialize the decoder from a ternary weight file.
+
+        Args:
+            weights: Ternary weight file with a ``config`` metadata entry
+            kernel_type: Kernel type for ternary matrices
+            context_size: Maximum sequence length
+            num_threads: Number of threads for ternary matrix products
+            tokenizer: Tokenizer of the model (optional, UTF-8 bytes are used without one)
+
+        Raises:
+            ValueError: If the file has no model configuration
+        """
+        config: Dict[str, Any] = weights.metadata.get("config") or {}
+        if "hidden_size" not in config or "num_hidden_layers" not in config:
+            raise ValueError(f"{weights.path} has no model configuration")
+
+        self.hidden_size = config["hidden_size"]
+        self.num_layers = config["num_hidden_layers"]
+        self.num_heads = config.get("num_attention_heads", 1)
+        self.num_kv_heads = config.get("num_key_value_heads", self.num_heads)
+        self.head_dim = self.hidden_size // self.num_heads
+        self.eps = config.get("rms_norm_eps", 1e-5)
+        self.rope_theta = config.get("rope_theta", 10000.0)
+        self.hidden_act = config.get("hidden_act", "silu")
+        self.eos_token_id = config.get("eos_token_id")
+        self.context_size = min(context_size, config.get("max_position_embeddings", context_size))
+        self.tokenizer = tokenizer
+        self._token_texts: Optional[List[str]] = None
+
+        self.embed_tokens = weights.tensor("model.embed_tokens.weight")
+        self.vocab_size = self.embed_tokens.shape[0]
+        self.layers = [_Layer(weights, f"model.layers.{i}.", kernel_type, num_threads) for i in range(self.num_layers)]
+        self.norm = weights.tensor("model.norm.weight").astype(np.float32)
+
+        if "lm_head.weight" in weights:
+            self.lm_head = _linear(weights, "lm_head.weight", kernel_type, num_threads)
+        else:
+            # Tied embeddings
+            self.lm_head = FloatLinear(self.embed_tokens)
+
+        inv_freq = 1.0 / (self.rope_theta ** (np.arange(0, self.head_dim, 2, dtype=np.float64) / self.head_dim))
+        angles = np.outer(np.arange(self.context_size), inv_freq)
+        self._cos = np.cos(angles).astype(np.float32)
+        self._sin = np.sin(angles).astype(np.float32)
+
+    def new_cache(self) -> KVCache:
+        """
+        Create an empty KV cache.
+
+        Returns:
+            KV cache sized for the context
+        """
+        return KVCache(self.num_layers, self.context_size, self.num_kv_heads, self.head_dim)
+
+    def _rope(self, x: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        """
+        Apply rotary position embeddings (rotate-half convention).
+
+        Args:
+            x: Queries or keys of shape (tokens, heads, head_dim)
+            positions: Position of each token
+
+        Returns:
+            Rotated values
+        """
+        cos = self._cos[positions][:, None, :]
+        sin = self._sin[positions][:, None, :]
+        half = self.head_dim // 2
+        first, second = x[..., :half], x[..., half:]
+        return np.concatenate([first * cos - second * sin, second * cos + first * sin], axis=-1)
+
+    def _attention(self, layer: _Layer, index: int, h: np.ndarray, segments: List[Tuple[KVCache, int, np.ndarray]]) -> np.ndarray:
+        """
+        Run causal self-attention, appending the new keys and values to the caches.
+
+        The projections run once over the new tokens of all sequences; only
+        the attention scores are computed per sequence.
+
+        Args:
+            layer: Decoder layer
+            index: Layer index
+            h: Normalized hidden states of the new tokens of all sequences, shape (tokens, hidden_size)
+            segments: For each sequence, its cache, the row of its first new token
+                in h and the positions of its new tokens
+
+        Returns:
+            Attention output of shape (tokens, hidden_size)
+        """
+        tokens = h.shape[0]
+        q = layer.q_proj(h).reshape(tokens, self.num_heads, self.head_dim)
+        k = layer.k_proj(h).reshape(tokens, self.num_kv_heads, self.head_dim)
+        v = layer.v_proj(h).reshape(tokens, self.num_kv_heads, self.head_dim)
+
+        output = np.empty((tokens, self.hidden_size), dtype=np.float32)
+        group = self.num_heads // self.num_kv_heads
+
+        for cache, row, positions in segments:
+            rows = slice(row, row + len(positions))
+            start, end = positions[0], positions[-1] + 1
+            cache.keys[index, start:end] = self._rope(k[rows], positions)
+            cache.values[index, start:end] = v[rows]
+            keys = cache.keys[index, :end]
+            values = cache.values[index, :end]
+
+            # Grouped-query attention: each key/value head serves several query heads
+            queries = self._rope(q[rows], positions).reshape(len(positions), self.num_kv_heads, group, self.head_dim)
+            scores = np.einsum("tkgd,skd->kgts", queries, keys) / np.sqrt(self.head_dim)
+            mask = np.arange(end)[None, :] > positions[:, None]
+            scores = np.where(mask, -np.inf, scores)
+            scores = np.exp(scores - scores.max(axis=-1, keepdims=True))
+            scores /= scores.sum(axis=-1, keepdims=True)
+
+            output[rows] = np.einsum("kgts,skd->tkgd", scores, values).reshape(len(positions), self.hidden_size)
+
+        if layer.attn_sub_norm is not None:
+            output = rms_norm(output, layer.attn_sub_norm, self.eps)
+        return layer.o_proj(output)
+
+    def _feed_forward(self, layer: _Layer, h: np.ndarray) -> np.ndarray:
+        """
+        Run the gated feed-forward block.
+
+        Args:
+            layer: Decoder layer
+            h: Normalized hidden states
+
+        Returns:
+            Feed-forward output
+        """
+        output = _activation(self.hidden_act, layer.gate_proj(h)) * layer.up_proj(h)
+        if layer.ffn_sub_norm is not None:
+            output = rms_norm(output, layer.ffn_sub_norm, self.eps)
+        return layer.down_proj(output)
+
+    def forward(self, token_ids: List[int], cache: KVCache, all_logits: bool = False) -> np.ndarray:
+        """
+        Process tokens after those already in the cache.
+
+        All tokens are processed together, so a prompt is one batch of matrix
+        products rather than one pass per token.
+
+        Args:
+            token_ids: New token IDs
+            cache: KV cache of the sequence (updated in place)
+            all_logits: Whether to return the logits after every new token
+
+        Returns:
+            Logits for the next token after the last one, or of shape
+            (tokens, vocab) after each token if all_logits is set
+
+        Raises:
+            ValueError: If the sequence would exceed the context size
+        """
+        logits = self.forward_batch([token_ids], [cache], all_logits=all_logits)
+        return logits if all_logits else logits[0]
+
+    def forward_batch(self, sequences: List[List[int]], caches: List[KVCache], all_logits: bool = False) -> np.ndarray:
+        """
+        Process new tokens of several sequences in one pass.
+
+        Args:
+            sequences: New token IDs of each sequence
+            caches: KV cache of each sequence (updated in place)
+            all_logits: Whether to return the logits after every new token
+
+        Returns:
+            Next-token logits of shape (sequences, vocab), or (tokens, vocab)
+            for the new tokens of all sequences if all_logits is set
+
+        Raises:
+            ValueError: If a sequence would exceed the context size
+        """
+        segments = []
+        row = 0
+        for token_ids, cache in zip(sequences, caches):
+            positions = np.arange(cache.length, cache.length + len(token_ids))
+            if positions[-1] >= cache.max_length:
+                raise ValueError(f"Sequence exceeds the context size of {cache.max_length} tokens")
+            segments.append((cache, row, positions))
+            row += len(token_ids)
+
+        x = self.embed_tokens[np.concatenate([np.asarray(token_ids) for token_ids in sequences])].astype(np.float32)
+
+        for index, layer in enumerate(self.layers):
+            x = x + self._attention(layer, index, rms_norm(x, layer.input_norm, self.eps), segments)
+            x = x + self._feed_forward(layer, rms_norm(x, layer.post_attention_norm, self.eps))
+
+        for token_ids, cache in zip(sequences, caches):
+            cache.length += len(token_ids)
+
+        if all_logits:
+            return self.lm_head(rms_norm(x, self.norm, self.eps))
+
+        # Only the last new token of each sequence predicts the next one
+        last_rows = [segment_row + len(token_ids) - 1 for (_, segment_row, _), token_ids in zip(segments, sequences)]
+        return self.lm_head(rms_norm(x[last_rows], self.norm, self.eps))
+
+    def encode(self, text: str) -> List[int]:
+        """
+        Tokenize text.
+
+        Args:
+            text: Text to tokenize
+
+        Returns:
+            Token IDs
+        """
+        if self.tokenizer is not None:
+            return self.tokenizer.encode(text)
+        return list(text.encode("utf-8"))
+
+    def decode(self, token_ids: List[int]) -> str:
+        """
+        Detokenize token IDs.
+
+        Args:
+            token_ids: Token IDs (without a tokenizer, IDs above 255 are skipped)
+
+        Returns:
+            Text
+        """
+        if self.tokenizer is not None:
+            return self.tokenizer.decode(token_ids)
+        return bytes(token for token in token_ids if token < 256).decode("utf-8", errors="ignore")
+
+    def has_stop(self, token_ids: List[int], stop_sequences: List[str]) -> bool:
+        """
+        Check generated tokens for a stop sequence that the latest token may have completed.
+
+        Only a tail of the tokens is decoded, long enough to hold the longest
+        stop sequence (a character takes at most four tokens), so checking
+        after every token does not get slower as the output grows.
+
+        Args:
+            token_ids: Generated token IDs
+            stop_sequences: Sequences that stop generation
+
+        Returns:
+            True if the tail contains a stop sequence
+        """
+        window = 4 * max(len(stop) for stop in stop_sequences) + 4
+        text = self.decode(token_ids[-window:])
+        return any(stop and stop in text for stop in stop_sequences)
+
+    @property
+    def token_texts(self) -> List[str]:
+        """
+        Text of each token ID, as grammar masks see it.
+
+        The end-of-sequence token has no text, so a grammar only allows it
+        where the output may end. Without a tokenizer, bytes above 127 stand
+        for U+FFFD, which is only valid inside strings.
+        """
+        if self._token_texts is None:
+            texts = []
+            for token_id in range(self.vocab_size):
+                if token_id == self.eos_token_id:
+                    texts.append("")
+                elif self.tokenizer is not None:
+                    texts.append(self.tokenizer.token_text(token_id))
+                elif token_id < 128:
+                    texts.append(chr(token_id))
+                else:
+                    texts.append("\ufffd" if token_id < 256 else "")
+            self._token_texts = texts
+        return self._token_texts
+
+    def generate(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float = 0.0,
+        top_k: int = 0,
+        top_p: float = 1.0,
+        repetition_penalty: float = 1.0,
+        stop_sequences: Optional[List[str]] = None,
+        cancel_token: Optional[CancelToken] = None,
+        seed: Optional[int] = None,
+        grammar: Optional["Grammar"] = None
+    ) -> str:
+        """
+        Generate text.
+
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum number of tokens to generate
+            temperature: Temperature (0 for greedy decoding)
+            top_k: Number of most likely tokens to sample from (0 for all)
+            top_p: Smallest cumulative probability of the tokens to sample from
+            repetition_penalty: Penalty for tokens already generated
+            stop_sequences: Sequences that stop generation
+            cancel_token: Token checked before every decoded token (optional)
+            seed: Random seed (optional)
+            grammar: Grammar the output must follow (optional)
+
+        Returns:
+            Generated text
+        """
+        return self.generate_batch(
+            [prompt], max_tokens, temperature, top_k, top_p, repetition_penalty,
+            stop_sequences=stop_sequences, cancel_token=cancel_token, seed=seed, grammar=grammar
+        )[0]
+
+    def generate_batch(
+        self,
+        prompts: List[str],
+        max_tokens: int,
+        temperature: float = 0.0,
+        top_k: int = 0,
+        top_p: float = 1.0,
+        repetition_penalty: float = 1.0,
+        stop_sequences: Optional[List[str]] = None,
+        cancel_token: Optional[CancelToken] = None,
+        seed: Optional[int] = None,
+        grammar: Optional["Grammar"] = None
+    ) -> List[str]:
+        """
+        Generate text for several prompts together.
+
+        Each step decodes one token for every unfinished sequence with a single
+        pass through the layers and a single vectorized sampling call. With a
+        grammar, tokens that would break it get a logit of -inf before
+        sampling, and a sequence ends once its output is complete or no token
+        can continue it.
+
+        Args:
+            prompts: Input prompts
+            max_tokens: Maximum number of tokens to generate per prompt
+            temperature: Temperature (0 for greedy decoding)
+            top_k: Number of most likely tokens to sample from (0 for all)
+            top_p: Smallest cumulative probability of the tokens to sample from
+            repetition_penalty: Penalty for tokens already generated
+            stop_sequences: Sequences that stop generation
+            cancel_token: Token checked before every decoding step (optional)
+            seed: Random seed (optional)
+            grammar: Grammar every output must follow (optional)
+
+        Returns:
+            Generated text for each prompt
+        """
+        caches = [self.new_cache() for _ in prompts]
+
+        # Keep the end of prompts that do not leave room to generate
+        keep = max(1, self.context_size - max_tokens)
+        with span("tokenize"):
+            prompt_ids = [self.encode(prompt)[-keep:] or [0] for prompt in prompts]
+        with span("prefill", tokens=sum(len(ids) for ids in prompt_ids)):
+            logits = self.forward_batch(prompt_ids, caches)
+
+        sampler = Sampler(len(prompts), self.vocab_size, temperature, top_k, top_p, repetition_penalty, seed)
+        generated: List[List[int]] = [[] for _ in prompts]
+        constraints = [grammar.constraint() for _ in prompts] if grammar is not None else None
+        active = list(range(len(prompts)))
+        steps = min(max_tokens, self.context_size - max(cache.length for cache in caches))
+
+        with span("decode") as decode_span:
+            for step in range(steps):
+                check_cancelled(cancel_token)
+
+                # Finished sequences keep their row but their samples are ignored
+                full_logits = np.zeros((len(prompts), logits.shape[1]), dtype=np.float32)
+                full_logits[active] = logits
+                blocked = set()
+                if constraints is not None:
+                    for i in active:
+                        mask = constraints[i].mask(self.token_texts)
+                        if mask is None:
+                            continue
+                        allowed = np.asarray(mask, dtype=bool)
+                        if allowed.any():
+                            full_logits[i, ~allowed] = -np.inf
+                        else:
+                            blocked.add(i)
+                tokens = sampler.sample(full_logits)
+
+                still_active = []
+                for i in active:
+                    token = int(tokens[i])
+                    if i in blocked or token == self.eos_token_id:
+                        continue
+                    generated[i].append(token)
+                    if constraints is not None:
+                        constraints[i].advance(self.token_texts[token])
+                        if constraints[i].done:
+                            continue
+                    if stop_sequences and self.has_stop(generated[i], stop_sequences):
+                        continue
+                    still_active.append(i)
+                active = still_active
+
+                if not active or step == steps - 1:
+                    break
+                logits = self.forward_batch([[generated[i][-1]] for i in active], [caches[i] for i in active])
+
+            decode_span.set(tokens=sum(len(tokens) for tokens in generated))
+
+        return [self.decode(tokens) for tokens in generated]
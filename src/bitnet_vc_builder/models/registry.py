@@ -0,0 +1,265 @@
+"""
+Model registry for BitNet Virtual Co-worker Builder.
+"""
+
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+
+logger = logging.getLogger(__name__)
+
+# Settings that identify the weights a model loads; registrations that agree on
+# these share one instance
+_IDENTITY_KEYS = ("model_path", "kernel_type")
+
+class ModelRegistry:
+    """
+    Registry of named model configurations with lazy loading.
+
+    Registering a model only records its configuration. The BitNetModel is
+    created and loaded the first time it is requested, and registrations with
+    the same model path and kernel type share a single instance. When a memory
+    budget is set, loading a model unloads the least recently used idle models
+    until the loaded models fit the budget again. Unloaded models reload
+    themselves on their next generation.
+    """
+
+    def __init__(self, memory_budget: Optional[int] = None):
+        """
+        Initialize model registry.
+
+        Args:
+            memory_budget: Maximum bytes of loaded models (None for no limit)
+        """
+        self.memory_budget = memory_budget
+
+        self._configs: Dict[str, Dict[str, Any]] = {}
+        self._instances: Dict[Tuple, BitNetModel] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _identity(config: Dict[str, Any]) -> Tuple:
+        """
+        Get the sharing key for a configuration.
+
+        Args:
+            config: Model configuration
+
+        Returns:
+            Sharing key
+        """
+        return tuple(config.get(key, "i2_s" if key == "kernel_type" else None) for key in _IDENTITY_KEYS)
+
+    def register(self, name: str, config: Dict[str, Any]) -> None:
+        """
+        Register a model configuration without loading it.
+
+        Args:
+            name: Model name
+            config: BitNetModel constructor arguments (must include model_path)
+
+        Raises:
+            ValueError: If the name is taken or the configuration is invalid
+        """
+        if "model_path" not in config:
+            raise ValueError("Model configuration must include model_path")
+
+        kernel_type = config.get("kernel_type", "i2_s")
+        if kernel_type not in BitNetModel.SUPPORTED_KERNELS:
+            raise ValueError(f"Unsupported kernel type: {kernel_type}. Supported kernel types: {', '.join(BitNetModel.SUPPORTED_KERNELS)}")
+
+        with self._lock:
+            if name in self._configs:
+                raise ValueError(f"Model {name} already exists")
+
+            identity = self._identity(config)
+            for other_name, other in self._configs.items():
+                if self._identity(other) == identity and other != config:
+                    logger.warning(f"Model {name} shares its weights with {other_name}; the settings of the first one loaded apply")
+                    break
+
+            self._configs[name] = dict(config)
+
+    def unregister(self, name: str) -> bool:
+        """
+        Remove a model configuration, unloading its instance if nothing else shares it.
+
+        Args:
+            name: Model name
+
+        Returns:
+            True if the model was removed, False if not found
+        """
+        with self._lock:
+            config = self._configs.pop(name, None)
+            if config is None:
+                return False
+
+            identity = self._identity(config)
+            if not any(self._identity(other) == identity for other in self._configs.values()):
+                model = self._instances.pop(identity, None)
+                if model is not None:
+                    model.on_load = None
+                    model.unload()
+
+        return True
+
+    def get(self, name: str, load: bool = True) -> Optional[BitNetModel]:
+        """
+        Get a model, creating it on first use.
+
+        Args:
+            name: Model name
+            load: Whether to load the model now rather than on its first generation
+
+        Returns:
+            Model, or None if not registered
+        """
+        with self._lock:
+            config = self._configs.get(name)
+            if config is None:
+                return None
+
+            identity = self._identity(config)
+            model = self._instances.get(identity)
+
+        if model is None:
+            # Construction can take a while (autotuning benchmarks the kernels),
+            # so it runs without the lock; the first instance installed wins
+            created = BitNetModel(**config)
+            created.on_load = self._on_load
+            with self._lock:
+                if self._configs.get(name) is not config:
+                    # Unregistered while the model was being created
+                    return None
+                model = self._instances.setdefault(identity, created)
+
+        if load:
+            model.load()
+        return model
+
+    def get_config(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a model's registered configuration.
+
+        Args:
+            name: Model name
+
+        Returns:
+            Copy of the configuration, or None if not registered
+        """
+        with self._lock:
+            config = self._configs.get(name)
+            return dict(config) if config is not None else None
+
+    def is_loaded(self, name: str) -> bool:
+        """
+        Check whether a model is currently loaded.
+
+        Args:
+            name: Model name
+
+        Returns:
+            True if the model is loaded, False otherwise
+        """
+        with self._lock:
+            config = self._configs.get(name)
+            model = self._instances.get(self._identity(config)) if config is not None else None
+        return model is not None and model.is_loaded
+
+    def names(self) -> List[str]:
+        """
+        Get the names of all registered models.
+
+        Returns:
+            List of model names
+        """
+        with self._lock:
+            return list(self._configs)
+
+    def loaded_bytes(self) -> int:
+        """
+        Get the memory used by loaded models.
+
+        Returns:
+            Total footprint of loaded models in bytes
+        """
+        with self._lock:
+            return sum(model.memory_footprint() for model in self._instances.values() if model.is_loaded)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get registry statistics.
+
+        Returns:
+            Dictionary with registry statistics
+        """
+        with self._lock:
+            return {
+                "registered": len(self._configs),
+                "instances": len(self._instances),
+                "loaded": sum(1 for model in self._instances.values() if model.is_loaded),
+                "loaded_bytes": self.loaded_bytes(),
+                "memory_budget": self.memory_budget
+            }
+
+    def _on_load(self, model: BitNetModel) -> None:
+        """
+        Enforce the memory budget after a model was loaded.
+
+        Args:
+            model: Model that was just loaded
+        """
+        if self.memory_budget is None:
+            return
+
+        with self._lock:
+            loaded = [other for other in self._instances.values() if other.is_loaded]
+            total = sum(other.memory_footprint() for other in loaded)
+
+            # Least recently used first; models mid-generation are never unloaded
+            for other in sorted(loaded, key=lambda m: m.last_used):
+                if total <= self.memory_budget:
+                    break
+                if other is model or other.in_use:
+                    continue
+                footprint = other.memory_footprint()
+                if other.unload():
+                    total -= footprint
+
+            if total > self.memory_budget:
+                logger.warning(f"Loaded models use {total} bytes, over the budget of {self.memory_budget} bytes; no idle model left to unload")
+
+    def __contains__(self, name: object) -> bool:
+        """
+        Check whether a model is registered.
+
+        Args:
+            name: Model name
+
+        Returns:
+            True if the model is registered, False otherwise
+        """
+        with self._lock:
+            return name in self._configs
+
+    def __len__(self) -> int:
+        """
+        Get number of registered models.
+
+        Returns:
+            Number of models
+        """
+        with self._lock:
+            return len(self._configs)
+
+    def __repr__(self) -> str:
+        """
+        Get representation of the registry.
+
+        Returns:
+            Representation
+        """
+        return f"ModelRegistry(models={self.names()}, memory_budget={self.memory_budget})"
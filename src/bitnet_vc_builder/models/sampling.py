@@ -0,0 +1,231 @@
+"""
+Vectorized token sampling for BitNet Virtual Co-worker Builder.
+
+Sampling works on a whole batch of sequences at once: logits arrive as a
+(batch, vocab) array and one token per sequence comes out, with no Python
+loop over sequences or over the vocabulary.
+
+- The repetition penalty is applied through a (batch, vocab) array of token
+  counts, so it costs one masked update regardless of history length.
+- Top-k uses argpartition, which selects the k largest logits in linear time
+  instead of sorting the vocabulary.
+- Top-p sorts and accumulates only the candidates that survive top-k.
+"""
+
+import logging
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def apply_repetition_penalty(logits: np.ndarray, counts: np.ndarray, penalty: float) -> np.ndarray:
+    """
+    Penalize tokens that already occurred.
+
+    Positive logits are divided by the penalty and negative ones multiplied,
+    so a penalty above 1 always makes repeated tokens less likely.
+
+    Args:
+        logits: Logits of shape (batch, vocab)
+        counts: Occurrences of each token so far, shape (batch, vocab)
+        penalty: Repetition penalty (1 disables it)
+
+    Returns:
+        Penalized logits
+    """
+    if penalty == 1.0:
+        return logits
+
+    penalized = np.where(logits > 0, logits / penalty, logits * penalty)
+    return np.where(counts > 0, penalized, logits)
+
+def _candidate_probabilities(
+    logits: np.ndarray,
+    temperature: np.ndarray,
+    top_k: int,
+    top_p: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the tokens that may be sampled and their probabilities.
+
+    Args:
+        logits: Logits of shape (batch, vocab)
+        temperature: Temperature per sequence (values of 0 are treated as 1)
+        top_k: Number of most likely tokens to sample from (0 for all)
+        top_p: Smallest cumulative probability of the tokens to sample from
+
+    Returns:
+        Tuple of candidate token IDs and their probabilities, both of shape
+        (batch, candidates) and sorted most likely first
+    """
+    batch, vocab = logits.shape
+
+    # Candidates: the k largest logits, in no particular order
+    k = top_k if 0 < top_k < vocab else vocab
+    if k < vocab:
+        candidates = np.argpartition(logits, vocab - k, axis=1)[:, vocab - k:]
+    else:
+        candidates = np.broadcast_to(np.arange(vocab), (batch, vocab))
+    values = np.take_along_axis(logits, candidates, axis=1)
+
+    # Sort only the candidates, most likely first
+    order = np.argsort(-values, axis=1)
+    candidates = np.take_along_axis(candidates, order, axis=1)
+    values = np.take_along_axis(values, order, axis=1)
+
+    scaled = values / np.where(temperature > 0, temperature, 1.0)[:, None]
+    probs = np.exp(scaled - scaled[:, :1])
+    probs /= probs.sum(axis=1, keepdims=True)
+
+    if top_p < 1.0:
+        # Keep every token whose preceding mass is below top_p (always the first)
+        cumulative = np.cumsum(probs, axis=1)
+        probs = np.where(cumulative - probs < top_p, probs, 0.0)
+        probs /= probs.sum(axis=1, keepdims=True)
+
+    return candidates, probs
+
+def token_probabilities(
+    logits: np.ndarray,
+    temperature: Union[float, np.ndarray] = 1.0,
+    top_k: int = 0,
+    top_p: float = 1.0
+) -> np.ndarray:
+    """
+    Get the distribution sample_tokens draws from.
+
+    Args:
+        logits: Logits of shape (batch, vocab)
+        temperature: Temperature, one for all sequences or one per sequence;
+            sequences with a temperature of 0 put all mass on the most likely token
+        top_k: Number of most likely tokens to sample from (0 for all)
+        top_p: Smallest cumulative probability of the tokens to sample from
+
+    Returns:
+        Probabilities of shape (batch, vocab)
+    """
+    logits = np.asarray(logits, dtype=np.float64)
+    batch, vocab = logits.shape
+    temperature = np.broadcast_to(np.asarray(temperature, dtype=np.float64), (batch,))
+
+    candidates, candidate_probs = _candidate_probabilities(logits, temperature, top_k, top_p)
+    probs = np.zeros((batch, vocab))
+    np.put_along_axis(probs, candidates, candidate_probs, axis=1)
+
+    greedy = temperature <= 0
+    if np.any(greedy):
+        probs[greedy] = 0.0
+        probs[greedy, np.argmax(logits[greedy], axis=1)] = 1.0
+    return probs
+
+def sample_tokens(
+    logits: np.ndarray,
+    temperature: Union[float, np.ndarray] = 1.0,
+    top_k: int = 0,
+    top_p: float = 1.0,
+    rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
+    """
+    Sample one token per sequence.
+
+    Args:
+        logits: Logits of shape (batch, vocab)
+        temperature: Temperature, one for all sequences or one per sequence;
+            sequences with a temperature of 0 are decoded greedily
+        top_k: Number of most likely tokens to sample from (0 for all)
+        top_p: Smallest cumulative probability of the tokens to sample from
+        rng: Random number generator (optional)
+
+    Returns:
+        Token IDs of shape (batch,)
+    """
+    logits = np.asarray(logits, dtype=np.float64)
+    batch = logits.shape[0]
+    temperature = np.broadcast_to(np.asarray(temperature, dtype=np.float64), (batch,))
+    rng = rng or np.random.default_rng()
+
+    greedy = np.argmax(logits, axis=1)
+    if np.all(temperature <= 0):
+        return greedy
+
+    candidates, probs = _candidate_probabilities(logits, temperature, top_k, top_p)
+
+    # Inverse transform sampling over each row's cumulative distribution
+    cumulative = np.cumsum(probs, axis=1)
+    draws = rng.random((batch, 1)) * cumulative[:, -1:]
+    picks = np.minimum((cumulative <= draws).sum(axis=1), cumulative.shape[1] - 1)
+    sampled = candidates[np.arange(batch), picks]
+
+    return np.where(temperature > 0, sampled, greedy)
+
+class Sampler:
+    """
+    Samples tokens for a batch of sequences, tracking their token counts.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        vocab_size: int,
+        temperature: float = 0.7,
+        top_k: int = 40,
+        top_p: float = 0.9,
+        repetition_penalty: float = 1.1,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize sampler.
+
+        Args:
+            batch_size: Number of sequences
+            vocab_size: Vocabulary size
+            temperature: Temperature (0 for greedy decoding)
+            top_k: Number of most likely tokens to sample from (0 for all)
+            top_p: Smallest cumulative probability of the tokens to sample from
+            repetition_penalty: Penalty for tokens already generated (1 disables it)
+            seed: Random seed (optional)
+        """
+        self.temperature = temperature
+        self.top_k = top_k
+        self.top_p = top_p
+        self.repetition_penalty = repetition_penalty
+        self.counts = np.zeros((batch_size, vocab_size), dtype=np.int32)
+        self.rng = np.random.default_rng(seed)
+
+    def sample(self, logits: np.ndarray) -> np.ndarray:
+        """
+        Sample the next token of every sequence and record it.
+
+        Args:
+            logits: Logits of shape (batch, vocab)
+
+        Returns:
+            Token IDs of shape (batch,)
+        """
+        logits = apply_repetition_penalty(logits, self.counts, self.repetition_penalty)
+        tokens = sample_tokens(logits, self.temperature, self.top_k, self.top_p, self.rng)
+        self.observe(tokens)
+        return tokens
+
+    def probabilities(self, logits: np.ndarray) -> np.ndarray:
+        """
+        Get the distribution the next tokens would be sampled from, without recording anything.
+
+        Args:
+            logits: Logits of shape (batch, vocab)
+
+        Returns:
+            Probabilities of shape (batch, vocab)
+        """
+        logits = apply_repetition_penalty(logits, self.counts, self.repetition_penalty)
+        return token_probabilities(logits, self.temperature, self.top_k, self.top_p)
+
+    def observe(self, tokens: np.ndarray) -> None:
+        """
+        Record one token per sequence for the repetition penalty.
+
+        Args:
+            tokens: Token IDs of shape (batch,)
+        """
+        self.counts[np.arange(len(tokens)), tokens] += 1
@@ -0,0 +1,217 @@
+"""
+Latency-simulating model backend for BitNet Virtual Co-worker Builder.
+
+The simulated backend produces the same responses as the mock backend (or a
+scripted list of responses) but takes as long as a real model would: a
+prefill cost per prompt token, a decode cost per generated token and seeded
+random jitter. Framework overhead, scheduling and concurrency can then be
+benchmarked reproducibly without model files.
+
+Responses and jitter depend only on the prompt and how often that prompt was
+seen before, never on the order in which concurrent callers arrive, so a
+parallel run gets the same responses and costs however its threads are
+scheduled.
+"""
+
+import time
+import random
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from bitnet_vc_builder.core.cancellation import CancelToken, check_cancelled
+from bitnet_vc_builder.core.timing import span
+
+logger = logging.getLogger(__name__)
+
+def sleep_until(deadline: float, cancel_token: Optional[CancelToken] = None) -> None:
+    """
+    Sleep until a point in time.
+
+    Args:
+        deadline: Time on the perf_counter clock
+        cancel_token: Token for abandoning the wait (optional)
+
+    Raises:
+        CancelledError: If the token is cancelled or its deadline passes
+    """
+    check_cancelled(cancel_token)
+    remaining = deadline - time.perf_counter()
+    if remaining > 0:
+        time.sleep(remaining)
+
+class SimulatedBackend:
+    """
+    Backend that sleeps like a model instead of running one.
+
+    Calls sleep for ``prefill_time_per_token`` per prompt token and then
+    ``decode_time_per_token`` per generated token, each scaled by one jitter
+    factor. The factor is drawn from a generator seeded with the seed, a hash
+    of the prompt and the number of earlier calls with the same prompt. Sleeps
+    are paced against the clock, so a run costs the modelled time however long
+    each sleep actually took.
+
+    A scripted call returns the response after the last one its prompt already
+    contains: a ReAct transcript holds the model's earlier responses, so each
+    conversation steps through the script on its own. Repeated calls with the
+    same prompt move on by one response each.
+    """
+
+    def __init__(
+        self,
+        prefill_time_per_token: float = 0.0005,
+        decode_time_per_token: float = 0.02,
+        jitter: float = 0.1,
+        script: Optional[List[str]] = None,
+        output_tokens: Optional[int] = None,
+        seed: int = 0
+    ):
+        """
+        Initialize simulated backend.
+
+        Args:
+            prefill_time_per_token: Seconds to process each prompt token
+            decode_time_per_token: Seconds to generate each output token
+            jitter: Maximum relative deviation of a call's costs (0.1 for +/-10%)
+            script: Responses returned in turn within each conversation,
+                cycling (optional; by default the caller's fallback response is
+                used)
+            output_tokens: Number of tokens each call is charged for decoding
+                (optional; by default the number of words in the response)
+            seed: Seed of the jitter generators
+
+        Raises:
+            ValueError: If a cost is negative or the jitter is not between 0 and 1
+        """
+        if prefill_time_per_token < 0 or decode_time_per_token < 0:
+            raise ValueError("Simulated costs per token must not be negative")
+        if not 0.0 <= jitter < 1.0:
+            raise ValueError(f"Jitter must be between 0 and 1, got {jitter}")
+        if script is not None and not script:
+            raise ValueError("Script must contain at least one response")
+
+        self.prefill_time_per_token = prefill_time_per_token
+        self.decode_time_per_token = decode_time_per_token
+        self.jitter = jitter
+        self.script = list(script) if script is not None else None
+        self.output_tokens = output_tokens
+        self.seed = seed
+
+        self._calls = 0
+        # Number of calls so far by prompt digest
+        self._prompt_calls: Dict[bytes, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def count_tokens(text: str) -> int:
+        """
+        Count the simulated tokens of a text.
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Number of whitespace-separated words
+        """
+        return len(text.split())
+
+    def _next_call(self, prompt: str) -> Tuple[int, float]:
+        """
+        Count a call with a prompt and derive its jitter factor.
+
+        Args:
+            prompt: Input prompt
+
+        Returns:
+            Tuple of the number of earlier calls with the prompt and the factor
+            scaling the call's costs
+        """
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()[:16]
+        with self._lock:
+            self._calls += 1
+            count = self._prompt_calls.get(digest, 0)
+            self._prompt_calls[digest] = count + 1
+        generator = random.Random(f"{self.seed}:{digest.hex()}:{count}")
+        return count, 1.0 + self.jitter * generator.uniform(-1.0, 1.0)
+
+    def generate(
+        self,
+        prompt: str,
+        max_tokens: int,
+        fallback: Callable[[str, int], str],
+        cancel_token: Optional[CancelToken] = None
+    ) -> str:
+        """
+        Generate a response in simulated time.
+
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum number of tokens to generate
+            fallback: Function producing the response from the prompt and
+                max_tokens when there is no script
+            cancel_token: Token for abandoning generation (optional)
+
+        Returns:
+            Generated text
+
+        Raises:
+            CancelledError: If the token is cancelled or its deadline passes
+        """
+        count, factor = self._next_call(prompt)
+
+        if self.script is not None:
+            # Earlier responses of this conversation are part of its prompt
+            step = sum(prompt.count(response) for response in set(self.script))
+            text = self.script[(step + count) % len(self.script)]
+            words = text.split(" ")
+            if len(words) > max_tokens:
+                text = " ".join(words[:max_tokens])
+        else:
+            text = fallback(prompt, max_tokens)
+
+        prompt_tokens = self.count_tokens(prompt)
+        output_tokens = self.output_tokens if self.output_tokens is not None else self.count_tokens(text)
+        output_tokens = min(output_tokens, max_tokens)
+
+        start = time.perf_counter()
+        with span("prefill", tokens=prompt_tokens):
+            self._sleep_until(start + prompt_tokens * self.prefill_time_per_token * factor, cancel_token)
+
+        with span("decode") as decode_span:
+            decode_start = time.perf_counter()
+            step = self.decode_time_per_token * factor
+            for i in range(output_tokens):
+                self._sleep_until(decode_start + (i + 1) * step, cancel_token)
+            decode_span.set(tokens=output_tokens)
+
+        return text
+
+    @staticmethod
+    def _sleep_until(deadline: float, cancel_token: Optional[CancelToken]) -> None:
+        """
+        Sleep until a point in time.
+
+        Args:
+            deadline: Time on the perf_counter clock
+            cancel_token: Token for abandoning generation (optional)
+
+        Raises:
+            CancelledError: If the token is cancelled or its deadline passes
+        """
+        sleep_until(deadline, cancel_token)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get simulated backend settings and usage.
+
+        Returns:
+            Dictionary with the cost settings and the number of calls so far
+        """
+        return {
+            "prefill_time_per_token": self.prefill_time_per_token,
+            "decode_time_per_token": self.decode_time_per_token,
+            "jitter": self.jitter,
+            "seed": self.seed,
+            "calls": self._calls
+        }
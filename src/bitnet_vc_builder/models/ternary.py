@@ -0,0 +1,570 @@
+"""
+Packed ternary weight format for BitNet Virtual Co-worker Builder.
+
+BitNet b1.58 weights take the values -1, 0 and +1 times a per-tensor scale,
+so each weight fits in 2 bits. A ternary weight file stores them packed four
+to a byte in the ``i2_s`` block layout, next to any tensors that stay in
+floating point (embeddings, norms). The file is memory-mapped when opened, so
+loading it reads only the header and the operating system shares the pages
+between every process that maps the same file.
+
+File layout::
+
+    magic     4 bytes   b"BTNW"
+    version   uint32    little endian
+    length    uint64    little endian, length of the header
+    header    JSON      tensor index and metadata
+    padding             up to the next multiple of ALIGNMENT
+    data                tensors, each starting on a multiple of ALIGNMENT
+
+Each tensor in the header index records its dtype (``i2_s``, ``float16`` or
+``float32``), shape, offset from the start of the data and size in bytes;
+``i2_s`` tensors also record their scale.
+"""
+
+import os
+import json
+import mmap
+import struct
+import logging
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"BTNW"
+VERSION = 1
+ALIGNMENT = 64
+
+# File extension of ternary weight files
+TERNARY_EXTENSION = ".i2s"
+
+# Weights per i2_s block; byte i of a block holds weights i, i+32, i+64 and i+96
+BLOCK_SIZE = 128
+_GROUP_SIZE = 32
+_SHIFTS = np.array([6, 4, 2, 0], dtype=np.uint8)
+
+_PREAMBLE = struct.Struct("<4sIQ")
+
+_FLOAT_DTYPES = {"float16": np.float16, "float32": np.float32}
+
+# Tensors whose names contain these stay in floating point when converting
+DEFAULT_KEEP_FLOAT = ("embed", "norm", "lm_head")
+
+class TernaryFormatError(ValueError):
+    """
+    Raised when a file is not a valid ternary weight file.
+    """
+
+def quantize_ternary(weights: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Quantize weights to ternary values with an absmean scale.
+
+    Args:
+        weights: Floating point weights
+
+    Returns:
+        Tuple of the ternary values (int8 in -1, 0, 1) and the scale
+    """
+    weights = np.asarray(weights, dtype=np.float32)
+    scale = float(max(np.abs(weights).mean(), 1e-5)) if weights.size else 1.0
+    values = np.clip(np.rint(weights / scale), -1, 1).astype(np.int8)
+    return values, scale
+
+def pack_ternary(values: np.ndarray) -> np.ndarray:
+    """
+    Pack ternary values into the i2_s layout.
+
+    Args:
+        values: Ternary values (-1, 0 or 1), any shape; flattened in C order
+
+    Returns:
+        Packed bytes, padded to a whole number of blocks
+    """
+    flat = np.asarray(values, dtype=np.int8).ravel()
+    if flat.size and (flat.min() < -1 or flat.max() > 1):
+        raise ValueError("Ternary values must be -1, 0 or 1")
+
+    padded_size = -(-flat.size // BLOCK_SIZE) * BLOCK_SIZE
+    codes = np.ones(padded_size, dtype=np.uint8)
+    codes[:flat.size] = flat + 1
+
+    groups = codes.reshape(-1, 4, _GROUP_SIZE) << _SHIFTS[None, :, None]
+    return np.bitwise_or.reduce(groups, axis=1).ravel()
+
+def unpack_ternary(packed: np.ndarray, count: int) -> np.ndarray:
+    """
+    Unpack i2_s packed bytes into ternary values.
+
+    Args:
+        packed: Packed bytes
+        count: Number of values to return (drops the block padding)
+
+    Returns:
+        Ternary values as int8
+    """
+    blocks = np.asarray(packed, dtype=np.uint8).reshape(-1, 1, _GROUP_SIZE)
+    codes = (blocks >> _SHIFTS[None, :, None]) & 3
+    return codes.ravel()[:count].astype(np.int8) - 1
+
+def packed_size(count: int) -> int:
+    """
+    Get the number of bytes needed to pack a number of ternary values.
+
+    Args:
+        count: Number of values
+
+    Returns:
+        Packed size in bytes
+    """
+    return -(-count // BLOCK_SIZE) * BLOCK_SIZE // 4
+
+def _align(offset: int) -> int:
+    """
+    Round an offset up to the file alignment.
+
+    Args:
+        offset: Offset in bytes
+
+    Returns:
+        Aligned offset
+    """
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def write_ternary_file(
+    path: str,
+    tensors: Dict[str, np.ndarray],
+    ternary: Optional[Callable[[str, np.ndarray], bool]] = None,
+    metadata: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Write tensors to a ternary weight file.
+
+    Args:
+        path: Output path
+        tensors: Tensors by name
+        ternary: Function deciding whether a tensor is quantized to ternary
+            (defaults to every tensor); the others are stored as float16 or float32
+        metadata: JSON-serializable metadata stored in the header (optional)
+    """
+    index: Dict[str, Dict[str, Any]] = {}
+    payloads: List[np.ndarray] = []
+    offset = 0
+
+    for name, tensor in tensors.items():
+        tensor = np.asarray(tensor)
+        entry: Dict[str, Any] = {"shape": list(tensor.shape)}
+
+        if ternary is None or ternary(name, tensor):
+            values, scale = quantize_ternary(tensor)
+            payload = pack_ternary(values)
+            entry.update(dtype="i2_s", scale=scale)
+        else:
+            dtype = "float16" if tensor.dtype == np.float16 else "float32"
+            payload = np.ascontiguousarray(tensor, dtype=_FLOAT_DTYPES[dtype]).view(np.uint8).ravel()
+            entry["dtype"] = dtype
+
+        entry.update(offset=offset, nbytes=int(payload.nbytes))
+        index[name] = entry
+        payloads.append(payload)
+        offset = _align(offset + payload.nbytes)
+
+    header = json.dumps({"tensors": index, "metadata": metadata or {}}, sort_keys=True).encode("utf-8")
+    data_start = _align(_PREAMBLE.size + len(header))
+
+    # Write to a temporary file first so readers never map a partial file
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for name, payload in zip(index, payloads):
+            f.seek(data_start + index[name]["offset"])
+            f.write(payload.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(temp_path, path)
+
+    logger.info(f"Wrote {len(index)} tensors to {path}")
+
+class TernaryWeights:
+    """
+    Memory-mapped ternary weight file.
+
+    Opening the file only parses its header. Tensor accessors return views of
+    the mapping, so packed weights are never copied into the process and
+    pages are shared with other processes that map the same file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a ternary weight file.
+
+        Args:
+            path: Path to the file
+
+        Raises:
+            TernaryFormatError: If the file is not a valid ternary weight file
+        """
+        self.path = path
+
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _PREAMBLE.size:
+                raise TernaryFormatError(f"{path} is too small to be a ternary weight file")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, header_length = _PREAMBLE.unpack_from(self._mmap, 0)
+            if magic != MAGIC:
+                raise TernaryFormatError(f"{path} is not a ternary weight file")
+            if version != VERSION:
+                raise TernaryFormatError(f"Unsupported ternary weight file version {version} in {path}")
+
+            header_end = _PREAMBLE.size + header_length
+            if header_end > size:
+                raise TernaryFormatError(f"Truncated header in {path}")
+            header = json.loads(self._mmap[_PREAMBLE.size:header_end].decode("utf-8"))
+
+            self.tensors: Dict[str, Dict[str, Any]] = header["tensors"]
+            self.metadata: Dict[str, Any] = header.get("metadata", {})
+            self._data_start = _align(header_end)
+
+            for name, entry in self.tensors.items():
+                if self._data_start + entry["offset"] + entry["nbytes"] > size:
+                    raise TernaryFormatError(f"Tensor {name} extends past the end of {path}")
+        except (TernaryFormatError, ValueError, KeyError):
+            self._mmap.close()
+            raise
+
+    def names(self) -> List[str]:
+        """
+        Get the names of all tensors.
+
+        Returns:
+            List of tensor names
+        """
+        return list(self.tensors)
+
+    def info(self, name: str) -> Dict[str, Any]:
+        """
+        Get a tensor's index entry.
+
+        Args:
+            name: Tensor name
+
+        Returns:
+            Dictionary with the tensor's dtype, shape, offset, size and scale
+
+        Raises:
+            KeyError: If the tensor does not exist
+        """
+        return dict(self.tensors[name])
+
+    def raw(self, name: str) -> np.ndarray:
+        """
+        Get a tensor's stored bytes without copying.
+
+        Args:
+            name: Tensor name
+
+        Returns:
+            Read-only uint8 view of the mapping
+
+        Raises:
+            KeyError: If the tensor does not exist
+        """
+        entry = self.tensors[name]
+        return np.frombuffer(self._mmap, dtype=np.uint8, count=entry["nbytes"], offset=self._data_start + entry["offset"])
+
+    def ternary(self, name: str) -> np.ndarray:
+        """
+        Unpack an i2_s tensor into its ternary values.
+
+        Args:
+            name: Tensor name
+
+        Returns:
+            int8 array of -1, 0 and 1 in the tensor's shape
+
+        Raises:
+            KeyError: If the tensor does not exist
+            ValueError: If the tensor is not stored as i2_s
+        """
+        entry = self.tensors[name]
+        if entry["dtype"] != "i2_s":
+            raise ValueError(f"Tensor {name} is stored as {entry['dtype']}, not i2_s")
+
+        shape = tuple(entry["shape"])
+        return unpack_ternary(self.raw(name), int(np.prod(shape))).reshape(shape)
+
+    def tensor(self, name: str) -> np.ndarray:
+        """
+        Get a tensor as floating point values.
+
+        Float tensors are returned as views of the mapping; i2_s tensors are
+        unpacked and multiplied by their scale.
+
+        Args:
+            name: Tensor name
+
+        Returns:
+            Tensor in its stored shape
+
+        Raises:
+            KeyError: If the tensor does not exist
+        """
+        entry = self.tensors[name]
+        shape = tuple(entry["shape"])
+
+        if entry["dtype"] == "i2_s":
+            return self.ternary(name).astype(np.float32) * np.float32(entry["scale"])
+
+        return self.raw(name).view(_FLOAT_DTYPES[entry["dtype"]]).reshape(shape)
+
+    def nbytes(self) -> int:
+        """
+        Get the size of the mapped file.
+
+        Returns:
+            Size in bytes
+        """
+        return len(self._mmap)
+
+    def close(self) -> None:
+        """
+        Unmap the file.
+
+        If arrays returned by this object are still alive the mapping stays
+        open until they are garbage collected.
+        """
+        try:
+            self._mmap.close()
+        except BufferError:
+            logger.debug(f"Tensors from {self.path} are still referenced; leaving the mapping to the garbage collector")
+
+    def __contains__(self, name: object) -> bool:
+        """
+        Check whether a tensor exists.
+
+        Args:
+            name: Tensor name
+
+        Returns:
+            True if the tensor exists, False otherwise
+        """
+        return name in self.tensors
+
+    def __len__(self) -> int:
+        """
+        Get number of tensors.
+
+        Returns:
+            Number of tensors
+        """
+        return len(self.tensors)
+
+    def __enter__(self) -> "TernaryWeights":
+        """
+        Enter the context manager.
+
+        Returns:
+            The weights
+        """
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """
+        Exit the context manager, unmapping the file.
+        """
+        self.close()
+
+    def __repr__(self) -> str:
+        """
+        Get representation of the weights.
+
+        Returns:
+            Representation
+        """
+        return f"TernaryWeights(path={self.path!r}, tensors={len(self.tensors)})"
+
+def _read_safetensors(path: str) -> Dict[str, np.ndarray]:
+    """
+    Read a safetensors checkpoint with NumPy.
+
+    Args:
+        path: Path to the checkpoint
+
+    Returns:
+        Tensors by name
+    """
+    dtypes = {"F16": np.float16, "F32": np.float32, "F64": np.float64, "BF16": np.uint16}
+
+    with open(path, "rb") as f:
+        (header_length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_length).decode("utf-8"))
+        data = f.read()
+
+    tensors = {}
+    for name, entry in header.items():
+        if name == "__metadata__":
+            continue
+        if entry["dtype"] not in dtypes:
+            raise ValueError(f"Unsupported dtype {entry['dtype']} for tensor {name}")
+
+        start, end = entry["data_offsets"]
+        array = np.frombuffer(data[start:end], dtype=dtypes[entry["dtype"]])
+        if entry["dtype"] == "BF16":
+            # bfloat16 is the upper half of a float32
+            array = (array.astype(np.uint32) << 16).view(np.float32)
+        tensors[name] = array.reshape(entry["shape"])
+
+    return tensors
+
+def load_float_checkpoint(path: str) -> Dict[str, np.ndarray]:
+    """
+    Load a floating point checkpoint.
+
+    Args:
+        path: Path to a ``.safetensors`` or NumPy ``.npz`` checkpoint
+
+    Returns:
+        Tensors by name
+
+    Raises:
+        ValueError: If the checkpoint format is not supported
+    """
+    if path.endswith(".safetensors"):
+        return _read_safetensors(path)
+
+    if path.endswith(".npz"):
+        with np.load(path) as archive:
+            return {name: archive[name] for name in archive.files}
+
+    raise ValueError(f"Unsupported checkpoint format: {path}. Supported formats: .safetensors, .npz")
+
+def convert_checkpoint(
+    src: str,
+    dst: str,
+    keep_float: Tuple[str, ...] = DEFAULT_KEEP_FLOAT,
+    config: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Convert a floating point checkpoint to a ternary weight file.
+
+    Two-dimensional weight matrices are quantized to ternary; all other
+    tensors, and tensors whose names contain one of ``keep_float``, stay in
+    floating point.
+
+    Args:
+        src: Path to a ``.safetensors`` or ``.npz`` checkpoint
+        dst: Path of the ternary weight file to write
+        keep_float: Name fragments of matrices to keep in floating point
+        config: Model configuration stored in the metadata (defaults to the
+            ``config.json`` next to the checkpoint, if any)
+
+    Returns:
+        Dictionary with conversion statistics
+    """
+    tensors = load_float_checkpoint(src)
+
+    if config is None:
+        config_path = os.path.join(os.path.dirname(os.path.abspath(src)), "config.json")
+        if os.path.exists(config_path):
+            with open(config_path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+
+    def is_ternary(name: str, tensor: np.ndarray) -> bool:
+        return tensor.ndim == 2 and not any(fragment in name for fragment in keep_float)
+
+    metadata: Dict[str, Any] = {"source": os.path.basename(src)}
+    if config is not None:
+        metadata["config"] = config
+
+    write_ternary_file(dst, tensors, ternary=is_ternary, metadata=metadata)
+
+    src_bytes = sum(tensor.nbytes for tensor in tensors.values())
+    dst_bytes = os.path.getsize(dst)
+    stats = {
+        "tensors": len(tensors),
+        "ternary_tensors": sum(1 for name, tensor in tensors.items() if is_ternary(name, tensor)),
+        "source_bytes": src_bytes,
+        "output_bytes": dst_bytes
+    }
+
+    logger.info(f"Converted {src} to {dst}: {src_bytes} -> {dst_bytes} bytes")
+    return stats
+
+def write_random_model(
+    path: str,
+    hidden_size: int = 128,
+    num_layers: int = 2,
+    vocab_size: int = 256,
+    seed: int = 0,
+    num_attention_heads: Optional[int] = None,
+    num_key_value_heads: Optional[int] = None,
+    intermediate_size: Optional[int] = None,
+    hidden_act: str = "silu",
+    sub_norms: bool = False
+) -> None:
+    """
+    Write a Llama-style model with random ternary weights.
+
+    Tests and benchmarks use it to run the NumPy backend without a trained
+    model; the same arguments always write the same weights.
+
+    Args:
+        path: Output path
+        hidden_size: Hidden size
+        num_layers: Number of transformer layers
+        vocab_size: Vocabulary size
+        seed: Random seed of the weights
+        num_attention_heads: Number of attention heads (defaults to one per 64 hidden units)
+        num_key_value_heads: Number of key/value heads (defaults to num_attention_heads)
+        intermediate_size: Size of the MLP's hidden layer (defaults to hidden_size)
+        hidden_act: MLP activation
+        sub_norms: Whether the layers have BitNet's attention and MLP sub-norms
+    """
+    num_attention_heads = num_attention_heads or max(1, hidden_size // 64)
+    num_key_value_heads = num_key_value_heads or num_attention_heads
+    intermediate_size = intermediate_size or hidden_size
+    kv_size = hidden_size // num_attention_heads * num_key_value_heads
+
+    rng = np.random.default_rng(seed)
+    tensors = {
+        "model.embed_tokens.weight": rng.standard_normal((vocab_size, hidden_size)).astype(np.float32),
+        "model.norm.weight": np.ones(hidden_size, dtype=np.float32)
+    }
+    shapes = {
+        "self_attn.q_proj": (hidden_size, hidden_size),
+        "self_attn.k_proj": (kv_size, hidden_size),
+        "self_attn.v_proj": (kv_size, hidden_size),
+        "self_attn.o_proj": (hidden_size, hidden_size),
+        "mlp.gate_proj": (intermediate_size, hidden_size),
+        "mlp.up_proj": (intermediate_size, hidden_size),
+        "mlp.down_proj": (hidden_size, intermediate_size)
+    }
+    for layer in range(num_layers):
+        prefix = f"model.layers.{layer}."
+        tensors[prefix + "input_layernorm.weight"] = np.ones(hidden_size, dtype=np.float32)
+        tensors[prefix + "post_attention_layernorm.weight"] = np.ones(hidden_size, dtype=np.float32)
+        if sub_norms:
+            tensors[prefix + "self_attn.attn_sub_norm.weight"] = np.ones(hidden_size, dtype=np.float32)
+            tensors[prefix + "mlp.ffn_sub_norm.weight"] = np.ones(intermediate_size, dtype=np.float32)
+        for name, shape in shapes.items():
+            tensors[prefix + f"{name}.weight"] = rng.standard_normal(shape)
+
+    config = {
+        "hidden_size": hidden_size,
+        "num_hidden_layers": num_layers,
+        "num_attention_heads": num_attention_heads,
+        "num_key_value_heads": num_key_value_heads,
+        "intermediate_size": intermediate_size,
+        "vocab_size": vocab_size,
+        "hidden_act": hidden_act
+    }
+    write_ternary_file(
+        path,
+        tensors,
+        ternary=lambda name, tensor: tensor.ndim == 2 and "embed" not in name,
+        metadata={"config": config}
+    )
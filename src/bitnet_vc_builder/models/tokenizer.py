@@ -0,0 +1,414 @@
+"""
+BPE tokenizer for BitNet Virtual Co-worker Builder.
+
+Reads the tokenizer shipped with a model: a Hugging Face ``tokenizer.json``,
+or a GPT-2 style ``vocab.json`` and ``merges.txt`` pair. Both byte-level
+vocabularies (Llama 3, GPT-2) and SentencePiece-style vocabularies with byte
+fallback (Llama 2) are supported.
+
+Encoding is kept cheap so that token counts can be used for context
+budgeting everywhere:
+
+- Merges are stored as a dictionary of pair ranks, so each merge step looks
+  pairs up instead of scanning the merge list.
+- Every pre-tokenized word is merged once and its token IDs are memoized.
+- Whole strings are kept in an LRU cache, so repeated system prompts and tool
+  descriptions cost a dictionary lookup.
+"""
+
+import os
+import re
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Llama 3 pre-tokenization pattern, with the Unicode letter and number classes
+# expressed through the classes the re module supports
+BYTE_LEVEL_PATTERN = (
+    r"(?i:'s|'t|'re|'ve|'m|'ll|'d)"
+    r"|(?:[^\r\n\w]|_)?[^\W\d_]+"
+    r"|\d{1,3}"
+    r"| ?(?:[^\s\w]|_)+[\r\n]*"
+    r"|\s*[\r\n]+"
+    r"|\s+(?!\S)"
+    r"|\s+"
+)
+
+# SentencePiece word boundary marker
+SPACE_MARKER = "▁"
+
+TOKENIZER_FILES = ("tokenizer.json", "vocab.json")
+
+MAX_CACHED_WORDS = 65536
+
+def _bytes_to_unicode() -> Dict[int, str]:
+    """
+    Get the GPT-2 mapping from bytes to printable characters.
+
+    Returns:
+        Dictionary mapping each byte value to a character
+    """
+    printable = list(range(ord("!"), ord("~") + 1)) + list(range(ord("\xa1"), ord("\xac") + 1)) + list(range(ord("\xae"), ord("\xff") + 1))
+    mapping = {b: chr(b) for b in printable}
+    shift = 0
+    for b in range(256):
+        if b not in mapping:
+            mapping[b] = chr(256 + shift)
+            shift += 1
+    return mapping
+
+BYTE_ENCODER = _bytes_to_unicode()
+BYTE_DECODER = {char: b for b, char in BYTE_ENCODER.items()}
+
+def find_tokenizer(model_path: str) -> Optional[str]:
+    """
+    Find the tokenizer file of a model.
+
+    Args:
+        model_path: Model directory, or a model file whose directory holds the tokenizer
+
+    Returns:
+        Path to ``tokenizer.json`` or ``vocab.json``, or None if there is none
+    """
+    directory = model_path if os.path.isdir(model_path) else os.path.dirname(model_path)
+    for filename in TOKENIZER_FILES:
+        path = os.path.join(directory or ".", filename)
+        if os.path.isfile(path):
+            return path
+    return None
+
+class BPETokenizer:
+    """
+    Byte pair encoding tokenizer with merge ranks and an LRU cache.
+    """
+
+    def __init__(
+        self,
+        vocab: Dict[str, int],
+        merges: List[Tuple[str, str]],
+        byte_level: bool = True,
+        special_tokens: Optional[Dict[str, int]] = None,
+        unk_token: Optional[str] = None,
+        cache_size: int = 1024
+    ):
+        """
+        Initialize tokenizer.
+
+        Args:
+            vocab: Token strings and their IDs
+            merges: Merges in priority order
+            byte_level: Whether tokens are GPT-2 byte-level strings (otherwise
+                SentencePiece-style with "▁" word markers and <0xNN> byte fallback)
+            special_tokens: Tokens matched verbatim before BPE, such as "<|eot_id|>"
+            unk_token: Token used for pieces missing from the vocabulary (optional)
+            cache_size: Maximum number of whole strings kept in the LRU cache
+        """
+        self.vocab = vocab
+        self.byte_level = byte_level
+        self.special_tokens = special_tokens or {}
+        self.unk_token_id = vocab.get(unk_token) if unk_token else None
+        self.cache_size = cache_size
+
+        # Lower rank merges first
+        self.ranks: Dict[Tuple[str, str], int] = {pair: rank for rank, pair in enumerate(merges)}
+
+        self.id_to_token: Dict[int, str] = {token_id: token for token, token_id in vocab.items()}
+        self.id_to_token.update({token_id: token for token, token_id in self.special_tokens.items()})
+        self._special_ids = set(self.special_tokens.values())
+
+        self._pattern = re.compile(BYTE_LEVEL_PATTERN) if byte_level else re.compile(f"{SPACE_MARKER}?[^{SPACE_MARKER}]+|{SPACE_MARKER}+")
+        self._special_pattern = None
+        if self.special_tokens:
+            # Longest first, so tokens that prefix others do not shadow them
+            alternatives = sorted(self.special_tokens, key=len, reverse=True)
+            self._special_pattern = re.compile("(" + "|".join(re.escape(token) for token in alternatives) + ")")
+
+        # Word memo; words repeat far more than whole strings, so it is only
+        # cleared when it reaches MAX_CACHED_WORDS
+        self._word_ids: Dict[str, Tuple[int, ...]] = {}
+
+        self._cache: "OrderedDict[str, Tuple[int, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_file(cls, path: str, cache_size: int = 1024) -> "BPETokenizer":
+        """
+        Load a tokenizer from ``tokenizer.json``, or from ``vocab.json`` with ``merges.txt`` beside it.
+
+        Args:
+            path: Path to the tokenizer file
+            cache_size: Maximum number of whole strings kept in the LRU cache
+
+        Returns:
+            BPETokenizer instance
+
+        Raises:
+            ValueError: If the file does not describe a BPE tokenizer
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        if os.path.basename(path) == "vocab.json":
+            merges_path = os.path.join(os.path.dirname(path), "merges.txt")
+            with open(merges_path, "r", encoding="utf-8") as f:
+                lines = [line.rstrip("\n") for line in f if line.strip() and not line.startswith("#version")]
+            return cls(data, [tuple(line.split(" ")) for line in lines], cache_size=cache_size)
+
+        model = data.get("model") or {}
+        if model.get("type") != "BPE":
+            raise ValueError(f"{path} does not describe a BPE tokenizer")
+
+        merges = [tuple(merge.split(" ")) if isinstance(merge, str) else tuple(merge) for merge in model.get("merges", [])]
+        special_tokens = {token["content"]: token["id"] for token in data.get("added_tokens", [])}
+        byte_level = "ByteLevel" in json.dumps(data.get("pre_tokenizer")) or (data.get("decoder") or {}).get("type") == "ByteLevel"
+
+        return cls(
+            model["vocab"],
+            merges,
+            byte_level=byte_level,
+            special_tokens=special_tokens,
+            unk_token=model.get("unk_token"),
+            cache_size=cache_size
+        )
+
+    @property
+    def vocab_size(self) -> int:
+        """
+        Number of token IDs, including special tokens.
+        """
+        return max(self.id_to_token) + 1 if self.id_to_token else 0
+
+    def _bpe(self, word: str) -> List[str]:
+        """
+        Merge the characters of a word.
+
+        Args:
+            word: Pre-tokenized word in vocabulary characters
+
+        Returns:
+            Token strings
+        """
+        parts = list(word)
+        ranks = self.ranks
+
+        while len(parts) > 1:
+            best = min(zip(parts, parts[1:]), key=lambda pair: ranks.get(pair, float("inf")))
+            if best not in ranks:
+                break
+
+            # Merge every occurrence of the best pair, left to right
+            first, second = best
+            merged = []
+            i = 0
+            while i < len(parts):
+                if i < len(parts) - 1 and parts[i] == first and parts[i + 1] == second:
+                    merged.append(first + second)
+                    i += 2
+                else:
+                    merged.append(parts[i])
+                    i += 1
+            parts = merged
+
+        return parts
+
+    def _encode_word(self, word: str) -> Tuple[int, ...]:
+        """
+        Get the token IDs of a pre-tokenized word.
+
+        Args:
+            word: Word as it appears in the text
+
+        Returns:
+            Token IDs
+        """
+        ids = self._word_ids.get(word)
+        if ids is not None:
+            return ids
+
+        if self.byte_level:
+            symbols = "".join(BYTE_ENCODER[b] for b in word.encode("utf-8"))
+        else:
+            symbols = word
+
+        result: List[int] = []
+        for piece in self._bpe(symbols):
+            token_id = self.vocab.get(piece)
+            if token_id is not None:
+                result.append(token_id)
+            elif not self.byte_level and all(f"<0x{b:02X}>" in self.vocab for b in piece.encode("utf-8")):
+                result.extend(self.vocab[f"<0x{b:02X}>"] for b in piece.encode("utf-8"))
+            elif self.unk_token_id is not None:
+                result.append(self.unk_token_id)
+            else:
+                raise ValueError(f"Token {piece!r} is not in the vocabulary and there is no unknown token")
+
+        ids = tuple(result)
+        if len(self._word_ids) >= MAX_CACHED_WORDS:
+            self._word_ids.clear()
+        self._word_ids[word] = ids
+        return ids
+
+    def _encode_text(self, text: str) -> Tuple[int, ...]:
+        """
+        Encode a string that contains no special tokens.
+
+        Args:
+            text: Text to encode
+
+        Returns:
+            Token IDs
+        """
+        if not text:
+            return ()
+        if not self.byte_level:
+            text = SPACE_MARKER + text.replace(" ", SPACE_MARKER)
+
+        ids: List[int] = []
+        for word in self._pattern.findall(text):
+            ids.extend(self._encode_word(word))
+        return tuple(ids)
+
+    def encode(self, text: str) -> List[int]:
+        """
+        Encode text.
+
+        Args:
+            text: Text to encode
+
+        Returns:
+            Token IDs
+        """
+        with self._lock:
+            ids = self._cache.get(text)
+            if ids is not None:
+                self._cache.move_to_end(text)
+                self.hits += 1
+                return list(ids)
+            self.misses += 1
+
+        if self._special_pattern is None:
+            ids = self._encode_text(text)
+        else:
+            parts: List[int] = []
+            # The split keeps special tokens at odd positions
+            for i, chunk in enumerate(self._special_pattern.split(text)):
+                if i % 2:
+                    parts.append(self.special_tokens[chunk])
+                else:
+                    parts.extend(self._encode_text(chunk))
+            ids = tuple(parts)
+
+        with self._lock:
+            self._cache[text] = ids
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return list(ids)
+
+    def encode_batch(self, texts: List[str]) -> List[List[int]]:
+        """
+        Encode several texts, encoding repeated texts once.
+
+        Args:
+            texts: Texts to encode
+
+        Returns:
+            Token IDs of each text
+        """
+        encoded = {text: self.encode(text) for text in dict.fromkeys(texts)}
+        return [list(encoded[text]) for text in texts]
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Count the tokens of a text.
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Number of tokens
+        """
+        return len(self.encode(text))
+
+    def decode(self, token_ids: List[int]) -> str:
+        """
+        Decode token IDs.
+
+        Args:
+            token_ids: Token IDs (unknown IDs are skipped)
+
+        Returns:
+            Text
+        """
+        data = bytearray()
+        for token_id in token_ids:
+            token = self.id_to_token.get(token_id)
+            if token is None:
+                continue
+            if token_id in self._special_ids:
+                data.extend(token.encode("utf-8"))
+            elif self.byte_level:
+                for char in token:
+                    if char in BYTE_DECODER:
+                        data.append(BYTE_DECODER[char])
+                    else:
+                        data.extend(char.encode("utf-8"))
+            elif re.fullmatch(r"<0x[0-9A-F]{2}>", token):
+                data.append(int(token[3:5], 16))
+            else:
+                data.extend(token.replace(SPACE_MARKER, " ").encode("utf-8"))
+
+        text = data.decode("utf-8", errors="replace")
+        if not self.byte_level and text.startswith(" "):
+            text = text[1:]
+        return text
+
+    def token_text(self, token_id: int) -> str:
+        """
+        Get the text one token contributes when decoded in a sequence.
+
+        Unlike decode([token_id]), a leading word marker is kept as a space and
+        partial UTF-8 bytes come out as U+FFFD. Special and unknown tokens
+        have no text.
+
+        Args:
+            token_id: Token ID
+
+        Returns:
+            Token text
+        """
+        token = self.id_to_token.get(token_id)
+        if token is None or token_id in self._special_ids:
+            return ""
+        if self.byte_level:
+            data = bytearray()
+            for char in token:
+                if char in BYTE_DECODER:
+                    data.append(BYTE_DECODER[char])
+                else:
+                    data.extend(char.encode("utf-8"))
+            return data.decode("utf-8", errors="replace")
+        if re.fullmatch(r"<0x[0-9A-F]{2}>", token):
+            return bytes([int(token[3:5], 16)]).decode("utf-8", errors="replace")
+        return token.replace(SPACE_MARKER, " ")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with cache hits, misses and sizes
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "cached_texts": len(self._cache),
+                "cached_words": len(self._word_ids)
+            }
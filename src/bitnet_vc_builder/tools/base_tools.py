@@ -2,9 +2,14 @@
 Base tools for BitNet Virtual Co-worker Builder.
 """
 
+import time
+import inspect
 import logging
 from typing import Dict, Any, Optional, Callable, List, Union
 
+from bitnet_vc_builder.core.cancellation import CancelToken, CancelledError, check_cancelled
+from bitnet_vc_builder.core.recording import get_recorder, get_replay
+
 logger = logging.getLogger(__name__)
 
 class Tool:
@@ -35,13 +40,19 @@ class Tool:
         self.description = description
         self.function = function
         self.args_schema = args_schema or {}
+        self._accepts_cancel_token: Optional[bool] = None
     
-    def __call__(self, args: Dict[str, Any]) -> Any:
+    def __call__(self, args: Dict[str, Any], cancel_token: Optional[CancelToken] = None) -> Any:
         """
         Call the tool.
         
+        Functions that declare a ``cancel_token`` parameter receive the token so
+        long-running work can stop early. While a replay is installed, recorded
+        calls return their recorded result instead (see core.recording).
+        
         Args:
             args: Tool arguments
+            cancel_token: Token for abandoning the call (optional)
             
         Returns:
             Tool result
@@ -51,13 +62,50 @@ class Tool:
         # Validate arguments
         self._validate_args(args)
         
+        check_cancelled(cancel_token)
+        
+        replay = get_replay()
+        if replay is not None:
+            recorded, result = replay.tool(self.name, args, cancel_token)
+            if recorded:
+                return result
+        
         # Call function
-        result = self.function(**args)
+        recorder = get_recorder()
+        start = time.perf_counter()
+        try:
+            if cancel_token is not None and self._function_accepts_cancel_token():
+                result = self.function(**args, cancel_token=cancel_token)
+            else:
+                result = self.function(**args)
+        except CancelledError:
+            raise
+        except Exception as e:
+            if recorder is not None:
+                recorder.record_tool(self.name, args, None, time.perf_counter() - start, error=str(e))
+            raise
+        
+        if recorder is not None:
+            recorder.record_tool(self.name, args, result, time.perf_counter() - start)
         
         logger.info(f"Tool {self.name} returned: {result}")
         
         return result
     
+    def _function_accepts_cancel_token(self) -> bool:
+        """
+        Check whether the tool function declares a cancel_token parameter.
+        
+        Returns:
+            True if the function accepts a cancel token, False otherwise
+        """
+        if self._accepts_cancel_token is None:
+            try:
+                self._accepts_cancel_token = "cancel_token" in inspect.signature(self.function).parameters
+            except (TypeError, ValueError):
+                self._accepts_cancel_token = False
+        return self._accepts_cancel_token
+    
     def _validate_args(self, args: Dict[str, Any]) -> None:
         """
         Validate tool arguments.
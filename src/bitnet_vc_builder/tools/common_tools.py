@@ -5,7 +5,6 @@ Common tools for BitNet Virtual Co-worker Builder.
 import os
 import json
 import logging
-import requests
 from typing import Dict, Any, Optional, List, Union
 
 from bitnet_vc_builder.tools.base_tools import Tool
@@ -27,6 +26,8 @@ def web_search(query: str) -> str:
     try:
         # Use a search API (this is a mock implementation)
         # In a real implementation, you would use a search API like Google, Bing, or DuckDuckGo
+        # through tools.http_client.get_http_client() so connections are pooled and responses
+        # cached (imported in the function, as requests is slow to import)
         
         # Mock response
         if "climate change" in query.lower():
@@ -80,6 +81,8 @@ def fetch_weather(location: str) -> Dict[str, Any]:
     try:
         # Use a weather API (this is a mock implementation)
         # In a real implementation, you would use a weather API like OpenWeatherMap or WeatherAPI
+        # through tools.http_client.get_http_client() so connections are pooled and responses
+        # cached (imported in the function, as requests is slow to import)
         
         # Mock response
         if "new york" in location.lower():
@@ -0,0 +1,678 @@
+"""
+Pooled HTTP client for network-backed tools in BitNet Virtual Co-worker Builder.
+"""
+
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+import email.utils
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple, Iterable, Mapping
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# Methods that are safe to retry without side effects
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+
+# Status codes that usually indicate a transient server-side problem
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Request headers that make a response specific to one user; the cache is
+# shared by all tools, so such requests bypass it
+PRIVATE_REQUEST_HEADERS = ("Authorization", "Cookie")
+
+class HTTPResponse:
+    """
+    Response returned by the HTTP client.
+
+    Responses are fully read so they can be cached and shared between callers.
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        headers: Dict[str, str],
+        content: bytes,
+        url: str,
+        from_cache: bool = False
+    ):
+        """
+        Initialize response.
+
+        Args:
+            status_code: HTTP status code
+            headers: Response headers
+            content: Response body
+            url: Final URL of the response
+            from_cache: Whether the response was served from the cache
+        """
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.content = content
+        self.url = url
+        self.from_cache = from_cache
+
+    @property
+    def ok(self) -> bool:
+        """
+        Whether the status code indicates success.
+        """
+        return 200 <= self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        """
+        Response body decoded as text.
+        """
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        """
+        Decode the response body as JSON.
+
+        Returns:
+            Decoded JSON value
+        """
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        """
+        Raise an error if the response indicates a failure.
+
+        Raises:
+            requests.HTTPError: If the status code is 4xx or 5xx
+        """
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error for url: {self.url}")
+
+    def __repr__(self) -> str:
+        """
+        Get representation of the response.
+
+        Returns:
+            Representation
+        """
+        return f"HTTPResponse(status_code={self.status_code}, url='{self.url}', from_cache={self.from_cache})"
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """
+    Parse a Cache-Control header.
+
+    Args:
+        value: Header value
+
+    Returns:
+        Dictionary of lower-cased directives to their values (None for flags)
+    """
+    directives = {}
+    if not value:
+        return directives
+
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "=" in part:
+            name, _, arg = part.partition("=")
+            directives[name.strip().lower()] = arg.strip().strip('"')
+        else:
+            directives[part.lower()] = None
+
+    return directives
+
+def _freshness_lifetime(headers: Dict[str, str], directives: Dict[str, Optional[str]]) -> Optional[float]:
+    """
+    Compute how long a response may be served without revalidation.
+
+    Args:
+        headers: Response headers
+        directives: Parsed Cache-Control directives
+
+    Returns:
+        Lifetime in seconds, or None if the response carries no freshness information
+    """
+    if "max-age" in directives:
+        try:
+            return max(0.0, float(directives["max-age"]))
+        except (TypeError, ValueError):
+            return 0.0
+
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            expires_at = email.utils.parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            return 0.0
+        return max(0.0, expires_at - time.time())
+
+    return None
+
+def _vary_values(response: HTTPResponse, request_headers: Mapping[str, str]) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """
+    Get the request header values a response varies on.
+
+    Args:
+        response: Response with an optional Vary header
+        request_headers: Case-insensitive headers of the request
+
+    Returns:
+        Sorted (lowercase header name, value or None) pairs
+    """
+    names = {name.strip().lower() for name in response.headers.get("Vary", "").split(",") if name.strip()}
+    return tuple(sorted((name, request_headers.get(name)) for name in names))
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache for HTTP responses that honors Cache-Control.
+
+    Entries that are stale but carry an ETag or Last-Modified validator are kept
+    so the client can revalidate them with a conditional request. An entry
+    whose response has a Vary header is only served to requests with the same
+    values of the named headers as the request that fetched it.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Initialize response cache.
+
+        Args:
+            max_entries: Maximum number of responses to keep
+        """
+        self.max_entries = max_entries
+        # Key -> (response, expiry time, request header values it varies on)
+        self._entries: "OrderedDict[Tuple, Tuple[HTTPResponse, float, Tuple]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple, request_headers: Optional[Mapping[str, str]] = None) -> Tuple[Optional[HTTPResponse], bool]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key
+            request_headers: Case-insensitive headers of the request (optional)
+
+        Returns:
+            Tuple of (response or None, whether the response is still fresh)
+        """
+        request_headers = request_headers if request_headers is not None else CaseInsensitiveDict()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            response, expires_at, vary = entry
+            if any(request_headers.get(name) != value for name, value in vary):
+                return None, False
+            self._entries.move_to_end(key)
+            return response, time.time() < expires_at
+
+    def store(self, key: Tuple, response: HTTPResponse, request_headers: Optional[Mapping[str, str]] = None) -> bool:
+        """
+        Store a response if its headers allow it.
+
+        Args:
+            key: Cache key
+            response: Response to store
+            request_headers: Case-insensitive headers of the request (optional)
+
+        Returns:
+            True if the response was stored, False otherwise
+        """
+        directives = parse_cache_control(response.headers.get("Cache-Control"))
+
+        if "no-store" in directives or response.headers.get("Vary", "").strip() == "*":
+            self.invalidate(key)
+            return False
+
+        has_validator = "ETag" in response.headers or "Last-Modified" in response.headers
+
+        if "no-cache" in directives:
+            lifetime = 0.0
+        else:
+            lifetime = _freshness_lifetime(response.headers, directives)
+
+        # Nothing to serve from cache and nothing to revalidate with
+        if not lifetime and not has_validator:
+            self.invalidate(key)
+            return False
+
+        if not response.from_cache:
+            response = HTTPResponse(response.status_code, dict(response.headers), response.content, response.url, from_cache=True)
+
+        vary = _vary_values(response, request_headers if request_headers is not None else CaseInsensitiveDict())
+        with self._lock:
+            self._entries[key] = (response, time.time() + (lifetime or 0.0), vary)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return True
+
+    def refresh(
+        self,
+        key: Tuple,
+        not_modified: HTTPResponse,
+        request_headers: Optional[Mapping[str, str]] = None
+    ) -> Optional[HTTPResponse]:
+        """
+        Refresh a cached entry after a 304 Not Modified response.
+
+        Args:
+            key: Cache key
+            not_modified: The 304 response
+            request_headers: Case-insensitive headers of the request (optional)
+
+        Returns:
+            The refreshed cached response, or None if the entry is gone
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        cached = entry[0]
+        headers = dict(cached.headers)
+        for name, value in not_modified.headers.items():
+            # A 304 has no body, so its framing headers do not describe the cached one
+            if name.lower() not in ("content-length", "content-encoding", "transfer-encoding"):
+                headers[name] = value
+        refreshed = HTTPResponse(cached.status_code, headers, cached.content, cached.url, from_cache=True)
+        self.store(key, refreshed, request_headers)
+        return refreshed
+
+    def invalidate(self, key: Tuple) -> None:
+        """
+        Remove an entry from the cache.
+
+        Args:
+            key: Cache key
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Remove all entries from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        """
+        Get number of cached responses.
+
+        Returns:
+            Number of cached responses
+        """
+        with self._lock:
+            return len(self._entries)
+
+class HTTPClient:
+    """
+    HTTP client with keep-alive connection pooling, retries and response caching.
+
+    A single client is meant to be shared by all tools so that repeated calls to
+    the same endpoints reuse open connections instead of opening a new one per call.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 20,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        backoff_max: float = 10.0,
+        retry_statuses: Iterable[int] = RETRY_STATUSES,
+        timeout: float = 10.0,
+        enable_cache: bool = True,
+        cache_size: int = 256,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        """
+        Initialize HTTP client.
+
+        Args:
+            pool_connections: Number of per-host connection pools to keep
+            pool_maxsize: Maximum number of connections kept open per host
+            max_retries: Maximum number of retries for transient failures
+            backoff_factor: Base delay in seconds for exponential backoff
+            backoff_max: Maximum delay in seconds between retries
+            retry_statuses: Status codes that trigger a retry
+            timeout: Default request timeout in seconds
+            enable_cache: Whether to cache GET responses according to Cache-Control
+            cache_size: Maximum number of cached responses
+            headers: Default headers sent with every request
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.timeout = timeout
+        self.cache = ResponseCache(cache_size) if enable_cache else None
+
+        # Retries are handled here rather than by urllib3 so they use jittered backoff
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=0,
+            pool_block=False
+        )
+
+        self._session = requests.Session()
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        if headers:
+            self._session.headers.update(headers)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        json: Any = None,
+        data: Any = None,
+        timeout: Optional[float] = None,
+        use_cache: bool = True
+    ) -> HTTPResponse:
+        """
+        Send an HTTP request.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            params: Query parameters
+            headers: Additional request headers
+            json: JSON body
+            data: Raw body
+            timeout: Request timeout in seconds (overrides the client default)
+            use_cache: Whether the response cache may be used for this request
+                (requests with Authorization or Cookie headers never use it)
+
+        Returns:
+            HTTP response
+
+        Raises:
+            requests.RequestException: If the request fails after all retries
+        """
+        method = method.upper()
+        cache_key = None
+        cached = None
+        headers = dict(headers or {})
+
+        # Headers as sent, including the session's defaults
+        request_headers = CaseInsensitiveDict(self._session.headers)
+        request_headers.update(headers)
+        private = any(name in request_headers for name in PRIVATE_REQUEST_HEADERS)
+
+        if self.cache is not None and use_cache and method == "GET" and not private:
+            cache_key = (url, tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())))
+            cached, fresh = self.cache.get(cache_key, request_headers)
+            if cached is not None and fresh:
+                return cached
+            if cached is not None:
+                # Stale: revalidate with whatever validators we have
+                if "ETag" in cached.headers:
+                    headers.setdefault("If-None-Match", cached.headers["ETag"])
+                if "Last-Modified" in cached.headers:
+                    headers.setdefault("If-Modified-Since", cached.headers["Last-Modified"])
+
+        response = self._send_with_retries(method, url, params, headers, json, data, timeout)
+
+        if cache_key is not None:
+            if response.status_code == 304 and cached is not None:
+                refreshed = self.cache.refresh(cache_key, response, request_headers)
+                if refreshed is not None:
+                    return refreshed
+            elif response.status_code == 200:
+                self.cache.store(cache_key, response, request_headers)
+
+        return response
+
+    def _send_with_retries(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        headers: Dict[str, str],
+        json: Any,
+        data: Any,
+        timeout: Optional[float]
+    ) -> HTTPResponse:
+        """
+        Send a request, retrying transient failures with jittered backoff.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            params: Query parameters
+            headers: Request headers
+            json: JSON body
+            data: Raw body
+            timeout: Request timeout in seconds
+
+        Returns:
+            HTTP response
+        """
+        retries = self.max_retries if method in IDEMPOTENT_METHODS else 0
+        attempt = 0
+
+        while True:
+            try:
+                raw = self._session.request(
+                    method,
+                    url,
+                    params=params,
+                    headers=headers,
+                    json=json,
+                    data=data,
+                    timeout=timeout if timeout is not None else self.timeout
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= retries:
+                    raise
+                logger.warning(f"{method} {url} failed ({e}), retrying ({attempt + 1}/{retries})")
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            response = HTTPResponse(raw.status_code, dict(raw.headers), raw.content, raw.url)
+
+            if response.status_code in self.retry_statuses and attempt < retries:
+                logger.warning(f"{method} {url} returned {response.status_code}, retrying ({attempt + 1}/{retries})")
+                time.sleep(self._backoff(attempt, response.headers.get("Retry-After")))
+                attempt += 1
+                continue
+
+            return response
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Compute the delay before the next retry.
+
+        Uses "full jitter" exponential backoff so that many clients retrying the
+        same endpoint do not synchronize.
+
+        Args:
+            attempt: Zero-based retry attempt
+            retry_after: Value of the Retry-After header, if any
+
+        Returns:
+            Delay in seconds
+        """
+        if retry_after:
+            try:
+                return min(self.backoff_max, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * (2 ** attempt)))
+
+    def get(self, url: str, **kwargs: Any) -> HTTPResponse:
+        """
+        Send a GET request.
+
+        Args:
+            url: Request URL
+            **kwargs: Additional arguments for request()
+
+        Returns:
+            HTTP response
+        """
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> HTTPResponse:
+        """
+        Send a POST request.
+
+        Args:
+            url: Request URL
+            **kwargs: Additional arguments for request()
+
+        Returns:
+            HTTP response
+        """
+        return self.request("POST", url, **kwargs)
+
+    def get_json(self, url: str, **kwargs: Any) -> Any:
+        """
+        Send a GET request and decode the JSON response.
+
+        Args:
+            url: Request URL
+            **kwargs: Additional arguments for request()
+
+        Returns:
+            Decoded JSON value
+
+        Raises:
+            requests.HTTPError: If the response indicates a failure
+        """
+        response = self.get(url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    def close(self) -> None:
+        """
+        Close all pooled connections.
+        """
+        self._session.close()
+
+    def __enter__(self) -> "HTTPClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+class AsyncHTTPClient:
+    """
+    Asyncio variant of the HTTP client.
+
+    Requests run on a bounded thread pool over a shared HTTPClient, so async
+    callers get the same connection pool, retries and cache as sync callers.
+    """
+
+    def __init__(self, client: Optional[HTTPClient] = None, max_workers: int = 20):
+        """
+        Initialize async HTTP client.
+
+        Args:
+            client: HTTP client to wrap (defaults to the shared client)
+            max_workers: Maximum number of concurrent requests
+        """
+        self.client = client or get_http_client()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="http-client")
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> HTTPResponse:
+        """
+        Send an HTTP request.
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Additional arguments for HTTPClient.request()
+
+        Returns:
+            HTTP response
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: self.client.request(method, url, **kwargs))
+
+    async def get(self, url: str, **kwargs: Any) -> HTTPResponse:
+        """
+        Send a GET request.
+
+        Args:
+            url: Request URL
+            **kwargs: Additional arguments for HTTPClient.request()
+
+        Returns:
+            HTTP response
+        """
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> HTTPResponse:
+        """
+        Send a POST request.
+
+        Args:
+            url: Request URL
+            **kwargs: Additional arguments for HTTPClient.request()
+
+        Returns:
+            HTTP response
+        """
+        return await self.request("POST", url, **kwargs)
+
+    async def get_json(self, url: str, **kwargs: Any) -> Any:
+        """
+        Send a GET request and decode the JSON response.
+
+        Args:
+            url: Request URL
+            **kwargs: Additional arguments for HTTPClient.request()
+
+        Returns:
+            Decoded JSON value
+        """
+        response = await self.get(url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    async def close(self) -> None:
+        """
+        Shut down the worker threads. The wrapped client is left open.
+        """
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> "AsyncHTTPClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+_shared_client: Optional[HTTPClient] = None
+_shared_client_lock = threading.Lock()
+
+def get_http_client() -> HTTPClient:
+    """
+    Get the HTTP client shared by all tools.
+
+    Returns:
+        Shared HTTPClient instance
+    """
+    global _shared_client
+
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = HTTPClient()
+
+    return _shared_client
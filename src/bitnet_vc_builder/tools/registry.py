@@ -0,0 +1,241 @@
+"""
+Tool registry for BitNet Virtual Co-worker Builder.
+"""
+
+import json
+import logging
+from typing import Dict, Optional, List, Iterable, Iterator, Tuple
+
+from bitnet_vc_builder.tools.base_tools import Tool
+from bitnet_vc_builder.models.grammar import JSONSchemaGrammar, get_grammar, tool_input_schema
+
+logger = logging.getLogger(__name__)
+
+class ToolRegistry:
+    """
+    Ordered collection of tools with constant-time, case-insensitive lookup.
+
+    The registry also caches the prompt fragment describing each tool, so the
+    tools section of a system prompt can be rebuilt after a tool is added or
+    removed without re-serializing every argument schema.
+    """
+
+    def __init__(self, tools: Optional[Iterable[Tool]] = None):
+        """
+        Initialize tool registry.
+
+        Args:
+            tools: Initial tools
+        """
+        # Case-folded name -> (tool, prompt fragment or None until first needed), in insertion order
+        self._entries: Dict[str, Tuple[Tool, Optional[str]]] = {}
+        self._ordered: Optional[List[Tool]] = None
+        self._description: Optional[str] = None
+        self._grammars: Dict[str, Optional[JSONSchemaGrammar]] = {}
+
+        for tool in tools or []:
+            self.add(tool)
+
+    @staticmethod
+    def _key(name: str) -> str:
+        """
+        Normalize a tool name for lookup.
+
+        Args:
+            name: Tool name
+
+        Returns:
+            Lookup key
+        """
+        return name.strip().casefold()
+
+    @staticmethod
+    def format_tool(tool: Tool) -> str:
+        """
+        Format the prompt fragment describing a tool.
+
+        Args:
+            tool: Tool to describe
+
+        Returns:
+            Prompt fragment
+        """
+        fragment = f"- {tool.name}: {tool.description}\n"
+        if tool.args_schema:
+            fragment += f"  Arguments: {json.dumps(tool.args_schema, separators=(',', ':'))}\n"
+        return fragment
+
+    def _invalidate(self) -> None:
+        """
+        Drop derived views after a mutation.
+        """
+        self._ordered = None
+        self._description = None
+        self._grammars = {}
+
+    def add(self, tool: Tool) -> None:
+        """
+        Add a tool, replacing any tool with the same name.
+
+        Args:
+            tool: Tool to add
+        """
+        key = self._key(tool.name)
+        if key in self._entries:
+            logger.warning(f"Tool {tool.name} already registered. Replacing.")
+            # Re-insert so the replacement moves to the end like any new tool
+            del self._entries[key]
+
+        self._entries[key] = (tool, None)
+        self._invalidate()
+
+    def remove(self, name: str) -> Optional[Tool]:
+        """
+        Remove a tool by name.
+
+        Args:
+            name: Tool name
+
+        Returns:
+            The removed tool, or None if not found
+        """
+        entry = self._entries.pop(self._key(name), None)
+        if entry is None:
+            return None
+
+        self._invalidate()
+        return entry[0]
+
+    def get(self, name: str) -> Optional[Tool]:
+        """
+        Get a tool by name.
+
+        Args:
+            name: Tool name (case-insensitive)
+
+        Returns:
+            Tool instance or None if not found
+        """
+        entry = self._entries.get(self._key(name))
+        return entry[0] if entry else None
+
+    def refresh(self, name: Optional[str] = None) -> None:
+        """
+        Recompute cached prompt fragments.
+
+        Call this after changing a registered tool's description or schema.
+
+        Args:
+            name: Tool to refresh (all tools if not provided)
+        """
+        keys = [self._key(name)] if name else list(self._entries)
+        for key in keys:
+            if key in self._entries:
+                self._entries[key] = (self._entries[key][0], None)
+        self._invalidate()
+
+    def input_grammar(self, name: str) -> Optional[JSONSchemaGrammar]:
+        """
+        Get the grammar that tool inputs for a tool must match.
+
+        Args:
+            name: Tool name (case-insensitive)
+
+        Returns:
+            Compiled grammar, or None if the tool is unknown or has no arguments schema
+        """
+        key = self._key(name)
+        if key not in self._grammars:
+            entry = self._entries.get(key)
+            args_schema = getattr(entry[0], "args_schema", None) if entry else None
+            self._grammars[key] = get_grammar(tool_input_schema(args_schema)) if isinstance(args_schema, dict) and args_schema else None
+        return self._grammars[key]
+
+    def names(self) -> List[str]:
+        """
+        Get the names of all tools.
+
+        Returns:
+            List of tool names
+        """
+        return [tool.name for tool in self.tools()]
+
+    def tools(self) -> List[Tool]:
+        """
+        Get all tools in the order they were added.
+
+        Returns:
+            List of tools
+        """
+        if self._ordered is None:
+            self._ordered = [tool for tool, _ in self._entries.values()]
+        return self._ordered
+
+    def describe(self) -> str:
+        """
+        Get the tools section of the system prompt.
+
+        Returns:
+            Description of all tools, or an empty string if there are none
+        """
+        if self._description is None:
+            fragments = []
+            for key, (tool, fragment) in self._entries.items():
+                if fragment is None:
+                    fragment = self.format_tool(tool)
+                    self._entries[key] = (tool, fragment)
+                fragments.append(fragment)
+
+            self._description = "You have access to the following tools:\n\n" + "".join(fragments) if fragments else ""
+        return self._description
+
+    def __contains__(self, name: object) -> bool:
+        """
+        Check whether a tool is registered.
+
+        Args:
+            name: Tool name (case-insensitive)
+
+        Returns:
+            True if the tool is registered, False otherwise
+        """
+        return isinstance(name, str) and self._key(name) in self._entries
+
+    def __iter__(self) -> Iterator[Tool]:
+        """
+        Iterate over tools in the order they were added.
+
+        Returns:
+            Iterator over tools
+        """
+        return iter(self.tools())
+
+    def __len__(self) -> int:
+        """
+        Get number of registered tools.
+
+        Returns:
+            Number of tools
+        """
+        return len(self._entries)
+
+    def __getitem__(self, index: int) -> Tool:
+        """
+        Get a tool by position.
+
+        Args:
+            index: Position in order of addition
+
+        Returns:
+            Tool instance
+        """
+        return self.tools()[index]
+
+    def __repr__(self) -> str:
+        """
+        Get representation of the registry.
+
+        Returns:
+            Representation
+        """
+        return f"ToolRegistry(tools={self.names()})"
@@ -346,6 +346,24 @@ class TestAPIServer(unittest.TestCase):
                 }
             }
         })
+    
+    def test_configure(self):
+        """
+        Test that the configuration sets the memory budget and profiling switch.
+        """
+        from bitnet_vc_builder.api import server
+        
+        budget = server.model_registry.memory_budget
+        try:
+            server.configure({"model": {"memory_budget_mb": 2}, "server": {"enable_profiling": True}})
+            
+            self.assertEqual(server.model_registry.memory_budget, 2 * 1024 * 1024)
+            self.assertTrue(server.profiling_enabled)
+        finally:
+            server.model_registry.memory_budget = budget
+            server.configure({})
+        
+        self.assertFalse(server.profiling_enabled)
 
 if __name__ == "__main__":
     unittest.main()
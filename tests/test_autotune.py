@@ -0,0 +1,131 @@
+"""
+Tests for the kernel autotuner.
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from bitnet_vc_builder.models.autotune import Autotuner, default_thread_counts
+from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+from bitnet_vc_builder.models.kernels import TernaryLinear
+
+class TestAutotuner(unittest.TestCase):
+    """
+    Test Autotuner class.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.temp_dir, "autotune.json")
+
+    def tearDown(self):
+        """
+        Clean up test fixtures.
+        """
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def create_tuner(self, **kwargs):
+        """
+        Create an autotuner with small shapes.
+        """
+        return Autotuner(cache_path=self.cache_path, thread_counts=[1, 2], shapes=[(1, 128, 64), (4, 128, 64)], repeats=1, **kwargs)
+
+    def test_picks_fastest_candidate(self):
+        """
+        Test that the fastest kernel type and thread count win.
+        """
+        timings = {("i2_s", 1): 3.0, ("i2_s", 2): 2.0, ("i2_m", 1): 1.0, ("i2_m", 2): 4.0, ("i2_l", 1): 5.0, ("i2_l", 2): 6.0}
+
+        with patch.object(Autotuner, "benchmark", side_effect=lambda kernel_type, num_threads: timings[(kernel_type, num_threads)]):
+            result = self.create_tuner().tune()
+
+        self.assertEqual(result["kernel_type"], "i2_m")
+        self.assertEqual(result["num_threads"], 1)
+        self.assertEqual(len(result["timings"]), 6)
+
+    def test_result_is_cached(self):
+        """
+        Test that later startups reuse the cached result.
+        """
+        first = self.create_tuner().tune()
+
+        with patch.object(Autotuner, "benchmark") as benchmark:
+            second = self.create_tuner().tune()
+            benchmark.assert_not_called()
+
+        self.assertEqual(second["kernel_type"], first["kernel_type"])
+        with open(self.cache_path, "r", encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)), 1)
+
+        with patch.object(Autotuner, "benchmark", return_value=1.0) as benchmark:
+            self.create_tuner().tune(force=True)
+            self.assertEqual(benchmark.call_count, 6)
+
+    def test_shapes_are_part_of_the_key(self):
+        """
+        Test that tuning for other shapes does not reuse the result.
+        """
+        self.create_tuner().tune()
+
+        tuner = Autotuner(cache_path=self.cache_path, thread_counts=[1], shapes=[(2, 128, 32)], repeats=1)
+        self.assertIsNone(tuner.cached())
+
+    def test_unreadable_cache_is_ignored(self):
+        """
+        Test that a corrupt cache file triggers tuning instead of failing.
+        """
+        with open(self.cache_path, "w", encoding="utf-8") as f:
+            f.write("not json")
+
+        self.assertIsNone(self.create_tuner().cached())
+        self.assertIn(self.create_tuner().tune()["kernel_type"], ("i2_s", "i2_m", "i2_l"))
+
+    def test_default_thread_counts(self):
+        """
+        Test that thread counts end at the CPU count.
+        """
+        with patch("bitnet_vc_builder.models.autotune.os.cpu_count", return_value=6):
+            self.assertEqual(default_thread_counts(), [1, 2, 4, 6])
+
+    def test_model_uses_tuned_settings(self):
+        """
+        Test that BitNetModel applies the tuned kernel type and thread count.
+        """
+        with open(self.cache_path, "w", encoding="utf-8") as f:
+            json.dump({}, f)
+
+        with patch.object(Autotuner, "tune", return_value={"kernel_type": "i2_l", "num_threads": 3}):
+            model = BitNetModel(model_path="model.gguf", num_threads=4, autotune=True, autotune_cache=self.cache_path)
+
+        self.assertEqual(model.kernel_type, "i2_l")
+        self.assertEqual(model.num_threads, 3)
+
+class TestThreadedKernel(unittest.TestCase):
+    """
+    Test multithreaded ternary products.
+    """
+
+    def test_threads_match_single_thread(self):
+        """
+        Test that spreading tiles over threads gives the same result.
+        """
+        rng = np.random.default_rng(0)
+        values = rng.integers(-1, 2, size=(200, 256)).astype(np.int8)
+        x = rng.standard_normal((3, 256)).astype(np.float32)
+
+        single = TernaryLinear.from_values(values, num_threads=1)(x)
+        threaded = TernaryLinear.from_values(values, num_threads=4)(x)
+
+        np.testing.assert_array_equal(single, threaded)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Tests for the benchmark harness.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from bitnet_vc_builder.core.benchmark import BenchmarkResult, compare, load_results, measure, parse_importtime, percentile, save_results
+
+class TestBenchmarkHarness(unittest.TestCase):
+    """
+    Test measuring, summarizing and comparing benchmarks.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Clean up test fixtures.
+        """
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_measure_warms_up(self):
+        """
+        Test that warmup calls are not timed and the iteration limits hold.
+        """
+        calls = []
+
+        samples = measure(lambda: calls.append(1), warmup=2, min_iterations=5, max_iterations=8, min_time=10.0)
+
+        self.assertEqual(len(samples), 8)
+        self.assertEqual(len(calls), 10)
+        self.assertTrue(all(isinstance(sample, int) and sample >= 0 for sample in samples))
+
+    def test_stats(self):
+        """
+        Test percentiles and throughput.
+        """
+        result = BenchmarkResult("generate", [1_000_000, 2_000_000, 3_000_000, 4_000_000, 5_000_000], units_per_call=10, unit="tokens")
+
+        stats = result.stats()
+
+        self.assertAlmostEqual(stats["p50"], 0.003)
+        self.assertAlmostEqual(stats["p90"], 0.0046)
+        self.assertAlmostEqual(stats["throughput"], 10 / 0.003)
+        self.assertEqual(percentile([7], 99), 7)
+
+    def test_compare(self):
+        """
+        Test that only significant slowdowns are regressions and benchmarks on one side are reported.
+        """
+        baseline = {"fast": {"p50": 0.001}, "slow": {"p50": 0.010}, "tiny": {"p50": 0.000001}, "old": {"p50": 0.5}}
+        current = {"fast": {"p50": 0.0011}, "slow": {"p50": 0.015}, "tiny": {"p50": 0.000002}, "new": {"p50": 1.0}}
+
+        comparisons = compare(current, baseline, threshold=0.2)
+
+        self.assertEqual([comparison["name"] for comparison in comparisons], ["tiny", "slow", "fast", "old", "new"])
+        self.assertEqual([comparison["name"] for comparison in comparisons if comparison["regression"]], ["slow"])
+        self.assertEqual(
+            [(comparison["missing"], comparison["baseline"], comparison["current"]) for comparison in comparisons[3:]],
+            [("current", 0.5, None), ("baseline", None, 1.0)]
+        )
+
+    def test_round_trip(self):
+        """
+        Test that saved results load back with their environment.
+        """
+        path = os.path.join(self.temp_dir, "results", "baseline.json")
+
+        save_results(path, [BenchmarkResult("agent_loop", [1000, 2000])])
+        data = load_results(path)
+
+        self.assertIn("host", data["environment"])
+        self.assertEqual(data["benchmarks"]["agent_loop"]["iterations"], 2)
+
+    def test_parse_importtime(self):
+        """
+        Test parsing the report of python -X importtime.
+        """
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     _json\n"
+            "import time:       300 |        420 |   json\n"
+            "some other stderr line\n"
+            "import time:      1000 |       1420 | bitnet_vc_builder.main\n"
+        )
+
+        modules = parse_importtime(output)
+
+        self.assertEqual(list(modules), ["_json", "json", "bitnet_vc_builder.main"])
+        self.assertEqual(modules["json"], {"self": 300, "cumulative": 420})
+        self.assertEqual(modules["bitnet_vc_builder.main"]["cumulative"], 1420)
+
+if __name__ == "__main__":
+    unittest.main()
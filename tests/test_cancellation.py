@@ -0,0 +1,255 @@
+"""
+Tests for deadlines and cancellation.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from bitnet_vc_builder.api import server
+from bitnet_vc_builder.core.cancellation import CancelToken, CancelledError, DeadlineExceededError
+from bitnet_vc_builder.core.single_flight import SingleFlight
+from bitnet_vc_builder.core.team import BitNetTeam, CollaborationMode
+from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker
+from bitnet_vc_builder.memory.memory import Memory
+from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+from bitnet_vc_builder.tools.base_tools import Tool
+
+class TestCancelToken(unittest.TestCase):
+    """
+    Test CancelToken class.
+    """
+
+    def test_cancel(self):
+        """
+        Test explicit cancellation.
+        """
+        token = CancelToken()
+        callback = MagicMock()
+        token.add_callback(callback)
+
+        self.assertFalse(token.cancelled)
+        token.raise_if_cancelled()
+
+        token.cancel("Stop")
+        token.cancel("Again")
+
+        self.assertTrue(token.cancelled)
+        self.assertEqual(token.reason, "Stop")
+        callback.assert_called_once()
+        with self.assertRaises(CancelledError):
+            token.raise_if_cancelled()
+
+    def test_deadline(self):
+        """
+        Test that a token expires at its deadline.
+        """
+        token = CancelToken(timeout=0.05)
+
+        self.assertIsNone(CancelToken().remaining())
+        self.assertLessEqual(token.remaining(), 0.05)
+        self.assertTrue(token.wait())
+        with self.assertRaises(DeadlineExceededError):
+            token.raise_if_cancelled()
+
+    def test_child(self):
+        """
+        Test that children follow their parent and keep the earlier deadline.
+        """
+        parent = CancelToken(timeout=10.0)
+        child = parent.child(timeout=60.0)
+
+        self.assertEqual(child.deadline, parent.deadline)
+        self.assertLess(parent.child(timeout=1.0).deadline, parent.deadline)
+
+        parent.cancel("Parent cancelled")
+
+        self.assertTrue(child.cancelled)
+        self.assertEqual(child.reason, "Parent cancelled")
+
+class TestCancellationPropagation(unittest.TestCase):
+    """
+    Test that cancellation reaches virtual co-workers, teams, tools and models.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.mock_model = MagicMock(spec=BitNetModel)
+        self.coworker = BitNetVirtualCoworker(model=self.mock_model, memory=Memory(), name="Test", description="Test")
+
+    def test_run_stops_between_iterations(self):
+        """
+        Test that a cancelled run stops before the next model call.
+        """
+        token = CancelToken()
+
+        def generate(**kwargs):
+            # The run holds a token shared by coalesced callers, cancelled with theirs
+            self.assertIsInstance(kwargs["cancel_token"], CancelToken)
+            token.cancel("Client went away")
+            self.assertTrue(kwargs["cancel_token"].cancelled)
+            return "Still thinking"
+
+        self.mock_model.generate.side_effect = generate
+
+        with self.assertRaises(CancelledError):
+            self.coworker.run("Task", cancel_token=token)
+
+        self.assertEqual(self.mock_model.generate.call_count, 1)
+        self.assertEqual(len(self.coworker.memory), 0)
+
+    def test_tool_receives_token(self):
+        """
+        Test that tools declaring cancel_token receive it and cancellation is not swallowed.
+        """
+        token = CancelToken()
+
+        def slow_tool(query, cancel_token=None):
+            cancel_token.cancel("Deadline")
+            cancel_token.raise_if_cancelled()
+
+        self.coworker.add_tool(Tool(name="slow", description="Slow tool", function=slow_tool))
+        self.mock_model.generate.return_value = 'Action: slow\nAction Input: {"query": "x"}'
+
+        with self.assertRaises(CancelledError):
+            self.coworker.run("Task", cancel_token=token)
+
+    def test_team_propagates_token(self):
+        """
+        Test that a team passes its token to every virtual co-worker and stops when cancelled.
+        """
+        token = CancelToken()
+        first = MagicMock(spec=BitNetVirtualCoworker)
+        first.name = "First"
+        first.run.side_effect = lambda task, cancel_token=None: cancel_token.cancel() or "done"
+        second = MagicMock(spec=BitNetVirtualCoworker)
+        second.name = "Second"
+        second.run.side_effect = lambda task, cancel_token=None: cancel_token.raise_if_cancelled()
+
+        team = BitNetTeam(agents=[first, second], collaboration_mode=CollaborationMode.SEQUENTIAL)
+
+        with self.assertRaises(CancelledError):
+            team.run("Task", cancel_token=token)
+
+        self.assertIs(second.run.call_args[1]["cancel_token"], token)
+
+    def test_model_kills_inference_process(self):
+        """
+        Test that cancelling generation stops the BitNet inference process.
+        """
+        bitnet_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, bitnet_path, ignore_errors=True)
+        with open(os.path.join(bitnet_path, "run_inference.py"), "w") as f:
+            f.write("import time\ntime.sleep(30)\n")
+
+        model = BitNetModel(model_path="model.gguf", bitnet_path=bitnet_path)
+        token = CancelToken(timeout=0.2)
+
+        start = time.monotonic()
+        with self.assertRaises(DeadlineExceededError):
+            model.generate("Hello", cancel_token=token)
+        self.assertLess(time.monotonic() - start, 5.0)
+
+    def test_shared_run_survives_one_cancellation(self):
+        """
+        Test that a coalesced call keeps running while any caller still waits.
+        """
+        group = SingleFlight()
+        release = threading.Event()
+        seen_tokens = []
+
+        def work(cancel_token=None):
+            seen_tokens.append(cancel_token)
+            release.wait(5)
+            cancel_token.raise_if_cancelled()
+            return "result"
+
+        first = CancelToken()
+        second = CancelToken()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(group.do, "key", work, cancel_token=first)
+            while not seen_tokens:
+                time.sleep(0.001)
+            follower = executor.submit(group.do, "key", work, cancel_token=second)
+            while group.get_stats()["coalesced"] < 1:
+                time.sleep(0.001)
+
+            second.cancel("Follower gave up")
+            with self.assertRaises(CancelledError):
+                follower.result()
+            self.assertFalse(seen_tokens[0].cancelled)
+
+            release.set()
+            self.assertEqual(leader.result(), "result")
+
+    def test_shared_run_cancelled_when_all_callers_leave(self):
+        """
+        Test that a coalesced call is cancelled once every caller has given up.
+        """
+        group = SingleFlight()
+        token = CancelToken()
+
+        def work(cancel_token=None):
+            token.cancel("Only caller gave up")
+            return cancel_token.cancelled
+
+        self.assertTrue(group.do("key", work, cancel_token=token))
+
+    def test_waiting_caller_reruns_cancelled_call(self):
+        """
+        Test that a caller whose token is live runs the function again when the shared call is cancelled.
+        """
+        group = SingleFlight()
+        joined = threading.Event()
+        calls = []
+
+        def work(cancel_token=None):
+            calls.append(cancel_token)
+            if len(calls) == 1:
+                joined.wait(5)
+                raise CancelledError("Leader cancelled")
+            return "result"
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(group.do, "key", work, cancel_token=CancelToken())
+            while not calls:
+                time.sleep(0.001)
+            follower = executor.submit(group.do, "key", work, cancel_token=CancelToken())
+            while group.get_stats()["coalesced"] < 1:
+                time.sleep(0.001)
+            joined.set()
+
+            with self.assertRaises(CancelledError):
+                leader.result()
+            self.assertEqual(follower.result(), "result")
+
+        self.assertEqual(group.get_stats()["executions"], 2)
+
+    def test_task_expired_before_start_is_cancelled(self):
+        """
+        Test that a background task whose deadline passed while queued is marked cancelled.
+        """
+        server.tasks["expired"] = {"task": "Task", "status": "pending", "result": None}
+        server.task_tokens["expired"] = CancelToken(timeout=0.0)
+        run = MagicMock()
+
+        try:
+            server.run_cancellable_task("expired", "test task", run)
+
+            run.assert_not_called()
+            self.assertEqual(server.tasks["expired"]["status"], "cancelled")
+            self.assertEqual(server.tasks["expired"]["result"], "Cancelled: Deadline exceeded")
+            self.assertNotIn("expired", server.task_tokens)
+        finally:
+            server.tasks.pop("expired", None)
+
+if __name__ == "__main__":
+    unittest.main()
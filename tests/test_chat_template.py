@@ -0,0 +1,135 @@
+"""
+Tests for chat templates and incremental transcripts.
+"""
+
+import unittest
+from unittest.mock import MagicMock
+
+from bitnet_vc_builder.core.chat_template import ChatTemplate, Transcript, get_chat_template, register_chat_template
+from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker
+from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+
+class TestChatTemplates(unittest.TestCase):
+    """
+    Test the chat templates.
+    """
+
+    def test_plain_format(self):
+        """
+        Test that the plain template keeps the Role: content layout.
+        """
+        prompt = get_chat_template("plain").render([
+            {"role": "system", "content": "Be brief."},
+            {"role": "user", "content": "Hi"}
+        ])
+
+        self.assertEqual(prompt, "System: Be brief.\n\nUser: Hi\n\nAssistant: ")
+
+    def test_llama3_format(self):
+        """
+        Test the Llama 3 header format.
+        """
+        template = get_chat_template("llama3")
+
+        prompt = template.render([{"role": "user", "content": "Hi"}])
+
+        self.assertEqual(
+            prompt,
+            "<|begin_of_text|><|start_header_id|>user<|end_header_id|>\n\nHi<|eot_id|>"
+            "<|start_header_id|>assistant<|end_header_id|>\n\n"
+        )
+        self.assertEqual(template.end_of_turn, "<|eot_id|>")
+
+    def test_unknown_names(self):
+        """
+        Test that unknown template names and roles are rejected.
+        """
+        with self.assertRaises(ValueError):
+            get_chat_template("alpaca")
+        with self.assertRaises(ValueError):
+            get_chat_template("chatml").format_message("tool", "x")
+
+    def test_register(self):
+        """
+        Test that registered templates can be used by name.
+        """
+        class ShoutTemplate(ChatTemplate):
+            name = "shout"
+
+            def format_message(self, role, content):
+                return f"{role.upper()}> {content}\n"
+
+        register_chat_template(ShoutTemplate())
+
+        self.assertEqual(get_chat_template("shout").render([{"role": "user", "content": "hi"}]), "USER> hi\nAssistant: ")
+
+class TestTranscript(unittest.TestCase):
+    """
+    Test Transcript class.
+    """
+
+    def test_matches_full_render(self):
+        """
+        Test that the incremental prompt equals rendering the whole conversation.
+        """
+        messages = [
+            {"role": "system", "content": "Tools: search"},
+            {"role": "user", "content": "Find X"},
+            {"role": "assistant", "content": "Action: search"}
+        ]
+        transcript = Transcript("llama3")
+
+        for message in messages:
+            transcript.append(message["role"], message["content"])
+
+        self.assertEqual(transcript.prompt(), get_chat_template("llama3").render(messages))
+        self.assertEqual(len(transcript), 3)
+
+    def test_tokenizes_only_new_segments(self):
+        """
+        Test that each segment is tokenized once.
+        """
+        tokenize = MagicMock(side_effect=lambda text: [len(text)])
+        transcript = Transcript(tokenize=tokenize)
+
+        transcript.append("system", "abc")
+        transcript.append("user", "de")
+        first = list(transcript.token_ids)
+        transcript.append("assistant", "f")
+        second = transcript.token_ids
+
+        self.assertEqual(second[:2], first)
+        self.assertEqual(len(second), 3)
+        self.assertEqual(tokenize.call_count, 3)
+
+    def test_prefix_keys(self):
+        """
+        Test that transcripts sharing their first turns share their first keys.
+        """
+        first = Transcript.from_messages([{"role": "system", "content": "S"}, {"role": "user", "content": "A"}])
+        second = Transcript.from_messages([{"role": "system", "content": "S"}, {"role": "user", "content": "B"}])
+
+        self.assertEqual(first.prefix_keys[0], second.prefix_keys[0])
+        self.assertNotEqual(first.prefix_keys[1], second.prefix_keys[1])
+
+class TestCoworkerTemplate(unittest.TestCase):
+    """
+    Test chat templates in the virtual co-worker.
+    """
+
+    def test_think_uses_template(self):
+        """
+        Test that think renders with the template and stops at its end of turn marker.
+        """
+        model = MagicMock(spec=BitNetModel)
+        model.generate.return_value = "Final Answer: ok"
+        coworker = BitNetVirtualCoworker(model=model, chat_template="chatml")
+
+        coworker.think([{"role": "user", "content": "Hi"}])
+
+        kwargs = model.generate.call_args[1]
+        self.assertEqual(kwargs["prompt"], "<|im_start|>user\nHi<|im_end|>\n<|im_start|>assistant\n")
+        self.assertEqual(kwargs["stop_sequences"], ["<|im_end|>"])
+
+if __name__ == "__main__":
+    unittest.main()
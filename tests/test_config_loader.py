@@ -13,7 +13,7 @@ import sys
 # Add the parent directory to the path so we can import the package
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from bitnet_vc_builder.config.config_loader import load_config, save_config, get_config_value, set_config_value
+from bitnet_vc_builder.config.config_loader import load_config, save_config, get_config_value, set_config_value, config_cache_path
 
 class TestConfigLoader(unittest.TestCase):
     """
@@ -58,8 +58,8 @@ class TestConfigLoader(unittest.TestCase):
         with open(config_path, "w") as f:
             yaml.dump(self.test_config, f)
         
-        # Load the config
-        config = load_config(config_path)
+        # Load the config without touching the user's cache
+        config = load_config(config_path, use_cache=False)
         
         # Check that the config was loaded correctly
         self.assertEqual(config["server"]["host"], "localhost")
@@ -72,6 +72,52 @@ class TestConfigLoader(unittest.TestCase):
         config = load_config("non_existent_config.yaml")
         self.assertEqual(config, {})
     
+    def test_load_config_cache(self):
+        """
+        Test that load_config reuses its cache until the file changes.
+        """
+        config_path = os.path.join(self.temp_dir.name, "config.yaml")
+        cache_dir = os.path.join(self.temp_dir.name, "cache")
+        with open(config_path, "w") as f:
+            yaml.dump(self.test_config, f)
+        
+        # The first load parses the file and fills the cache
+        config = load_config(config_path, cache_dir=cache_dir)
+        self.assertEqual(config, self.test_config)
+        self.assertTrue(os.path.exists(config_cache_path(config_path, cache_dir)))
+        
+        # Later loads do not parse the file
+        with patch("yaml.safe_load") as safe_load:
+            config = load_config(config_path, cache_dir=cache_dir)
+        safe_load.assert_not_called()
+        self.assertEqual(config, self.test_config)
+        
+        # Changing the file invalidates the cache
+        with open(config_path, "w") as f:
+            yaml.dump({"server": {"port": 9000}}, f)
+        config = load_config(config_path, cache_dir=cache_dir)
+        self.assertEqual(config, {"server": {"port": 9000}})
+        
+        # Without the cache, nothing is written
+        other_dir = os.path.join(self.temp_dir.name, "unused")
+        config = load_config(config_path, use_cache=False, cache_dir=other_dir)
+        self.assertEqual(config, {"server": {"port": 9000}})
+        self.assertFalse(os.path.exists(other_dir))
+    
+    def test_load_config_uncacheable(self):
+        """
+        Test that values marshal cannot store are loaded without caching.
+        """
+        config_path = os.path.join(self.temp_dir.name, "config.yaml")
+        cache_dir = os.path.join(self.temp_dir.name, "cache")
+        with open(config_path, "w") as f:
+            f.write("released: 2024-01-02 03:04:05\n")
+        
+        config = load_config(config_path, cache_dir=cache_dir)
+        
+        self.assertEqual(config["released"].year, 2024)
+        self.assertFalse(os.path.exists(config_cache_path(config_path, cache_dir)))
+    
     def test_save_config(self):
         """
         Test save_config function.
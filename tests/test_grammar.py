@@ -0,0 +1,207 @@
+"""
+Tests for JSON schema grammar.
+"""
+
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from bitnet_vc_builder.models.grammar import JSONSchemaGrammar, get_grammar, tool_input_schema
+from bitnet_vc_builder.core.team import plan_schema_for
+from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker
+from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+from bitnet_vc_builder.tools.base_tools import Tool
+
+class TestJSONSchemaGrammar(unittest.TestCase):
+    """
+    Test JSONSchemaGrammar class.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.plan_grammar = JSONSchemaGrammar(plan_schema_for(["A", "B"], with_dependencies=True))
+
+    def test_advance_accepts_valid_document(self):
+        """
+        Test that a valid document reaches an accepting state.
+        """
+        state = self.plan_grammar.advance(self.plan_grammar.initial_state, '[{"subtask": "x", "agent_name": "B", "depends_on": [0, 1]}]')
+
+        self.assertIsNotNone(state)
+        self.assertTrue(self.plan_grammar.is_accepting(state))
+
+    def test_advance_rejects_invalid_text(self):
+        """
+        Test that text outside the schema is rejected.
+        """
+        start = self.plan_grammar.initial_state
+
+        self.assertIsNone(self.plan_grammar.advance(start, '{'))
+        self.assertIsNone(self.plan_grammar.advance(start, '[{"agent_name": "C'))
+        self.assertIsNone(self.plan_grammar.advance(start, '[{"extra'))
+        self.assertIsNone(self.plan_grammar.advance(start, '[{"subtask": "x", "agent_name": "A", "depends_on": [0.5'))
+        self.assertFalse(self.plan_grammar.is_accepting(self.plan_grammar.advance(start, '[{"subtask": "x"')))
+
+    def test_check_rejects_instead_of_repairing(self):
+        """
+        Test that text outside the schema is rejected rather than rewritten.
+        """
+        valid = ' [{"subtask": "do x", "agent_name": "A", "depends_on": [0]}] '
+
+        self.assertEqual(self.plan_grammar.check(valid), valid)
+        for text in (
+            '[{"subtask": "do x", "agent_name": "A"',
+            '[{"subtask": "do x", "agent_name": "a", "depends_on": []}]',
+            '[{"subtask": "do x", "agent_name": "A", "depends_on": []},]'
+        ):
+            with self.assertRaises(ValueError):
+                self.plan_grammar.check(text)
+
+    def test_matches(self):
+        """
+        Test matching whole documents.
+        """
+        grammar = JSONSchemaGrammar({"type": "array", "items": {"type": "integer"}})
+
+        self.assertTrue(grammar.matches(" [1, 2]\n"))
+        self.assertFalse(grammar.matches("[1, x2]"))
+        self.assertFalse(grammar.matches("[1, 2] trailing text"))
+        self.assertFalse(grammar.matches("The answer is [1, 2]"))
+
+    def test_any_schema(self):
+        """
+        Test that a grammar without a schema accepts any JSON value.
+        """
+        grammar = JSONSchemaGrammar()
+
+        for value in ({"a": [1, "two", None, True]}, [], "text", 3.5, False):
+            text = json.dumps(value)
+            self.assertTrue(grammar.is_accepting(grammar.advance(grammar.initial_state, text)))
+        self.assertFalse(grammar.matches('{"a": [1, {"b": "c'))
+
+    def test_enum_with_escapes(self):
+        """
+        Test that enum values containing escapes are matched on their JSON text.
+        """
+        grammar = JSONSchemaGrammar({"type": "string", "enum": ['say "hi"']})
+
+        self.assertTrue(grammar.is_accepting(grammar.advance(grammar.initial_state, '"say \\"hi\\""')))
+        self.assertIsNone(grammar.advance(grammar.initial_state, '"say \\n'))
+
+    def test_allowed_tokens(self):
+        """
+        Test token masks for a vocabulary.
+        """
+        grammar = JSONSchemaGrammar({"type": "object", "properties": {"ok": {"type": "boolean"}}, "required": ["ok"]})
+        vocab = ['{"', 'ok', '":', ' true', 'tr', '}', '"x', '']
+
+        state = grammar.advance(grammar.initial_state, '{"ok": ')
+        mask = grammar.allowed_tokens(state, vocab)
+
+        self.assertEqual(mask, [False, False, False, True, True, False, False, False])
+        self.assertIs(grammar.allowed_tokens(state, vocab), mask)
+
+    def test_free_string_masks_are_shared(self):
+        """
+        Test that states inside a free-form string share one cached mask.
+        """
+        grammar = JSONSchemaGrammar({"type": "object", "properties": {"q": {"type": "string"}}})
+        vocab = ['a', '"', '"}', '\\', '\n', '']
+
+        first = grammar.allowed_tokens(grammar.advance(grammar.initial_state, '{"q": "a'), vocab)
+        second = grammar.allowed_tokens(grammar.advance(grammar.initial_state, '{"q": "abc'), vocab)
+
+        self.assertEqual(first, [True, True, True, True, False, False])
+        self.assertIs(second, first)
+
+    def test_constraint(self):
+        """
+        Test GrammarConstraint tracking a sequence of tokens.
+        """
+        constraint = JSONSchemaGrammar({"type": "array", "items": {"type": "string"}}).constraint()
+
+        constraint.advance('["a"')
+        self.assertFalse(constraint.allows("1"))
+        self.assertFalse(constraint.is_complete)
+        self.assertEqual(constraint.complete(), "]")
+        with self.assertRaises(ValueError):
+            constraint.advance("}")
+        self.assertFalse(constraint.done)
+        constraint.advance("]")
+        self.assertTrue(constraint.is_complete)
+        self.assertTrue(constraint.done)
+
+    def test_get_grammar_reuses_compilation(self):
+        """
+        Test that equal schemas share one compiled grammar.
+        """
+        self.assertIs(get_grammar({"type": "string", "enum": ["a"]}), get_grammar({"enum": ["a"], "type": "string"}))
+
+    def test_tool_input_schema(self):
+        """
+        Test conversion of tool argument schemas.
+        """
+        schema = tool_input_schema({
+            "query": {"type": "string", "required": True},
+            "limit": {"type": "int"}
+        })
+        grammar = JSONSchemaGrammar(schema)
+
+        self.assertEqual(schema["required"], ["query"])
+        self.assertTrue(grammar.matches('{"query": "x", "limit": 3}'))
+        self.assertFalse(grammar.matches('{"query": 42}'))
+        self.assertFalse(grammar.matches('{"limit": 3, "other": 1}'))
+
+class TestConstrainedGeneration(unittest.TestCase):
+    """
+    Test grammar-constrained generation paths.
+    """
+
+    def test_unconstrained_backend_output_is_checked(self):
+        """
+        Test that output from a backend that cannot be constrained is rejected, not rewritten.
+        """
+        model = BitNetModel(model_path="mock_model", use_bitnet_integration=False)
+
+        with self.assertRaises(ValueError):
+            model.generate("User: hello", json_schema={"type": "object", "properties": {"a": {"type": "string"}}, "required": ["a"]})
+
+    def test_invalid_tool_input_is_sent_back(self):
+        """
+        Test that a tool input outside the schema is reported to the model instead of being repaired.
+        """
+        model = MagicMock(spec=BitNetModel)
+        model.generate.side_effect = [
+            'Action: lookup\nAction Input: {"key": 42}',
+            'Action: lookup\nAction Input: {"key": "abc"}',
+            "Final Answer: done"
+        ]
+        function = MagicMock(return_value="value")
+        tool = Tool(name="lookup", description="Look up a key", function=function, args_schema={"key": {"type": "string", "required": True}})
+        coworker = BitNetVirtualCoworker(model=model, tools=[tool], name="Test", description="Test")
+
+        self.assertEqual(coworker.run("Look up abc"), "done")
+        function.assert_called_once_with(key="abc")
+        self.assertIn("Error: Invalid input for tool 'lookup'", model.generate.call_args_list[1][1]["prompt"])
+        self.assertIsNotNone(model.generate.call_args_list[0][1]["grammar"])
+
+    def test_run_with_output_schema(self):
+        """
+        Test that a final answer outside the output schema is asked for again.
+        """
+        model = MagicMock(spec=BitNetModel)
+        model.generate.side_effect = [
+            'Final Answer: [{"subtask": "x", "agent_name": "Nobody"}]',
+            'Final Answer: [{"subtask": "x", "agent_name": "Writer"}]'
+        ]
+        coworker = BitNetVirtualCoworker(model=model, name="Test", description="Test")
+
+        result = coworker.run("Plan", output_schema=plan_schema_for(["Writer"]))
+
+        self.assertEqual(json.loads(result), [{"subtask": "x", "agent_name": "Writer"}])
+        self.assertEqual(model.generate.call_count, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,285 @@
+"""
+Tests for the pooled HTTP client.
+"""
+
+import json
+import asyncio
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bitnet_vc_builder.tools.http_client import (
+    HTTPClient,
+    AsyncHTTPClient,
+    ResponseCache,
+    HTTPResponse,
+    parse_cache_control
+)
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Local stand-in for a remote API.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            server.client_ports.add(self.client_address[1])
+            hits = server.hits[self.path]
+
+        if self.path.startswith("/flaky") and hits <= 2:
+            self._send(503, {"error": "unavailable"})
+        elif self.path.startswith("/cached"):
+            self._send(200, {"hits": hits}, {"Cache-Control": "max-age=60"})
+        elif self.path.startswith("/vary"):
+            language = self.headers.get("Accept-Language")
+            self._send(200, {"hits": hits, "language": language}, {"Cache-Control": "max-age=60", "Vary": "Accept-Language"})
+        elif self.path.startswith("/no-store"):
+            self._send(200, {"hits": hits}, {"Cache-Control": "no-store, max-age=60"})
+        elif self.path.startswith("/etag"):
+            if self.headers.get("If-None-Match") == '"v1"':
+                self._send(304, None, {"ETag": '"v1"', "Cache-Control": "no-cache"})
+            else:
+                self._send(200, {"hits": hits}, {"ETag": '"v1"', "Cache-Control": "no-cache"})
+        else:
+            self._send(200, {"hits": hits, "path": self.path})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            key = f"POST {self.path}"
+            self.server.hits[key] = self.server.hits.get(key, 0) + 1
+        self._send(503, {"error": "unavailable"})
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestHTTPClient(unittest.TestCase):
+    """
+    Test HTTPClient against a local stand-in server.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Start the stand-in server.
+        """
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        cls.server.lock = threading.Lock()
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Stop the stand-in server.
+        """
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.server.hits = {}
+        self.server.client_ports = set()
+        self.client = HTTPClient(backoff_factor=0.0, timeout=5.0)
+
+    def tearDown(self):
+        """
+        Tear down test fixtures.
+        """
+        self.client.close()
+
+    def test_connection_reuse(self):
+        """
+        Test that sequential requests reuse one keep-alive connection.
+        """
+        for i in range(5):
+            response = self.client.get(f"{self.base_url}/plain/{i}")
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(len(self.server.client_ports), 1)
+
+    def test_retry_on_transient_status(self):
+        """
+        Test that transient 5xx responses are retried.
+        """
+        response = self.client.get(f"{self.base_url}/flaky")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.hits["/flaky"], 3)
+
+    def test_retries_exhausted(self):
+        """
+        Test that the last response is returned once retries are exhausted.
+        """
+        client = HTTPClient(max_retries=1, backoff_factor=0.0)
+        response = client.get(f"{self.base_url}/flaky")
+        client.close()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.server.hits["/flaky"], 2)
+
+    def test_post_is_not_retried(self):
+        """
+        Test that non-idempotent methods are not retried.
+        """
+        response = self.client.post(f"{self.base_url}/flaky", json={"a": 1})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.server.hits["POST /flaky"], 1)
+
+    def test_backoff(self):
+        """
+        Test backoff delays.
+        """
+        self.assertEqual(self.client._backoff(0), 0.0)
+        self.assertEqual(self.client._backoff(3, retry_after="2"), 2.0)
+
+    def test_cache_max_age(self):
+        """
+        Test that responses with max-age are served from cache.
+        """
+        first = self.client.get_json(f"{self.base_url}/cached")
+        second = self.client.get(f"{self.base_url}/cached")
+
+        self.assertEqual(first, {"hits": 1})
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.json(), {"hits": 1})
+        self.assertEqual(self.server.hits["/cached"], 1)
+
+    def test_cache_no_store(self):
+        """
+        Test that no-store responses are never cached.
+        """
+        self.client.get(f"{self.base_url}/no-store")
+        response = self.client.get(f"{self.base_url}/no-store")
+
+        self.assertFalse(response.from_cache)
+        self.assertEqual(self.server.hits["/no-store"], 2)
+
+    def test_cache_revalidation(self):
+        """
+        Test that stale entries are revalidated with their ETag.
+        """
+        first = self.client.get(f"{self.base_url}/etag")
+        second = self.client.get(f"{self.base_url}/etag")
+
+        self.assertEqual(self.server.hits["/etag"], 2)
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.content, first.content)
+
+    def test_cache_bypass(self):
+        """
+        Test that the cache can be bypassed per request.
+        """
+        self.client.get(f"{self.base_url}/cached")
+        response = self.client.get(f"{self.base_url}/cached", use_cache=False)
+
+        self.assertFalse(response.from_cache)
+        self.assertEqual(self.server.hits["/cached"], 2)
+
+    def test_cache_vary(self):
+        """
+        Test that responses with Vary are only served to requests with the same header values.
+        """
+        english = self.client.get(f"{self.base_url}/vary", headers={"Accept-Language": "en"})
+        french = self.client.get(f"{self.base_url}/vary", headers={"accept-language": "fr"})
+        again = self.client.get(f"{self.base_url}/vary", headers={"Accept-Language": "fr"})
+
+        self.assertEqual(english.json()["language"], "en")
+        self.assertFalse(french.from_cache)
+        self.assertEqual(french.json()["language"], "fr")
+        self.assertTrue(again.from_cache)
+        self.assertEqual(self.server.hits["/vary"], 2)
+
+    def test_authorized_requests_bypass_cache(self):
+        """
+        Test that requests with credentials are neither served from nor stored in the shared cache.
+        """
+        self.client.get(f"{self.base_url}/cached", headers={"Authorization": "Bearer alice"})
+        response = self.client.get(f"{self.base_url}/cached", headers={"Authorization": "Bearer bob"})
+        self.assertFalse(response.from_cache)
+
+        client = HTTPClient(headers={"Cookie": "session=alice"})
+        response = client.get(f"{self.base_url}/cached")
+        client.close()
+
+        self.assertFalse(response.from_cache)
+        self.assertEqual(self.server.hits["/cached"], 3)
+        self.assertEqual(len(self.client.cache), 0)
+
+    def test_async_client(self):
+        """
+        Test the async variant.
+        """
+        async def fetch_all():
+            async with AsyncHTTPClient(self.client, max_workers=4) as client:
+                return await asyncio.gather(*(client.get_json(f"{self.base_url}/async/{i}") for i in range(8)))
+
+        results = asyncio.run(fetch_all())
+
+        self.assertEqual(len(results), 8)
+        self.assertEqual(results[3]["path"], "/async/3")
+        self.assertLessEqual(len(self.server.client_ports), 4)
+
+class TestResponseCache(unittest.TestCase):
+    """
+    Test ResponseCache class.
+    """
+
+    def test_parse_cache_control(self):
+        """
+        Test parse_cache_control function.
+        """
+        directives = parse_cache_control('public, Max-Age=30, no-cache="Set-Cookie"')
+
+        self.assertEqual(directives["max-age"], "30")
+        self.assertIsNone(directives["public"])
+        self.assertEqual(directives["no-cache"], "Set-Cookie")
+        self.assertEqual(parse_cache_control(None), {})
+
+    def test_lru_eviction(self):
+        """
+        Test that the least recently used entry is evicted.
+        """
+        cache = ResponseCache(max_entries=2)
+
+        for key in ("a", "b"):
+            cache.store((key,), HTTPResponse(200, {"Cache-Control": "max-age=60"}, b"", key))
+
+        cache.get(("a",))
+        cache.store(("c",), HTTPResponse(200, {"Cache-Control": "max-age=60"}, b"", "c"))
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(("b",))[0])
+        self.assertIsNotNone(cache.get(("a",))[0])
+
+    def test_uncacheable_response(self):
+        """
+        Test that responses without freshness or validators are not stored.
+        """
+        cache = ResponseCache()
+
+        self.assertFalse(cache.store(("k",), HTTPResponse(200, {}, b"", "k")))
+        self.assertEqual(len(cache), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+"""
+Tests for the NumPy ternary kernels and inference backend.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from bitnet_vc_builder.core.cancellation import CancelToken, CancelledError
+from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+from bitnet_vc_builder.models.kernels import TernaryLinear, quantize_activations, build_tables, SIGN_LUT
+from bitnet_vc_builder.models.numpy_backend import NumPyTransformer
+from bitnet_vc_builder.models.ternary import TernaryWeights, write_random_model
+
+class TestTernaryKernels(unittest.TestCase):
+    """
+    Test the ternary matmul kernels.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.rng = np.random.default_rng(0)
+
+    def test_tables(self):
+        """
+        Test that each table entry is the signed sum of its group.
+        """
+        groups = self.rng.integers(-128, 128, size=(2, 3, 4)).astype(np.int8)
+
+        tables = build_tables(groups)
+
+        expected = groups.astype(np.int32) @ SIGN_LUT.T.astype(np.int32)
+        np.testing.assert_array_equal(tables, expected)
+
+    def test_matmul_is_exact(self):
+        """
+        Test that the integer product matches a direct matrix product for every kernel and path.
+        """
+        for shape in ((64, 256), (50, 200), (300, 128)):
+            values = self.rng.integers(-1, 2, size=shape).astype(np.int8)
+            for rows in (1, 5):
+                quantized = self.rng.integers(-128, 128, size=(rows, shape[1])).astype(np.int8)
+                expected = quantized.astype(np.int32) @ values.T.astype(np.int32)
+
+                for kernel_type in ("i2_s", "i2_m", "i2_l"):
+                    for num_threads in (1, 2):
+                        layer = TernaryLinear.from_values(values, kernel_type=kernel_type, num_threads=num_threads)
+                        np.testing.assert_array_equal(layer.matmul_int(quantized), expected)
+                        groups = layer._group_activations(quantized)
+                        for unpack in (False, True):
+                            np.testing.assert_array_equal(layer._matmul(groups, unpack), expected)
+
+    def test_float_output(self):
+        """
+        Test that outputs approximate the float product for batched inputs.
+        """
+        values = self.rng.integers(-1, 2, size=(32, 128)).astype(np.int8)
+        layer = TernaryLinear.from_values(values, scale=0.5)
+        x = self.rng.standard_normal((2, 3, 128)).astype(np.float32)
+
+        output = layer(x)
+
+        expected = x @ (values.T * 0.5)
+        self.assertEqual(output.shape, (2, 3, 32))
+        np.testing.assert_allclose(output, expected, atol=0.02 * np.abs(expected).max())
+
+    def test_quantize_activations(self):
+        """
+        Test per-row absmax quantization.
+        """
+        quantized, scales = quantize_activations(np.array([[1.0, -0.5], [0.0, 0.0]]))
+
+        np.testing.assert_array_equal(quantized, [[127, -64], [0, 0]])
+        self.assertAlmostEqual(scales[0], 127.0)
+
+    def test_rejects_unknown_kernel(self):
+        """
+        Test that unknown kernel types are rejected.
+        """
+        with self.assertRaises(ValueError):
+            TernaryLinear.from_values(np.zeros((4, 4), dtype=np.int8), kernel_type="q4")
+
+class TestNumPyBackend(unittest.TestCase):
+    """
+    Test the NumPy inference backend.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "tiny.i2s")
+        write_random_model(self.path, num_attention_heads=4, num_key_value_heads=2, intermediate_size=256, hidden_act="relu2", sub_norms=True)
+        self.weights = TernaryWeights(self.path)
+        self.transformer = NumPyTransformer(self.weights)
+
+    def tearDown(self):
+        """
+        Clean up test fixtures.
+        """
+        self.transformer = None
+        self.weights.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_incremental_matches_full_forward(self):
+        """
+        Test that decoding with the KV cache matches processing the whole sequence.
+        """
+        tokens = [10, 20, 30, 40, 50]
+
+        full = self.transformer.forward(tokens, self.transformer.new_cache())
+
+        cache = self.transformer.new_cache()
+        self.transformer.forward(tokens[:3], cache)
+        self.transformer.forward(tokens[3:4], cache)
+        incremental = self.transformer.forward(tokens[4:], cache)
+
+        self.assertEqual(full.shape, (256,))
+        self.assertEqual(cache.length, 5)
+        np.testing.assert_allclose(incremental, full, rtol=1e-4, atol=1e-4)
+
+    def test_greedy_generation_is_deterministic(self):
+        """
+        Test that greedy generation returns the same text every time.
+        """
+        first = self.transformer.generate("Hello", max_tokens=8)
+        second = self.transformer.generate("Hello", max_tokens=8)
+
+        self.assertEqual(first, second)
+
+    def test_generation_checks_cancellation(self):
+        """
+        Test that a cancelled token stops decoding.
+        """
+        token = CancelToken()
+        token.cancel()
+
+        with self.assertRaises(CancelledError):
+            self.transformer.generate("Hello", max_tokens=8, cancel_token=token)
+
+    def test_stop_check_reads_only_the_tail(self):
+        """
+        Test that stop sequences are found at the end of long outputs.
+        """
+        tokens = list(("x" * 1000 + "é<END>").encode("utf-8"))
+
+        self.assertTrue(self.transformer.has_stop(tokens, ["<END>", "\n"]))
+        self.assertFalse(self.transformer.has_stop(list(b"<END>" + b"x" * 1000), ["<END>"]))
+
+    def test_model_uses_numpy_backend(self):
+        """
+        Test that BitNetModel runs ternary weight files on the NumPy backend.
+        """
+        model = BitNetModel(model_path=self.path, use_bitnet_integration=False)
+
+        text = model.generate("Hello", max_tokens=4, temperature=0.0)
+
+        self.assertIsInstance(text, str)
+        self.assertEqual(model.get_model_info()["backend"], "numpy")
+        self.assertFalse(model.get_model_info()["is_mock"])
+
+    def test_batch_matches_single_sequences(self):
+        """
+        Test that batched greedy decoding matches decoding each prompt alone.
+        """
+        prompts = ["Hello", "A longer prompt"]
+
+        batched = self.transformer.generate_batch(prompts, max_tokens=6)
+
+        self.assertEqual(batched, [self.transformer.generate(prompt, max_tokens=6) for prompt in prompts])
+
+    def test_forward_batch_matches_forward(self):
+        """
+        Test that logits do not depend on the other sequences in the batch.
+        """
+        caches = [self.transformer.new_cache(), self.transformer.new_cache()]
+        batched = self.transformer.forward_batch([[1, 2, 3], [4, 5]], caches)
+
+        single = self.transformer.forward([4, 5], self.transformer.new_cache())
+
+        self.assertEqual(batched.shape, (2, 256))
+        np.testing.assert_allclose(batched[1], single, rtol=1e-4, atol=1e-4)
+        self.assertEqual([cache.length for cache in caches], [3, 2])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Tests for the API load generator.
+"""
+
+import asyncio
+import unittest
+
+import httpx
+
+from bitnet_vc_builder.api import server
+from bitnet_vc_builder.api.loadgen import LoadGenerator, parse_metrics, summarize
+
+INSTANT = {"prefill_time_per_token": 0.0, "decode_time_per_token": 0.0, "jitter": 0.0}
+
+class TestLoadGenerator(unittest.TestCase):
+    """
+    Test LoadGenerator class against the API server in process.
+    """
+
+    def make_generator(self, **kwargs):
+        """
+        Create a load generator that calls the server app directly.
+        """
+        return LoadGenerator(
+            base_url="http://test",
+            simulation=INSTANT,
+            poll_interval=0.01,
+            transport=httpx.ASGITransport(app=server.app),
+            **kwargs
+        )
+
+    def test_closed_loop(self):
+        """
+        Test that tasks complete and the created resources are removed.
+        """
+        generator = self.make_generator(concurrency=2, max_requests=6, duration=30.0)
+
+        report = asyncio.run(generator.run())
+
+        self.assertEqual(report["mode"], "closed")
+        self.assertEqual(report["requests"], 6)
+        self.assertEqual(report["outcomes"], {"completed": 6})
+        self.assertEqual(report["error_rate"], 0.0)
+        self.assertGreater(report["latency"]["p50"], 0.0)
+        self.assertNotIn("loadgen-model", server.model_registry.names())
+        self.assertNotIn("loadgen-coworker-0", server.virtual_coworkers)
+
+    def test_open_loop_team(self):
+        """
+        Test arrivals at a fixed rate against a team.
+        """
+        generator = self.make_generator(target="team", rps=50.0, max_requests=4, duration=30.0)
+
+        report = asyncio.run(generator.run())
+
+        self.assertEqual(report["mode"], "open")
+        self.assertEqual(report["outcomes"], {"completed": 4})
+        self.assertNotIn("loadgen-team", server.teams)
+
+    def test_unknown_target(self):
+        """
+        Test that an unknown target is rejected.
+        """
+        with self.assertRaises(ValueError):
+            LoadGenerator(target="cluster")
+
+class TestReportHelpers(unittest.TestCase):
+    """
+    Test metrics parsing and latency summaries.
+    """
+
+    def test_parse_metrics(self):
+        """
+        Test that samples keep their labels.
+        """
+        samples = parse_metrics('# HELP bitnet_tasks Tasks\nbitnet_tasks{status="pending"} 3\nbitnet_up 1.0\n')
+
+        self.assertEqual(samples, {'bitnet_tasks{status="pending"}': 3.0, "bitnet_up": 1.0})
+
+    def test_summarize(self):
+        """
+        Test latency percentiles.
+        """
+        stats = summarize([0.3, 0.1, 0.2])
+
+        self.assertAlmostEqual(stats["p50"], 0.2)
+        self.assertAlmostEqual(stats["max"], 0.3)
+        self.assertEqual(summarize([])["p99"], 0.0)
+
+if __name__ == "__main__":
+    unittest.main()
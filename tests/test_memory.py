@@ -116,6 +116,20 @@ class TestMemory(unittest.TestCase):
         # Check that memory is empty
         self.assertEqual(len(self.memory.items), 0)
     
+    def test_fingerprint(self):
+        """
+        Test that the fingerprint depends on the items' content and metadata only.
+        """
+        other = Memory()
+        self.memory.add("First", {"source": "test"})
+        time.sleep(0.01)
+        other.add("First", {"source": "test"})
+        
+        self.assertEqual(self.memory.fingerprint(), other.fingerprint())
+        
+        other.add("Second")
+        self.assertNotEqual(self.memory.fingerprint(), other.fingerprint())
+    
     def test_search(self):
         """
         Test search method.
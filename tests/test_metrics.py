@@ -0,0 +1,190 @@
+"""
+Tests for metrics and the /metrics endpoint.
+"""
+
+import threading
+import unittest
+
+from fastapi.testclient import TestClient
+
+from bitnet_vc_builder.api import server
+from bitnet_vc_builder.core.metrics import MetricsCollector, MetricsRegistry, QuantileSketch
+from bitnet_vc_builder.core.timing import set_collector, span
+
+class TestMetrics(unittest.TestCase):
+    """
+    Test counters, gauges and histograms.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.registry = MetricsRegistry()
+
+    def test_counter_sums_threads(self):
+        """
+        Test that increments from several threads are all counted.
+        """
+        counter = self.registry.counter("requests_total", "Requests", ("route",))
+
+        def work():
+            for _ in range(1000):
+                counter.labels("/").inc()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(counter.labels("/").value, 4000)
+        self.assertIn('requests_total{route="/"} 4000', self.registry.render())
+
+    def test_exited_threads_are_folded(self):
+        """
+        Test that the cells of exited threads are reclaimed without losing their counts.
+        """
+        counter = self.registry.counter("jobs_total", "Jobs")
+        histogram = self.registry.histogram("job_seconds", "Job time", buckets=(1.0,))
+        counter.inc()
+
+        for _ in range(50):
+            thread = threading.Thread(target=lambda: (counter.inc(2), histogram.observe(0.5)))
+            thread.start()
+            thread.join()
+
+        self.assertIn("jobs_total 101", self.registry.render())
+        self.assertIn("job_seconds_count 50", self.registry.render())
+        self.assertEqual(len(counter.labels()._shards._cells), 1)
+        self.assertEqual(len(histogram.labels()._shards._cells), 0)
+
+    def test_histogram_buckets(self):
+        """
+        Test cumulative buckets, sum and count.
+        """
+        histogram = self.registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value)
+
+        text = self.registry.render()
+        self.assertIn("# TYPE latency_seconds histogram", text)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{le="1"} 3', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 4', text)
+        self.assertIn("latency_seconds_sum 6.05", text)
+        self.assertIn("latency_seconds_count 4", text)
+
+    def test_gauge_function(self):
+        """
+        Test gauges computed at scrape time.
+        """
+        queue = ["a", "b"]
+        self.registry.gauge("queue_depth", "Queued items", function=lambda: len(queue))
+        self.registry.gauge("items", "Items", ("store",), lambda: {("notes",): 3})
+
+        queue.append("c")
+        text = self.registry.render()
+
+        self.assertIn("queue_depth 3", text)
+        self.assertIn('items{store="notes"} 3', text)
+
+    def test_labels(self):
+        """
+        Test label validation and escaping.
+        """
+        counter = self.registry.counter("errors_total", "Errors", ("tool",))
+
+        counter.labels(tool='say "hi"').inc()
+
+        self.assertIn('errors_total{tool="say \\"hi\\""} 1', self.registry.render())
+        with self.assertRaises(ValueError):
+            counter.labels("a", "b")
+        self.assertIs(self.registry.counter("errors_total", "Errors", ("tool",)), counter)
+
+    def test_collector(self):
+        """
+        Test that spans become model and tool metrics.
+        """
+        set_collector(MetricsCollector(self.registry))
+        try:
+            with span("generate", model="models/bitnet/model.gguf") as generate_span:
+                generate_span.set(tokens=10, ttft=0.2, tokens_per_second=25.0)
+            with self.assertRaises(RuntimeError):
+                with span("tool", tool="search"):
+                    raise RuntimeError("offline")
+        finally:
+            set_collector(None)
+
+        text = self.registry.render()
+        self.assertIn('bitnet_generated_tokens_total{model="model.gguf"} 10', text)
+        self.assertIn('bitnet_tokens_per_second_bucket{model="model.gguf",le="50"} 1', text)
+        self.assertIn('bitnet_tool_errors_total{tool="search"} 1', text)
+        self.assertIn('bitnet_tool_duration_seconds_count{tool="search"} 1', text)
+
+class TestQuantileSketch(unittest.TestCase):
+    """
+    Test QuantileSketch class.
+    """
+
+    def test_quantiles_within_accuracy(self):
+        """
+        Test that quantiles of a skewed stream are within the relative accuracy.
+        """
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        values = [0.01 * 1.05 ** i for i in range(200)]
+
+        for value in values:
+            sketch.add(value)
+
+        for q in (0.5, 0.95, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            self.assertAlmostEqual(sketch.quantile(q), exact, delta=exact * 0.011)
+        self.assertEqual(sketch.quantile(1.0), values[-1])
+
+    def test_merge(self):
+        """
+        Test that merged sketches answer like one sketch of all values.
+        """
+        whole = QuantileSketch()
+        parts = [QuantileSketch(), QuantileSketch()]
+        for i in range(100):
+            whole.add(i / 10.0)
+            parts[i % 2].add(i / 10.0)
+
+        parts[0].merge(parts[1])
+
+        self.assertEqual(parts[0].count, 100)
+        self.assertEqual(parts[0].quantile(0.95), whole.quantile(0.95))
+        self.assertEqual(parts[0].quantile(0.0), 0.0)
+        self.assertIsNone(QuantileSketch().quantile(0.5))
+        with self.assertRaises(ValueError):
+            parts[0].merge(QuantileSketch(relative_accuracy=0.05))
+
+class TestMetricsEndpoint(unittest.TestCase):
+    """
+    Test the API server's /metrics endpoint.
+    """
+
+    def test_endpoint(self):
+        """
+        Test that requests and tasks show up in the scrape.
+        """
+        with TestClient(server.app) as client:
+            client.get("/models/missing")
+            server.tasks["metrics-test"] = {"status": "running", "result": None}
+            try:
+                response = client.get("/metrics")
+            finally:
+                del server.tasks["metrics-test"]
+        set_collector(None)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        self.assertIn('bitnet_http_requests_total{method="GET",route="/models/{model_name}",status="404"}', response.text)
+        self.assertIn('bitnet_tasks{status="running"} 1', response.text)
+        self.assertIn("bitnet_loaded_model_bytes 0", response.text)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,208 @@
+"""
+Tests for ModelRegistry class.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from bitnet_vc_builder.models.registry import ModelRegistry
+
+class TestModelRegistry(unittest.TestCase):
+    """
+    Test ModelRegistry class.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.model_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Clean up test fixtures.
+        """
+        shutil.rmtree(self.model_dir, ignore_errors=True)
+
+    def create_model_file(self, name, size):
+        """
+        Create a model file of a known size.
+        """
+        path = os.path.join(self.model_dir, name)
+        with open(path, "wb") as f:
+            f.write(b"\0" * size)
+        return path
+
+    def test_lazy_loading(self):
+        """
+        Test that registering a model does not load it.
+        """
+        registry = ModelRegistry()
+        registry.register("small", {"model_path": self.create_model_file("small.gguf", 100)})
+
+        self.assertIn("small", registry)
+        self.assertFalse(registry.is_loaded("small"))
+        self.assertEqual(registry.get_stats()["instances"], 0)
+
+        model = registry.get("small")
+
+        self.assertTrue(model.is_loaded)
+        self.assertTrue(registry.is_loaded("small"))
+        self.assertEqual(registry.loaded_bytes(), 100)
+        self.assertIsNone(registry.get("missing"))
+
+    def test_register_validation(self):
+        """
+        Test that invalid and duplicate registrations are rejected.
+        """
+        registry = ModelRegistry()
+        registry.register("small", {"model_path": "small.gguf"})
+
+        with self.assertRaises(ValueError):
+            registry.register("small", {"model_path": "other.gguf"})
+        with self.assertRaises(ValueError):
+            registry.register("no_path", {"kernel_type": "i2_s"})
+        with self.assertRaises(ValueError):
+            registry.register("bad_kernel", {"model_path": "small.gguf", "kernel_type": "q4"})
+
+    def test_shared_instances(self):
+        """
+        Test that registrations of the same weights share one instance.
+        """
+        registry = ModelRegistry()
+        path = self.create_model_file("shared.gguf", 100)
+        registry.register("first", {"model_path": path})
+        registry.register("second", {"model_path": path, "kernel_type": "i2_s"})
+        registry.register("third", {"model_path": path, "kernel_type": "i2_m"})
+
+        self.assertIs(registry.get("first"), registry.get("second"))
+        self.assertIsNot(registry.get("first"), registry.get("third"))
+        self.assertEqual(registry.get_stats()["instances"], 2)
+
+    def test_lru_unload_under_budget(self):
+        """
+        Test that loading a model unloads the least recently used idle models.
+        """
+        registry = ModelRegistry(memory_budget=250)
+        for name in ("a", "b", "c"):
+            registry.register(name, {"model_path": self.create_model_file(f"{name}.gguf", 100)})
+
+        a = registry.get("a")
+        b = registry.get("b")
+        b.last_used = a.last_used + 1
+        c = registry.get("c")
+
+        self.assertFalse(a.is_loaded)
+        self.assertTrue(b.is_loaded)
+        self.assertTrue(c.is_loaded)
+        self.assertLessEqual(registry.loaded_bytes(), 250)
+
+    def test_in_use_model_is_not_unloaded(self):
+        """
+        Test that a model that is generating is never unloaded.
+        """
+        registry = ModelRegistry(memory_budget=150)
+        registry.register("a", {"model_path": self.create_model_file("a.gguf", 100)})
+        registry.register("b", {"model_path": self.create_model_file("b.gguf", 100)})
+
+        a = registry.get("a")
+        started = threading.Event()
+        release = threading.Event()
+
+        def generate(*args, **kwargs):
+            started.set()
+            release.wait(5)
+            return "done"
+
+        with patch.object(a, "_generate", side_effect=generate):
+            thread = threading.Thread(target=a.generate, args=("Hello",))
+            thread.start()
+            started.wait(5)
+
+            registry.get("b")
+            self.assertTrue(a.is_loaded)
+
+            release.set()
+            thread.join()
+
+        self.assertFalse(a.in_use)
+        self.assertTrue(a.unload())
+
+    def test_reload_on_generate(self):
+        """
+        Test that an unloaded model reloads itself on its next generation.
+        """
+        registry = ModelRegistry(memory_budget=150)
+        registry.register("a", {"model_path": self.create_model_file("a.gguf", 100)})
+        registry.register("b", {"model_path": self.create_model_file("b.gguf", 100)})
+
+        a = registry.get("a")
+        b = registry.get("b")
+        self.assertFalse(a.is_loaded)
+
+        with patch.object(a, "_generate", return_value="done"):
+            self.assertEqual(a.generate("Hello"), "done")
+
+        self.assertTrue(a.is_loaded)
+        self.assertFalse(b.is_loaded)
+
+    def test_unregister(self):
+        """
+        Test that unregistering unloads instances nothing else shares.
+        """
+        registry = ModelRegistry()
+        path = self.create_model_file("shared.gguf", 100)
+        registry.register("first", {"model_path": path})
+        registry.register("second", {"model_path": path})
+        model = registry.get("first")
+
+        self.assertTrue(registry.unregister("first"))
+        self.assertTrue(model.is_loaded)
+        self.assertIs(registry.get("second"), model)
+
+        self.assertTrue(registry.unregister("second"))
+        self.assertFalse(model.is_loaded)
+        self.assertFalse(registry.unregister("second"))
+        self.assertEqual(len(registry), 0)
+
+    def test_creation_does_not_hold_lock(self):
+        """
+        Test that a slow model construction does not block the registry, and concurrent gets share its instance.
+        """
+        registry = ModelRegistry()
+        registry.register("tuned", {"model_path": self.create_model_file("tuned.gguf", 100), "autotune": True})
+        registry.register("other", {"model_path": self.create_model_file("other.gguf", 100)})
+        started = threading.Event()
+        release = threading.Event()
+        timed_out = []
+
+        def tune(*args, **kwargs):
+            started.set()
+            timed_out.append(not release.wait(5))
+            return {"kernel_type": "i2_s", "num_threads": 1}
+
+        models = []
+        with patch("bitnet_vc_builder.models.autotune.Autotuner.tune", side_effect=tune):
+            threads = [threading.Thread(target=lambda: models.append(registry.get("tuned", load=False))) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            started.wait(5)
+
+            # Other models stay available while the tuned one is created
+            self.assertIsNotNone(registry.get("other"))
+            self.assertEqual(registry.loaded_bytes(), 100)
+
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertFalse(any(timed_out))
+        self.assertIs(models[0], models[1])
+        self.assertEqual(registry.get_stats()["instances"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
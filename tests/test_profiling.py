@@ -0,0 +1,211 @@
+"""
+Tests for profiling sessions and the profiling endpoints.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+
+from fastapi.testclient import TestClient
+
+from bitnet_vc_builder.api import server
+from bitnet_vc_builder.core.cancellation import CancelToken
+from bitnet_vc_builder.core.profiling import AllocationTracer, ProfileSession, SamplingProfiler
+
+def busy_loop(seconds):
+    """
+    Keep the CPU busy, for profiles to find.
+    """
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(100))
+    return str(total)
+
+def allocate_blocks():
+    """
+    Allocate memory that stays referenced, for allocation reports to find.
+    """
+    return [bytearray(1024) for _ in range(200)]
+
+class TestProfileSession(unittest.TestCase):
+    """
+    Test profilers and allocation tracing.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Clean up test fixtures.
+        """
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_sampling_thread_filter(self):
+        """
+        Test that only the selected threads are sampled.
+        """
+        worker = threading.Thread(target=busy_loop, args=(0.3,))
+        worker.start()
+        profiler = SamplingProfiler(interval=0.002, threads=lambda: [worker.ident])
+
+        profiler.start()
+        busy_loop(0.2)
+        profiler.stop()
+        worker.join()
+
+        self.assertGreater(sum(profiler.samples.values()), 0)
+        self.assertTrue(all(stack.startswith("threading.py:_bootstrap") for stack in profiler.samples))
+        self.assertIn("test_profiling.py:busy_loop", profiler.collapsed())
+
+    def test_cprofile(self):
+        """
+        Test that cprofile sessions report the functions called.
+        """
+        session = ProfileSession(mode="cprofile")
+
+        session.start()
+        busy_loop(0.01)
+        session.stop()
+        paths = session.save(self.temp_dir)
+
+        self.assertIn("busy_loop", session.stats())
+        self.assertEqual(session.collapsed(), "")
+        self.assertEqual([os.path.basename(path) for path in paths], ["profile.pstats", "profile.txt"])
+
+    def test_cprofile_report_waits_for_stop(self):
+        """
+        Test that reading a running cprofile session does not stop its profiler.
+        """
+        session = ProfileSession(mode="cprofile")
+
+        session.start()
+        self.assertEqual(session.result()["stats"], "")
+        self.assertEqual(session.save(self.temp_dir), [])
+        busy_loop(0.01)
+        session.stop()
+
+        self.assertIn("busy_loop", session.stats())
+
+    def test_allocations(self):
+        """
+        Test that the allocating line is reported.
+        """
+        tracer = AllocationTracer()
+
+        tracer.start()
+        blocks = allocate_blocks()
+        report = tracer.stop()
+
+        self.assertEqual(len(blocks), 200)
+        self.assertIn("test_profiling.py", report["top"][0]["location"])
+        self.assertGreaterEqual(report["top"][0]["size_diff"], 200 * 1024)
+
+    def test_invalid_mode(self):
+        """
+        Test that an unknown mode is rejected.
+        """
+        with self.assertRaises(ValueError):
+            ProfileSession(mode="perf")
+
+class TestProfilingEndpoints(unittest.TestCase):
+    """
+    Test the /admin/profiles endpoints.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        server.profiling_enabled = True
+        self.client = TestClient(server.app)
+
+    def tearDown(self):
+        """
+        Clean up test fixtures.
+        """
+        server.profiling_enabled = False
+
+    def add_task(self, task_id):
+        """
+        Add a pending task to the server.
+        """
+        server.tasks[task_id] = {"task": "profile me", "status": "pending", "result": None}
+        server.task_tokens[task_id] = CancelToken()
+
+    def wait_for(self, profile_id):
+        """
+        Wait until a profile has completed and return it.
+        """
+        for _ in range(200):
+            profile = self.client.get(f"/admin/profiles/{profile_id}").json()
+            if profile["status"] == "completed":
+                return profile
+            time.sleep(0.01)
+        self.fail(f"Profile {profile_id} did not complete")
+
+    def test_window(self):
+        """
+        Test a sampling profile over a time window.
+        """
+        response = self.client.post("/admin/profiles", json={"duration": 0.1, "allocations": True})
+        profile_id = response.json()["profile_id"]
+        busy_loop(0.15)
+
+        profile = self.wait_for(profile_id)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(profile["samples"], 0)
+        self.assertIn("top", profile["allocations"])
+        self.assertIn("busy_loop", self.client.get(f"/admin/profiles/{profile_id}/collapsed").text)
+
+    def test_task_profiles(self):
+        """
+        Test sampling and cprofile profiles of a single task.
+        """
+        self.add_task("profiled_task")
+        sampling_id = self.client.post("/admin/profiles", json={"task_id": "profiled_task"}).json()["profile_id"]
+        cprofile_id = self.client.post("/admin/profiles", json={"task_id": "profiled_task", "mode": "cprofile"}).json()["profile_id"]
+
+        worker = threading.Thread(target=server.run_cancellable_task, args=("profiled_task", "test", lambda token: busy_loop(0.1)))
+        worker.start()
+        worker.join()
+
+        self.assertEqual(server.tasks["profiled_task"]["status"], "completed")
+        self.assertIn("busy_loop", self.client.get(f"/admin/profiles/{sampling_id}/collapsed").text)
+        self.assertIn("busy_loop", self.wait_for(cprofile_id)["stats"])
+        self.assertNotIn("profiled_task", server.task_threads)
+
+    def test_invalid_requests(self):
+        """
+        Test that profiles that cannot run are rejected.
+        """
+        self.add_task("finished_task")
+        server.tasks["finished_task"]["status"] = "completed"
+
+        self.assertEqual(self.client.post("/admin/profiles", json={}).status_code, 400)
+        self.assertEqual(self.client.post("/admin/profiles", json={"duration": 1, "mode": "perf"}).status_code, 400)
+        self.assertEqual(self.client.post("/admin/profiles", json={"duration": 1, "mode": "cprofile"}).status_code, 400)
+        self.assertEqual(self.client.post("/admin/profiles", json={"task_id": "missing_task"}).status_code, 404)
+        self.assertEqual(self.client.post("/admin/profiles", json={"task_id": "finished_task"}).status_code, 400)
+        self.assertEqual(self.client.get("/admin/profiles/missing_profile").status_code, 404)
+
+    def test_disabled_by_default(self):
+        """
+        Test that profiles can only be started when the configuration enables them.
+        """
+        server.configure({})
+        self.assertEqual(self.client.post("/admin/profiles", json={"duration": 0.1}).status_code, 400)
+
+        server.configure({"server": {"enable_profiling": True}})
+        self.assertTrue(server.profiling_enabled)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+"""
+Tests for the ReAct output parser.
+"""
+
+import unittest
+
+from bitnet_vc_builder.core.react_parser import ReActParser, ReActEvent, ReActEventType, ReActGrammar, parse_react
+from bitnet_vc_builder.models.grammar import get_grammar
+
+class TestReActParser(unittest.TestCase):
+    """
+    Test ReActParser class.
+    """
+    
+    def test_tool_call(self):
+        """
+        Test parsing a complete tool call.
+        """
+        parsed = parse_react("I should search.\nAction: search\nAction Input: {\"query\": \"python\"}\n")
+        
+        self.assertEqual(parsed.tool_name, "search")
+        self.assertEqual(parsed.tool_input, {"query": "python"})
+        self.assertFalse(parsed.has_final_answer)
+    
+    def test_trailing_text_after_input(self):
+        """
+        Test that text after the tool input object is ignored.
+        """
+        parsed = parse_react(
+            "Action: search\n"
+            "Action Input: {\"query\": \"a } in a string\", \"tags\": [\"x\"]}\n"
+            "Observation: something with {braces}\n"
+        )
+        
+        self.assertEqual(parsed.tool_input, {"query": "a } in a string", "tags": ["x"]})
+    
+    def test_final_answer(self):
+        """
+        Test parsing a final answer.
+        """
+        parsed = parse_react("Thinking...\nFinal Answer: The answer is 4.\nIt spans lines.")
+        
+        self.assertEqual(parsed.tool_name, "")
+        self.assertTrue(parsed.has_final_answer)
+        self.assertEqual(parsed.final_answer, "The answer is 4.\nIt spans lines.")
+    
+    def test_final_answer_stops_at_repeated_marker(self):
+        """
+        Test that only the first final answer is kept.
+        """
+        parsed = parse_react("Final Answer: first\nFinal Answer: second")
+        
+        self.assertEqual(parsed.final_answer, "first")
+    
+    def test_missing_or_invalid_input(self):
+        """
+        Test tool calls without a usable input object.
+        """
+        self.assertIsNone(parse_react("Action: search\n").tool_input)
+        self.assertEqual(parse_react("Action: search\nAction Input: python\n").tool_input, {})
+        self.assertEqual(parse_react("Action: search\nAction Input: {\"query\": nope}").tool_input, {})
+    
+    def test_streaming_events(self):
+        """
+        Test that events are emitted as soon as they are complete.
+        """
+        parser = ReActParser()
+        text = "Action: calc\nAction Input: {\"expression\": \"2 + 2\"}\nTool result: 4"
+        events = []
+        consumed = 0
+        
+        for char in text:
+            events.extend(parser.feed(char))
+            consumed += 1
+            if parser.is_complete:
+                break
+        
+        self.assertEqual(events, [
+            ReActEvent(ReActEventType.ACTION, "calc"),
+            ReActEvent(ReActEventType.ACTION_INPUT, {"expression": "2 + 2"})
+        ])
+        self.assertEqual(text[:consumed], "Action: calc\nAction Input: {\"expression\": \"2 + 2\"}")
+    
+    def test_markers_split_across_chunks(self):
+        """
+        Test markers that straddle chunk boundaries.
+        """
+        parser = ReActParser()
+        
+        for chunk in ["Fin", "al An", "swer: he", "llo"]:
+            self.assertEqual(parser.feed(chunk), [])
+        
+        self.assertEqual(parser.close(), [ReActEvent(ReActEventType.FINAL_ANSWER, "hello")])
+    
+    def test_partial_json_is_repaired(self):
+        """
+        Test that a tool input cut off mid-stream is closed.
+        """
+        parsed = parse_react("Action: search\nAction Input: {\"query\": \"clim")
+        self.assertEqual(parsed.tool_input, {"query": "clim"})
+        
+        parsed = parse_react("Action: search\nAction Input: {\"query\": \"x\", \"filters\": [1, {\"k\":")
+        self.assertEqual(parsed.tool_input, {"query": "x", "filters": [1, {"k": None}]})
+    
+    def test_feed_after_close(self):
+        """
+        Test that a closed parser rejects more input.
+        """
+        parser = ReActParser()
+        parser.close()
+        
+        with self.assertRaises(RuntimeError):
+            parser.feed("more")
+
+class TestReActGrammar(unittest.TestCase):
+    """
+    Test ReActGrammar class.
+    """
+    
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        input_grammar = get_grammar({"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]})
+        self.grammar = ReActGrammar(lambda name: input_grammar if name == "search" else None, get_grammar({"type": "array"}))
+        self.vocab = ["{", '"query"', ": ", '"x"', "42", "}", "[", "]", "text", " ", ""]
+    
+    def test_free_text_is_unconstrained(self):
+        """
+        Test that text outside tool inputs and answers is not masked.
+        """
+        constraint = self.grammar.constraint()
+        constraint.advance("I should search.\nAction: search\n")
+        
+        self.assertIsNone(constraint.mask(self.vocab))
+        self.assertEqual(self.grammar.check("anything"), "anything")
+    
+    def test_tool_input_is_masked(self):
+        """
+        Test that the tool input is held to the tool's grammar.
+        """
+        constraint = self.grammar.constraint()
+        constraint.advance("Action: search\nAction Input:")
+        
+        self.assertEqual(constraint.mask(self.vocab), [True, False, False, False, False, False, False, False, False, True, False])
+        constraint.advance(' {"query": ')
+        self.assertEqual(constraint.mask(self.vocab)[3:5], [True, False])
+        self.assertFalse(constraint.done)
+        constraint.advance('"x"}')
+        self.assertEqual(constraint.parser.tool_input, {"query": "x"})
+        self.assertTrue(constraint.done)
+    
+    def test_unknown_tool_is_unconstrained(self):
+        """
+        Test that inputs of tools without a grammar are not masked.
+        """
+        constraint = self.grammar.constraint()
+        constraint.advance("Action: other\nAction Input: ")
+        
+        self.assertIsNone(constraint.mask(self.vocab))
+    
+    def test_final_answer_is_masked_until_done(self):
+        """
+        Test that the final answer is held to the answer grammar and ends generation.
+        """
+        constraint = self.grammar.constraint()
+        constraint.advance("Final Answer:")
+        
+        self.assertEqual(constraint.mask(self.vocab)[6:9], [True, False, False])
+        constraint.advance(" [")
+        self.assertFalse(constraint.done)
+        constraint.advance("]")
+        self.assertTrue(constraint.done)
+
+if __name__ == "__main__":
+    unittest.main()
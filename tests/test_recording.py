@@ -0,0 +1,158 @@
+"""
+Tests for recording and replaying model and tool calls.
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+from bitnet_vc_builder.core.recording import Recorder, Recording, prompt_key, set_recorder, set_replay
+from bitnet_vc_builder.core.team import BitNetTeam, CollaborationMode
+from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker
+from bitnet_vc_builder.memory.memory import Memory
+from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+from bitnet_vc_builder.tools.base_tools import Tool
+
+CALCULATOR_CALL = 'Action: calculator\nAction Input: {"expression": "2 + 2"}'
+
+class TestRecordReplay(unittest.TestCase):
+    """
+    Test Recorder and Recording classes.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "recording.jsonl")
+        self.tool_calls = []
+
+    def tearDown(self):
+        """
+        Clean up test fixtures.
+        """
+        set_recorder(None)
+        set_replay(None)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def make_team(self, scripts, decode_time_per_token=0.0):
+        """
+        Create a sequential team whose co-workers answer from scripts.
+        """
+        def calculate(expression):
+            self.tool_calls.append(expression)
+            return "4"
+
+        tool = Tool(name="calculator", description="Calculate", function=calculate, args_schema={"expression": {"type": "string"}})
+        agents = []
+        for name, script in scripts.items():
+            simulation = {"prefill_time_per_token": 0.0, "decode_time_per_token": decode_time_per_token, "jitter": 0.0, "script": script}
+            model = BitNetModel(model_path=f"models/{name}", simulation=simulation)
+            agents.append(BitNetVirtualCoworker(model=model, tools=[tool], memory=Memory(), name=name))
+        return BitNetTeam(agents=agents, name="Calculators", collaboration_mode=CollaborationMode.SEQUENTIAL)
+
+    def record(self, decode_time_per_token=0.0):
+        """
+        Record a team run and return its result.
+        """
+        team = self.make_team({
+            "Adder": [CALCULATOR_CALL, "Final Answer: 2 + 2 = 4"],
+            "Checker": ["Final Answer: checked, it is 4"]
+        }, decode_time_per_token)
+        recorder = Recorder(self.path)
+        set_recorder(recorder)
+        try:
+            return team.run("Add 2 and 2")
+        finally:
+            set_recorder(None)
+            recorder.close()
+
+    def test_replay_matches_recording(self):
+        """
+        Test that a replay gives the recorded answers without running tools.
+        """
+        recorded = self.record()
+        self.tool_calls.clear()
+        # The replaying team's own models would answer differently
+        team = self.make_team({"Adder": ["Final Answer: 5"], "Checker": ["Final Answer: wrong"]})
+        recording = Recording(self.path, latency="zero")
+        set_replay(recording)
+
+        replayed = team.run("Add 2 and 2")
+
+        self.assertEqual(replayed, recorded)
+        self.assertEqual(self.tool_calls, [])
+        self.assertEqual(recording.get_stats()["hits"], 4)
+        self.assertEqual(recording.get_stats()["misses"], 0)
+        self.assertEqual(recording.team_tasks("Calculators"), ["Add 2 and 2"])
+
+    def test_recorded_latency(self):
+        """
+        Test that recorded latency is reproduced and zero latency skips it.
+        """
+        self.record(decode_time_per_token=0.02)
+        prompt = "Final Answer: unrelated"
+
+        timings = {}
+        for latency in ("recorded", "zero"):
+            recording = Recording(self.path, latency=latency)
+            start = time.perf_counter()
+            recording.generate("models/Checker", prompt, 16)
+            timings[latency] = time.perf_counter() - start
+
+        self.assertGreaterEqual(timings["recorded"], 0.08)
+        self.assertLess(timings["zero"], 0.05)
+
+    def test_changed_prompts(self):
+        """
+        Test that changed prompts get the model's responses in order unless strict.
+        """
+        self.record()
+        recording = Recording(self.path, latency="zero")
+
+        responses = [recording.generate("models/Adder", f"new prompt format {i}", 64) for i in range(2)]
+
+        self.assertEqual(responses, [CALCULATOR_CALL, "Final Answer: 2 + 2 = 4"])
+        self.assertEqual(recording.get_stats()["misses"], 2)
+        with self.assertRaises(ValueError):
+            Recording(self.path, latency="zero", strict=True).generate("models/Adder", "new prompt format", 64)
+        with self.assertRaises(ValueError):
+            recording.generate("models/Unknown", "prompt", 64)
+
+    def test_tool_errors(self):
+        """
+        Test that a tool call that failed when recorded fails again on replay.
+        """
+        def fail(expression):
+            raise ZeroDivisionError("division by zero")
+
+        tool = Tool(name="calculator", description="Calculate", function=fail, args_schema={"expression": {"type": "string"}})
+        recorder = Recorder(self.path)
+        set_recorder(recorder)
+        with self.assertRaises(ZeroDivisionError):
+            tool({"expression": "1 / 0"})
+        set_recorder(None)
+        recorder.close()
+
+        set_replay(Recording(self.path, latency="zero"))
+        with self.assertRaisesRegex(RuntimeError, "division by zero"):
+            tool({"expression": "1 / 0"})
+
+    def test_invalid_recordings(self):
+        """
+        Test that unknown latencies and malformed files are rejected.
+        """
+        with open(self.path, "w") as f:
+            f.write('{"type": "generate"}\n')
+
+        with self.assertRaises(ValueError):
+            Recording(self.path, latency="fast")
+        with self.assertRaises(ValueError):
+            Recording(self.path)
+        self.assertEqual(len(prompt_key("prompt")), 32)
+
+if __name__ == "__main__":
+    unittest.main()
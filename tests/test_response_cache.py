@@ -0,0 +1,177 @@
+"""
+Tests for ResponseCache class.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from bitnet_vc_builder.core.response_cache import ResponseCache, make_cache_key
+from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker
+from bitnet_vc_builder.memory.memory import Memory
+from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+
+class TestResponseCache(unittest.TestCase):
+    """
+    Test ResponseCache class.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Clean up test fixtures.
+        """
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_get_and_put(self):
+        """
+        Test storing and looking up answers.
+        """
+        cache = ResponseCache()
+
+        self.assertIsNone(cache.get("key"))
+        cache.put("key", "answer")
+        self.assertEqual(cache.get("key"), "answer")
+
+        stats = cache.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_lru_eviction(self):
+        """
+        Test that the least recently used entry is evicted first.
+        """
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("a"), "1")
+        self.assertIsNone(cache.get("b"))
+
+    def test_ttl_expiry(self):
+        """
+        Test that entries expire after their time-to-live.
+        """
+        cache = ResponseCache(ttl=10.0, cache_dir=self.cache_dir)
+
+        with patch("bitnet_vc_builder.core.response_cache.time.time", return_value=1000.0):
+            cache.put("key", "answer")
+        with patch("bitnet_vc_builder.core.response_cache.time.time", return_value=1005.0):
+            self.assertEqual(cache.get("key"), "answer")
+        with patch("bitnet_vc_builder.core.response_cache.time.time", return_value=1011.0):
+            self.assertIsNone(cache.get("key"))
+
+        # The expired entry is also removed from disk
+        self.assertFalse(os.path.exists(cache._path("key")))
+
+    def test_persistent_tier(self):
+        """
+        Test that entries survive in the cache directory.
+        """
+        ResponseCache(cache_dir=self.cache_dir).put("key", "answer")
+
+        cache = ResponseCache(cache_dir=self.cache_dir)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.get("key"), "answer")
+        self.assertEqual(len(cache), 1)
+
+        cache.clear()
+        self.assertIsNone(ResponseCache(cache_dir=self.cache_dir).get("key"))
+
+    def test_accepts(self):
+        """
+        Test that only reproducible answers are cached by default.
+        """
+        self.assertTrue(ResponseCache().accepts({"temperature": 0.0}))
+        self.assertFalse(ResponseCache().accepts({"temperature": 0.7}))
+        self.assertTrue(ResponseCache(allow_nondeterministic=True).accepts({"temperature": 0.7}))
+
+    def test_make_cache_key(self):
+        """
+        Test that keys are stable and distinguish their parts.
+        """
+        self.assertEqual(make_cache_key("task", {"a": 1, "b": 2}), make_cache_key("task", {"b": 2, "a": 1}))
+        self.assertNotEqual(make_cache_key("task", 1), make_cache_key("task", 2))
+
+class TestCoworkerResponseCache(unittest.TestCase):
+    """
+    Test response caching in BitNetVirtualCoworker.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.mock_model = MagicMock(spec=BitNetModel)
+        self.mock_model.get_model_info.return_value = {"model_path": "mock_model"}
+        self.mock_model.generate.return_value = "Final Answer: 42"
+        self.cache = ResponseCache()
+
+    def create_coworker(self, **kwargs):
+        """
+        Create a virtual co-worker sharing the test cache.
+        """
+        return BitNetVirtualCoworker(
+            model=self.mock_model,
+            memory=Memory(),
+            name="Test",
+            description="Test",
+            response_cache=self.cache,
+            **kwargs
+        )
+
+    def test_repeated_task_is_cached(self):
+        """
+        Test that a task repeated with the same memory is answered without calling the model.
+        """
+        first = self.create_coworker(sampling_params={"temperature": 0.0})
+        second = self.create_coworker(sampling_params={"temperature": 0.0})
+
+        self.assertEqual(first.run("What is the answer?"), "42")
+        self.assertEqual(second.run("What is the answer?"), "42")
+        self.assertEqual(self.mock_model.generate.call_count, 1)
+        self.assertEqual(self.mock_model.generate.call_args[1]["temperature"], 0.0)
+
+        # A hit leaves memory as the run did
+        self.assertEqual(second.memory.fingerprint(), first.memory.fingerprint())
+        self.assertEqual(len(second.memory), 1)
+
+        second.run("Another question")
+        self.assertEqual(self.mock_model.generate.call_count, 2)
+
+    def test_memory_change_misses(self):
+        """
+        Test that changing the memory invalidates cached answers.
+        """
+        coworker = self.create_coworker(sampling_params={"temperature": 0.0})
+
+        coworker.run("What is the answer?")
+        coworker.add_to_memory("The answer changed.")
+        coworker.run("What is the answer?")
+
+        self.assertEqual(self.mock_model.generate.call_count, 2)
+
+    def test_nonzero_temperature_is_not_cached(self):
+        """
+        Test that sampled answers are not cached by default.
+        """
+        coworker = self.create_coworker()
+
+        coworker.run("What is the answer?")
+        coworker.run("What is the answer?")
+
+        self.assertEqual(self.mock_model.generate.call_count, 2)
+        self.assertEqual(len(self.cache), 0)
+
+if __name__ == "__main__":
+    unittest.main()
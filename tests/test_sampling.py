@@ -0,0 +1,101 @@
+"""
+Tests for vectorized token sampling.
+"""
+
+import unittest
+
+import numpy as np
+
+from bitnet_vc_builder.models.sampling import Sampler, apply_repetition_penalty, sample_tokens
+
+class TestSampling(unittest.TestCase):
+    """
+    Test the sampling functions.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.rng = np.random.default_rng(0)
+
+    def test_greedy(self):
+        """
+        Test that a temperature of 0 picks the most likely token of every row.
+        """
+        logits = self.rng.standard_normal((4, 50))
+
+        tokens = sample_tokens(logits, temperature=0.0)
+
+        np.testing.assert_array_equal(tokens, logits.argmax(axis=1))
+
+    def test_per_sequence_temperature(self):
+        """
+        Test that greedy and sampled sequences can share a batch.
+        """
+        logits = np.tile(np.linspace(0, 1, 20), (2, 1))
+
+        tokens = sample_tokens(logits, temperature=np.array([0.0, 100.0]), rng=self.rng)
+
+        self.assertEqual(tokens[0], 19)
+
+    def test_top_k(self):
+        """
+        Test that only the k most likely tokens are sampled.
+        """
+        logits = np.tile(np.arange(100, dtype=np.float64), (2000, 1))
+
+        tokens = sample_tokens(logits, temperature=5.0, top_k=3, rng=self.rng)
+
+        self.assertEqual(set(tokens.tolist()), {97, 98, 99})
+
+    def test_top_p(self):
+        """
+        Test that sampling stops at the smallest set reaching top_p.
+        """
+        logits = np.tile(np.log([0.5, 0.3, 0.15, 0.05]), (2000, 1))
+
+        tokens = sample_tokens(logits, temperature=1.0, top_p=0.6, rng=self.rng)
+
+        self.assertEqual(set(tokens.tolist()), {0, 1})
+        self.assertAlmostEqual(np.mean(tokens == 0), 0.5 / 0.8, delta=0.05)
+
+    def test_distribution(self):
+        """
+        Test that samples follow the softmax of the logits.
+        """
+        probs = np.array([0.1, 0.2, 0.3, 0.4])
+        logits = np.tile(np.log(probs), (20000, 1))
+
+        tokens = sample_tokens(logits, temperature=1.0, rng=self.rng)
+
+        np.testing.assert_allclose(np.bincount(tokens, minlength=4) / 20000, probs, atol=0.02)
+
+    def test_repetition_penalty(self):
+        """
+        Test that repeated tokens become less likely whatever their sign.
+        """
+        logits = np.array([[2.0, -2.0, 1.0]])
+        counts = np.array([[1, 3, 0]])
+
+        penalized = apply_repetition_penalty(logits, counts, 2.0)
+
+        np.testing.assert_array_equal(penalized, [[1.0, -4.0, 1.0]])
+        self.assertIs(apply_repetition_penalty(logits, counts, 1.0), logits)
+
+    def test_sampler_tracks_counts(self):
+        """
+        Test that the sampler penalizes the tokens it produced.
+        """
+        sampler = Sampler(batch_size=2, vocab_size=3, temperature=0.0, repetition_penalty=10.0)
+        logits = np.array([[3.0, 2.0, 0.0], [0.0, 2.0, 3.0]])
+
+        first = sampler.sample(logits)
+        second = sampler.sample(logits)
+
+        np.testing.assert_array_equal(first, [0, 2])
+        np.testing.assert_array_equal(second, [1, 1])
+        self.assertEqual(sampler.counts.sum(), 4)
+
+if __name__ == "__main__":
+    unittest.main()
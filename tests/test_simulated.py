@@ -0,0 +1,150 @@
+"""
+Tests for the simulated model backend.
+"""
+
+import time
+import unittest
+
+from bitnet_vc_builder.core.cancellation import CancelToken, CancelledError
+from bitnet_vc_builder.core.timing import InMemoryCollector, set_collector
+from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker
+from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+from bitnet_vc_builder.models.simulated import SimulatedBackend
+from bitnet_vc_builder.tools.base_tools import Tool
+
+def echo(prompt, max_tokens):
+    """
+    Fallback response used by the tests.
+    """
+    return "one two three"
+
+class TestSimulatedBackend(unittest.TestCase):
+    """
+    Test SimulatedBackend class.
+    """
+
+    def test_costs(self):
+        """
+        Test that a call takes the prefill and decode costs.
+        """
+        backend = SimulatedBackend(prefill_time_per_token=0.01, decode_time_per_token=0.01, jitter=0.0)
+
+        start = time.perf_counter()
+        text = backend.generate("a b c d e", 16, echo)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(text, "one two three")
+        self.assertGreaterEqual(elapsed, 0.08)
+        self.assertLess(elapsed, 0.5)
+
+    def test_seeded_jitter(self):
+        """
+        Test that the same seed gives the same jitter sequence.
+        """
+        first = SimulatedBackend(jitter=0.5, seed=7)
+        second = SimulatedBackend(jitter=0.5, seed=7)
+
+        factors = [first._next_call("prompt")[1] for _ in range(5)]
+
+        self.assertEqual(factors, [second._next_call("prompt")[1] for _ in range(5)])
+        self.assertTrue(all(0.5 <= factor <= 1.5 for factor in factors))
+        self.assertNotEqual(len(set(factors)), 1)
+
+    def test_calls_do_not_depend_on_order(self):
+        """
+        Test that jitter and scripted responses depend on the prompt, not on the order of calls.
+        """
+        prompts = ["task a", "task b", "task a", "task c"]
+        first = SimulatedBackend(jitter=0.5, script=["one", "two", "three"])
+        second = SimulatedBackend(jitter=0.5, script=["one", "two", "three"])
+
+        forward = [(prompt, first._next_call(prompt)) for prompt in prompts]
+        backward = [(prompt, second._next_call(prompt)) for prompt in reversed(prompts)]
+
+        self.assertEqual(sorted(forward), sorted(backward))
+        self.assertEqual(dict(forward)["task c"][0], 0)
+
+    def test_script_follows_conversation(self):
+        """
+        Test that each conversation steps through the script on its own.
+        """
+        backend = SimulatedBackend(decode_time_per_token=0.0, jitter=0.0, script=["Action: a", "Final Answer: b"])
+
+        self.assertEqual(backend.generate("Task 1", 16, echo), "Action: a")
+        self.assertEqual(backend.generate("Task 2", 16, echo), "Action: a")
+        self.assertEqual(backend.generate("Task 2\nAction: a\nResult: x", 16, echo), "Final Answer: b")
+
+    def test_script_and_output_tokens(self):
+        """
+        Test that scripted responses cycle and output_tokens sets the decode charge.
+        """
+        backend = SimulatedBackend(decode_time_per_token=0.0, jitter=0.0, script=["first", "second"], output_tokens=40)
+        collector = InMemoryCollector()
+        set_collector(collector)
+        try:
+            texts = [backend.generate("prompt", 16, echo) for _ in range(3)]
+        finally:
+            set_collector(None)
+
+        self.assertEqual(texts, ["first", "second", "first"])
+        self.assertEqual(collector.get_stats()["decode"]["mean_tokens"], 16.0)
+        self.assertEqual(backend.get_stats()["calls"], 3)
+
+    def test_cancellation(self):
+        """
+        Test that a cancelled call stops between tokens.
+        """
+        backend = SimulatedBackend(decode_time_per_token=0.05, jitter=0.0)
+        token = CancelToken(timeout=0.1)
+
+        start = time.perf_counter()
+        with self.assertRaises(CancelledError):
+            backend.generate("prompt", 100, lambda prompt, max_tokens: "word " * 100, token)
+
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_invalid_settings(self):
+        """
+        Test that invalid settings are rejected.
+        """
+        with self.assertRaises(ValueError):
+            SimulatedBackend(jitter=1.5)
+        with self.assertRaises(ValueError):
+            SimulatedBackend(decode_time_per_token=-1.0)
+        with self.assertRaises(ValueError):
+            SimulatedBackend(script=[])
+
+class TestSimulatedModel(unittest.TestCase):
+    """
+    Test BitNetModel with simulation settings.
+    """
+
+    def test_coworker_run(self):
+        """
+        Test a scripted ReAct run with generation metrics.
+        """
+        tool = Tool(name="calculator", description="Calculate", function=lambda expression: "4", args_schema={"expression": {"type": "string"}})
+        model = BitNetModel(
+            model_path="simulated",
+            simulation={
+                "decode_time_per_token": 0.001,
+                "script": ["Action: calculator\nAction Input: {\"expression\": \"2 + 2\"}", "Final Answer: 4"]
+            }
+        )
+        coworker = BitNetVirtualCoworker(model=model, tools=[tool])
+        collector = InMemoryCollector()
+        set_collector(collector)
+        try:
+            answer = coworker.run("What is 2 + 2?")
+        finally:
+            set_collector(None)
+
+        stats = collector.get_stats()
+        self.assertEqual(answer, "4")
+        self.assertEqual(model.backend, "simulated")
+        self.assertTrue(model.get_model_info()["is_mock"])
+        self.assertEqual(stats["tool"]["count"], 1)
+        self.assertGreater(stats["generate"]["mean_tokens_per_second"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
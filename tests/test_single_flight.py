@@ -0,0 +1,156 @@
+"""
+Tests for SingleFlight class.
+"""
+
+import time
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+from bitnet_vc_builder.core.single_flight import SingleFlight
+from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker
+from bitnet_vc_builder.memory.memory import Memory
+from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+
+class TestSingleFlight(unittest.TestCase):
+    """
+    Test SingleFlight class.
+    """
+    
+    def test_concurrent_calls_share_execution(self):
+        """
+        Test that overlapping calls with the same key run once.
+        """
+        group = SingleFlight()
+        release = threading.Event()
+        calls = []
+        
+        def slow():
+            calls.append(1)
+            release.wait(5)
+            return "result"
+        
+        def call():
+            return group.do("key", slow)
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(call) for _ in range(4)]
+            # Wait until every caller has joined before letting the leader finish
+            while group.get_stats()["coalesced"] < 3:
+                time.sleep(0.001)
+            release.set()
+            results = [future.result() for future in futures]
+        
+        self.assertEqual(results, ["result"] * 4)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(group.get_stats(), {"executions": 1, "coalesced": 3, "in_flight": 0})
+    
+    def test_sequential_calls_run_again(self):
+        """
+        Test that a finished call does not serve later callers.
+        """
+        group = SingleFlight()
+        function = MagicMock(side_effect=["first", "second"])
+        
+        self.assertEqual(group.do("key", function), "first")
+        self.assertEqual(group.do("key", function), "second")
+    
+    def test_errors_are_shared(self):
+        """
+        Test that waiters receive the leader's exception.
+        """
+        group = SingleFlight()
+        release = threading.Event()
+        
+        def failing():
+            release.wait(5)
+            raise ValueError("boom")
+        
+        def call():
+            try:
+                group.do("key", failing)
+            except ValueError as e:
+                return str(e)
+        
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(call) for _ in range(3)]
+            while group.get_stats()["coalesced"] < 2:
+                time.sleep(0.001)
+            release.set()
+            results = [future.result() for future in futures]
+        
+        self.assertEqual(results, ["boom"] * 3)
+        self.assertEqual(group.in_flight(), 0)
+    
+    def test_coworker_coalesces_identical_runs(self):
+        """
+        Test that identical concurrent runs of a virtual co-worker share one execution.
+        """
+        release = threading.Event()
+        mock_model = MagicMock(spec=BitNetModel)
+        
+        def generate(**kwargs):
+            release.wait(5)
+            return "Final Answer: shared"
+        
+        mock_model.generate.side_effect = generate
+        coworker = BitNetVirtualCoworker(model=mock_model, memory=Memory(), name="Test", description="Test")
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(coworker.run, "Same task") for _ in range(4)]
+            while coworker._inflight.get_stats()["coalesced"] < 3:
+                time.sleep(0.001)
+            release.set()
+            results = [future.result() for future in futures]
+        
+        self.assertEqual(results, ["shared"] * 4)
+        self.assertEqual(mock_model.generate.call_count, 1)
+        self.assertEqual(len(coworker.memory), 1)
+    
+    def test_model_coalesces_identical_generations(self):
+        """
+        Test that identical concurrent generate calls share one inference run.
+        """
+        model = BitNetModel(model_path="mock_model", use_bitnet_integration=False)
+        release = threading.Event()
+        original = model._mock_generate
+        model._mock_generate = MagicMock(side_effect=lambda *args: release.wait(5) and original(*args))
+        
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(model.generate, "User: hello") for _ in range(3)]
+            while model._inflight.get_stats()["coalesced"] < 2:
+                time.sleep(0.001)
+            release.set()
+            results = [future.result() for future in futures]
+        
+        self.assertEqual(len(set(results)), 1)
+        self.assertEqual(model._mock_generate.call_count, 1)
+        
+        # Different sampling parameters are separate calls
+        model.generate("User: hello", temperature=0.0)
+        self.assertEqual(model._mock_generate.call_count, 2)
+
+    def test_model_coalesces_runs_of_identical_coworkers(self):
+        """
+        Test that separate runs with the same prompt and tools share the model's generation.
+        """
+        model = BitNetModel(model_path="mock_model", use_bitnet_integration=False)
+        release = threading.Event()
+        original = model._mock_generate
+        model._mock_generate = MagicMock(side_effect=lambda *args: release.wait(5) and original(*args))
+        coworkers = [BitNetVirtualCoworker(model=model, memory=Memory(), name="Test", description="Test") for _ in range(2)]
+        
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(coworker.run, "Same task") for coworker in coworkers]
+            deadline = time.monotonic() + 5
+            while model._inflight.get_stats()["coalesced"] < 1 and time.monotonic() < deadline:
+                time.sleep(0.001)
+            release.set()
+            results = [future.result() for future in futures]
+        
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(model._mock_generate.call_count, 1)
+
+if __name__ == "__main__":
+    unittest.main()
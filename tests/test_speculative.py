@@ -0,0 +1,240 @@
+"""
+Tests for speculative decoding.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import threading
+
+import numpy as np
+
+from bitnet_vc_builder.core.cancellation import CancelToken, CancelledError
+from bitnet_vc_builder.core.react_parser import ReActGrammar
+from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+from bitnet_vc_builder.models.grammar import get_grammar
+from bitnet_vc_builder.models.numpy_backend import NumPyTransformer
+from bitnet_vc_builder.models.speculative import (
+    PromptLookupDrafter, DraftModelDrafter, SpeculationGate, expected_tokens_per_pass, speculative_generate
+)
+from bitnet_vc_builder.models.ternary import TernaryWeights, write_random_model
+
+class TestPromptLookupDrafter(unittest.TestCase):
+    """
+    Test PromptLookupDrafter class.
+    """
+
+    def test_copies_continuation(self):
+        """
+        Test that the tokens after the latest match of the suffix are proposed.
+        """
+        drafter = PromptLookupDrafter(max_ngram=2)
+
+        self.assertEqual(drafter.propose([1, 2, 3, 4, 9, 1, 2, 5, 6, 1, 2], 3), [5, 6, 1])
+        self.assertEqual(drafter.propose([7, 8, 9, 4, 8], 5), [9, 4, 8])
+
+    def test_no_match(self):
+        """
+        Test that nothing is proposed for an unseen suffix.
+        """
+        self.assertEqual(PromptLookupDrafter().propose([1, 2, 3], 4), [])
+        self.assertEqual(PromptLookupDrafter().propose([1], 4), [])
+
+class TestSpeculationGate(unittest.TestCase):
+    """
+    Test SpeculationGate class.
+    """
+
+    def test_expected_tokens_per_pass(self):
+        """
+        Test the expected yield of a pass at several acceptance rates.
+        """
+        self.assertEqual(expected_tokens_per_pass(0.0, 4), 1.0)
+        self.assertEqual(expected_tokens_per_pass(1.0, 4), 5.0)
+        self.assertAlmostEqual(expected_tokens_per_pass(0.5, 2), 1.75)
+
+    def test_declines_when_speculation_does_not_pay_off(self):
+        """
+        Test that a low acceptance rate falls back to plain decoding, probing now and then.
+        """
+        gate = SpeculationGate(pass_cost=2.0, num_draft_tokens=4, min_proposed=10, probe_interval=4)
+        drafter = PromptLookupDrafter()
+
+        self.assertTrue(gate.allows(drafter))
+
+        drafter.record(10, 1)
+        self.assertLess(gate.expected_speedup(0.1), 1.0)
+        self.assertEqual([gate.allows(drafter) for _ in range(8)], [False, False, False, True] * 2)
+
+        drafter.record(90, 89)
+        self.assertTrue(gate.allows(drafter))
+        self.assertGreater(gate.get_stats(drafter)["expected_speedup"], 1.0)
+
+class TestSpeculativeGeneration(unittest.TestCase):
+    """
+    Test speculative generation on the NumPy backend.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "main.i2s")
+        self.draft_path = os.path.join(self.temp_dir, "draft.i2s")
+        write_random_model(self.path, num_attention_heads=4)
+        write_random_model(self.draft_path, num_layers=1, seed=1, num_attention_heads=4)
+        self.weights = TernaryWeights(self.path)
+        self.draft_weights = TernaryWeights(self.draft_path)
+        self.transformer = NumPyTransformer(self.weights)
+
+    def tearDown(self):
+        """
+        Clean up test fixtures.
+        """
+        self.transformer = None
+        self.weights.close()
+        self.draft_weights.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_greedy_matches_plain_decoding(self):
+        """
+        Test that greedy speculative output equals greedy decoding for both drafters.
+        """
+        prompt = "Action: search\nAction Input: {\"query\": \"x\"}\nAction: "
+        expected = self.transformer.generate(prompt, max_tokens=16)
+
+        for drafter in (PromptLookupDrafter(), DraftModelDrafter(NumPyTransformer(self.draft_weights))):
+            text = speculative_generate(self.transformer, drafter, prompt, max_tokens=16, num_draft_tokens=4)
+            self.assertEqual(text, expected)
+            self.assertGreater(drafter.get_stats()["proposed"], 0)
+
+    def test_draft_model_state_is_per_thread(self):
+        """
+        Test that concurrent proposals from one draft model match sequential ones.
+        """
+        contexts = [[1, 2, 3, 4, 5, 6], [9, 8, 7, 6], [5, 5, 5, 5, 5, 1, 2]]
+        expected = [DraftModelDrafter(NumPyTransformer(self.draft_weights)).propose(context, 4) for context in contexts]
+        drafter = DraftModelDrafter(NumPyTransformer(self.draft_weights))
+        results = [[] for _ in contexts]
+
+        def propose(index):
+            for _ in range(5):
+                results[index].append(drafter.propose(contexts[index], 4))
+
+        threads = [threading.Thread(target=propose, args=(index,)) for index in range(len(contexts))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for index, proposals in enumerate(results):
+            self.assertEqual(proposals, [expected[index]] * 5)
+
+    def test_self_draft_is_always_accepted(self):
+        """
+        Test that drafts from the model itself are all accepted.
+        """
+        drafter = DraftModelDrafter(self.transformer)
+
+        speculative_generate(self.transformer, drafter, "Hello", max_tokens=12, num_draft_tokens=3)
+
+        stats = drafter.get_stats()
+        self.assertEqual(stats["accepted"], stats["proposed"])
+
+    def test_sampling_respects_token_budget(self):
+        """
+        Test that sampled speculative output stops at max_tokens.
+        """
+        text = speculative_generate(
+            self.transformer, PromptLookupDrafter(), "abcabcabc", max_tokens=10,
+            temperature=1.0, top_k=20, seed=0
+        )
+
+        self.assertLessEqual(len(text.encode("utf-8")), 10)
+
+    def test_grammar_masks_decoding(self):
+        """
+        Test that every token is masked by the grammar, identically with and without drafts.
+        """
+        grammar = get_grammar({
+            "type": "object",
+            "properties": {"a": {"type": "string", "enum": ["xy", "z"]}, "n": {"type": "integer"}},
+            "required": ["a", "n"],
+            "additionalProperties": False
+        })
+
+        for temperature, seed in ((0.0, None), (1.0, 0), (1.0, 1)):
+            plain = self.transformer.generate("Answer: ", max_tokens=48, temperature=temperature, seed=seed, grammar=grammar)
+            drafted = speculative_generate(
+                self.transformer, PromptLookupDrafter(), "Answer: ", max_tokens=48,
+                temperature=temperature, seed=seed, grammar=grammar
+            )
+            self.assertIsNotNone(grammar.advance(grammar.initial_state, plain))
+            self.assertIsNotNone(grammar.advance(grammar.initial_state, drafted))
+            if temperature == 0.0:
+                self.assertEqual(drafted, plain)
+
+    def test_grammar_stops_when_document_closes(self):
+        """
+        Test that decoding stops once the document is complete.
+        """
+        grammar = get_grammar({"type": "array", "items": {"type": "integer"}})
+        # "]" is the most likely token everywhere, then "["
+        logits = np.zeros(self.transformer.vocab_size, dtype=np.float32)
+        logits[ord("]")] = 2.0
+        logits[ord("[")] = 1.0
+        self.transformer.forward_batch = lambda sequences, caches, all_logits=False: np.tile(logits, (len(sequences), 1))
+
+        self.assertEqual(self.transformer.generate("x", max_tokens=16, grammar=grammar), "[]")
+
+    def test_react_grammar_stops_after_tool_call(self):
+        """
+        Test that decoding stops as soon as the streamed tool call is complete.
+        """
+        script = 'Action: search\nAction Input: {"query": "x"}\nObservation: made up'
+        position = [0]
+
+        def forward_batch(sequences, caches, all_logits=False):
+            # Make the next character of the script the most likely token
+            logits = np.zeros((len(sequences), self.transformer.vocab_size), dtype=np.float32)
+            logits[:, ord(script[min(position[0], len(script) - 1)])] = 5.0
+            position[0] += 1
+            return logits
+
+        self.transformer.forward_batch = forward_batch
+        grammar = ReActGrammar(lambda name: get_grammar({"type": "object", "properties": {"query": {"type": "string"}}}))
+
+        text = self.transformer.generate("x", max_tokens=len(script), grammar=grammar)
+
+        self.assertEqual(text, 'Action: search\nAction Input: {"query": "x"}')
+
+    def test_checks_cancellation(self):
+        """
+        Test that a cancelled token stops decoding.
+        """
+        token = CancelToken()
+        token.cancel()
+
+        with self.assertRaises(CancelledError):
+            speculative_generate(self.transformer, PromptLookupDrafter(), "Hello", max_tokens=8, cancel_token=token)
+
+    def test_model_uses_drafter(self):
+        """
+        Test that BitNetModel decodes speculatively when a drafter is configured.
+        """
+        plain = BitNetModel(model_path=self.path, use_bitnet_integration=False)
+        model = BitNetModel(model_path=self.path, use_bitnet_integration=False, draft="ngram")
+
+        self.assertIsNone(plain.get_speculative_stats())
+        self.assertEqual(
+            model.generate("abcabc", max_tokens=8, temperature=0.0),
+            plain.generate("abcabc", max_tokens=8, temperature=0.0)
+        )
+        stats = model.get_speculative_stats()
+        self.assertIn("acceptance_rate", stats)
+        self.assertGreater(stats["pass_cost"], 0.0)
+
+if __name__ == "__main__":
+    unittest.main()
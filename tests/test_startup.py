@@ -0,0 +1,102 @@
+"""
+Tests for CLI startup: lazy imports and listing without a model.
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+import bitnet_vc_builder
+
+SRC_PATH = os.path.dirname(os.path.dirname(os.path.abspath(bitnet_vc_builder.__file__)))
+SHIPPED_CONFIG = os.path.join(os.path.dirname(SRC_PATH), "config", "config.yaml")
+
+def run_python(args, cwd):
+    """
+    Run a fresh interpreter that imports the package from this tree, with
+    cwd as its home directory so caches stay out of the user's.
+    """
+    env = dict(os.environ)
+    env["HOME"] = cwd
+    env["PYTHONPATH"] = os.pathsep.join(path for path in (SRC_PATH, env.get("PYTHONPATH")) if path)
+    return subprocess.run([sys.executable] + args, cwd=cwd, env=env, capture_output=True, text=True, timeout=60)
+
+class TestStartup(unittest.TestCase):
+    """
+    Test that the CLI starts without loading the model stack.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Clean up test fixtures.
+        """
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_cli_import_is_lazy(self):
+        """
+        Test that importing the CLI does not import NumPy, requests or YAML.
+        """
+        code = (
+            "import sys, bitnet_vc_builder.main\n"
+            "print(sorted(name for name in ('numpy', 'requests', 'yaml', 'bitnet_vc_builder.models.bitnet_wrapper') if name in sys.modules))"
+        )
+
+        completed = run_python(["-c", code], self.temp_dir)
+
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertEqual(completed.stdout.strip(), "[]")
+
+    def test_package_exports(self):
+        """
+        Test that the package's public names import on first access.
+        """
+        from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker
+        from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+
+        self.assertIs(bitnet_vc_builder.BitNetModel, BitNetModel)
+        self.assertIs(bitnet_vc_builder.BitNetAgent, BitNetVirtualCoworker)
+        self.assertIn("BitNetTeam", dir(bitnet_vc_builder))
+        with self.assertRaises(AttributeError):
+            bitnet_vc_builder.NotExported
+
+    def test_list_without_model(self):
+        """
+        Test that --list prints the configured names without loading a model.
+        """
+        config_path = os.path.join(self.temp_dir, "config.yaml")
+        with open(config_path, "w") as f:
+            json.dump({"agents": [{"name": "Researcher"}, {"name": "Writer"}], "teams": [{"name": "ResearchTeam"}]}, f)
+
+        completed = run_python(["-m", "bitnet_vc_builder.main", "--config", config_path, "--list"], self.temp_dir)
+
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertEqual(
+            completed.stdout,
+            "Available virtual co-workers:\n  - Researcher\n  - Writer\n\nAvailable teams:\n  - ResearchTeam\n"
+        )
+
+    def test_list_shipped_config(self):
+        """
+        Test that --list prints the template names of the shipped configuration.
+        """
+        completed = run_python(["-m", "bitnet_vc_builder.main", "--config", SHIPPED_CONFIG, "--list"], self.temp_dir)
+
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertEqual(
+            completed.stdout,
+            "Available virtual co-workers:\n  - Researcher\n  - Analyst\n  - Writer\n  - Coder\n\n"
+            "Available teams:\n  - ResearchTeam\n  - DevelopmentTeam\n"
+        )
+
+if __name__ == "__main__":
+    unittest.main()
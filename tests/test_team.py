@@ -2,10 +2,12 @@
 Tests for BitNetTeam class.
 """
 
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
 
-from bitnet_vc_builder.core.team import BitNetTeam, CollaborationMode, TaskStatus, Task
+from bitnet_vc_builder.core.team import BitNetTeam, CollaborationMode, PerformanceTracker, TaskStatus, Task
+from bitnet_vc_builder.core.timing import InMemoryCollector, set_collector, span
 from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker
 
 class TestBitNetTeam(unittest.TestCase):
@@ -254,6 +256,99 @@ class TestBitNetTeam(unittest.TestCase):
         # Test getting performance for non-existent virtual co-worker
         metrics = self.team.get_agent_performance("NonExistentCoworker")
         self.assertIsNone(metrics)
+    
+    def test_performance_failures_and_usage(self):
+        """
+        Test that failed runs are counted and usage is read from timing spans.
+        """
+        def run_with_tool(task, cancel_token=None):
+            with span("generate") as generate_span:
+                generate_span.set(tokens=7)
+            with span("tool", tool="search"):
+                pass
+            return "Coworker2 response"
+        
+        self.mock_coworker2.run.side_effect = run_with_tool
+        self.mock_coworker3.run.side_effect = RuntimeError("model offline")
+        set_collector(InMemoryCollector())
+        try:
+            self.team.run("Test task")
+        finally:
+            set_collector(None)
+        
+        metrics = self.team.get_performance_metrics()
+        
+        self.assertEqual(metrics["Coworker2"]["tokens"], 7)
+        self.assertEqual(metrics["Coworker2"]["tool_calls"], 1)
+        self.assertEqual(metrics["Coworker3"]["tasks_failed"], 1)
+        self.assertEqual(metrics["Coworker3"]["tasks_completed"], 0)
+        self.assertLessEqual(metrics["Coworker1"]["p50_time"], metrics["Coworker1"]["p99_time"])
+
+class TestPerformanceTracker(unittest.TestCase):
+    """
+    Test PerformanceTracker class.
+    """
+    
+    def test_merges_threads(self):
+        """
+        Test that records from several threads are merged with tail quantiles.
+        """
+        tracker = PerformanceTracker(["worker"])
+        
+        def work(offset):
+            for i in range(100):
+                tracker.record_completed("worker", (offset + i + 1) / 1000.0, tokens=1)
+        
+        threads = [threading.Thread(target=work, args=(offset,)) for offset in (0, 100, 200, 300)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        metrics = tracker.get("worker")
+        
+        self.assertEqual(metrics["tasks_completed"], 400)
+        self.assertEqual(metrics["tokens"], 400)
+        self.assertAlmostEqual(metrics["avg_time"], 0.2005)
+        self.assertAlmostEqual(metrics["p50_time"], 0.2, delta=0.005)
+        self.assertAlmostEqual(metrics["p99_time"], 0.396, delta=0.008)
+        self.assertEqual(metrics["max_time"], 0.4)
+        self.assertEqual(len(tracker._buffers), 0)
+    
+    def test_exited_threads_are_merged(self):
+        """
+        Test that buffers of exited threads are reclaimed, keep their records and reset with their co-worker.
+        """
+        tracker = PerformanceTracker(["worker"])
+        tracker.record_completed("worker", 0.5)
+        
+        for i in range(20):
+            thread = threading.Thread(target=tracker.record_completed, args=("worker", 0.1), kwargs={"tool_calls": 1})
+            thread.start()
+            thread.join()
+        
+        metrics = tracker.get("worker")
+        self.assertEqual(len(tracker._buffers), 1)
+        self.assertEqual(metrics["tasks_completed"], 21)
+        self.assertEqual(metrics["tool_calls"], 20)
+        self.assertEqual(metrics["max_time"], 0.5)
+        
+        tracker.add_agent("worker")
+        self.assertEqual(tracker.get("worker")["tasks_completed"], 0)
+    
+    def test_remove_agent(self):
+        """
+        Test that removed and re-added virtual co-workers start over.
+        """
+        tracker = PerformanceTracker(["worker"])
+        tracker.record_failed("worker")
+        
+        tracker.remove_agent("worker")
+        self.assertIsNone(tracker.get("worker"))
+        tracker.add_agent("worker")
+        
+        self.assertEqual(tracker.get("worker")["tasks_failed"], 0)
+        self.assertEqual(tracker.get("worker")["p99_time"], 0.0)
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,197 @@
+"""
+Tests for the packed ternary weight format.
+"""
+
+import os
+import json
+import struct
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+from bitnet_vc_builder.models.ternary import (
+    TernaryWeights, TernaryFormatError, pack_ternary, unpack_ternary, packed_size,
+    quantize_ternary, write_ternary_file, convert_checkpoint
+)
+
+class TestTernaryPacking(unittest.TestCase):
+    """
+    Test packing and quantization of ternary values.
+    """
+
+    def test_round_trip(self):
+        """
+        Test that unpacking returns the packed values.
+        """
+        values = np.random.default_rng(0).integers(-1, 2, size=300).astype(np.int8)
+
+        packed = pack_ternary(values)
+
+        self.assertEqual(packed.nbytes, packed_size(300))
+        self.assertEqual(packed.nbytes, 96)
+        np.testing.assert_array_equal(unpack_ternary(packed, 300), values)
+
+    def test_i2s_layout(self):
+        """
+        Test that byte i of a block holds weights i, i+32, i+64 and i+96.
+        """
+        values = np.zeros(128, dtype=np.int8)
+        values[[0, 32, 64, 96]] = [1, -1, 0, 1]
+
+        packed = pack_ternary(values)
+
+        self.assertEqual(packed[0], (2 << 6) | (0 << 4) | (1 << 2) | 2)
+        self.assertEqual(packed[1], 0b01010101)
+
+    def test_rejects_non_ternary(self):
+        """
+        Test that values outside -1, 0 and 1 are rejected.
+        """
+        with self.assertRaises(ValueError):
+            pack_ternary(np.array([2], dtype=np.int8))
+
+    def test_quantize(self):
+        """
+        Test absmean quantization.
+        """
+        values, scale = quantize_ternary(np.array([0.5, -0.5, 0.01, 1.5]))
+
+        self.assertAlmostEqual(scale, 0.6275, places=4)
+        np.testing.assert_array_equal(values, [1, -1, 0, 1])
+
+class TestTernaryWeights(unittest.TestCase):
+    """
+    Test reading and writing ternary weight files.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "model.i2s")
+        rng = np.random.default_rng(0)
+        self.tensors = {
+            "layers.0.weight": rng.standard_normal((8, 130)).astype(np.float32),
+            "norm.weight": rng.standard_normal(8).astype(np.float16)
+        }
+
+    def tearDown(self):
+        """
+        Clean up test fixtures.
+        """
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_write_and_read(self):
+        """
+        Test that tensors are stored packed or in float and read back.
+        """
+        write_ternary_file(self.path, self.tensors, ternary=lambda name, tensor: tensor.ndim == 2, metadata={"layers": 1})
+
+        with TernaryWeights(self.path) as weights:
+            self.assertEqual(len(weights), 2)
+            self.assertIn("layers.0.weight", weights)
+            self.assertEqual(weights.metadata, {"layers": 1})
+
+            info = weights.info("layers.0.weight")
+            self.assertEqual(info["dtype"], "i2_s")
+            self.assertEqual(info["nbytes"], packed_size(8 * 130))
+
+            expected, scale = quantize_ternary(self.tensors["layers.0.weight"])
+            np.testing.assert_array_equal(weights.ternary("layers.0.weight"), expected)
+            np.testing.assert_allclose(weights.tensor("layers.0.weight"), expected * np.float32(scale))
+
+            norm = weights.tensor("norm.weight")
+            self.assertEqual(norm.dtype, np.float16)
+            np.testing.assert_array_equal(norm, self.tensors["norm.weight"])
+
+            with self.assertRaises(ValueError):
+                weights.ternary("norm.weight")
+
+    def test_tensors_are_aligned_views(self):
+        """
+        Test that tensors are aligned, read-only views of the mapping.
+        """
+        write_ternary_file(self.path, self.tensors)
+
+        weights = TernaryWeights(self.path)
+        raw = weights.raw("layers.0.weight")
+
+        self.assertFalse(raw.flags.writeable)
+        self.assertEqual((weights._data_start + weights.info("norm.weight")["offset"]) % 64, 0)
+
+        # Closing while views are alive leaves the mapping to the garbage collector
+        weights.close()
+        self.assertEqual(raw.nbytes, packed_size(8 * 130))
+
+    def test_invalid_files(self):
+        """
+        Test that files in other formats are rejected.
+        """
+        with open(self.path, "wb") as f:
+            f.write(b"GGUF" + b"\0" * 60)
+        with self.assertRaises(TernaryFormatError):
+            TernaryWeights(self.path)
+
+        with open(self.path, "wb") as f:
+            f.write(b"")
+        with self.assertRaises(TernaryFormatError):
+            TernaryWeights(self.path)
+
+    def test_convert_safetensors(self):
+        """
+        Test converting a safetensors checkpoint.
+        """
+        src = os.path.join(self.temp_dir, "model.safetensors")
+        header = {}
+        data = b""
+        for name, tensor in self.tensors.items():
+            dtype = "F16" if tensor.dtype == np.float16 else "F32"
+            header[name] = {"dtype": dtype, "shape": list(tensor.shape), "data_offsets": [len(data), len(data) + tensor.nbytes]}
+            data += tensor.tobytes()
+        header_bytes = json.dumps(header).encode("utf-8")
+        with open(src, "wb") as f:
+            f.write(struct.pack("<Q", len(header_bytes)) + header_bytes + data)
+
+        stats = convert_checkpoint(src, self.path)
+
+        self.assertEqual(stats["tensors"], 2)
+        self.assertEqual(stats["ternary_tensors"], 1)
+        self.assertLess(stats["output_bytes"], stats["source_bytes"])
+        with TernaryWeights(self.path) as weights:
+            self.assertEqual(weights.info("layers.0.weight")["dtype"], "i2_s")
+            self.assertEqual(weights.info("norm.weight")["dtype"], "float16")
+
+    def test_convert_npz(self):
+        """
+        Test converting a NumPy checkpoint, keeping embeddings in float.
+        """
+        src = os.path.join(self.temp_dir, "model.npz")
+        np.savez(src, **self.tensors, **{"embed_tokens.weight": np.ones((4, 4), dtype=np.float32)})
+
+        convert_checkpoint(src, self.path)
+
+        with TernaryWeights(self.path) as weights:
+            self.assertEqual(weights.info("embed_tokens.weight")["dtype"], "float32")
+
+        with self.assertRaises(ValueError):
+            convert_checkpoint(os.path.join(self.temp_dir, "model.bin"), self.path)
+
+    def test_model_maps_weights_on_load(self):
+        """
+        Test that BitNetModel maps a ternary weight file when it is loaded.
+        """
+        write_ternary_file(self.path, self.tensors)
+        model = BitNetModel(model_path=self.path)
+
+        self.assertIsNone(model.weights)
+        model.load()
+        self.assertIn("layers.0.weight", model.weights)
+        model.unload()
+        self.assertIsNone(model.weights)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+Tests for per-phase timing.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from bitnet_vc_builder.core.timing import NULL_SPAN, InMemoryCollector, TimingCollector, current_span, set_collector, span
+from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker
+from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+from bitnet_vc_builder.models.ternary import write_ternary_file
+from bitnet_vc_builder.tools.base_tools import Tool
+
+class TestSpans(unittest.TestCase):
+    """
+    Test spans and collectors.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.collector = InMemoryCollector()
+        set_collector(self.collector)
+
+    def tearDown(self):
+        """
+        Clean up test fixtures.
+        """
+        set_collector(None)
+
+    def test_disabled_spans_are_shared_no_ops(self):
+        """
+        Test that nothing is recorded without a collector.
+        """
+        set_collector(None)
+
+        with span("run") as run_span:
+            run_span.set(tokens=3)
+
+        self.assertIs(run_span, NULL_SPAN)
+        self.assertIs(current_span(), NULL_SPAN)
+        self.assertEqual(NULL_SPAN.attributes, {})
+
+    def test_nesting(self):
+        """
+        Test that spans nest and reach the collector children first.
+        """
+        recorded = []
+        collector = MagicMock(spec=TimingCollector)
+        collector.record.side_effect = lambda finished: recorded.append(finished.name)
+        set_collector(collector)
+
+        with span("run") as run_span:
+            with span("think"):
+                with span("generate") as generate_span:
+                    self.assertIs(current_span(), generate_span)
+
+        self.assertEqual(recorded, ["generate", "think", "run"])
+        self.assertEqual(run_span.to_dict()["children"][0]["children"][0]["name"], "generate")
+        self.assertGreaterEqual(run_span.duration, generate_span.duration)
+
+    def test_aggregates(self):
+        """
+        Test per-phase counts and attribute means.
+        """
+        for tokens in (2, 4):
+            with span("decode", tokens=tokens):
+                pass
+
+        stats = self.collector.get_stats()["decode"]
+
+        self.assertEqual(stats["count"], 2)
+        self.assertEqual(stats["mean_tokens"], 3.0)
+        self.assertGreaterEqual(stats["max"], stats["mean"])
+        self.assertEqual(len(self.collector.roots), 2)
+
+    def test_errors_are_recorded(self):
+        """
+        Test that a failing phase is still recorded with its error.
+        """
+        with self.assertRaises(KeyError):
+            with span("tool"):
+                raise KeyError("x")
+
+        self.assertEqual(self.collector.roots[0].attributes["error"], "KeyError")
+
+    def test_coworker_phases(self):
+        """
+        Test that a co-worker run records its phases under one run span, one iteration per step.
+        """
+        tool = MagicMock(spec=Tool)
+        tool.name = "search"
+        tool.description = "Search"
+        tool.args_schema = {}
+        tool.return_value = "result"
+        model = BitNetModel(model_path="models/test_model", use_bitnet_integration=False)
+        model.generate = MagicMock(side_effect=["Action: search\nAction Input: {}", "Final Answer: done"])
+        coworker = BitNetVirtualCoworker(model=model, tools=[tool])
+
+        coworker.run("Search for x")
+
+        stats = self.collector.get_stats()
+        for phase in ("run", "think", "prompt", "parse", "tool", "memory"):
+            self.assertIn(phase, stats)
+        self.assertEqual(stats["think"]["count"], 2)
+        iterations = [child for child in self.collector.roots[-1].children if child.name == "iteration"]
+        self.assertEqual([iteration.attributes["step"] for iteration in iterations], [0, 1])
+        self.assertTrue(all(iteration.child("think") is not None for iteration in iterations))
+
+    def test_generation_metrics(self):
+        """
+        Test that generation reports prefill, decode, time to first token and throughput.
+        """
+        temp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(temp_dir, "tiny.i2s")
+            rng = np.random.default_rng(0)
+            tensors = {
+                "model.embed_tokens.weight": rng.standard_normal((256, 128)).astype(np.float32),
+                "model.norm.weight": np.ones(128, dtype=np.float32),
+                "model.layers.0.input_layernorm.weight": np.ones(128, dtype=np.float32),
+                "model.layers.0.post_attention_layernorm.weight": np.ones(128, dtype=np.float32)
+            }
+            for name in ("self_attn.q_proj", "self_attn.k_proj", "self_attn.v_proj", "self_attn.o_proj", "mlp.gate_proj", "mlp.up_proj", "mlp.down_proj"):
+                tensors[f"model.layers.0.{name}.weight"] = rng.standard_normal((128, 128))
+            write_ternary_file(
+                path, tensors,
+                ternary=lambda name, tensor: tensor.ndim == 2 and "embed" not in name,
+                metadata={"config": {"hidden_size": 128, "num_hidden_layers": 1, "num_attention_heads": 4}}
+            )
+            model = BitNetModel(model_path=path, use_bitnet_integration=False)
+
+            model.generate("Hello", max_tokens=5, temperature=0.0)
+
+            generate_span = self.collector.roots[-1]
+            self.assertEqual(generate_span.name, "generate")
+            self.assertEqual([child.name for child in generate_span.children], ["tokenize", "prefill", "decode"])
+            self.assertEqual(generate_span.attributes["tokens"], 5)
+            self.assertGreater(generate_span.attributes["tokens_per_second"], 0)
+            self.assertLess(generate_span.attributes["ttft"], generate_span.duration)
+            model.unload()
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    unittest.main()
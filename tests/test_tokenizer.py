@@ -0,0 +1,131 @@
+"""
+Tests for the BPE tokenizer.
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+from bitnet_vc_builder.models.tokenizer import BPETokenizer, BYTE_ENCODER, find_tokenizer
+
+def byte_level_tokenizer_json():
+    """
+    Build a small byte-level tokenizer.json document.
+    """
+    vocab = {char: b for b, char in BYTE_ENCODER.items()}
+    merges = ["Ġ t", "h e", "Ġt he", "o r", "Ġ w", "Ġw or", "l d", "Ġwor ld"]
+    for merge in merges:
+        vocab[merge.replace(" ", "")] = len(vocab)
+
+    return {
+        "added_tokens": [{"id": len(vocab), "content": "<|eot_id|>", "special": True}],
+        "pre_tokenizer": {"type": "Sequence", "pretokenizers": [{"type": "ByteLevel"}]},
+        "decoder": {"type": "ByteLevel"},
+        "model": {"type": "BPE", "vocab": vocab, "merges": merges}
+    }
+
+class TestBPETokenizer(unittest.TestCase):
+    """
+    Test BPETokenizer class.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "tokenizer.json")
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(byte_level_tokenizer_json(), f)
+        self.tokenizer = BPETokenizer.from_file(self.path)
+
+    def tearDown(self):
+        """
+        Clean up test fixtures.
+        """
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_merges_by_rank(self):
+        """
+        Test that words merge into the tokens their ranked merges produce.
+        """
+        ids = self.tokenizer.encode("hello the world")
+        vocab = self.tokenizer.vocab
+
+        self.assertEqual(ids, [vocab["he"], vocab["l"], vocab["l"], vocab["o"], vocab["Ġthe"], vocab["Ġworld"]])
+
+    def test_round_trip(self):
+        """
+        Test that decoding restores the text, including non-ASCII characters.
+        """
+        text = "Action Input: {\"query\": \"café ☕\"}\n\nthe world"
+
+        self.assertEqual(self.tokenizer.decode(self.tokenizer.encode(text)), text)
+
+    def test_special_tokens(self):
+        """
+        Test that special tokens are matched verbatim.
+        """
+        ids = self.tokenizer.encode("the<|eot_id|>")
+
+        self.assertEqual(ids[-1], self.tokenizer.special_tokens["<|eot_id|>"])
+        self.assertEqual(self.tokenizer.decode(ids), "the<|eot_id|>")
+
+    def test_cache(self):
+        """
+        Test that repeated strings are served from the LRU cache.
+        """
+        tokenizer = BPETokenizer.from_file(self.path, cache_size=2)
+
+        first = tokenizer.encode("the world")
+        first.append(0)
+        second = tokenizer.encode("the world")
+        tokenizer.encode("a")
+        tokenizer.encode("b")
+
+        self.assertEqual(len(second), 3)
+        stats = tokenizer.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["cached_texts"], 2)
+
+    def test_batch(self):
+        """
+        Test that batch encoding matches encoding each text.
+        """
+        texts = ["the world", "hello", "the world"]
+
+        self.assertEqual(self.tokenizer.encode_batch(texts), [self.tokenizer.encode(text) for text in texts])
+        self.assertEqual(self.tokenizer.count_tokens("the world"), 3)
+
+    def test_sentencepiece_byte_fallback(self):
+        """
+        Test "▁" word markers and <0xNN> byte fallback.
+        """
+        vocab = {"<unk>": 0, "▁": 1, "a": 2, "b": 3, "▁a": 4, "▁ab": 5}
+        vocab.update({f"<0x{b:02X}>": 6 + b for b in range(256)})
+        tokenizer = BPETokenizer(vocab, [("▁", "a"), ("▁a", "b")], byte_level=False, unk_token="<unk>")
+
+        ids = tokenizer.encode("ab é")
+
+        self.assertEqual(ids[:2], [5, 1])
+        self.assertEqual(ids[2:], [6 + 0xC3, 6 + 0xA9])
+        self.assertEqual(tokenizer.decode(ids), "ab é")
+
+    def test_model_uses_tokenizer(self):
+        """
+        Test that BitNetModel reads the tokenizer from the model directory.
+        """
+        self.assertEqual(find_tokenizer(os.path.join(self.temp_dir, "model.gguf")), self.path)
+
+        model = BitNetModel(model_path=os.path.join(self.temp_dir, "model.gguf"), use_bitnet_integration=False)
+
+        self.assertEqual(model.tokenize("the world"), self.tokenizer.encode("the world"))
+        self.assertEqual(model.detokenize(model.tokenize("the world")), "the world")
+        self.assertEqual(model.get_token_count("the world"), 3)
+        self.assertEqual(model.tokenize_batch(["a", "b"]), [[ord("a")], [ord("b")]])
+
+if __name__ == "__main__":
+    unittest.main()
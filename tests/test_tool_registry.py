@@ -0,0 +1,103 @@
+"""
+Tests for ToolRegistry class.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from bitnet_vc_builder.tools.base_tools import Tool
+from bitnet_vc_builder.tools.registry import ToolRegistry
+
+class TestToolRegistry(unittest.TestCase):
+    """
+    Test ToolRegistry class.
+    """
+    
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.search_tool = Tool(
+            name="Web_Search",
+            description="Search the web",
+            function=MagicMock(return_value="results"),
+            args_schema={"query": {"type": "string", "required": True}}
+        )
+        self.clock_tool = Tool(
+            name="clock",
+            description="Get the current time",
+            function=MagicMock(return_value="noon")
+        )
+        self.registry = ToolRegistry([self.search_tool, self.clock_tool])
+    
+    def test_get_is_case_insensitive(self):
+        """
+        Test get method.
+        """
+        self.assertIs(self.registry.get("web_search"), self.search_tool)
+        self.assertIs(self.registry.get("WEB_SEARCH "), self.search_tool)
+        self.assertIsNone(self.registry.get("unknown"))
+        self.assertIn("CLOCK", self.registry)
+    
+    def test_sequence_behaviour(self):
+        """
+        Test that the registry behaves like an ordered list of tools.
+        """
+        self.assertEqual(len(self.registry), 2)
+        self.assertIs(self.registry[0], self.search_tool)
+        self.assertEqual(list(self.registry), [self.search_tool, self.clock_tool])
+        self.assertEqual(self.registry.names(), ["Web_Search", "clock"])
+    
+    def test_add_replaces_same_name(self):
+        """
+        Test that adding a tool with an existing name replaces it.
+        """
+        replacement = Tool(name="CLOCK", description="Replacement clock", function=MagicMock())
+        self.registry.add(replacement)
+        
+        self.assertEqual(len(self.registry), 2)
+        self.assertIs(self.registry.get("clock"), replacement)
+    
+    def test_remove(self):
+        """
+        Test remove method.
+        """
+        self.assertIs(self.registry.remove("WEB_search"), self.search_tool)
+        self.assertIsNone(self.registry.remove("web_search"))
+        self.assertEqual(self.registry.names(), ["clock"])
+    
+    def test_describe(self):
+        """
+        Test describe method.
+        """
+        description = self.registry.describe()
+        
+        self.assertTrue(description.startswith("You have access to the following tools:"))
+        self.assertIn("- Web_Search: Search the web\n", description)
+        self.assertIn('  Arguments: {"query":{"type":"string","required":true}}\n', description)
+        self.assertIn("- clock: Get the current time\n", description)
+        self.assertEqual(ToolRegistry().describe(), "")
+    
+    def test_describe_is_cached(self):
+        """
+        Test that tool fragments are only formatted once.
+        """
+        self.registry.describe()
+        
+        with patch.object(ToolRegistry, "format_tool", side_effect=AssertionError):
+            self.registry.describe()
+            self.registry.remove("clock")
+            self.assertNotIn("clock", self.registry.describe())
+    
+    def test_refresh(self):
+        """
+        Test that refresh picks up changed descriptions.
+        """
+        self.registry.describe()
+        self.clock_tool.description = "Tell the time"
+        self.registry.refresh("clock")
+        
+        self.assertIn("- clock: Tell the time\n", self.registry.describe())
+
+if __name__ == "__main__":
+    unittest.main()
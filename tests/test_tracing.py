@@ -0,0 +1,141 @@
+"""
+Tests for execution traces.
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from bitnet_vc_builder.core.team import BitNetTeam, CollaborationMode
+from bitnet_vc_builder.core.timing import CompositeCollector, InMemoryCollector, set_collector, span
+from bitnet_vc_builder.core.tracing import TraceWriter, concurrency, critical_path, read_traces, summarize
+from bitnet_vc_builder.core.virtual_coworker import BitNetVirtualCoworker
+from bitnet_vc_builder.memory.memory import Memory
+from bitnet_vc_builder.models.bitnet_wrapper import BitNetModel
+
+def scripted_coworker(name, script, decode_time_per_token=0.0):
+    """
+    Create a virtual co-worker answering from a script.
+    """
+    simulation = {"prefill_time_per_token": 0.0, "decode_time_per_token": decode_time_per_token, "jitter": 0.0, "script": script}
+    return BitNetVirtualCoworker(model=BitNetModel(model_path="simulated", simulation=simulation), memory=Memory(), name=name)
+
+def node(name, start, end, *children, **attributes):
+    """
+    Build a span as read_traces returns it.
+    """
+    return {"name": name, "start": start, "end": end, "duration": end - start, "thread": 0, "attributes": attributes, "children": list(children)}
+
+class TestTraceWriter(unittest.TestCase):
+    """
+    Test writing and reading traces.
+    """
+
+    def setUp(self):
+        """
+        Set up test fixtures.
+        """
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "traces", "traces.jsonl")
+
+    def tearDown(self):
+        """
+        Clean up test fixtures.
+        """
+        set_collector(None)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_round_trip(self):
+        """
+        Test that a span tree is written one line per span and read back.
+        """
+        writer = TraceWriter(self.path)
+        set_collector(writer)
+        with span("run", coworker="Writer"):
+            with span("generate", tokens=12):
+                pass
+        # Top-level spans other than team and co-worker runs are not written
+        with span("generate", tokens=3):
+            pass
+        writer.close()
+
+        with open(self.path) as f:
+            records = [json.loads(line) for line in f]
+        traces = read_traces(self.path)
+
+        self.assertEqual([(record["name"], record.get("parent")) for record in records], [("run", None), ("generate", 0)])
+        self.assertEqual(writer.traces_written, 1)
+        self.assertIn("time", records[0])
+        self.assertEqual(traces[0]["root"]["attributes"], {"coworker": "Writer"})
+        self.assertEqual(summarize(traces[0])["tokens"], 12)
+
+    def test_parallel_team(self):
+        """
+        Test that a PARALLEL team run is traced with its plan, agents and iterations.
+        """
+        plan = json.dumps([
+            {"subtask": "Add the numbers", "agent_name": "Worker1", "depends_on": []},
+            {"subtask": "Check the sum", "agent_name": "Worker2", "depends_on": []}
+        ])
+        agents = [scripted_coworker("Coordinator", [f"Final Answer: {plan}"])]
+        agents += [scripted_coworker(f"Worker{i}", ["Final Answer: the sum is four"], decode_time_per_token=0.02) for i in (1, 2)]
+        team = BitNetTeam(agents=agents, collaboration_mode=CollaborationMode.PARALLEL)
+        timings = InMemoryCollector()
+        writer = TraceWriter(self.path)
+        set_collector(CompositeCollector([timings, writer]))
+
+        team.run("Add 2 and 2")
+        writer.close()
+
+        traces = read_traces(self.path)
+        summary = summarize(traces[0])
+        path_labels = [entry["label"] for entry in summary["critical_path"]]
+
+        self.assertEqual(len(traces), 1)
+        self.assertEqual(summary["mode"], "PARALLEL")
+        self.assertEqual(summary["phases"]["agent"]["count"], 2)
+        self.assertEqual(summary["iterations"], 3)
+        self.assertGreater(summary["tokens"], 0)
+        self.assertEqual(summary["agents"]["max"], 2)
+        self.assertGreater(summary["agents"]["mean"], 1.5)
+        self.assertEqual(path_labels[:2], ["team BitNetTeam", "plan Coordinator"])
+        self.assertTrue(any(label.startswith("agent Worker") for label in path_labels))
+        self.assertEqual(timings.get_stats()["team"]["count"], 1)
+
+class TestTraceAnalysis(unittest.TestCase):
+    """
+    Test critical paths and concurrency.
+    """
+
+    def test_critical_path(self):
+        """
+        Test that the path follows the children that finished last.
+        """
+        root = node(
+            "team", 0.0, 1.0,
+            node("plan", 0.0, 0.2),
+            node("agent", 0.2, 0.5, agent="fast"),
+            node("agent", 0.2, 0.9, node("iteration", 0.2, 0.9, step=0), agent="slow")
+        )
+
+        path = critical_path(root)
+
+        self.assertEqual([entry["label"] for entry in path], ["team", "plan", "agent slow", "iteration 0"])
+        self.assertAlmostEqual(path[0]["self"], 0.1)
+        self.assertEqual(path[2]["depth"], 1)
+
+    def test_concurrency(self):
+        """
+        Test busy time, wall time and peak concurrency.
+        """
+        stats = concurrency([(0.0, 1.0), (0.5, 1.5), (3.0, 4.0)])
+
+        self.assertAlmostEqual(stats["busy"], 3.0)
+        self.assertAlmostEqual(stats["wall"], 2.5)
+        self.assertAlmostEqual(stats["mean"], 1.2)
+        self.assertEqual(stats["max"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -152,6 +152,11 @@ class TestBitNetVirtualCoworker(unittest.TestCase):
         response = "Action: test_tool\n"
         tool_input = self.coworker._extract_tool_input(response)
         self.assertEqual(tool_input, {})
+        
+        # Test with trailing text after the tool input
+        response = "Action: test_tool\nAction Input: {\"arg1\": \"test\"}\nObservation: {pending}\n"
+        tool_input = self.coworker._extract_tool_input(response)
+        self.assertEqual(tool_input, {"arg1": "test"})
     
     def test_extract_final_answer(self):
         """
@@ -189,6 +194,35 @@ class TestBitNetVirtualCoworker(unittest.TestCase):
         self.assertEqual(len(self.coworker.tools), 2)
         self.assertEqual(self.coworker.tools[1], new_tool)
     
+    def test_add_tool_updates_system_prompt(self):
+        """
+        Test that the default system prompt follows tool changes.
+        """
+        new_tool = Tool(name="new_tool", description="A new tool", function=MagicMock())
+        
+        self.assertNotIn("new_tool", self.coworker.system_prompt)
+        
+        self.coworker.add_tool(new_tool)
+        self.assertIn("- new_tool: A new tool", self.coworker.system_prompt)
+        self.assertIs(self.coworker._find_tool("NEW_TOOL"), new_tool)
+        
+        self.coworker.remove_tool("new_tool")
+        self.assertNotIn("new_tool", self.coworker.system_prompt)
+    
+    def test_custom_system_prompt_is_kept(self):
+        """
+        Test that a custom system prompt is not rebuilt when tools change.
+        """
+        coworker = BitNetVirtualCoworker(
+            model=self.mock_model,
+            tools=[self.mock_tool],
+            system_prompt="Custom prompt"
+        )
+        
+        coworker.add_tool(Tool(name="new_tool", description="A new tool", function=MagicMock()))
+        
+        self.assertEqual(coworker.system_prompt, "Custom prompt")
+    
     def test_remove_tool(self):
         """
         Test remove_tool method.